@@ -0,0 +1,37 @@
+"""add_recurring_merchant_watermarks
+
+Per-merchant watermarks so recurring-pattern detection only re-analyzes
+merchants whose transactions changed since the last run.
+
+Revision ID: b3c4d5e6f7a8
+Revises: a2b3c4d5e6f7
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3c4d5e6f7a8'
+down_revision = 'a2b3c4d5e6f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('recurring_merchant_watermarks',
+        sa.Column('merchant', sa.String(), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('amount_total', sa.Float(), nullable=False),
+        sa.Column('last_updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('min_occurrences', sa.Integer(), nullable=False),
+        sa.Column('min_confidence', sa.Float(), nullable=False),
+        sa.Column('detected_frequency', sa.String(), nullable=True),
+        sa.Column('analyzed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('merchant')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('recurring_merchant_watermarks')
@@ -0,0 +1,76 @@
+"""add_monthly_rollups
+
+Per-month transaction totals per (account, bucket tag, category, transfer)
+group, read by reports over whole months. Filled from existing transactions;
+kept current by app.services.monthly_rollups.
+
+Revision ID: c4d5e6f7a8b9
+Revises: b3c4d5e6f7a8
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d5e6f7a8b9'
+down_revision = 'b3c4d5e6f7a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('monthly_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('year_month', sa.Integer(), nullable=False),
+        sa.Column('account_tag_id', sa.Integer(), nullable=True),
+        sa.Column('account_source', sa.String(), nullable=False),
+        sa.Column('bucket_tag_id', sa.Integer(), nullable=True),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('is_transfer', sa.Boolean(), nullable=False),
+        sa.Column('income', sa.Float(), nullable=False),
+        sa.Column('expenses', sa.Float(), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('expense_count', sa.Integer(), nullable=False),
+        sa.Column('first_date', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_monthly_rollups_year_month'), 'monthly_rollups', ['year_month'], unique=False)
+
+    if op.get_bind().dialect.name == 'sqlite':
+        year_month = "CAST(strftime('%Y%m', t.date) AS INTEGER)"
+    else:
+        year_month = "CAST(to_char(t.date, 'YYYYMM') AS INTEGER)"
+    op.execute(f"""
+        INSERT INTO monthly_rollups (
+            year_month, account_tag_id, account_source, bucket_tag_id, category, is_transfer,
+            income, expenses, transaction_count, expense_count, first_date
+        )
+        SELECT year_month, account_tag_id, account_source, bucket_tag_id, category, is_transfer,
+               SUM(CASE WHEN amount > 0 THEN amount ELSE 0.0 END),
+               SUM(CASE WHEN amount < 0 THEN -amount ELSE 0.0 END),
+               COUNT(*),
+               SUM(CASE WHEN amount < 0 THEN 1 ELSE 0 END),
+               MIN(date)
+        FROM (
+            SELECT {year_month} AS year_month,
+                   t.account_tag_id,
+                   t.account_source,
+                   (SELECT tags.id FROM tags
+                    JOIN transaction_tags ON transaction_tags.tag_id = tags.id
+                    WHERE transaction_tags.transaction_id = t.id AND tags.namespace = 'bucket'
+                    ORDER BY tags.value DESC LIMIT 1) AS bucket_tag_id,
+                   COALESCE(NULLIF(t.category, ''), 'Uncategorized') AS category,
+                   t.is_transfer,
+                   t.amount,
+                   t.date
+            FROM transactions t
+        ) AS per_transaction
+        GROUP BY year_month, account_tag_id, account_source, bucket_tag_id, category, is_transfer
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_monthly_rollups_year_month'), table_name='monthly_rollups')
+    op.drop_table('monthly_rollups')
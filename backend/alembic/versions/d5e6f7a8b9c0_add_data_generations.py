@@ -0,0 +1,40 @@
+"""add_data_generations
+
+Per-table change counters bumped on commit by app.services.data_generations.
+Read endpoints build ETags from them and answer If-None-Match with 304.
+
+Revision ID: d5e6f7a8b9c0
+Revises: c4d5e6f7a8b9
+Create Date: 2026-10-16
+
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e6f7a8b9c0'
+down_revision = 'c4d5e6f7a8b9'
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = ('transactions', 'transaction_tags', 'tags', 'budgets', 'dashboards', 'dashboard_widgets')
+
+
+def upgrade() -> None:
+    data_generations = op.create_table('data_generations',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('generation', sa.Integer(), nullable=False),
+        sa.Column('token', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(
+        data_generations,
+        [{'table_name': name, 'generation': 0, 'token': uuid.uuid4().hex} for name in TRACKED_TABLES],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('data_generations')
@@ -0,0 +1,75 @@
+"""add_transaction_search_index
+
+Full-text index over transactions.merchant, description and notes, read by
+the `search` filter through app.services.transaction_search. SQLite gets an
+FTS5 external-content table kept in sync by triggers and filled from the
+existing rows; PostgreSQL a GIN index over to_tsvector('simple', ...).
+
+SQLite batch migrations that rebuild the transactions table drop these
+triggers; such migrations must recreate them and rebuild the index.
+
+Revision ID: e6f7a8b9c0d1
+Revises: d5e6f7a8b9c0
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6f7a8b9c0d1'
+down_revision = 'd5e6f7a8b9c0'
+branch_labels = None
+depends_on = None
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+    "merchant, description, notes, content='transactions', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts(rowid, merchant, description, notes) "
+    "VALUES (new.id, new.merchant, new.description, new.notes); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, merchant, description, notes) "
+    "VALUES ('delete', old.id, old.merchant, old.description, old.notes); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF merchant, description, notes ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, merchant, description, notes) "
+    "VALUES ('delete', old.id, old.merchant, old.description, old.notes); "
+    "INSERT INTO transactions_fts(rowid, merchant, description, notes) "
+    "VALUES (new.id, new.merchant, new.description, new.notes); END",
+    "INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS transactions_fts_au",
+    "DROP TRIGGER IF EXISTS transactions_fts_ad",
+    "DROP TRIGGER IF EXISTS transactions_fts_ai",
+    "DROP TABLE IF EXISTS transactions_fts",
+]
+
+POSTGRES_UPGRADE = [
+    "CREATE INDEX IF NOT EXISTS ix_transactions_search ON transactions USING gin ("
+    "to_tsvector('simple', coalesce(merchant, '') || ' ' || "
+    "coalesce(description, '') || ' ' || coalesce(notes, '')))",
+]
+
+POSTGRES_DOWNGRADE = ["DROP INDEX IF EXISTS ix_transactions_search"]
+
+
+def _statements(sqlite, postgresql):
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return sqlite
+    if dialect == 'postgresql':
+        return postgresql
+    return []
+
+
+def upgrade() -> None:
+    for statement in _statements(SQLITE_UPGRADE, POSTGRES_UPGRADE):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in _statements(SQLITE_DOWNGRADE, POSTGRES_DOWNGRADE):
+        op.execute(statement)
@@ -4,7 +4,8 @@ Application configuration for demo mode and backup settings.
 All settings can be configured via environment variables.
 """
 
-from typing import List
+from typing import Any, List, Literal
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -29,6 +30,16 @@ class AppSettings(BaseSettings):
     auto_backup_enabled: bool = False  # Enable automatic backups
     auto_backup_interval_hours: int = 24  # How often to run automatic backups
 
+    # Backups are taken with SQLite's online backup API, a few pages per step, so
+    # writers are not locked out and the copy is always a consistent snapshot.
+    backup_compression: str = "gzip"  # gzip | bz2 | xz | zstd (Python 3.14+) | none
+    backup_compression_level: int = 6  # 1 (fastest) - 9 (smallest); zstd accepts up to 22
+    backup_step_pages: int = 1024  # Database pages copied per backup step
+    # "chunked" stores each backup as a list of content-addressed chunks shared with
+    # earlier backups, so backups of a mostly unchanged database take little space.
+    backup_format: str = "archive"  # archive (one compressed file) | chunked
+    backup_chunk_kib: int = 64  # Chunk size of chunked backups; keep it a multiple of the page size
+
     # Authentication settings
     secret_key: str = "change-me-in-production-use-a-long-random-string"
     token_expire_hours: int = 24 * 7  # 1 week default
@@ -36,6 +47,32 @@ class AppSettings(BaseSettings):
     # CORS settings - comma-separated list of allowed origins
     cors_origins: str = "http://localhost:3000"
 
+    # SQLite connection profile - applied with PRAGMAs on every new connection.
+    # WAL lets dashboard reads proceed while an import holds the write lock.
+    sqlite_tuning: bool = True  # False = SQLite library defaults
+    sqlite_journal_mode: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = "WAL"
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"  # NORMAL is durable with WAL
+    sqlite_busy_timeout_ms: int = 5000  # Wait this long for a lock instead of "database is locked"
+    sqlite_cache_size_kib: int = 64 * 1024  # Page cache per connection (0 = library default)
+    sqlite_mmap_size_mb: int = 256  # Memory-mapped I/O window (0 = disabled)
+    sqlite_temp_store: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+
+    # Connection pool for server databases (PostgreSQL); SQLite keeps its default pool
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_recycle_seconds: int = 1800  # Recycle connections older than this (-1 = never)
+    db_pool_pre_ping: bool = True  # Test connections on checkout; survives server restarts
+
+    # Worker pool for CPU-bound import work (parsing, format detection, hashing).
+    # "process" spreads parsing across cores; "inline" keeps it on the event loop.
+    import_executor: Literal["thread", "process", "inline"] = "thread"
+    import_workers: int = 0  # Workers per pool (0 = one per CPU)
+
+    # Per-tag usage statistics (tag management pages). Entries are also dropped as
+    # soon as tags or transactions change, so the lifetime only bounds staleness
+    # after writes made outside the app.
+    tag_stats_cache_seconds: float = 60  # 0 = always query
+
     # AI assistant: configured entirely via environment (e.g. Docker Compose).
     # Nothing assistant-related is persisted to the database. Provide a key for
     # whichever provider you want; the provider auto-detects from the present
@@ -46,6 +83,12 @@ class AppSettings(BaseSettings):
     assistant_provider: str = ""  # "anthropic" | "openai" | "" (auto-detect)
     assistant_model: str = ""  # optional override; defaults per provider
 
+    @field_validator("sqlite_journal_mode", "sqlite_synchronous", "sqlite_temp_store", mode="before")
+    @classmethod
+    def _upper_pragma_value(cls, value: Any) -> Any:
+        """PRAGMA values are case-insensitive; accept e.g. SQLITE_JOURNAL_MODE=wal."""
+        return value.upper() if isinstance(value, str) else value
+
     @property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS_ORIGINS environment variable into a list."""
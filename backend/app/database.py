@@ -1,14 +1,109 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
 from alembic.config import Config
 from alembic import command
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict, List, Tuple
 import os
 
+from app.config import settings
+from app.utils.regexp import regexp
+# Registers the Session hooks that keep monthly rollups and data generations current for every session
+import app.services.monthly_rollups  # noqa: F401
+import app.services.data_generations  # noqa: F401
+# Attaches the full-text search index DDL to the transactions table for create_all()
+import app.services.transaction_search  # noqa: F401
+
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./wallet.db")
 SQL_ECHO = os.getenv("SQL_ECHO", "").lower() in {"1", "true", "yes", "on", "debug"}
 SKIP_MIGRATIONS = os.getenv("SKIP_MIGRATIONS", "").lower() in {"1", "true", "yes", "on"}
 
-engine = create_async_engine(DATABASE_URL, echo=SQL_ECHO)
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def sqlite_pragmas() -> List[Tuple[str, Any]]:
+    """PRAGMAs run on every new SQLite connection, from settings.
+
+    journal_mode=WAL lets readers proceed while an import holds the write
+    lock, and busy_timeout makes a second writer wait instead of failing with
+    "database is locked". Empty when SQLITE_TUNING is off.
+    """
+    if not settings.sqlite_tuning:
+        return []
+    pragmas: List[Tuple[str, Any]] = [
+        ("journal_mode", settings.sqlite_journal_mode.upper()),
+        ("synchronous", settings.sqlite_synchronous.upper()),
+        ("busy_timeout", settings.sqlite_busy_timeout_ms),
+        ("temp_store", settings.sqlite_temp_store.upper()),
+    ]
+    if settings.sqlite_cache_size_kib:
+        # Negative cache_size is in KiB rather than pages
+        pragmas.append(("cache_size", -settings.sqlite_cache_size_kib))
+    if settings.sqlite_mmap_size_mb:
+        pragmas.append(("mmap_size", settings.sqlite_mmap_size_mb * 1024 * 1024))
+    return pragmas
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Pool keyword arguments for create_async_engine.
+
+    SQLite keeps SQLAlchemy's default pool (file databases are cheap to open
+    and :memory: must stay on one connection); server databases get a sized
+    pool with pre-ping so connections dropped by a server restart are
+    replaced instead of surfacing as errors.
+    """
+    if is_sqlite(url):
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def register_sqlite_functions(engine: AsyncEngine) -> AsyncEngine:
+    """Register the app's SQL functions on every new SQLite connection of ``engine``.
+
+    Replaces the case-sensitive REGEXP SQLAlchemy installs with
+    app.utils.regexp.regexp (case-insensitive, cached compiled patterns,
+    guarded against pathological patterns), used by regex search and
+    merchant alias matching.
+    """
+    if engine.dialect.name != "sqlite":
+        return engine
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _create_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function("regexp", 2, regexp, deterministic=True)
+
+    return engine
+
+
+def configure_engine(engine: AsyncEngine) -> AsyncEngine:
+    """Apply the SQLite connection profile and SQL functions to ``engine`` on connect."""
+    if engine.dialect.name != "sqlite":
+        return engine
+    register_sqlite_functions(engine)
+    pragmas = sqlite_pragmas()
+    if not pragmas:
+        return engine
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+engine = configure_engine(create_async_engine(DATABASE_URL, echo=SQL_ECHO, **engine_options(DATABASE_URL)))
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -0,0 +1,87 @@
+"""
+Relationship loader profiles.
+
+Every ORM relationship is declared with lazy="raise", so loading a row never
+pulls in related rows behind the caller's back (a select(Tag) used to load
+every transaction carrying the tag). Read paths that need relationships say
+so by applying a profile to their query:
+
+    query = TRANSACTION_WITH_TAGS.apply(select(Transaction).where(...))
+
+Each relationship in a profile is loaded with selectinload, i.e. one extra
+SELECT ... WHERE id IN (...) per relationship regardless of row count.
+Touching a relationship that the query did not load raises
+InvalidRequestError instead of silently issuing SQL.
+"""
+
+from typing import Any, List, Sequence, Tuple, TypeVar, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import QueryableAttribute, selectinload
+from sqlalchemy.sql import Executable
+
+from app.orm import Dashboard, Transaction
+
+# A relationship, or a chain of relationships to load through (A.b, B.c)
+LoadPath = Union[QueryableAttribute, Tuple[QueryableAttribute, ...]]
+
+StatementT = TypeVar("StatementT", bound=Executable)
+
+
+class LoaderProfile:
+    """Named set of relationships a read path needs loaded."""
+
+    __slots__ = ("name", "paths")
+
+    def __init__(self, name: str, *paths: LoadPath):
+        self.name = name
+        self.paths: Tuple[Tuple[QueryableAttribute, ...], ...] = tuple(
+            path if isinstance(path, tuple) else (path,) for path in paths
+        )
+
+    def __repr__(self) -> str:
+        return f"LoaderProfile({self.name!r})"
+
+    def options(self) -> List[Any]:
+        """Loader options for ``Select.options()``."""
+        options = []
+        for chain in self.paths:
+            loader = selectinload(chain[0])
+            for attribute in chain[1:]:
+                loader = loader.selectinload(attribute)
+            options.append(loader)
+        return options
+
+    def apply(self, statement: StatementT) -> StatementT:
+        """Return ``statement`` with this profile's loader options added."""
+        options = self.options()
+        return statement.options(*options) if options else statement
+
+    @property
+    def attribute_names(self) -> List[str]:
+        """Top-level relationship names, for ``AsyncSession.refresh()``."""
+        return [chain[0].key for chain in self.paths]
+
+
+# ============================================================================
+# Profiles
+# ============================================================================
+
+# TransactionResponse serializes the transaction's tags
+TRANSACTION_WITH_TAGS = LoaderProfile("transaction_with_tags", Transaction.tags)
+
+# Dashboards listed together with their widgets
+DASHBOARD_WITH_WIDGETS = LoaderProfile("dashboard_with_widgets", Dashboard.widgets)
+
+
+async def load_profile(session: AsyncSession, instances: Sequence[Any], profile: LoaderProfile) -> None:
+    """Load ``profile``'s relationships onto already-fetched instances.
+
+    Used after create/update, where the object came from ``session.add()``
+    rather than from a query that could carry the loader options.
+    """
+    names = profile.attribute_names
+    if not names:
+        return
+    for instance in instances:
+        await session.refresh(instance, attribute_names=names)
@@ -28,6 +28,7 @@ from app.routers import (
 )
 from app.observability import setup_observability
 from app.services.scheduler import scheduler_service
+from app.services import worker_pool
 from app.middleware import SecurityHeadersMiddleware, add_demo_mode_middleware
 from app.version import get_version, get_version_info
 from app.config import settings as app_settings
@@ -54,6 +55,7 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     scheduler_service.stop()
+    worker_pool.shutdown()
 
 
 tags_metadata = [
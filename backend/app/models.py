@@ -24,6 +24,8 @@ from app.orm import (
     TransactionTag,
     Tag,
     Transaction,
+    MonthlyRollup,
+    DataGeneration,
     ImportFormat,
     CustomFormatConfig,
     ImportSession,
@@ -31,6 +33,7 @@ from app.orm import (
     Budget,
     TagRule,
     RecurringPattern,
+    RecurringMerchantWatermark,
     MerchantAlias,
     SavedFilter,
     Dashboard,
@@ -130,6 +133,8 @@ __all__ = [
     "TransactionTag",
     "Tag",
     "Transaction",
+    "MonthlyRollup",
+    "DataGeneration",
     "ImportFormat",
     "CustomFormatConfig",
     "ImportSession",
@@ -137,6 +142,7 @@ __all__ = [
     "Budget",
     "TagRule",
     "RecurringPattern",
+    "RecurringMerchantWatermark",
     "MerchantAlias",
     "SavedFilter",
     "Dashboard",
@@ -163,9 +163,9 @@ class Tag(TimestampMixin, Base):
     credit_limit: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     # Relationships
-    # Use lazy="selectin" for async compatibility
+    # lazy="raise": load explicitly through app.loader_profiles
     transactions: Mapped[List["Transaction"]] = relationship(
-        back_populates="tags", secondary="transaction_tags", lazy="selectin"
+        back_populates="tags", secondary="transaction_tags", lazy="raise"
     )
 
 
@@ -207,18 +207,57 @@ class Transaction(TimestampMixin, Base):
     )
 
     # Relationships
-    # Use lazy="selectin" for async compatibility - eager loads in separate SELECT
+    # lazy="raise": load explicitly through app.loader_profiles
     tags: Mapped[List["Tag"]] = relationship(
-        back_populates="transactions", secondary="transaction_tags", lazy="selectin"
+        back_populates="transactions", secondary="transaction_tags", lazy="raise"
     )
     account_tag: Mapped[Optional["Tag"]] = relationship(
-        foreign_keys=[account_tag_id], lazy="selectin"
+        foreign_keys=[account_tag_id], lazy="raise"
     )
     linked_transaction: Mapped[Optional["Transaction"]] = relationship(
-        foreign_keys=[linked_transaction_id], remote_side="Transaction.id", lazy="selectin"
+        foreign_keys=[linked_transaction_id], remote_side="Transaction.id", lazy="raise"
     )
 
 
+class MonthlyRollup(Base):
+    """Per-month transaction totals, maintained by app.services.monthly_rollups.
+
+    One row per (year_month, account, bucket tag, category, is_transfer) group.
+    Derived data: rows are rewritten whole months at a time from the
+    transactions table, so tag ids are not foreign keys.
+    """
+
+    __tablename__ = "monthly_rollups"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    year_month: Mapped[int] = mapped_column(Integer, index=True)  # YYYYMM
+    account_tag_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    account_source: Mapped[str] = mapped_column(String)
+    bucket_tag_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # None = untagged
+    category: Mapped[str] = mapped_column(String)  # "Uncategorized" when empty
+    is_transfer: Mapped[bool] = mapped_column(Boolean)
+    income: Mapped[float] = mapped_column(Float)
+    expenses: Mapped[float] = mapped_column(Float)  # positive
+    transaction_count: Mapped[int] = mapped_column(Integer)
+    expense_count: Mapped[int] = mapped_column(Integer)
+    first_date: Mapped[date_type] = mapped_column(Date)
+
+
+class DataGeneration(Base):
+    """Change counter per table, maintained by app.services.data_generations.
+
+    ``generation`` counts committed transactions that changed the table;
+    ``token`` is replaced on every bump and is what ETags are built from, so
+    a restored database never repeats a value a client cached earlier.
+    """
+
+    __tablename__ = "data_generations"
+
+    table_name: Mapped[str] = mapped_column(String, primary_key=True)
+    generation: Mapped[int] = mapped_column(Integer, default=0)
+    token: Mapped[str] = mapped_column(String)
+
+
 class ImportFormat(TimestampMixin, Base):
     """Saved import format preferences."""
 
@@ -340,6 +379,28 @@ class RecurringPattern(TimestampMixin, Base):
     status: Mapped[str] = mapped_column(String, default=RecurringStatus.active.value)
 
 
+class RecurringMerchantWatermark(Base):
+    """Per-merchant watermark for incremental recurring-pattern detection.
+
+    Records a fingerprint of the merchant's transactions (count, amount total,
+    latest updated_at) and the thresholds used when it was last analyzed, so
+    detection only re-analyzes merchants whose transactions changed.
+    """
+
+    __tablename__ = "recurring_merchant_watermarks"
+
+    merchant: Mapped[str] = mapped_column(String, primary_key=True)  # lowercased
+    transaction_count: Mapped[int] = mapped_column(Integer)
+    amount_total: Mapped[float] = mapped_column(Float)
+    last_updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    min_occurrences: Mapped[int] = mapped_column(Integer)
+    min_confidence: Mapped[float] = mapped_column(Float)
+    detected_frequency: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    analyzed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=func.now())
+
+
 class MerchantAlias(TimestampMixin, Base):
     """Merchant alias for normalizing merchant names."""
 
@@ -415,9 +476,9 @@ class Dashboard(TimestampMixin, Base):
     filter_merchants: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     # Relationships
-    # Use lazy="selectin" for async compatibility
+    # lazy="raise": load explicitly through app.loader_profiles
     widgets: Mapped[List["DashboardWidget"]] = relationship(
-        back_populates="dashboard", lazy="selectin"
+        back_populates="dashboard", lazy="raise"
     )
 
 
@@ -437,9 +498,9 @@ class DashboardWidget(TimestampMixin, Base):
     config: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     # Relationships
-    # Use lazy="selectin" for async compatibility
+    # lazy="raise": load explicitly through app.loader_profiles
     dashboard: Mapped[Optional["Dashboard"]] = relationship(
-        back_populates="widgets", lazy="selectin"
+        back_populates="widgets", lazy="raise"
     )
 
 
@@ -16,11 +16,16 @@ Usage:
     parser = ParserRegistry.get_parser("amex_cc")
     transactions = parser.parse(csv_content)
 
+    # Or parse lazily from a text stream, one transaction at a time
+    with open(path, newline="") as f:
+        for transaction in parser.iter_parse(f):
+            ...
+
 Adding a new format:
     1. Create a new file in parsers/formats/
     2. Subclass CSVFormatParser
     3. Set format_key, format_name, column_mapping
-    4. Implement can_parse()
+    4. Implement detect() against the sniffed FormatSample
     5. Decorate with @ParserRegistry.register
 
     That's it - no other changes needed!
@@ -32,8 +37,8 @@ Example:
         format_name = "My Bank"
         column_mapping = ColumnMapping(...)
 
-        def can_parse(self, csv_content: str) -> tuple[bool, float]:
-            if "My Bank" in csv_content[:500]:
+        def detect(self, sample: FormatSample) -> tuple[bool, float]:
+            if sample.has_columns("Date", "Amount", "My Bank Ref"):
                 return True, 0.9
             return False, 0.0
 """
@@ -47,6 +52,7 @@ from .base import (
     ParsedTransaction,
 )
 from .registry import ParserRegistry
+from .sniff import SAMPLE_CHARS, FormatSample
 
 # Custom CSV parser (user-defined mappings)
 from .formats.custom_csv import (
@@ -73,6 +79,8 @@ __all__ = [
     "AmountSign",
     "ParsedTransaction",
     "ParserRegistry",
+    "FormatSample",
+    "SAMPLE_CHARS",
     # Custom CSV
     "CustomCsvParser",
     "CustomCsvConfig",
@@ -7,11 +7,14 @@ along with configuration dataclasses for declarative parser configuration.
 
 import csv
 import io
-from abc import ABC, abstractmethod
+from abc import ABC
 from dataclasses import dataclass, field
 from datetime import date, datetime
 from enum import Enum
-from typing import Dict, List, Optional, Tuple
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .sniff import FormatSample
 
 
 class AmountSign(Enum):
@@ -88,6 +91,24 @@ class ParsedTransaction:
         }
 
 
+def lines_from_header(lines: Iterable[str], is_header: Callable[[str], bool]) -> Iterator[str]:
+    """
+    Yield ``lines`` starting at the first one ``is_header`` accepts.
+
+    Lines before the header are held back; if no header is found they are all
+    yielded unchanged, as if the content had not been preprocessed.
+    """
+    lines = iter(lines)
+    skipped: List[str] = []
+    for line in lines:
+        if is_header(line):
+            yield line
+            yield from lines
+            return
+        skipped.append(line)
+    yield from skipped
+
+
 class CSVFormatParser(ABC):
     """
     Abstract base class for CSV format parsers.
@@ -95,8 +116,8 @@ class CSVFormatParser(ABC):
     To create a new parser:
     1. Subclass CSVFormatParser
     2. Set class attributes (format_key, format_name, column_mapping, etc.)
-    3. Implement can_parse() for format detection
-    4. Optionally override hooks (extract_merchant, should_skip_row, etc.)
+    3. Implement detect() for format detection
+    4. Optionally override hooks (preprocess_lines, extract_merchant, should_skip_row, etc.)
     5. Decorate with @ParserRegistry.register
 
     Example:
@@ -110,8 +131,8 @@ class CSVFormatParser(ABC):
                 description_column="Description"
             )
 
-            def can_parse(self, csv_content: str) -> Tuple[bool, float]:
-                if "My Bank" in csv_content[:500]:
+            def detect(self, sample: FormatSample) -> Tuple[bool, float]:
+                if sample.has_columns("Date", "Amount", "My Bank Ref"):
                     return True, 0.9
                 return False, 0.0
     """
@@ -133,31 +154,47 @@ class CSVFormatParser(ABC):
         if self.date_config is None:
             self.date_config = DateConfig()
 
-    @abstractmethod
+    def detect(self, sample: FormatSample) -> Tuple[bool, float]:
+        """
+        Detect if this parser can handle a file from its sniffed start.
+
+        Check the sample's features (header cells, markers) rather than
+        rescanning ``sample.text``. Parsers that only override can_parse()
+        are called with the sampled text.
+
+        Returns:
+            Tuple of (can_parse: bool, confidence: float 0.0-1.0)
+        """
+        if type(self).can_parse is not CSVFormatParser.can_parse:
+            return self.can_parse(sample.text)
+        return False, 0.0
+
     def can_parse(self, csv_content: str) -> Tuple[bool, float]:
         """
         Detect if this parser can handle the given CSV content.
 
+        Sniffs the start of ``csv_content`` and calls detect().
+
         Returns:
             Tuple of (can_parse: bool, confidence: float 0.0-1.0)
         """
-        pass
+        return self.detect(FormatSample.from_content(csv_content))
 
     # =========================================================================
     # Customization Hooks - Override as needed
     # =========================================================================
 
-    def preprocess_content(self, csv_content: str) -> str:
+    def preprocess_lines(self, lines: Iterator[str]) -> Iterator[str]:
         """
-        Preprocess CSV content before parsing.
+        Preprocess CSV lines before parsing.
         Override to handle header rows, metadata, etc.
 
-        Default: Skips `skip_header_rows` lines and returns the rest.
+        Works on a lazy line iterator so large files are never held in memory;
+        see lines_from_header() for skipping to a header row.
+
+        Default: Skips `skip_header_rows` lines and yields the rest.
         """
-        if self.skip_header_rows > 0:
-            lines = csv_content.split("\n")
-            return "\n".join(lines[self.skip_header_rows :])
-        return csv_content
+        return islice(lines, self.skip_header_rows, None)
 
     def extract_merchant(self, row: Dict, description: str) -> str:
         """
@@ -192,10 +229,10 @@ class CSVFormatParser(ABC):
         amount_val = row.get(amount_col, "").strip() if amount_col else ""
         return not date_val or not amount_val
 
-    def get_default_account_source(self, csv_content: str, row: Dict) -> str:
+    def get_default_account_source(self, row: Dict) -> str:
         """
         Get default account source if not provided.
-        Override to extract from CSV content or row data.
+        Override to extract from row data.
 
         Default: Returns format_key in uppercase.
         """
@@ -290,80 +327,95 @@ class CSVFormatParser(ABC):
 
     def parse(self, csv_content: str, account_source: Optional[str] = None) -> List[ParsedTransaction]:
         """
-        Parse CSV content and return normalized transactions.
+        Parse CSV content held in memory and return normalized transactions.
 
-        Uses declarative configuration + hooks for customization.
-        Most parsers won't need to override this method.
+        Convenience wrapper around iter_parse().
+        """
+        return list(self.iter_parse(io.StringIO(csv_content), account_source))
+
+    def iter_parse(self, lines: Iterable[str], account_source: Optional[str] = None) -> Iterator[ParsedTransaction]:
+        """
+        Parse CSV lines lazily, yielding normalized transactions as rows are read.
+
+        ``lines`` is any iterable of text lines keeping their line endings, such
+        as a text file opened with ``newline=""``, so only the current row is
+        held in memory. Uses declarative configuration + hooks for
+        customization. Most parsers won't need to override this method.
         """
         if self.column_mapping is None:
             raise ValueError("column_mapping must be set before parsing")
 
-        transactions = []
+        # Preprocess lines (handle header rows, etc.)
+        reader = csv.DictReader(self.preprocess_lines(iter(lines)))
 
-        # Preprocess content (handle header rows, etc.)
-        content = self.preprocess_content(csv_content)
+        for row in reader:
+            transaction = self.parse_row(row, account_source)
+            if transaction is not None:
+                yield transaction
 
-        reader = csv.DictReader(io.StringIO(content))
+    def parse_row(self, row: Dict[str, str], account_source: Optional[str] = None) -> Optional[ParsedTransaction]:
+        """
+        Convert one CSV row to a transaction, or None if the row is skipped.
+        Override for formats whose fields don't fit column_mapping.
+        """
+        mapping = self.column_mapping
+        if mapping is None:
+            raise ValueError("column_mapping must be set before parsing")
 
-        for row in reader:
-            # Check if row should be skipped
-            if self.should_skip_row(row):
-                continue
-
-            # Parse date
-            date_col = self.column_mapping.date_column
-            date_str = row.get(date_col, "").strip()
-            trans_date = self.parse_date(date_str)
-            if trans_date is None:
-                continue
-
-            # Parse amount
-            amount_col = self.column_mapping.amount_column
-            amount_str = row.get(amount_col, "").strip()
-            amount = self.parse_amount(amount_str)
-            if amount is None:
-                continue
-
-            # Get description
-            desc_col = self.column_mapping.description_column
-            description = row.get(desc_col, "").strip()
-
-            # Extract merchant
-            merchant = self.extract_merchant(row, description)
-
-            # Determine account source
-            effective_account = account_source
-            if not effective_account:
-                effective_account = self.get_default_account_source(csv_content, row)
-
-            # Get reference ID
-            reference_id = self.get_reference_id(row, trans_date, amount)
-
-            # Get card member if applicable
-            card_member = None
-            if self.column_mapping.card_member_column:
-                card_member = row.get(self.column_mapping.card_member_column, "").strip()
-
-            # Map category
-            source_category = None
-            suggested_category = None
-            if self.column_mapping.category_column:
-                source_category = row.get(self.column_mapping.category_column, "").strip()
-                if source_category:
-                    suggested_category = self.map_category(source_category)
-
-            transactions.append(
-                ParsedTransaction(
-                    date=trans_date,
-                    amount=amount,
-                    description=description,
-                    merchant=merchant,
-                    account_source=effective_account,
-                    reference_id=reference_id,
-                    card_member=card_member,
-                    suggested_category=suggested_category,
-                    source_category=source_category,
-                )
-            )
+        # Check if row should be skipped
+        if self.should_skip_row(row):
+            return None
+
+        # Parse date
+        date_col = mapping.date_column
+        date_str = row.get(date_col, "").strip()
+        trans_date = self.parse_date(date_str)
+        if trans_date is None:
+            return None
+
+        # Parse amount
+        amount_col = mapping.amount_column
+        amount_str = row.get(amount_col, "").strip()
+        amount = self.parse_amount(amount_str)
+        if amount is None:
+            return None
 
-        return transactions
+        # Get description
+        desc_col = mapping.description_column
+        description = row.get(desc_col, "").strip()
+
+        # Extract merchant
+        merchant = self.extract_merchant(row, description)
+
+        # Determine account source
+        effective_account = account_source
+        if not effective_account:
+            effective_account = self.get_default_account_source(row)
+
+        # Get reference ID
+        reference_id = self.get_reference_id(row, trans_date, amount)
+
+        # Get card member if applicable
+        card_member = None
+        if mapping.card_member_column:
+            card_member = row.get(mapping.card_member_column, "").strip()
+
+        # Map category
+        source_category = None
+        suggested_category = None
+        if mapping.category_column:
+            source_category = row.get(mapping.category_column, "").strip()
+            if source_category:
+                suggested_category = self.map_category(source_category)
+
+        return ParsedTransaction(
+            date=trans_date,
+            amount=amount,
+            description=description,
+            merchant=merchant,
+            account_source=effective_account,
+            reference_id=reference_id,
+            card_member=card_member,
+            suggested_category=suggested_category,
+            source_category=source_category,
+        )
@@ -20,6 +20,7 @@ from ..base import (
     AmountSign,
 )
 from ..registry import ParserRegistry
+from ..sniff import FormatSample
 
 
 @ParserRegistry.register
@@ -67,12 +68,10 @@ class AmexCCParser(CSVFormatParser):
         "communications": "Utilities",
     }
 
-    def can_parse(self, csv_content: str) -> Tuple[bool, float]:
+    def detect(self, sample: FormatSample) -> Tuple[bool, float]:
         """Detect AMEX format by looking for 'Card Member' and 'Account #' columns."""
-        lines = csv_content.strip().split("\n")
-        for line in lines[:10]:
-            if "Card Member" in line and "Account #" in line:
-                return True, 0.95
+        if sample.has_columns("Card Member", "Account #"):
+            return True, 0.95
         return False, 0.0
 
     def should_skip_row(self, row: Dict) -> bool:
@@ -118,7 +117,7 @@ class AmexCCParser(CSVFormatParser):
 
         return None
 
-    def get_default_account_source(self, csv_content: str, row: Dict) -> str:
+    def get_default_account_source(self, row: Dict) -> str:
         """Build account source from account number."""
         account_num = row.get("Account #", "").strip() if row else ""
         if account_num:
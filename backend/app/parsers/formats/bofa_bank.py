@@ -9,7 +9,7 @@ Format characteristics:
 - Description contains encoded merchant info
 """
 
-from typing import Dict, Tuple
+from typing import Dict, Iterator, Tuple
 
 from ..base import (
     CSVFormatParser,
@@ -17,8 +17,10 @@ from ..base import (
     AmountConfig,
     DateConfig,
     AmountSign,
+    lines_from_header,
 )
 from ..registry import ParserRegistry
+from ..sniff import FormatSample
 
 
 @ParserRegistry.register
@@ -43,21 +45,17 @@ class BofaBankParser(CSVFormatParser):
         format="%m/%d/%Y",
     )
 
-    def can_parse(self, csv_content: str) -> Tuple[bool, float]:
+    def detect(self, sample: FormatSample) -> Tuple[bool, float]:
         """Detect BofA Bank format by looking for 'Running Bal.' column."""
-        lines = csv_content.strip().split("\n")
-        for line in lines[:10]:
-            if "Running Bal." in line:
-                return True, 0.95
+        if sample.has_columns("Running Bal."):
+            return True, 0.95
         return False, 0.0
 
-    def preprocess_content(self, csv_content: str) -> str:
-        """Find the header row and return content from there."""
-        lines = csv_content.split("\n")
-        for i, line in enumerate(lines):
-            if line.startswith("Date") and "Description" in line and "Amount" in line:
-                return "\n".join(lines[i:])
-        return csv_content
+    def preprocess_lines(self, lines: Iterator[str]) -> Iterator[str]:
+        """Find the header row and yield lines from there."""
+        return lines_from_header(
+            lines, lambda line: line.startswith("Date") and "Description" in line and "Amount" in line
+        )
 
     def should_skip_row(self, row: Dict) -> bool:
         """Skip summary rows and rows without valid data."""
@@ -95,7 +93,7 @@ class BofaBankParser(CSVFormatParser):
 
         return merchant.strip()
 
-    def get_default_account_source(self, csv_content: str, row: Dict) -> str:
+    def get_default_account_source(self, row: Dict) -> str:
         """Default account source for BofA Bank."""
         return "BOFA-Unknown"
 
@@ -18,6 +18,7 @@ from ..base import (
     AmountSign,
 )
 from ..registry import ParserRegistry
+from ..sniff import FormatSample
 
 
 @ParserRegistry.register
@@ -43,12 +44,10 @@ class BofaCCParser(CSVFormatParser):
         format="%m/%d/%Y",
     )
 
-    def can_parse(self, csv_content: str) -> Tuple[bool, float]:
+    def detect(self, sample: FormatSample) -> Tuple[bool, float]:
         """Detect BofA CC format by looking for specific header columns."""
-        lines = csv_content.strip().split("\n")
-        for line in lines[:10]:
-            if "Posted Date" in line and "Reference Number" in line and "Payee" in line:
-                return True, 0.95
+        if sample.has_columns("Posted Date", "Reference Number", "Payee"):
+            return True, 0.95
         return False, 0.0
 
     def extract_merchant(self, row: Dict, description: str) -> str:
@@ -57,6 +56,6 @@ class BofaCCParser(CSVFormatParser):
             return ""
         return description.split(",")[0].strip()
 
-    def get_default_account_source(self, csv_content: str, row: Dict) -> str:
+    def get_default_account_source(self, row: Dict) -> str:
         """Default account source for BofA CC."""
         return "BOFA-CC"
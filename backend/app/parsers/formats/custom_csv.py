@@ -13,9 +13,11 @@ import hashlib
 import io
 import json
 import re
+from collections import deque
 from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Union, cast
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union, cast
 
 from ..base import (
     AmountConfig,
@@ -24,7 +26,9 @@ from ..base import (
     ColumnMapping,
     DateConfig,
     ParsedTransaction,
+    lines_from_header,
 )
+from ..sniff import FormatSample
 
 
 @dataclass
@@ -133,6 +137,22 @@ class CustomCsvConfig:
         return cast(Dict[str, Any], json.loads(self.to_json()))
 
 
+def _drop_last(lines: Iterator[str], count: int) -> Iterator[str]:
+    """
+    Yield all but the last ``count`` lines, reading at most ``count`` ahead.
+
+    Content ending in a newline has an empty last line, which counts as one of
+    the ``count``.
+    """
+    window: Deque[str] = deque()
+    for line in lines:
+        window.append(line)
+        if len(window) > count:
+            yield window.popleft()
+    if len(window) == count and window[-1].endswith("\n"):
+        yield window[0]
+
+
 class CustomCsvParser(CSVFormatParser):
     """
     CSV parser with user-defined column mappings.
@@ -205,38 +225,31 @@ class CustomCsvParser(CSVFormatParser):
         # For index-based columns, we need to use the placeholder key
         return row.get(f"__idx_{col}", "").strip()
 
-    def can_parse(self, csv_content: str) -> Tuple[bool, float]:
+    def detect(self, sample: FormatSample) -> Tuple[bool, float]:
         """
         Custom parser doesn't auto-detect - it's explicitly selected.
         Returns low confidence so it never wins auto-detection.
         """
         return False, 0.0
 
-    def preprocess_content(self, csv_content: str) -> str:
+    def preprocess_lines(self, lines: Iterator[str]) -> Iterator[str]:
         """Skip header and footer rows, optionally auto-detecting header row."""
-        lines = csv_content.split("\n")
+        row_handling = self.config.row_handling
 
         # Find header row if configured
-        if self.config.row_handling.find_header_row and self.config.row_handling.header_indicators:
-            start = 0
-            for i, line in enumerate(lines):
-                # Check if this line contains all header indicators
-                if all(indicator in line for indicator in self.config.row_handling.header_indicators):
-                    start = i
-                    break
-        else:
-            start = self.config.row_handling.skip_header_rows
-
-        # Skip footer rows (calculate as positive index from end)
-        if self.config.row_handling.skip_footer_rows > 0:
-            end = len(lines) - self.config.row_handling.skip_footer_rows
+        if row_handling.find_header_row and row_handling.header_indicators:
+            # Start at the first line containing all header indicators
+            lines = lines_from_header(
+                lines, lambda line: all(indicator in line for indicator in row_handling.header_indicators)
+            )
         else:
-            end = len(lines)
+            lines = islice(lines, row_handling.skip_header_rows, None)
 
-        if end <= start:
-            return ""
+        # Skip footer rows by holding back the last N lines read
+        if row_handling.skip_footer_rows > 0:
+            lines = _drop_last(lines, row_handling.skip_footer_rows)
 
-        return "\n".join(lines[start:end])
+        return lines
 
     def should_skip_row(self, row: Dict[str, str]) -> bool:
         """Check if row should be skipped based on config."""
@@ -291,66 +304,42 @@ class CustomCsvParser(CSVFormatParser):
 
         return merchant[: self.config.merchant_max_length].strip()
 
-    def get_default_account_source(self, csv_content: str, row: Dict[str, str]) -> str:
+    def get_default_account_source(self, row: Dict[str, str]) -> str:
         """Return configured account source."""
         return self.config.account_source
 
-    def parse(self, csv_content: str, account_source: Optional[str] = None) -> List[ParsedTransaction]:
+    def iter_parse(self, lines: Iterable[str], account_source: Optional[str] = None) -> Iterator[ParsedTransaction]:
         """
-        Parse CSV with custom column mappings.
+        Parse CSV lines with custom column mappings.
 
         Handles both named columns and index-based columns.
         """
-        transactions = []
-
-        # Preprocess content (skip header/footer rows)
-        content = self.preprocess_content(csv_content)
-        if not content.strip():
-            return []
-
-        lines = content.split("\n")
-        if not lines:
-            return []
+        # Preprocess lines (skip header/footer rows)
+        content = self.preprocess_lines(iter(lines))
 
         # Check if we're using index-based columns
         uses_indexes = isinstance(self.config.date_column, int)
 
+        rows: Iterable[Dict[str, str]]
         if uses_indexes:
             # Parse without header - create synthetic column names
-            csv_reader = csv.reader(io.StringIO(content))
-            rows = list(csv_reader)
-
-            # Create dict rows with index-based keys
-            for row_values in rows:
-                if not row_values:
-                    continue
-
-                row = {f"__idx_{i}": v for i, v in enumerate(row_values)}
-
-                if self.should_skip_row(row):
-                    continue
-
-                transaction = self._parse_row(row, csv_content, account_source)
-                if transaction:
-                    transactions.append(transaction)
+            rows = (
+                {f"__idx_{i}": v for i, v in enumerate(row_values)} for row_values in csv.reader(content) if row_values
+            )
         else:
             # Use DictReader for named columns
-            dict_reader = csv.DictReader(io.StringIO(content))
+            rows = csv.DictReader(content)
 
-            for row in dict_reader:
-                if self.should_skip_row(row):
-                    continue
+        for row in rows:
+            transaction = self.parse_row(row, account_source)
+            if transaction:
+                yield transaction
 
-                transaction = self._parse_row(row, csv_content, account_source)
-                if transaction:
-                    transactions.append(transaction)
-
-        return transactions
-
-    def _parse_row(
-        self, row: Dict[str, str], csv_content: str, account_source: Optional[str]
-    ) -> Optional[ParsedTransaction]:
+    def parse_row(self, row: Dict[str, str], account_source: Optional[str] = None) -> Optional[ParsedTransaction]:
         """Parse a single row into a transaction."""
+        if self.should_skip_row(row):
+            return None
+
         # Parse date
         date_str = self._get_value(row, self.config.date_column)
         trans_date = self.parse_date(date_str)
@@ -370,7 +359,7 @@ class CustomCsvParser(CSVFormatParser):
         merchant = self.extract_merchant(row, description)
 
         # Determine account source
-        effective_account = account_source or self.get_default_account_source(csv_content, row)
+        effective_account = account_source or self.get_default_account_source(row)
 
         # Get reference ID
         reference_id = ""
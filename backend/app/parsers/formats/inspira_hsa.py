@@ -19,8 +19,10 @@ from ..base import (
     AmountConfig,
     DateConfig,
     AmountSign,
+    ParsedTransaction,
 )
 from ..registry import ParserRegistry
+from ..sniff import FormatSample
 
 
 @ParserRegistry.register
@@ -49,12 +51,10 @@ class InspiraHSAParser(CSVFormatParser):
         format="%m/%d/%Y",
     )
 
-    def can_parse(self, csv_content: str) -> Tuple[bool, float]:
+    def detect(self, sample: FormatSample) -> Tuple[bool, float]:
         """Detect Inspira HSA format by looking for specific columns."""
-        lines = csv_content.strip().split("\n")
-        for line in lines[:10]:
-            if "Transaction ID" in line and "Transaction Type" in line and "Expense Category" in line:
-                return True, 0.95
+        if sample.has_columns("Transaction ID", "Transaction Type", "Expense Category"):
+            return True, 0.95
         return False, 0.0
 
     def should_skip_row(self, row: Dict) -> bool:
@@ -66,7 +66,7 @@ class InspiraHSAParser(CSVFormatParser):
 
     def parse_date(self, date_str: str):
         """Override to handle fallback to Origination Date."""
-        # The row handling for fallback is done in the parse method override
+        # The row handling for fallback is done in the parse_row override
         return super().parse_date(date_str)
 
     def extract_merchant(self, row: Dict[str, Any], description: str) -> str:
@@ -85,73 +85,60 @@ class InspiraHSAParser(CSVFormatParser):
             return "Healthcare"
         return None
 
-    def get_default_account_source(self, csv_content: str, row: Dict) -> str:
+    def get_default_account_source(self, row: Dict) -> str:
         """Default account source for Inspira HSA."""
         return "Inspira-HSA"
 
-    def parse(self, csv_content: str, account_source: Optional[str] = None):
+    def parse_row(self, row: Dict[str, str], account_source: Optional[str] = None) -> Optional[ParsedTransaction]:
         """Override to handle Posted Date / Origination Date fallback."""
-        import csv
-        import io
-        from ..base import ParsedTransaction
-
-        transactions = []
-        content = self.preprocess_content(csv_content)
-        reader = csv.DictReader(io.StringIO(content))
-
-        for row in reader:
-            # Handle date fallback - use Posted Date, fall back to Origination Date
-            date_str = row.get("Posted Date", "") or row.get("Origination Date", "")
-            date_str = date_str.strip() if date_str else ""
-
-            if not date_str:
-                continue
-
-            amount_str = row.get("Amount", "").strip()
-            if not amount_str:
-                continue
-
-            # Parse date
-            trans_date = super().parse_date(date_str)
-            if trans_date is None:
-                continue
-
-            # Parse amount
-            amount = self.parse_amount(amount_str)
-            if amount is None:
-                continue
-
-            # Get description, fall back to transaction type
-            description = row.get("Description", "").strip()
-            trans_type = row.get("Transaction Type", "").strip()
-            if not description:
-                description = trans_type
-
-            # Extract merchant
-            merchant = self.extract_merchant(row, description)
-
-            # Determine account source
-            effective_account = account_source or self.get_default_account_source(csv_content, row)
-
-            # Get reference ID
-            reference_id = self.get_reference_id(row, trans_date, amount)
-
-            # Map category
-            source_category = row.get("Expense Category", "").strip()
-            suggested_category = self.map_category(source_category) if source_category else None
-
-            transactions.append(
-                ParsedTransaction(
-                    date=trans_date,
-                    amount=amount,
-                    description=description,
-                    merchant=merchant,
-                    account_source=effective_account,
-                    reference_id=reference_id,
-                    card_member=None,
-                    suggested_category=suggested_category,
-                    source_category=source_category,
-                )
-            )
-
-        return transactions
+        # Handle date fallback - use Posted Date, fall back to Origination Date
+        date_str = row.get("Posted Date", "") or row.get("Origination Date", "")
+        date_str = date_str.strip() if date_str else ""
+
+        if not date_str:
+            return None
+
+        amount_str = row.get("Amount", "").strip()
+        if not amount_str:
+            return None
+
+        # Parse date
+        trans_date = super().parse_date(date_str)
+        if trans_date is None:
+            return None
+
+        # Parse amount
+        amount = self.parse_amount(amount_str)
+        if amount is None:
+            return None
+
+        # Get description, fall back to transaction type
+        description = row.get("Description", "").strip()
+        trans_type = row.get("Transaction Type", "").strip()
+        if not description:
+            description = trans_type
+
+        # Extract merchant
+        merchant = self.extract_merchant(row, description)
+
+        # Determine account source
+        effective_account = account_source or self.get_default_account_source(row)
+
+        # Get reference ID
+        reference_id = self.get_reference_id(row, trans_date, amount)
+
+        # Map category
+        source_category = row.get("Expense Category", "").strip()
+        suggested_category = self.map_category(source_category) if source_category else None
+
+        return ParsedTransaction(
+            date=trans_date,
+            amount=amount,
+            description=description,
+            merchant=merchant,
+            account_source=effective_account,
+            reference_id=reference_id,
+            card_member=None,
+            suggested_category=suggested_category,
+            source_category=source_category,
+        )
@@ -24,10 +24,11 @@ Reference: https://en.wikipedia.org/wiki/Open_Financial_Exchange
 
 import re
 from datetime import datetime, date
-from typing import List, Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 from ..base import CSVFormatParser, ParsedTransaction
 from ..registry import ParserRegistry
+from ..sniff import FormatSample
 
 
 @ParserRegistry.register
@@ -37,86 +38,133 @@ class QFXParser(CSVFormatParser):
     format_key = "qfx"
     format_name = "Quicken QFX/OFX"
 
-    # These aren't used since we override parse(), but required by base class
+    # These aren't used since we override iter_parse(), but required by base class
     column_mapping = None
 
     # Regex patterns for extracting OFX elements
     # OFX uses SGML-like syntax where closing tags are optional
     STMTTRN_PATTERN = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.DOTALL | re.IGNORECASE)
     TAG_PATTERN = re.compile(r"<(\w+)>([^<]*)", re.IGNORECASE)
+    STMTTRN_OPEN_PATTERN = re.compile(r"<STMTTRN>", re.IGNORECASE)
+    ACCTID_PATTERN = re.compile(r"<ACCTID>([^<]+)", re.IGNORECASE)
+    ACCTTYPE_PATTERN = re.compile(r"<ACCTTYPE>([^<]+)", re.IGNORECASE)
 
-    def can_parse(self, content: str) -> Tuple[bool, float]:
+    def detect(self, sample: FormatSample) -> Tuple[bool, float]:
         """
         Detect QFX/OFX format by looking for OFX markers.
 
         Returns:
             Tuple of (can_parse, confidence)
         """
-        content_upper = content.strip().upper()
+        markers = sample.ofx_markers
 
         # Check for OFX header or root element
-        if "<OFX>" in content_upper:
-            return True, 0.95
-
-        # Check for OFXHEADER
-        if "OFXHEADER:" in content_upper:
+        if "<OFX>" in markers or "OFXHEADER:" in markers:
             return True, 0.95
 
         # Check for <?OFX processing instruction
-        if "<?OFX" in content_upper:
+        if "<?OFX" in markers:
             return True, 0.90
 
         # Check for statement transaction elements
-        if "<STMTTRN>" in content_upper:
+        if "<STMTTRN>" in markers:
             return True, 0.85
 
         return False, 0.0
 
-    def parse(self, content: str, account_source: Optional[str] = None) -> List[ParsedTransaction]:
+    def iter_parse(self, lines: Iterable[str], account_source: Optional[str] = None) -> Iterator[ParsedTransaction]:
         """
-        Parse QFX/OFX content into transactions.
+        Parse QFX/OFX lines into transactions, yielding each STMTTRN block as it closes.
+
+        Only the unfinished end of the input is buffered. Without an
+        account_source, blocks are held until the account is known: <ACCTID>
+        normally precedes the transaction list, otherwise the whole file is
+        read before falling back to <ACCTTYPE>.
 
         Args:
-            content: QFX/OFX file content as string
+            lines: QFX/OFX file content as an iterable of lines
             account_source: Optional account source identifier
 
-        Returns:
-            List of ParsedTransaction objects
+        Yields:
+            ParsedTransaction objects
         """
-        transactions = []
-
-        # Extract account info if available
-        detected_account = self._extract_account_info(content)
+        buffer = ""
+        acct_id: Optional[str] = None
+        acct_type: Optional[str] = None
+        held: List[str] = []  # Blocks read before the account is known
+
+        for line in lines:
+            buffer += line
+
+            # Extract account info if available
+            if account_source is None and acct_id is None:
+                acct_id = self._complete_tag_value(self.ACCTID_PATTERN, buffer)
+                if acct_type is None:
+                    acct_type = self._complete_tag_value(self.ACCTTYPE_PATTERN, buffer)
+
+            # Cut out finished STMTTRN (Statement Transaction) blocks
+            consumed = 0
+            for match in self.STMTTRN_PATTERN.finditer(buffer):
+                held.append(match.group(1))
+                consumed = match.end()
+            buffer = self._unfinished_tail(buffer[consumed:])
+
+            account = account_source or (self._account_label(acct_id, None) if acct_id is not None else None)
+            if account is not None:
+                for block in held:
+                    txn = self._parse_transaction_block(block, account)
+                    if txn:
+                        yield txn
+                held.clear()
+
+        # End of input: a value running to the end is complete now
+        if account_source is None and acct_id is None:
+            acct_id = self._complete_tag_value(self.ACCTID_PATTERN, buffer, at_end=True)
+            if acct_type is None:
+                acct_type = self._complete_tag_value(self.ACCTTYPE_PATTERN, buffer, at_end=True)
+
+        account = account_source or self._account_label(acct_id, acct_type)
+        for block in held:
+            txn = self._parse_transaction_block(block, account)
+            if txn:
+                yield txn
 
-        # Find all STMTTRN (Statement Transaction) blocks
-        matches = self.STMTTRN_PATTERN.findall(content)
+    def _complete_tag_value(self, pattern: re.Pattern[str], buffer: str, at_end: bool = False) -> Optional[str]:
+        """
+        Value of the first ``pattern`` element in ``buffer``, once fully read.
 
-        for match in matches:
-            txn = self._parse_transaction_block(match, account_source or detected_account)
-            if txn:
-                transactions.append(txn)
+        A value running to the end of the buffer may continue in the next
+        line, so it only counts at the end of the input.
+        """
+        match = pattern.search(buffer)
+        if match and (at_end or match.end() < len(buffer)):
+            return match.group(1).strip()
+        return None
 
-        return transactions
+    def _unfinished_tail(self, text: str) -> str:
+        """
+        The part of ``text`` that may still be extended by later lines.
 
-    def _extract_account_info(self, content: str) -> str:
+        That is an open STMTTRN block, or else the last element, whose
+        value may be incomplete.
         """
-        Extract account information from OFX content.
+        open_block = self.STMTTRN_OPEN_PATTERN.search(text)
+        if open_block:
+            return text[open_block.start() :]
+        last_tag = text.rfind("<")
+        return text[last_tag:] if last_tag >= 0 else ""
 
-        Looks for ACCTID (account ID) or ACCTTYPE elements.
+    def _account_label(self, acct_id: Optional[str], acct_type: Optional[str]) -> str:
+        """
+        Account source for the OFX account ID, else the account type.
         """
-        # Try to find account ID
-        acct_match = re.search(r"<ACCTID>([^<]+)", content, re.IGNORECASE)
-        if acct_match:
-            acct_id = acct_match.group(1).strip()
+        if acct_id is not None:
             # Mask most digits for privacy, keep last 4
             if len(acct_id) > 4:
                 return f"QFX-****{acct_id[-4:]}"
             return f"QFX-{acct_id}"
 
-        # Try to find account type
-        type_match = re.search(r"<ACCTTYPE>([^<]+)", content, re.IGNORECASE)
-        if type_match:
-            acct_type = type_match.group(1).strip()
+        if acct_type is not None:
             return f"QFX-{acct_type}"
 
         return "QFX-Unknown"
@@ -24,10 +24,11 @@ Reference: https://en.wikipedia.org/wiki/Quicken_Interchange_Format
 
 import re
 from datetime import datetime, date
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 
 from ..base import CSVFormatParser, ParsedTransaction
 from ..registry import ParserRegistry
+from ..sniff import FormatSample
 
 
 @ParserRegistry.register
@@ -37,44 +38,35 @@ class QIFParser(CSVFormatParser):
     format_key = "qif"
     format_name = "Quicken QIF"
 
-    # These aren't used since we override parse(), but required by base class
+    # These aren't used since we override iter_parse(), but required by base class
     column_mapping = None
 
-    def can_parse(self, content: str) -> Tuple[bool, float]:
+    def detect(self, sample: FormatSample) -> Tuple[bool, float]:
         """
         Detect QIF format by looking for !Type: header.
 
         Returns:
             Tuple of (can_parse, confidence)
         """
-        content_lower = content.strip().lower()
-
-        # Check for QIF type header
-        if content_lower.startswith("!type:"):
+        # QIF type header on the first line, or within the first few lines
+        if sample.qif_type_line == 0:
             return True, 0.95
-
-        # Check within first few lines
-        lines = content.strip().split("\n")[:10]
-        for line in lines:
-            if line.strip().lower().startswith("!type:"):
-                return True, 0.90
+        if sample.qif_type_line is not None:
+            return True, 0.90
 
         return False, 0.0
 
-    def parse(self, content: str, account_source: Optional[str] = None) -> List[ParsedTransaction]:
+    def iter_parse(self, lines: Iterable[str], account_source: Optional[str] = None) -> Iterator[ParsedTransaction]:
         """
-        Parse QIF content into transactions.
+        Parse QIF lines into transactions, yielding each record as its '^' is read.
 
         Args:
-            content: QIF file content as string
+            lines: QIF file content as an iterable of lines
             account_source: Optional account source identifier
 
-        Returns:
-            List of ParsedTransaction objects
+        Yields:
+            ParsedTransaction objects
         """
-        transactions = []
-        lines = content.strip().split("\n")
-
         # Track account type from header
         account_type = "Unknown"
         current_record: Dict[str, str] = {}
@@ -103,7 +95,7 @@ class QIFParser(CSVFormatParser):
                 if current_record:
                     txn = self._parse_record(current_record, account_type, account_source)
                     if txn:
-                        transactions.append(txn)
+                        yield txn
                 current_record = {}
                 continue
 
@@ -135,9 +127,7 @@ class QIFParser(CSVFormatParser):
         if current_record:
             txn = self._parse_record(current_record, account_type, account_source)
             if txn:
-                transactions.append(txn)
-
-        return transactions
+                yield txn
 
     def _parse_record(
         self, record: Dict[str, str], account_type: str, account_source: Optional[str]
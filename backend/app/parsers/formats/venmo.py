@@ -12,9 +12,7 @@ Format characteristics:
 - Datetime format: ISO "2025-04-04T22:01:03"
 """
 
-import csv
-import io
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, Optional, Tuple
 
 from ..base import (
     CSVFormatParser,
@@ -23,8 +21,10 @@ from ..base import (
     DateConfig,
     AmountSign,
     ParsedTransaction,
+    lines_from_header,
 )
 from ..registry import ParserRegistry
+from ..sniff import FormatSample
 
 
 @ParserRegistry.register
@@ -55,23 +55,17 @@ class VenmoParser(CSVFormatParser):
         use_iso_format=True,  # 2025-04-04T22:01:03
     )
 
-    def can_parse(self, csv_content: str) -> Tuple[bool, float]:
+    def detect(self, sample: FormatSample) -> Tuple[bool, float]:
         """Detect Venmo format by looking for characteristic headers."""
-        lines = csv_content.strip().split("\n")
-        for line in lines[:10]:
-            if "Account Statement" in line:
-                return True, 0.95
-            if "ID" in line and "Datetime" in line and "From" in line and "To" in line:
-                return True, 0.90
+        if sample.line_contains("Account Statement"):
+            return True, 0.95
+        if sample.has_columns("ID", "Datetime", "From", "To"):
+            return True, 0.90
         return False, 0.0
 
-    def preprocess_content(self, csv_content: str) -> str:
-        """Find the header row (contains ID,Datetime,Type) and return from there."""
-        lines = csv_content.strip().split("\n")
-        for i, line in enumerate(lines):
-            if "ID" in line and "Datetime" in line and "Type" in line:
-                return "\n".join(lines[i:])
-        return csv_content
+    def preprocess_lines(self, lines: Iterator[str]) -> Iterator[str]:
+        """Find the header row (contains ID,Datetime,Type) and yield lines from there."""
+        return lines_from_header(lines, lambda line: "ID" in line and "Datetime" in line and "Type" in line)
 
     def should_skip_row(self, row: Dict) -> bool:
         """Skip balance rows and incomplete transactions."""
@@ -108,68 +102,59 @@ class VenmoParser(CSVFormatParser):
         else:
             return to_user if to_user else "Venmo"
 
-    def get_default_account_source(self, csv_content: str, row: Dict) -> str:
+    def get_default_account_source(self, row: Dict) -> str:
         """Default account source for Venmo."""
         return "Venmo"
 
-    def parse(self, csv_content: str, account_source: Optional[str] = None) -> List[ParsedTransaction]:
+    def parse_row(self, row: Dict[str, str], account_source: Optional[str] = None) -> Optional[ParsedTransaction]:
         """
-        Override parse to handle Venmo-specific description building.
+        Override parse_row to handle Venmo-specific description building.
         When Note is empty, build description from Type: From -> To
         """
-        transactions = []
-        content = self.preprocess_content(csv_content)
-        reader = csv.DictReader(io.StringIO(content))
-
-        for row in reader:
-            if self.should_skip_row(row):
-                continue
-
-            # Parse date
-            datetime_str = row.get("Datetime", "").strip()
-            trans_date = self.parse_date(datetime_str)
-            if trans_date is None:
-                continue
-
-            # Parse amount
-            amount_str = row.get("Amount (total)", "").strip()
-            amount = self.parse_amount(amount_str)
-            if amount is None:
-                continue
-
-            # Build description from Note, or from Type/From/To if Note is empty
-            note = row.get("Note", "").strip()
-            trans_type = row.get("Type", "").strip()
-            from_user = row.get("From", "").strip()
-            to_user = row.get("To", "").strip()
-
-            if note:
-                description = note
-            else:
-                description = f"{trans_type}: {from_user} -> {to_user}"
-
-            # Extract merchant
-            merchant = self.extract_merchant(row, description)
-
-            # Determine account source
-            effective_account = account_source or self.get_default_account_source(csv_content, row)
-
-            # Get reference ID
-            trans_id = row.get("ID", "").strip()
-            reference_id = trans_id if trans_id else f"venmo_{datetime_str}_{amount}"
-
-            transactions.append(
-                ParsedTransaction(
-                    date=trans_date,
-                    amount=amount,
-                    description=description,
-                    merchant=merchant,
-                    account_source=effective_account,
-                    reference_id=reference_id,
-                    card_member=None,
-                    suggested_category=None,
-                    source_category=None,
-                )
-            )
-
-        return transactions
+        if self.should_skip_row(row):
+            return None
+
+        # Parse date
+        datetime_str = row.get("Datetime", "").strip()
+        trans_date = self.parse_date(datetime_str)
+        if trans_date is None:
+            return None
+
+        # Parse amount
+        amount_str = row.get("Amount (total)", "").strip()
+        amount = self.parse_amount(amount_str)
+        if amount is None:
+            return None
+
+        # Build description from Note, or from Type/From/To if Note is empty
+        note = row.get("Note", "").strip()
+        trans_type = row.get("Type", "").strip()
+        from_user = row.get("From", "").strip()
+        to_user = row.get("To", "").strip()
+
+        if note:
+            description = note
+        else:
+            description = f"{trans_type}: {from_user} -> {to_user}"
+
+        # Extract merchant
+        merchant = self.extract_merchant(row, description)
+
+        # Determine account source
+        effective_account = account_source or self.get_default_account_source(row)
+
+        # Get reference ID
+        trans_id = row.get("ID", "").strip()
+        reference_id = trans_id if trans_id else f"venmo_{datetime_str}_{amount}"
+
+        return ParsedTransaction(
+            date=trans_date,
+            amount=amount,
+            description=description,
+            merchant=merchant,
+            account_source=effective_account,
+            reference_id=reference_id,
+            card_member=None,
+            suggested_category=None,
+            source_category=None,
+        )
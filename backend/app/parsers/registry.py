@@ -4,8 +4,14 @@ Parser registry with decorator-based registration.
 Provides automatic format detection and parser discovery.
 """
 
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Type
 from .base import CSVFormatParser
+from .sniff import FormatSample
+
+# Detection results kept, keyed by the hash of the sampled content
+DETECTION_CACHE_SIZE = 256
 
 
 class ParserRegistry:
@@ -32,6 +38,8 @@ class ParserRegistry:
     """
 
     _parsers: Dict[str, Type[CSVFormatParser]] = {}
+    _detected: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+    _detected_lock = threading.Lock()
 
     @classmethod
     def register(cls, parser_class: Type[CSVFormatParser]) -> Type[CSVFormatParser]:
@@ -54,6 +62,7 @@ class ParserRegistry:
             )
 
         cls._parsers[parser_class.format_key] = parser_class
+        cls._clear_detected()
         return parser_class
 
     @classmethod
@@ -69,20 +78,40 @@ class ParserRegistry:
         """
         Auto-detect CSV format by checking all registered parsers.
 
+        The start of the content is sniffed once into a FormatSample that every
+        parser's detect() checks. Results are cached by the sample's hash, so
+        re-detecting the same file skips the parsers entirely.
+
         Returns:
             Tuple of (parser instance, confidence) or (None, 0.0) if no match
         """
+        sample = FormatSample.from_content(csv_content)
+        digest = sample.digest
+
+        with cls._detected_lock:
+            cached = cls._detected.get(digest)
+            if cached is not None:
+                cls._detected.move_to_end(digest)
+        if cached is not None:
+            format_key, confidence = cached
+            return (cls.get_parser(format_key) if format_key else None), confidence
+
         best_parser = None
         best_confidence = 0.0
 
         for parser_class in cls._parsers.values():
             parser = parser_class()
-            can_parse, confidence = parser.can_parse(csv_content)
+            can_parse, confidence = parser.detect(sample)
 
             if can_parse and confidence > best_confidence:
                 best_parser = parser
                 best_confidence = confidence
 
+        with cls._detected_lock:
+            cls._detected[digest] = (best_parser.format_key if best_parser else None, best_confidence)
+            if len(cls._detected) > DETECTION_CACHE_SIZE:
+                cls._detected.popitem(last=False)
+
         return best_parser, best_confidence
 
     @classmethod
@@ -104,3 +133,9 @@ class ParserRegistry:
     def clear(cls):
         """Clear all registered parsers (useful for testing)."""
         cls._parsers = {}
+        cls._clear_detected()
+
+    @classmethod
+    def _clear_detected(cls):
+        with cls._detected_lock:
+            cls._detected.clear()
@@ -0,0 +1,80 @@
+"""
+Format sniffing: one bounded pass over the start of a file, shared by all detectors.
+
+ParserRegistry.detect_format() builds a FormatSample from the first
+SAMPLE_CHARS characters of the content and hands the same sample to every
+parser's detect(). Detection therefore costs the same for a 100-row and a
+100k-row statement, and a new parser adds a few checks against features that
+are already extracted instead of another scan of the content.
+"""
+
+import csv
+import hashlib
+from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple
+
+# Characters of content a format is detected from
+SAMPLE_CHARS = 64 * 1024
+# Leading lines searched for header rows and markers
+HEAD_LINES = 10
+# Candidate CSV delimiters, preferred in this order on ties
+DELIMITERS = (",", "\t", ";", "|")
+# OFX/QFX markers, searched case-insensitively anywhere in the sample
+OFX_MARKERS = ("<OFX>", "OFXHEADER:", "<?OFX", "<STMTTRN>")
+
+
+@dataclass(frozen=True)
+class FormatSample:
+    """Features of the start of a file that format detectors check."""
+
+    text: str  # The sampled prefix
+    head: Tuple[str, ...]  # First HEAD_LINES lines of the stripped sample
+    delimiter: str  # Most frequent DELIMITERS character in the head lines
+    header_rows: Tuple[Tuple[str, ...], ...]  # Head lines split into stripped cells
+    ofx_markers: FrozenSet[str]  # OFX_MARKERS present in the sample
+    qif_type_line: Optional[int]  # Index of the first head line starting with "!Type:"
+
+    @classmethod
+    def from_content(cls, content: str) -> "FormatSample":
+        """Sniff the first SAMPLE_CHARS characters of ``content``."""
+        text = content[:SAMPLE_CHARS]
+        stripped = text.strip()
+        head = tuple(stripped.split("\n", HEAD_LINES)[:HEAD_LINES])
+
+        counts = {delimiter: sum(line.count(delimiter) for line in head) for delimiter in DELIMITERS}
+        delimiter = max(DELIMITERS, key=lambda d: counts[d]) if any(counts.values()) else ","
+        try:
+            header_rows = tuple(
+                tuple(cell.strip() for cell in row) for row in csv.reader(head, delimiter=delimiter)
+            )
+        except csv.Error:
+            header_rows = ()
+
+        upper = stripped.upper()
+        ofx_markers = frozenset(marker for marker in OFX_MARKERS if marker in upper)
+        qif_type_line = next(
+            (i for i, line in enumerate(head) if line.strip().lower().startswith("!type:")), None
+        )
+
+        return cls(
+            text=text,
+            head=head,
+            delimiter=delimiter,
+            header_rows=header_rows,
+            ofx_markers=ofx_markers,
+            qif_type_line=qif_type_line,
+        )
+
+    @property
+    def digest(self) -> str:
+        """SHA256 of the sampled text; identifies the detection result."""
+        return hashlib.sha256(self.text.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def has_columns(self, *names: str) -> bool:
+        """Whether one of the head rows has all of ``names`` as cells."""
+        wanted = set(names)
+        return any(wanted.issubset(row) for row in self.header_rows)
+
+    def line_contains(self, *needles: str) -> bool:
+        """Whether one of the head lines contains all of ``needles``."""
+        return any(all(needle in line for needle in needles) for line in self.head)
@@ -0,0 +1,102 @@
+"""
+Column projections for read-only transaction scans.
+
+Report, analytics and preview code that only reads a few scalar columns
+selects just those columns and gets plain named tuples back instead of
+Transaction objects: no identity map entry, InstanceState or attribute
+instrumentation per row, and none of the columns the caller never reads.
+Rows are immutable tuples with attribute access, so code written against
+Transaction attributes (``txn.amount``, ``txn.merchant``) reads them
+unchanged.
+
+    rows = await REPORT_ROWS.fetch(session, REPORT_ROWS.select(Transaction.amount < 0))
+
+Use a projection only where the rows are not modified; writes still go
+through the ORM.
+"""
+
+from datetime import date
+from typing import Any, AsyncIterator, Generic, List, NamedTuple, Optional, Tuple, Type, TypeVar
+
+from sqlalchemy import ColumnElement, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.orm import Transaction
+
+
+class TransactionRow(NamedTuple):
+    """Common transaction columns for previews and rule/transfer matching."""
+
+    id: int
+    date: date
+    amount: float
+    description: str
+    merchant: Optional[str]
+    account_source: str
+    category: Optional[str]
+
+
+class ReportRow(NamedTuple):
+    """Transaction columns read by reports and analytics."""
+
+    id: int
+    date: date
+    amount: float
+    merchant: Optional[str]
+    account_source: str
+    category: Optional[str]
+
+
+class ExportRow(NamedTuple):
+    """Transaction columns written by CSV/NDJSON export, in file order."""
+
+    date: date
+    amount: float
+    merchant: Optional[str]
+    description: str
+    account_source: str
+    category: Optional[str]
+    reconciliation_status: str
+    notes: Optional[str]
+    is_transfer: bool
+    reference_id: Optional[str]
+
+
+RowT = TypeVar("RowT", bound=Tuple[Any, ...])
+
+
+class Projection(Generic[RowT]):
+    """Selects the Transaction columns named by a NamedTuple's fields."""
+
+    def __init__(self, row_type: Type[RowT]):
+        self.row_type = row_type
+        self.columns = tuple(getattr(Transaction, field) for field in row_type._fields)  # type: ignore[attr-defined]
+
+    def select(self, *where: ColumnElement[bool]) -> Select[Any]:
+        """SELECT of the projected columns; add ordering/limits as usual."""
+        statement = select(*self.columns)
+        return statement.where(*where) if where else statement
+
+    async def fetch(self, session: AsyncSession, statement: Select[Any]) -> List[RowT]:
+        """Execute ``statement`` (built by ``select()``) and return row tuples."""
+        result = await session.execute(statement)
+        make = self.row_type._make  # type: ignore[attr-defined]
+        return [make(row) for row in result]
+
+    async def stream(
+        self, session: AsyncSession, statement: Select[Any], batch_size: int = 1000
+    ) -> AsyncIterator[RowT]:
+        """Execute ``statement`` on a streaming cursor; iterate the result for row tuples.
+
+        The statement runs here, so SQL errors are raised by this call rather
+        than mid-iteration. At most ``batch_size`` rows are buffered at a
+        time, so memory does not grow with the size of the result.
+        """
+        result = await session.stream(statement.execution_options(yield_per=batch_size))
+        make = self.row_type._make  # type: ignore[attr-defined]
+        return (make(row) async for row in result)
+
+
+TRANSACTION_ROWS = Projection(TransactionRow)
+REPORT_ROWS = Projection(ReportRow)
+EXPORT_ROWS = Projection(ExportRow)
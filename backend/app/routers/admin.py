@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import APIRouter, Depends, Query, Body
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -5,10 +7,11 @@ from typing import Literal
 
 from pydantic import BaseModel
 
-from app.database import get_session
+from app.database import engine, get_session
 from app.orm import AppSettings, BatchImportSession, Budget, CustomFormatConfig, Dashboard, DashboardWidget, ImportFormat, ImportSession, MerchantAlias, RecurringPattern, SavedFilter, Tag, TagRule, Transaction, TransactionTag
 from app.errors import ErrorCode, not_found, bad_request
-from app.services.backup import backup_service, BackupMetadata
+from app.services import merchant_aliases, merchant_history
+from app.services.backup import backup_service, BackupMetadata, BackupProgress
 
 
 class CreateBackupRequest(BaseModel):
@@ -241,16 +244,24 @@ async def create_backup(request: CreateBackupRequest = Body(default=CreateBackup
     """
     Create a new database backup.
 
-    The backup will be stored as a gzip-compressed copy of the SQLite database.
+    The backup is a compressed snapshot of the SQLite database, taken on a
+    worker thread so other requests keep being served while it runs.
     GFS retention policy automatically manages backup cleanup.
     """
-    return backup_service.create_backup(
+    return await asyncio.to_thread(
+        backup_service.create_backup,
         description=request.description,
         source=request.source,
         is_demo_backup=request.is_demo_backup,
     )
 
 
+@router.get("/backup/progress", response_model=BackupProgress | None)
+async def get_backup_progress():
+    """Progress of the backup being created, or null when none is running."""
+    return backup_service.progress
+
+
 @router.get("/backup/{backup_id}", response_model=BackupMetadata)
 async def get_backup(backup_id: str):
     """Get metadata for a specific backup."""
@@ -282,7 +293,12 @@ async def restore_backup(
     if backup is None:
         raise not_found(ErrorCode.BACKUP_NOT_FOUND, backup_id=backup_id)
 
-    backup_service.restore_backup(backup_id)
+    # Close pooled connections so none keeps the old file's WAL state
+    await engine.dispose()
+    await asyncio.to_thread(backup_service.restore_backup, backup_id)
+    # The restored file never went through the Session hooks that keep these current
+    merchant_aliases.clear_cache()
+    merchant_history.clear_cache()
 
     return {
         "success": True,
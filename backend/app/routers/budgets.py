@@ -1,16 +1,19 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, tuple_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from datetime import UTC, datetime, date
 from calendar import monthrange
 
 from app.database import get_session
+from app.routers.conditional import TRANSACTION_TABLES, conditional_get
 from app.orm import Budget, BudgetPeriod, Tag, Transaction, TransactionTag
 from app.schemas import BudgetCreate, BudgetUpdate, BudgetResponse
 from app.errors import ErrorCode, not_found, bad_request
 
-router = APIRouter(prefix="/api/v1/budgets", tags=["budgets"])
+router = APIRouter(
+    prefix="/api/v1/budgets", tags=["budgets"], dependencies=[conditional_get("budgets", *TRANSACTION_TABLES)]
+)
 
 
 def parse_tag_string(tag_str: str) -> tuple[str, str]:
@@ -109,45 +112,41 @@ async def delete_budget(budget_id: int, session: AsyncSession = Depends(get_sess
     await session.commit()
 
 
-async def get_spending_for_tag(session: AsyncSession, tag_str: str, start_date: date, end_date: date) -> float:
-    """Get total spending for transactions with a specific tag in date range"""
-    namespace, value = parse_tag_string(tag_str)
-
-    # Get the tag
-    tag_result = await session.execute(select(Tag).where(and_(Tag.namespace == namespace, Tag.value == value)))
-    tag = tag_result.scalar_one_or_none()
-    if not tag:
-        return 0.0
+async def get_spending_by_tag(
+    session: AsyncSession, tag_strs: Iterable[str], start_date: date, end_date: date
+) -> Dict[str, float]:
+    """Total spending per tag string for transactions in date range, in a single grouped query.
 
+    Tags that do not exist or have no spending are missing from the result.
+    """
+    pairs = sorted({parse_tag_string(tag_str) for tag_str in tag_strs})
+    if not pairs:
+        return {}
+
+    spent = func.sum(Transaction.amount).label("spent")
+    window = (
+        Transaction.date >= start_date,
+        Transaction.date <= end_date,
+        Transaction.amount < 0,  # Only expenses
+        Transaction.is_transfer.is_(False),  # Exclude transfers
+    )
     # Account tags use FK relationship, buckets/occasions use M2M junction table
-    # Exclude transfers from spending calculations
-    if namespace == "account":
-        # Accounts use direct FK (account_tag_id) on Transaction
-        spending_result = await session.execute(
-            select(func.sum(Transaction.amount)).where(
-                Transaction.account_tag_id == tag.id,
-                Transaction.date >= start_date,
-                Transaction.date <= end_date,
-                Transaction.amount < 0,  # Only expenses
-                Transaction.is_transfer.is_(False),  # Exclude transfers
-            )
-        )
-    else:
-        # Buckets and occasions use M2M via TransactionTag
-        spending_result = await session.execute(
-            select(func.sum(Transaction.amount))
-            .join(TransactionTag, Transaction.id == TransactionTag.transaction_id)
-            .where(
-                TransactionTag.tag_id == tag.id,
-                Transaction.date >= start_date,
-                Transaction.date <= end_date,
-                Transaction.amount < 0,  # Only expenses
-                Transaction.is_transfer.is_(False),  # Exclude transfers
-            )
-        )
-
-    spent_raw = spending_result.scalar()
-    return abs(spent_raw) if spent_raw else 0.0
+    tagged = (
+        select(Tag.namespace, Tag.value, spent)
+        .join(TransactionTag, TransactionTag.tag_id == Tag.id)
+        .join(Transaction, Transaction.id == TransactionTag.transaction_id)
+        .where(Tag.namespace != "account", tuple_(Tag.namespace, Tag.value).in_(pairs), *window)
+        .group_by(Tag.namespace, Tag.value)
+    )
+    accounts = (
+        select(Tag.namespace, Tag.value, spent)
+        .join(Transaction, Transaction.account_tag_id == Tag.id)
+        .where(Tag.namespace == "account", tuple_(Tag.namespace, Tag.value).in_(pairs), *window)
+        .group_by(Tag.namespace, Tag.value)
+    )
+
+    result = await session.execute(union_all(tagged, accounts))
+    return {f"{namespace}:{value}": abs(spent_raw) for namespace, value, spent_raw in result.all() if spent_raw}
 
 
 @router.get("/status/current")
@@ -183,11 +182,11 @@ async def get_budget_status(
         days_elapsed = days_in_month  # Full month for past months
 
     # Get spending by tag for this month
+    spending = await get_spending_by_tag(session, [budget_item.tag for budget_item in budgets], start_date, end_date)
     status_list = []
 
     for budget_item in budgets:
-        # Get spending for this tag
-        spent_amount = await get_spending_for_tag(session, budget_item.tag, start_date, end_date)
+        spent_amount = spending.get(budget_item.tag, 0.0)
 
         # Calculate metrics
         budget_amount = budget_item.amount
@@ -0,0 +1,72 @@
+"""Conditional GET support (ETag / If-None-Match) for read endpoints."""
+
+import hashlib
+from datetime import date
+from typing import Any, Optional
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_session
+from app.services.data_generations import current_tokens
+from app.version import get_version
+
+# Revalidate on every use; the browser keeps the body and sends If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+# Tables behind transaction lists and reports
+TRANSACTION_TABLES = ("transactions", "transaction_tags", "tags")
+
+
+def make_etag(tokens: dict, request: Request) -> str:
+    """Weak ETag over the data tokens and everything else a response depends on.
+
+    Today's date is included because many reports default to the current
+    month or a window ending today.
+    """
+    parts = [
+        get_version(),
+        date.today().isoformat(),
+        request.url.path,
+        repr(sorted(request.query_params.multi_items())),
+        repr(sorted(tokens.items())),
+    ]
+    digest = hashlib.sha1("\n".join(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of ``etag`` against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def conditional_get(*table_names: str) -> Any:
+    """Dependency that makes GETs conditional on the data in ``table_names``.
+
+    Reads the tables' tokens (one query) before the endpoint runs any of its
+    own; a matching If-None-Match is answered with 304 and the endpoint is
+    skipped. Otherwise the response carries the ETag. Reading the tokens
+    first means a concurrent commit can only make the ETag older than the
+    body, never newer, so the worst case is one extra full response.
+    The tokens are left on ``request.state.data_tokens`` for the endpoint.
+    Other methods pass through, so it can be set on a whole router.
+    """
+
+    async def check(request: Request, response: Response, session: AsyncSession = Depends(get_session)) -> None:
+        if request.method not in ("GET", "HEAD"):
+            return
+        tokens = await current_tokens(session, table_names)
+        # Endpoints keyed on the same tokens (e.g. tag statistics) reuse them
+        request.state.data_tokens = tokens
+        etag = make_etag(tokens, request)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return Depends(check)
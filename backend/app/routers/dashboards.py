@@ -13,9 +13,12 @@ from datetime import UTC, datetime, date, timedelta
 from pydantic import BaseModel
 
 from app.database import get_session
+from app.routers.conditional import TRANSACTION_TABLES, conditional_get
 from app.orm import Dashboard, DashboardWidget, DateRangeType
 from app.schemas import DashboardCreate, DashboardUpdate, DashboardWidgetCreate, DashboardWidgetResponse
 from app.errors import ErrorCode, not_found, bad_request
+from app.services.dashboard_data import DashboardScope, dashboard_widget_data
+from app.services.data_generations import mark_changed
 
 
 # ============================================================================
@@ -262,6 +265,7 @@ async def create_dashboard(dashboard: DashboardCreate, session: AsyncSession = D
                     "config": widget_data.get("config"),  # Explicitly handle None
                 },
             )
+        mark_changed(session.sync_session, "dashboard_widgets")
         await session.commit()
         logger.info(f"Created {len(DEFAULT_WIDGETS)} widgets for dashboard {db_dashboard.id}")
 
@@ -454,6 +458,43 @@ async def list_dashboard_widgets(dashboard_id: int, session: AsyncSession = Depe
     return widgets
 
 
+@router.get(
+    "/{dashboard_id}/data",
+    dependencies=[conditional_get("dashboards", "dashboard_widgets", *TRANSACTION_TABLES)],
+)
+async def get_dashboard_data(dashboard_id: int, session: AsyncSession = Depends(get_session)):
+    """Data for every visible widget on a dashboard in one request.
+
+    The date range is resolved once and all widgets are computed from a
+    single scan of the transactions they need. Each widget's ``data`` holds
+    the payloads of the report endpoints it would otherwise call (e.g.
+    ``summary`` and ``month_over_month`` for the summary widget).
+    """
+    dash_result = await session.execute(select(Dashboard).where(Dashboard.id == dashboard_id))
+    dashboard = dash_result.scalar_one_or_none()
+    if not dashboard:
+        raise not_found(ErrorCode.DASHBOARD_NOT_FOUND, dashboard_id=dashboard_id)
+
+    result = await session.execute(
+        select(DashboardWidget)
+        .where(DashboardWidget.dashboard_id == dashboard_id, DashboardWidget.is_visible.is_(True))
+        .order_by(DashboardWidget.position)
+    )
+    widgets = list(result.scalars().all())
+
+    range_type = DateRangeType(dashboard.date_range_type)
+    date_range = calculate_date_range(range_type)
+    scope = DashboardScope(
+        range_type, date.fromisoformat(date_range["start_date"]), date.fromisoformat(date_range["end_date"])
+    )
+
+    return {
+        "dashboard_id": dashboard_id,
+        "date_range": date_range,
+        "widgets": await dashboard_widget_data(session, scope, widgets),
+    }
+
+
 @router.post("/{dashboard_id}/widgets", response_model=DashboardWidgetResponse, status_code=201)
 async def create_dashboard_widget(
     dashboard_id: int, widget: DashboardWidgetCreate, session: AsyncSession = Depends(get_session)
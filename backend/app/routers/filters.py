@@ -8,6 +8,7 @@ from datetime import UTC, datetime, date, timedelta
 import json
 
 from app.database import get_session
+from app.loader_profiles import TRANSACTION_WITH_TAGS
 from app.orm import ReconciliationStatus, SavedFilter, Transaction
 from app.schemas import SavedFilterCreate, SavedFilterUpdate, TransactionResponse
 from app.routers.transactions import build_transaction_filter_query
@@ -213,7 +214,7 @@ async def apply_filter(
         reconciliation_status = ReconciliationStatus(db_filter.reconciliation_status)
 
     # Build and execute query
-    base_query = select(Transaction)
+    base_query = TRANSACTION_WITH_TAGS.apply(select(Transaction))
     query = build_transaction_filter_query(
         base_query,
         account=accounts,
@@ -3,12 +3,12 @@
 from fastapi import APIRouter, Depends, UploadFile, File, Form
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from datetime import UTC, datetime
 from pydantic import BaseModel as PydanticBaseModel
 
 from app.database import get_session
-from app.orm import CustomFormatConfig, ImportFormatType, ReconciliationStatus, Transaction
+from app.orm import CustomFormatConfig, ImportFormatType
 from app.schemas import CustomFormatConfigCreate, CustomFormatConfigUpdate
 from app.parsers import (
     ParserRegistry,
@@ -17,16 +17,14 @@ from app.parsers import (
     analyze_csv_columns,
     find_header_row,
     compute_header_signature,
+    ParsedTransaction,
 )
-from app.tag_inference import infer_bucket_tag
-from app.utils.hashing import compute_transaction_hash_from_dict
 from app.errors import ErrorCode, not_found, bad_request
-from app.routers.import_helpers import (
-    apply_bucket_tag,
-    apply_merchant_alias,
-    get_merchant_aliases,
-    get_or_create_account_tag,
-)
+from app.routers.import_helpers import add_bucket_suggestions, open_upload_text
+from app.services.import_pipeline import CHUNK_SIZE, TransactionImporter
+from app.services.merchant_aliases import get_alias_matcher
+from app.services.merchant_history import get_merchant_history
+from app.services.worker_pool import iterate_blocking, run_cpu
 from app.orm import ImportSession
 
 router = APIRouter(prefix="/api/v1/import", tags=["import"])
@@ -36,6 +34,59 @@ router = APIRouter(prefix="/api/v1/import", tags=["import"])
 # Custom CSV Format Endpoints
 # ============================================================================
 
+# Transactions returned by /custom/preview
+PREVIEW_LIMIT = 100
+
+
+def _to_dicts_or_bad_request(transactions: Iterator[ParsedTransaction]) -> Iterator[Dict[str, Any]]:
+    """Convert lazily parsed transactions to dicts, turning parse failures into 400s."""
+    try:
+        for txn in transactions:
+            yield txn.to_dict()
+    except Exception as e:
+        raise bad_request(ErrorCode.IMPORT_PARSE_ERROR, f"Parse error: {str(e)}")
+
+
+def _analyze_content(content: bytes, skip_rows: int) -> Dict[str, Any]:
+    """Column analysis, row count and known-format detection for /analyze (a run_cpu() task)."""
+    csv_content = content.decode("utf-8")
+    analysis = analyze_csv_columns(csv_content, skip_rows)
+
+    # Count total rows
+    lines = csv_content.strip().split("\n")
+    row_count = max(0, len(lines) - 1 - skip_rows)  # Subtract header and skipped rows
+
+    # Try to detect known format
+    detected_format: Optional[str] = None
+    format_confidence: Optional[float] = None
+    try:
+        parser, confidence = ParserRegistry.detect_format(csv_content)
+        if parser:
+            detected_format = parser.format_key
+            format_confidence = confidence
+    except Exception:
+        pass  # Format detection failed, leave as None
+
+    return {
+        **analysis,
+        "row_count": row_count,
+        "detected_format": detected_format,
+        "format_confidence": format_confidence,
+    }
+
+
+def _detect_layout(content: bytes) -> tuple[int, List[str], Dict[str, Any]]:
+    """Header row, headers and column analysis for /custom/auto-detect (a run_cpu() task)."""
+    csv_content = content.decode("utf-8")
+
+    skip_rows = 0
+    headers: List[str] = []
+    header_result = find_header_row(csv_content)
+    if header_result:
+        skip_rows, headers = header_result
+
+    return skip_rows, headers, analyze_csv_columns(csv_content, skip_rows)
+
 
 class AnalyzeResponse(PydanticBaseModel):
     """Response from CSV analysis endpoint"""
@@ -89,32 +140,15 @@ async def analyze_csv_file(
         )
 
     content = await file.read()
-    csv_content = content.decode("utf-8")
-
-    analysis = analyze_csv_columns(csv_content, skip_rows)
-
-    # Count total rows
-    lines = csv_content.strip().split("\n")
-    row_count = max(0, len(lines) - 1 - skip_rows)  # Subtract header and skipped rows
-
-    # Try to detect known format
-    detected_format: Optional[str] = None
-    format_confidence: Optional[float] = None
-    try:
-        parser, confidence = ParserRegistry.detect_format(csv_content)
-        if parser:
-            detected_format = parser.format_key
-            format_confidence = confidence
-    except Exception:
-        pass  # Format detection failed, leave as None
+    analysis = await run_cpu(_analyze_content, content, skip_rows)
 
     return AnalyzeResponse(
         headers=analysis["headers"],
         sample_rows=analysis["sample_rows"],
         column_hints=analysis["column_hints"],
-        row_count=row_count,
-        detected_format=detected_format,
-        format_confidence=format_confidence,
+        row_count=analysis["row_count"],
+        detected_format=analysis["detected_format"],
+        format_confidence=analysis["format_confidence"],
         suggested_config=analysis.get("suggested_config"),
     )
 
@@ -156,14 +190,9 @@ async def auto_detect_csv_format_endpoint(
         raise bad_request(ErrorCode.IMPORT_UNSUPPORTED_FORMAT, "Only CSV files can be auto-detected")
 
     content = await file.read()
-    csv_content = content.decode("utf-8")
 
-    # Step 1: Find the header row
-    header_result = find_header_row(csv_content)
-    skip_rows = 0
-    headers: List[str] = []
-    if header_result:
-        skip_rows, headers = header_result
+    # Step 1: Find the header row and analyze the columns below it
+    skip_rows, headers, analysis = await run_cpu(_detect_layout, content)
 
     # Step 2: Compute header signature
     header_signature = None
@@ -187,10 +216,7 @@ async def auto_detect_csv_format_endpoint(
                 "use_count": saved_config.use_count,
             }
 
-    # Step 4: Analyze columns with the detected header row
-    analysis = analyze_csv_columns(csv_content, skip_rows)
-
-    # Step 5: Get suggested config (fallback if no signature match)
+    # Step 4: Get suggested config (fallback if no signature match)
     suggested = analysis.get("suggested_config", {})
 
     # Determine if detection was successful
@@ -231,49 +257,34 @@ async def preview_custom_import(
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise bad_request(ErrorCode.IMPORT_UNSUPPORTED_FORMAT, "Custom format preview only supports CSV files")
 
-    content = await file.read()
-    csv_content = content.decode("utf-8")
-
     errors = []
     try:
         config = CustomCsvConfig.from_json(config_json)
     except Exception as e:
         raise bad_request(ErrorCode.IMPORT_PARSE_ERROR, f"Invalid config JSON: {str(e)}")
 
+    # Stream-parse the file, keeping only the previewed transactions
+    transactions: List[Dict[str, Any]] = []
+    transaction_count = 0
+    total_amount = 0.0
     try:
         parser = CustomCsvParser(config)
-        parsed_transactions = parser.parse(csv_content)
+        with open_upload_text(file) as text:
+            async for parsed in iterate_blocking(parser.iter_parse(text), CHUNK_SIZE):
+                transaction_count += 1
+                total_amount += parsed.amount
+                if len(transactions) < PREVIEW_LIMIT:
+                    transactions.append(parsed.to_dict())
     except Exception as e:
         errors.append(f"Parse error: {str(e)}")
         return CustomPreviewResponse(transaction_count=0, transactions=[], total_amount=0.0, errors=errors)
 
-    # Convert ParsedTransaction objects to dicts
-    transactions = [t.to_dict() for t in parsed_transactions]
-
     # Add bucket tag suggestions
-    all_txns_result = await session.execute(select(Transaction).where(Transaction.category.isnot(None)))
-    all_txns = all_txns_result.scalars().all()
-    user_history: Dict[str, str] = {}
-    for db_txn in all_txns:
-        if db_txn.merchant and db_txn.category:
-            merchant = db_txn.merchant.lower()
-            bucket_value = db_txn.category.lower().replace(" ", "-").replace("&", "and")
-            user_history[merchant] = f"bucket:{bucket_value}"
-
-    for txn in transactions:
-        suggestions = infer_bucket_tag(
-            txn.get("merchant", ""), txn.get("description", ""), txn.get("amount", 0), user_history
-        )
-        if suggestions:
-            tag = suggestions[0][0]
-            bucket_value = tag.split(":", 1)[1] if ":" in tag else tag
-            txn["bucket"] = bucket_value
-            txn["bucket_tag"] = tag
-
-    total_amount = sum(t.amount for t in parsed_transactions)
+    user_history = await get_merchant_history(session)
+    await add_bucket_suggestions(transactions, user_history, with_category=False)
 
     return CustomPreviewResponse(
-        transaction_count=len(transactions), transactions=transactions[:100], total_amount=total_amount, errors=errors
+        transaction_count=transaction_count, transactions=transactions, total_amount=total_amount, errors=errors
     )
 
 
@@ -302,37 +313,18 @@ async def confirm_custom_import(
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise bad_request(ErrorCode.IMPORT_UNSUPPORTED_FORMAT, "Custom format import only supports CSV files")
 
-    content = await file.read()
-    csv_content = content.decode("utf-8")
-
     # Parse and validate config
     try:
         config = CustomCsvConfig.from_json(config_json)
-    except Exception as e:
-        raise bad_request(ErrorCode.IMPORT_PARSE_ERROR, f"Invalid config JSON: {str(e)}")
-
-    # Parse transactions
-    try:
         parser = CustomCsvParser(config)
-        parsed_transactions = parser.parse(csv_content)
     except Exception as e:
-        raise bad_request(ErrorCode.IMPORT_PARSE_ERROR, f"Parse error: {str(e)}")
-
-    if not parsed_transactions:
-        raise bad_request(ErrorCode.IMPORT_NO_TRANSACTIONS)
+        raise bad_request(ErrorCode.IMPORT_PARSE_ERROR, f"Invalid config JSON: {str(e)}")
 
     # Build user history for bucket tag suggestions
-    all_txns_result = await session.execute(select(Transaction).where(Transaction.category.isnot(None)))
-    all_txns = all_txns_result.scalars().all()
-    user_history: Dict[str, str] = {}
-    for db_txn in all_txns:
-        if db_txn.merchant and db_txn.category:
-            merchant = db_txn.merchant.lower()
-            bucket_value = db_txn.category.lower().replace(" ", "-").replace("&", "and")
-            user_history[merchant] = f"bucket:{bucket_value}"
+    user_history = await get_merchant_history(session)
 
     # Load merchant aliases for normalization
-    merchant_aliases = await get_merchant_aliases(session)
+    merchant_aliases = await get_alias_matcher(session)
 
     # Create import session
     import_session = ImportSession(
@@ -347,109 +339,18 @@ async def confirm_custom_import(
     session.add(import_session)
     await session.flush()
 
-    # Import transactions
-    imported_count = 0
-    duplicate_count = 0
-    total_amount = 0.0
-    dates = []
-    cross_account_warnings = []
-
-    for parsed_txn in parsed_transactions:
-        txn_data = parsed_txn.to_dict()
-
-        # Generate hashes for deduplication
-        content_hash = compute_transaction_hash_from_dict(txn_data, include_account=True)
-        content_hash_no_account = compute_transaction_hash_from_dict(txn_data, include_account=False)
-
-        # Check for exact duplicate
-        if content_hash:
-            dup_query = select(Transaction).where(Transaction.content_hash == content_hash)
-            result = await session.execute(dup_query)
-            existing = result.scalar_one_or_none()
-
-            if existing:
-                duplicate_count += 1
-                continue
-
-            # Check for cross-account duplicate
-            if content_hash_no_account:
-                cross_query = select(Transaction).where(
-                    Transaction.content_hash_no_account == content_hash_no_account,
-                    Transaction.account_source != txn_data["account_source"],
-                )
-                result = await session.execute(cross_query)
-                cross_match = result.scalar_one_or_none()
-
-                if cross_match:
-                    cross_account_warnings.append(
-                        {
-                            "date": str(txn_data["date"]),
-                            "amount": txn_data["amount"],
-                            "description": txn_data["description"][:50],
-                            "existing_account": cross_match.account_source,
-                            "importing_account": txn_data["account_source"],
-                        }
-                    )
-
-        # Infer bucket tag
-        suggestions = infer_bucket_tag(
-            txn_data.get("merchant", ""), txn_data.get("description", ""), txn_data.get("amount", 0), user_history
-        )
+    # Parse transactions as the file is read, deduplicating and importing in set-based batches
+    importer = TransactionImporter(session, user_history=user_history, merchant_aliases=merchant_aliases)
+    with open_upload_text(file) as text:
+        transactions = iterate_blocking(_to_dicts_or_bad_request(parser.iter_parse(text)), CHUNK_SIZE)
+        import_result = await importer.import_transactions(transactions, import_session)
 
-        if suggestions:
-            bucket_tag = suggestions[0][0]
-            bucket_value = bucket_tag.split(":", 1)[1] if ":" in bucket_tag else "none"
-        else:
-            bucket_value = "none"
-
-        category_display = bucket_value.replace("-", " ").title() if bucket_value != "none" else None
-
-        # Apply merchant alias
-        merchant_name = txn_data.get("merchant")
-        if merchant_aliases:
-            aliased_merchant = apply_merchant_alias(txn_data["description"], merchant_aliases)
-            if aliased_merchant:
-                merchant_name = aliased_merchant
-
-        # Create transaction
-        db_transaction = Transaction(
-            date=txn_data["date"],
-            amount=txn_data["amount"],
-            description=txn_data["description"],
-            merchant=merchant_name,
-            account_source=txn_data["account_source"],
-            card_member=txn_data.get("card_member"),
-            category=category_display,
-            reconciliation_status=ReconciliationStatus.unreconciled,
-            reference_id=txn_data.get("reference_id"),
-            import_session_id=import_session.id,
-            content_hash=content_hash,
-            content_hash_no_account=content_hash_no_account,
-        )
-
-        # Set account_tag_id
-        if txn_data["account_source"]:
-            account_tag = await get_or_create_account_tag(session, txn_data["account_source"])
-            db_transaction.account_tag_id = account_tag.id
-
-        session.add(db_transaction)
-        await session.flush()
-
-        # Apply bucket tag
-        await apply_bucket_tag(session, db_transaction.id, bucket_value)
-
-        imported_count += 1
-        total_amount += txn_data["amount"]
-        dates.append(txn_data["date"])
+    # Nothing parsed: the session is rolled back with the import session row
+    if not import_result.imported and not import_result.duplicates:
+        raise bad_request(ErrorCode.IMPORT_NO_TRANSACTIONS)
 
     # Update import session
-    import_session.transaction_count = imported_count
-    import_session.duplicate_count = duplicate_count
-    import_session.total_amount = total_amount
-    import_session.status = "completed"
-    if dates:
-        import_session.date_range_start = min(dates)
-        import_session.date_range_end = max(dates)
+    import_result.apply_to(import_session)
 
     # Save config if requested
     config_saved = False
@@ -481,15 +382,15 @@ async def confirm_custom_import(
     await session.commit()
 
     response: Dict[str, Any] = {
-        "imported": imported_count,
-        "duplicates": duplicate_count,
+        "imported": import_result.imported,
+        "duplicates": import_result.duplicates,
         "config_saved": config_saved,
         "import_session_id": import_session.id,
     }
 
-    if cross_account_warnings:
-        response["cross_account_warnings"] = cross_account_warnings[:10]
-        response["cross_account_warning_count"] = len(cross_account_warnings)
+    if import_result.cross_account_warnings:
+        response["cross_account_warnings"] = import_result.cross_account_warnings[:10]
+        response["cross_account_warning_count"] = len(import_result.cross_account_warnings)
 
     return response
 
@@ -1,12 +1,21 @@
-"""Shared helpers for import routes (core + custom CSV)."""
+"""Shared helpers for import routes (core + custom CSV).
 
-from sqlalchemy import select, and_
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
-import re as regex_module
+Parsing, format detection and bucket inference run on the worker pool
+(app.services.worker_pool). Functions passed to run_cpu() live at module level
+and take and return plain data so a process pool can run them.
+"""
 
-from app.orm import ImportFormatType, MerchantAlias, MerchantAliasMatchType, Tag, TransactionTag
-from app.parsers import ParserRegistry
+import io
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional, TextIO
+
+from fastapi import UploadFile
+
+from app.orm import ImportFormatType
+from app.parsers import SAMPLE_CHARS, CSVFormatParser, ParserRegistry
+from app.services.import_pipeline import CHUNK_SIZE
+from app.services.worker_pool import iterate_blocking, run_blocking, run_cpu
+from app.tag_inference import top_bucket_tags
 
 # Supported import file extensions
 SUPPORTED_EXTENSIONS = (".csv", ".qif", ".qfx", ".ofx")
@@ -17,17 +26,34 @@ def is_valid_import_file(filename: str) -> bool:
     return filename.lower().endswith(SUPPORTED_EXTENSIONS)
 
 
-def _parse_csv(
-    csv_content: str, account_source: Optional[str] = None, format_hint: Optional[ImportFormatType] = None
-) -> tuple[list, ImportFormatType]:
-    """Parse CSV/QIF/QFX content via ParserRegistry and return (transactions_dicts, format_type)."""
+@contextmanager
+def open_upload_text(file: UploadFile) -> Iterator[TextIO]:
+    """
+    Open an upload as UTF-8 text, decoded incrementally as it is read.
+
+    Iterating the result yields lines with their endings, so a parser's
+    iter_parse() never needs the whole file in memory. The upload itself is
+    left open and can be opened again.
+    """
+    file.file.seek(0)
+    text = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        yield text
+    finally:
+        text.detach()
+
+
+def _select_parser(
+    sample: str, format_hint: Optional[ImportFormatType] = None
+) -> tuple[Optional[CSVFormatParser], ImportFormatType]:
+    """Get the parser for ``format_hint``, or detect one from ``sample``."""
     format_type: ImportFormatType
     if format_hint is not None and format_hint != ImportFormatType.unknown:
         format_key = format_hint.value if hasattr(format_hint, "value") else format_hint
         parser = ParserRegistry.get_parser(format_key)
         format_type = format_hint if isinstance(format_hint, ImportFormatType) else ImportFormatType(format_hint)
     else:
-        parser, _confidence = ParserRegistry.detect_format(csv_content)
+        parser, _confidence = ParserRegistry.detect_format(sample)
         if parser:
             try:
                 format_type = ImportFormatType(parser.format_key)
@@ -35,97 +61,75 @@ def _parse_csv(
                 format_type = ImportFormatType.unknown
         else:
             format_type = ImportFormatType.unknown
+    return parser, format_type
 
-    if parser is None:
-        return [], format_type
-
-    parsed = parser.parse(csv_content, account_source)
-    return [t.to_dict() for t in parsed], format_type
 
+def _iter_parse(
+    text: TextIO, account_source: Optional[str] = None, format_hint: Optional[ImportFormatType] = None
+) -> tuple[Iterator[Dict[str, Any]], ImportFormatType]:
+    """
+    Lazily parse an upload opened with open_upload_text() via ParserRegistry.
 
-async def get_or_create_bucket_tag(session: AsyncSession, bucket_value: str) -> Tag:
-    """Get bucket tag by value, creating if needed"""
-    result = await session.execute(select(Tag).where(and_(Tag.namespace == "bucket", Tag.value == bucket_value)))
-    tag = result.scalar_one_or_none()
-    if not tag:
-        # Create the bucket tag
-        tag = Tag(namespace="bucket", value=bucket_value)
-        session.add(tag)
-        await session.flush()
-    return tag
-
+    Returns (transaction dict iterator, format_type). Without a format_hint the
+    format is detected from the first SAMPLE_CHARS characters.
+    """
+    parser, format_type = _select_parser(text.read(SAMPLE_CHARS), format_hint)
+    text.seek(0)
+    if parser is None:
+        return iter(()), format_type
+    return (t.to_dict() for t in parser.iter_parse(text, account_source)), format_type
 
-async def get_or_create_account_tag(session: AsyncSession, account_source: str) -> Tag:
-    """Get or create an account tag for the given account_source.
 
-    The tag value is the normalized account_source (lowercase, dashes for spaces).
-    The description defaults to the original account_source as the display name.
-    """
-    # Normalize to tag value format
-    tag_value = account_source.lower().replace(" ", "-")
-
-    result = await session.execute(select(Tag).where(and_(Tag.namespace == "account", Tag.value == tag_value)))
-    tag = result.scalar_one_or_none()
-    if not tag:
-        # Create the account tag with original name as description (display name)
-        tag = Tag(
-            namespace="account",
-            value=tag_value,
-            description=account_source,  # Use original as default display name
-        )
-        session.add(tag)
-        await session.flush()
-    return tag
-
-
-async def apply_bucket_tag(session: AsyncSession, transaction_id: int, bucket_value: str):
-    """Apply a bucket tag to a transaction"""
-    tag = await get_or_create_bucket_tag(session, bucket_value)
-
-    # Remove any existing bucket tags first
-    existing_result = await session.execute(
-        select(TransactionTag)
-        .join(Tag)
-        .where(and_(TransactionTag.transaction_id == transaction_id, Tag.namespace == "bucket"))
-    )
-    for existing in existing_result.scalars().all():
-        await session.delete(existing)
-
-    # Add the new bucket tag
-    txn_tag = TransactionTag(transaction_id=transaction_id, tag_id=tag.id)
-    session.add(txn_tag)
-
-
-async def get_merchant_aliases(session: AsyncSession) -> List[MerchantAlias]:
-    """Get all merchant aliases ordered by priority (highest first)"""
-    result = await session.execute(select(MerchantAlias).order_by(MerchantAlias.priority.desc()))
-    return list(result.scalars().all())
-
-
-def apply_merchant_alias(description: str, aliases: List[MerchantAlias]) -> Optional[str]:
+async def iter_parse_upload(
+    text: TextIO, account_source: Optional[str] = None, format_hint: Optional[ImportFormatType] = None
+) -> tuple[AsyncIterator[Dict[str, Any]], ImportFormatType]:
     """
-    Apply merchant aliases to get a canonical merchant name from a description.
-    Returns the canonical name if matched, None otherwise.
-    """
-    if not description:
-        return None
-
-    desc_lower = description.lower()
+    _iter_parse() with detection and parsing on the worker threads.
 
-    for alias in aliases:
-        pattern_lower = alias.pattern.lower()
+    Transactions are parsed CHUNK_SIZE at a time; the next chunk is only
+    parsed once the caller has consumed the current one.
+    """
+    transactions, format_type = await run_blocking(_iter_parse, text, account_source, format_hint)
+    return iterate_blocking(transactions, CHUNK_SIZE), format_type
 
-        if alias.match_type == MerchantAliasMatchType.exact:
-            if desc_lower == pattern_lower:
-                return alias.canonical_name
-        elif alias.match_type == MerchantAliasMatchType.contains:
-            if pattern_lower in desc_lower:
-                return alias.canonical_name
-        elif alias.match_type == MerchantAliasMatchType.regex:
-            try:
-                if regex_module.search(alias.pattern, description, regex_module.IGNORECASE):
-                    return alias.canonical_name
-            except regex_module.error:
-                continue
 
-    return None
+def _parse_content(
+    content: bytes, account_source: Optional[str] = None, format_hint: Optional[ImportFormatType] = None
+) -> tuple[List[Dict[str, Any]], ImportFormatType]:
+    """Decode, detect and parse a whole file (a run_cpu() task)."""
+    csv_content = content.decode("utf-8")
+    parser, format_type = _select_parser(csv_content, format_hint)
+    if parser is None:
+        return [], format_type
+    return [t.to_dict() for t in parser.parse(csv_content, account_source)], format_type
+
+
+async def parse_upload(
+    file: UploadFile, account_source: Optional[str] = None, format_hint: Optional[ImportFormatType] = None
+) -> tuple[List[Dict[str, Any]], ImportFormatType]:
+    """Parse a whole upload on the CPU pool; uploads parsed concurrently use separate workers."""
+    content = await file.read()
+    return await run_cpu(_parse_content, content, account_source, format_hint)
+
+
+async def add_bucket_suggestions(
+    transactions: List[Dict[str, Any]], user_history: Optional[Mapping[str, str]], with_category: bool = True
+) -> None:
+    """Set the suggested bucket, bucket_tag and (legacy) category on previewed transactions."""
+    tags = await run_cpu(top_bucket_tags, transactions, user_history)
+    for txn, tag in zip(transactions, tags):
+        # Get bucket value from tag, e.g. "bucket:groceries"
+        if tag:
+            bucket_value = tag.split(":", 1)[1] if ":" in tag else tag
+            txn["bucket"] = bucket_value
+            txn["bucket_tag"] = tag
+            # Keep category for backwards compatibility
+            if with_category:
+                txn["category"] = bucket_value.replace("-", " ").title()
+
+
+async def prepend(first: Dict[str, Any], rest: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """Put a transaction taken with anext() back in front of the rest."""
+    yield first
+    async for txn in rest:
+        yield txn
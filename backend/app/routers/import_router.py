@@ -5,25 +5,39 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List, Dict, Any
 from datetime import UTC, datetime, date
+import asyncio
 from pydantic import BaseModel as PydanticBaseModel
 
 from app.database import get_session
-from app.orm import BatchImportSession, ImportFormat, ImportFormatType, ImportSession, ReconciliationStatus, Transaction
-from app.tag_inference import infer_bucket_tag
-from app.utils.hashing import compute_transaction_hash_from_dict
+from app.orm import BatchImportSession, ImportFormat, ImportFormatType, ImportSession
 from app.errors import ErrorCode, not_found, bad_request
 from app.routers.import_helpers import (
     SUPPORTED_EXTENSIONS,
     is_valid_import_file,
-    _parse_csv,
-    get_or_create_account_tag,
-    apply_bucket_tag,
-    get_merchant_aliases,
-    apply_merchant_alias,
+    add_bucket_suggestions,
+    iter_parse_upload,
+    open_upload_text,
+    parse_upload,
+    prepend,
 )
+from app.services.import_pipeline import (
+    BATCH_MATCH_FIELDS,
+    BatchDuplicateIndex,
+    BatchDuplicateReport,
+    TransactionImporter,
+    existing_match_keys,
+)
+from app.services.merchant_aliases import get_alias_matcher
+from app.services.merchant_history import get_merchant_history
+from app.services.worker_pool import run_cpu
+from app.utils.hashing import hash_transaction_dicts
 
 router = APIRouter(prefix="/api/v1/import", tags=["import"])
 
+# Transactions returned by /preview, and per file by /batch/upload
+PREVIEW_LIMIT = 100
+BATCH_PREVIEW_LIMIT = 10
+
 
 @router.post("/preview")
 async def preview_import(
@@ -57,10 +71,6 @@ async def preview_import(
             filename=file.filename,
         )
 
-    # Read file content
-    content = await file.read()
-    csv_content = content.decode("utf-8")
-
     # Check for saved import format preference
     if not format_hint and account_source:
         fmt_result = await session.execute(select(ImportFormat).where(ImportFormat.account_source == account_source))
@@ -68,40 +78,30 @@ async def preview_import(
         if saved_format:
             format_hint = ImportFormatType(saved_format.format_type)
 
-    # Parse CSV
-    transactions, detected_format = _parse_csv(csv_content, account_source, format_hint)
-
     # Build user history for bucket tag suggestions
     # Note: This uses the old category field for now during transition
-    all_txns_result = await session.execute(select(Transaction).where(Transaction.category.isnot(None)))
-    all_txns = all_txns_result.scalars().all()
-    # Convert old category format to bucket tag format for user history
-    user_history: Dict[str, str] = {}
-    for db_txn in all_txns:
-        if db_txn.merchant and db_txn.category:
-            merchant = db_txn.merchant.lower()
-            bucket_value = db_txn.category.lower().replace(" ", "-").replace("&", "and")
-            user_history[merchant] = f"bucket:{bucket_value}"
-
-    # Add bucket tag suggestions to each transaction
-    for txn in transactions:
-        suggestions = infer_bucket_tag(
-            txn.get("merchant", ""), txn.get("description", ""), txn.get("amount", 0), user_history
-        )
-        # Get bucket value from tag
-        if suggestions:
-            tag = suggestions[0][0]  # e.g., "bucket:groceries"
-            bucket_value = tag.split(":", 1)[1] if ":" in tag else tag
-            txn["bucket"] = bucket_value
-            txn["bucket_tag"] = tag
-            # Keep category for backwards compatibility
-            txn["category"] = bucket_value.replace("-", " ").title()
+    user_history = await get_merchant_history(session)
+
+    # Stream-parse the file, keeping only the previewed transactions
+    preview: List[Dict[str, Any]] = []
+    transaction_count = 0
+    total_amount = 0.0
+    with open_upload_text(file) as text:
+        transactions, detected_format = await iter_parse_upload(text, account_source, format_hint)
+        async for txn in transactions:
+            transaction_count += 1
+            total_amount += txn["amount"]
+            if len(preview) < PREVIEW_LIMIT:
+                preview.append(txn)
+
+    # Add bucket tag suggestions to each previewed transaction
+    await add_bucket_suggestions(preview, user_history)
 
     return {
         "detected_format": detected_format,
-        "transaction_count": len(transactions),
-        "transactions": transactions[:100],  # Limit preview to 100 transactions
-        "total_amount": sum(txn["amount"] for txn in transactions),
+        "transaction_count": transaction_count,
+        "transactions": preview,
+        "total_amount": total_amount,
     }
 
 
@@ -132,159 +132,39 @@ async def confirm_import(
             f"Unsupported file type. Supported formats: {', '.join(SUPPORTED_EXTENSIONS)}",
         )
 
-    # Read file content
-    content = await file.read()
-    file_content = content.decode("utf-8")
-
-    # Parse file with confirmed format
-    transactions, _ = _parse_csv(file_content, account_source, format_type)
-
-    if not transactions:
-        raise bad_request(ErrorCode.IMPORT_NO_TRANSACTIONS)
-
     # Build user history for bucket tag suggestions
-    all_txns_result = await session.execute(select(Transaction).where(Transaction.category.isnot(None)))
-    all_txns = all_txns_result.scalars().all()
-    user_history: Dict[str, str] = {}
-    for db_txn in all_txns:
-        if db_txn.merchant and db_txn.category:
-            merchant = db_txn.merchant.lower()
-            bucket_value = db_txn.category.lower().replace(" ", "-").replace("&", "and")
-            user_history[merchant] = f"bucket:{bucket_value}"
+    user_history = await get_merchant_history(session)
 
     # Load merchant aliases for normalization
-    merchant_aliases = await get_merchant_aliases(session)
-
-    # Create import session to track this batch
-    import_session = ImportSession(
-        filename=file.filename,
-        format_type=format_type,
-        account_source=account_source,
-        transaction_count=0,
-        duplicate_count=0,
-        total_amount=0.0,
-        status="in_progress",
-    )
-    session.add(import_session)
-    await session.flush()  # Get the ID
-
-    # Check for duplicates and save
-    imported_count = 0
-    duplicate_count = 0
-    skipped_count = 0
-    total_amount = 0.0
-    dates = []
-    cross_account_warnings = []  # Warnings for transactions that exist in other accounts
-
-    for txn_data in transactions:
-        # Generate both hashes for deduplication
-        content_hash = compute_transaction_hash_from_dict(txn_data, include_account=True)
-        content_hash_no_account = compute_transaction_hash_from_dict(txn_data, include_account=False)
-
-        # Check for exact duplicate using content_hash (primary method)
-        if content_hash:
-            dup_query = select(Transaction).where(Transaction.content_hash == content_hash)
-            result = await session.execute(dup_query)
-            existing = result.scalar_one_or_none()
-
-            if existing:
-                duplicate_count += 1
-                continue
-
-            # Check for cross-account duplicate (same transaction in different account)
-            if content_hash_no_account:
-                cross_account_query = select(Transaction).where(
-                    Transaction.content_hash_no_account == content_hash_no_account,
-                    Transaction.account_source != txn_data["account_source"],
-                )
-                result = await session.execute(cross_account_query)
-                cross_match = result.scalar_one_or_none()
-
-                if cross_match:
-                    cross_account_warnings.append(
-                        {
-                            "date": str(txn_data["date"]),
-                            "amount": txn_data["amount"],
-                            "description": txn_data["description"][:50],
-                            "existing_account": cross_match.account_source,
-                            "importing_account": txn_data["account_source"],
-                        }
-                    )
-        else:
-            # Fallback to old deduplication logic if hash generation fails
-            dup_query = select(Transaction).where(
-                Transaction.date == txn_data["date"],
-                Transaction.amount == txn_data["amount"],
-                Transaction.merchant == txn_data.get("merchant"),
-            )
-            result = await session.execute(dup_query)
-            existing = result.scalar_one_or_none()
+    merchant_aliases = await get_alias_matcher(session)
 
-            if existing:
-                duplicate_count += 1
-                continue
+    # Parse the file with the confirmed format as it is read, deduplicating and
+    # saving in set-based batches
+    importer = TransactionImporter(session, user_history=user_history, merchant_aliases=merchant_aliases)
+    with open_upload_text(file) as text:
+        transactions, _ = await iter_parse_upload(text, account_source, format_type)
 
-        # Infer bucket tag
-        suggestions = infer_bucket_tag(
-            txn_data.get("merchant", ""), txn_data.get("description", ""), txn_data.get("amount", 0), user_history
-        )
+        first = await anext(transactions, None)
+        if first is None:
+            raise bad_request(ErrorCode.IMPORT_NO_TRANSACTIONS)
 
-        # Determine bucket value
-        if suggestions:
-            bucket_tag = suggestions[0][0]  # e.g., "bucket:groceries"
-            bucket_value = bucket_tag.split(":", 1)[1] if ":" in bucket_tag else "none"
-        else:
-            bucket_value = "none"
-
-        # Create transaction linked to import session
-        # Keep category field for backwards compatibility during migration
-        category_display = bucket_value.replace("-", " ").title() if bucket_value != "none" else None
-
-        # Apply merchant alias to normalize merchant name
-        merchant_name = txn_data.get("merchant")
-        if merchant_aliases:
-            aliased_merchant = apply_merchant_alias(txn_data["description"], merchant_aliases)
-            if aliased_merchant:
-                merchant_name = aliased_merchant
-
-        db_transaction = Transaction(
-            date=txn_data["date"],
-            amount=txn_data["amount"],
-            description=txn_data["description"],
-            merchant=merchant_name,
-            account_source=txn_data["account_source"],
-            card_member=txn_data.get("card_member"),
-            category=category_display,  # Legacy field
-            reconciliation_status=ReconciliationStatus.unreconciled,
-            reference_id=txn_data.get("reference_id"),
-            import_session_id=import_session.id,
-            content_hash=content_hash,  # Store computed hash
-            content_hash_no_account=content_hash_no_account,  # Store hash without account for cross-account detection
+        # Create import session to track this batch
+        import_session = ImportSession(
+            filename=file.filename,
+            format_type=format_type,
+            account_source=account_source,
+            transaction_count=0,
+            duplicate_count=0,
+            total_amount=0.0,
+            status="in_progress",
         )
+        session.add(import_session)
+        await session.flush()  # Get the ID
 
-        # Set account_tag_id foreign key for data integrity
-        if txn_data["account_source"]:
-            account_tag = await get_or_create_account_tag(session, txn_data["account_source"])
-            db_transaction.account_tag_id = account_tag.id
-
-        session.add(db_transaction)
-        await session.flush()  # Get the transaction ID
-
-        # Apply bucket tag via junction table
-        await apply_bucket_tag(session, db_transaction.id, bucket_value)
-
-        imported_count += 1
-        total_amount += txn_data["amount"]
-        dates.append(txn_data["date"])
+        import_result = await importer.import_transactions(prepend(first, transactions), import_session)
 
     # Update import session with final stats
-    import_session.transaction_count = imported_count
-    import_session.duplicate_count = duplicate_count
-    import_session.total_amount = total_amount
-    import_session.status = "completed"
-    if dates:
-        import_session.date_range_start = min(dates)
-        import_session.date_range_end = max(dates)
+    import_result.apply_to(import_session)
 
     # Save import format preference if requested
     if save_format and account_source:
@@ -302,17 +182,17 @@ async def confirm_import(
     await session.commit()
 
     response: Dict[str, Any] = {
-        "imported": imported_count,
-        "duplicates": duplicate_count,
-        "skipped": skipped_count,
+        "imported": import_result.imported,
+        "duplicates": import_result.duplicates,
+        "skipped": 0,
         "format_saved": save_format,
         "import_session_id": import_session.id,
     }
 
     # Include cross-account warnings if any transactions match in other accounts
-    if cross_account_warnings:
-        response["cross_account_warnings"] = cross_account_warnings[:10]  # Limit to first 10
-        response["cross_account_warning_count"] = len(cross_account_warnings)
+    if import_result.cross_account_warnings:
+        response["cross_account_warnings"] = import_result.cross_account_warnings[:10]  # Limit to first 10
+        response["cross_account_warning_count"] = len(import_result.cross_account_warnings)
 
     return response
 
@@ -348,6 +228,7 @@ class BatchFilePreview(PydanticBaseModel):
     transaction_count: int
     duplicate_count: int  # Duplicates against DB
     cross_file_duplicate_count: int  # Duplicates within batch
+    duplicate_report: BatchDuplicateReport  # Which earlier files the batch duplicates come from
     total_amount: float
     date_range_start: Optional[date] = None
     date_range_end: Optional[date] = None
@@ -397,25 +278,15 @@ async def batch_upload_preview(files: List[UploadFile] = File(...), session: Asy
 
     previews: List[BatchFilePreview] = []
 
-    # Track all transactions across files for cross-file duplicate detection
-    all_batch_transactions: List[Dict[str, Any]] = []
+    # Index rows of processed files for cross-file duplicate detection
+    batch_index = BatchDuplicateIndex()
 
     # Build user history for bucket tag suggestions
-    all_txns_result = await session.execute(select(Transaction).where(Transaction.category.isnot(None)))
-    all_txns = all_txns_result.scalars().all()
-    user_history: Dict[str, str] = {}
-    for db_txn in all_txns:
-        if db_txn.merchant and db_txn.category:
-            merchant = db_txn.merchant.lower()
-            bucket_value = db_txn.category.lower().replace(" ", "-").replace("&", "and")
-            user_history[merchant] = f"bucket:{bucket_value}"
+    user_history = await get_merchant_history(session)
 
-    # Process each file
+    # Resolve each file's account and saved format
+    uploads: List[tuple[str, Optional[str], Optional[ImportFormatType]]] = []
     for file in files:
-        # Read file content
-        content = await file.read()
-        csv_content = content.decode("utf-8")
-
         # file.filename validated above
         filename = file.filename or ""
 
@@ -442,58 +313,38 @@ async def batch_upload_preview(files: List[UploadFile] = File(...), session: Asy
             if saved_format:
                 format_hint = ImportFormatType(saved_format.format_type)
 
-        # Parse CSV
-        transactions, detected_format = _parse_csv(csv_content, account_source, format_hint)
+        uploads.append((filename, account_source, format_hint))
 
-        # Add bucket tag suggestions to each transaction
-        for txn in transactions:
-            suggestions = infer_bucket_tag(
-                txn.get("merchant", ""), txn.get("description", ""), txn.get("amount", 0), user_history
-            )
-            if suggestions:
-                tag = suggestions[0][0]
-                bucket_value = tag.split(":", 1)[1] if ":" in tag else tag
-                txn["bucket"] = bucket_value
-                txn["bucket_tag"] = tag
-                txn["category"] = bucket_value.replace("-", " ").title()
+    # Parse all files in parallel on the worker pool
+    parsed_files = await asyncio.gather(
+        *(
+            parse_upload(file, account_source, format_hint)
+            for file, (_, account_source, format_hint) in zip(files, uploads)
+        )
+    )
+
+    # Process each file
+    for (filename, account_source, _), (transactions, detected_format) in zip(uploads, parsed_files):
+        # Add bucket tag suggestions to the previewed transactions
+        await add_bucket_suggestions(transactions[:BATCH_PREVIEW_LIMIT], user_history)
 
         # Check for duplicates against existing DB transactions
+        existing_keys = await existing_match_keys(
+            session,
+            [tuple(txn.get(name) for name in BATCH_MATCH_FIELDS) for txn in transactions],
+            BATCH_MATCH_FIELDS,
+        )
         db_duplicate_count = 0
         for txn in transactions:
-            dup_query = select(Transaction).where(
-                Transaction.date == txn["date"],
-                Transaction.amount == txn["amount"],
-                Transaction.reference_id == txn.get("reference_id"),
-            )
-            result = await session.execute(dup_query)
-            existing = result.scalar_one_or_none()
-            if existing:
+            if tuple(txn.get(name) for name in BATCH_MATCH_FIELDS) in existing_keys:
                 db_duplicate_count += 1
                 txn["is_db_duplicate"] = True
             else:
                 txn["is_db_duplicate"] = False
 
         # Check for cross-file duplicates (against previously processed files in this batch)
-        cross_file_duplicate_count = 0
-        for txn in transactions:
-            if txn.get("is_db_duplicate"):
-                continue  # Already marked as DB duplicate
-
-            # Check if this transaction matches any in previously processed files
-            for batch_txn in all_batch_transactions:
-                if (
-                    txn["date"] == batch_txn["date"]
-                    and txn["amount"] == batch_txn["amount"]
-                    and txn.get("reference_id") == batch_txn.get("reference_id")
-                ):
-                    cross_file_duplicate_count += 1
-                    txn["is_cross_file_duplicate"] = True
-                    break
-            else:
-                txn["is_cross_file_duplicate"] = False
-
-        # Add this file's transactions to the batch tracking
-        all_batch_transactions.extend(transactions)
+        hashes = await run_cpu(hash_transaction_dicts, transactions)
+        duplicate_report = batch_index.add_file(filename, transactions, hashes)
 
         # Calculate stats
         total_amount = sum(txn["amount"] for txn in transactions)
@@ -508,11 +359,12 @@ async def batch_upload_preview(files: List[UploadFile] = File(...), session: Asy
             detected_format=detected_format,
             transaction_count=len(transactions),
             duplicate_count=db_duplicate_count,
-            cross_file_duplicate_count=cross_file_duplicate_count,
+            cross_file_duplicate_count=duplicate_report.cross_file_duplicates,
+            duplicate_report=duplicate_report,
             total_amount=total_amount,
             date_range_start=date_range_start,
             date_range_end=date_range_end,
-            transactions=transactions[:10],  # Preview first 10
+            transactions=transactions[:BATCH_PREVIEW_LIMIT],
         )
         previews.append(preview)
 
@@ -550,20 +402,19 @@ async def batch_confirm_import(
     await session.flush()  # Get the ID
 
     # Build user history for bucket tag suggestions
-    all_txns_result = await session.execute(select(Transaction).where(Transaction.category.isnot(None)))
-    all_txns = all_txns_result.scalars().all()
-    user_history: Dict[str, str] = {}
-    for db_txn in all_txns:
-        if db_txn.merchant and db_txn.category:
-            merchant = db_txn.merchant.lower()
-            bucket_value = db_txn.category.lower().replace(" ", "-").replace("&", "and")
-            user_history[merchant] = f"bucket:{bucket_value}"
+    user_history = await get_merchant_history(session)
 
     # Load merchant aliases for normalization
-    merchant_aliases = await get_merchant_aliases(session)
-
-    # Track all transactions being imported for cross-file duplicate detection
-    batch_transactions_to_import: List[Dict[str, Any]] = []
+    merchant_aliases = await get_alias_matcher(session)
+
+    # One importer for the whole batch: tags are resolved once and rows imported
+    # from earlier files count as cross-file duplicates for later ones
+    importer = TransactionImporter(
+        session,
+        user_history=user_history,
+        merchant_aliases=merchant_aliases,
+        match_fields=BATCH_MATCH_FIELDS,
+    )
 
     results = []
     total_imported = 0
@@ -583,134 +434,42 @@ async def batch_confirm_import(
 
         file = file_map[file_info.filename]
 
-        # Read file content
-        content = await file.read()
-        csv_content = content.decode("utf-8")
-
-        # Parse CSV with confirmed format
-        transactions, _ = _parse_csv(csv_content, file_info.account_source, file_info.format_type)
-
-        if not transactions:
-            continue
-
-        # Create import session for this file
-        import_session = ImportSession(
-            filename=file_info.filename,
-            format_type=file_info.format_type,
-            account_source=file_info.account_source,
-            transaction_count=0,
-            duplicate_count=0,
-            total_amount=0.0,
-            status="in_progress",
-            batch_import_id=batch_session.id,
-        )
-        session.add(import_session)
-        await session.flush()
-
-        # Import transactions
-        imported_count = 0
-        duplicate_count = 0
-        file_total_amount = 0.0
-        dates = []
-
-        for txn_data in transactions:
-            # Check for duplicate against DB
-            dup_query = select(Transaction).where(
-                Transaction.date == txn_data["date"],
-                Transaction.amount == txn_data["amount"],
-                Transaction.reference_id == txn_data.get("reference_id"),
-            )
-            result = await session.execute(dup_query)
-            existing = result.scalar_one_or_none()
-
-            if existing:
-                duplicate_count += 1
-                continue
-
-            # Check for cross-file duplicate within this batch
-            is_cross_file_dup = False
-            for batch_txn in batch_transactions_to_import:
-                if (
-                    txn_data["date"] == batch_txn["date"]
-                    and txn_data["amount"] == batch_txn["amount"]
-                    and txn_data.get("reference_id") == batch_txn.get("reference_id")
-                ):
-                    duplicate_count += 1
-                    is_cross_file_dup = True
-                    break
+        with open_upload_text(file) as text:
+            # Parse file with confirmed format as it is read
+            transactions, _ = await iter_parse_upload(text, file_info.account_source, file_info.format_type)
 
-            if is_cross_file_dup:
+            first = await anext(transactions, None)
+            if first is None:
                 continue
 
-            # Add to batch tracking
-            batch_transactions_to_import.append(txn_data)
-
-            # Infer bucket tag
-            suggestions = infer_bucket_tag(
-                txn_data.get("merchant", ""), txn_data.get("description", ""), txn_data.get("amount", 0), user_history
-            )
-
-            if suggestions:
-                bucket_tag = suggestions[0][0]
-                bucket_value = bucket_tag.split(":", 1)[1] if ":" in bucket_tag else "none"
-            else:
-                bucket_value = "none"
-
-            # Create transaction
-            category_display = bucket_value.replace("-", " ").title() if bucket_value != "none" else None
-
-            # Apply merchant alias to normalize merchant name
-            merchant_name = txn_data.get("merchant")
-            if merchant_aliases:
-                aliased_merchant = apply_merchant_alias(txn_data["description"], merchant_aliases)
-                if aliased_merchant:
-                    merchant_name = aliased_merchant
-
-            db_transaction = Transaction(
-                date=txn_data["date"],
-                amount=txn_data["amount"],
-                description=txn_data["description"],
-                merchant=merchant_name,
-                account_source=txn_data["account_source"],
-                card_member=txn_data.get("card_member"),
-                category=category_display,
-                reconciliation_status=ReconciliationStatus.unreconciled,
-                reference_id=txn_data.get("reference_id"),
-                import_session_id=import_session.id,
+            # Create import session for this file
+            import_session = ImportSession(
+                filename=file_info.filename,
+                format_type=file_info.format_type,
+                account_source=file_info.account_source,
+                transaction_count=0,
+                duplicate_count=0,
+                total_amount=0.0,
+                status="in_progress",
+                batch_import_id=batch_session.id,
             )
-
-            # Set account_tag_id foreign key
-            if txn_data["account_source"]:
-                account_tag = await get_or_create_account_tag(session, txn_data["account_source"])
-                db_transaction.account_tag_id = account_tag.id
-
-            session.add(db_transaction)
+            session.add(import_session)
             await session.flush()
 
-            # Apply bucket tag
-            await apply_bucket_tag(session, db_transaction.id, bucket_value)
-
-            imported_count += 1
-            file_total_amount += txn_data["amount"]
-            dates.append(txn_data["date"])
+            # Import transactions (duplicates checked against DB and earlier files in this batch)
+            import_result = await importer.import_transactions(prepend(first, transactions), import_session)
 
         # Update import session stats
-        import_session.transaction_count = imported_count
-        import_session.duplicate_count = duplicate_count
-        import_session.total_amount = file_total_amount
-        import_session.status = "completed"
-        if dates:
-            import_session.date_range_start = min(dates)
-            import_session.date_range_end = max(dates)
+        import_result.apply_to(import_session)
 
-        total_imported += imported_count
-        total_duplicates += duplicate_count
+        total_imported += import_result.imported
+        total_duplicates += import_result.duplicates
 
         results.append(
             {
                 "filename": file_info.filename,
-                "imported": imported_count,
-                "duplicates": duplicate_count,
+                "imported": import_result.imported,
+                "duplicates": import_result.duplicates,
                 "import_session_id": import_session.id,
             }
         )
@@ -1,16 +1,21 @@
 """Merchant aliases router for normalizing merchant names"""
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func, update
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from datetime import UTC, datetime
+import json
 import re
 
 from app.database import get_session
 from app.orm import MerchantAlias, MerchantAliasMatchType, Transaction
 from app.schemas import MerchantAliasCreate, MerchantAliasUpdate, MerchantAliasResponse
 from app.errors import ErrorCode, not_found, bad_request
+from app.services.import_pipeline import chunked
+from app.services.merchant_aliases import AliasEntry, AliasMatcher, get_alias_matcher
+from app.utils.regexp import pattern_error, regexp
 
 
 router = APIRouter(prefix="/api/v1/merchants", tags=["merchants"])
@@ -29,13 +34,18 @@ def apply_alias_to_text(alias: MerchantAlias, text: str) -> bool:
     elif alias.match_type == MerchantAliasMatchType.contains:
         return pattern_lower in text_lower
     elif alias.match_type == MerchantAliasMatchType.regex:
-        try:
-            return bool(re.search(alias.pattern, text, re.IGNORECASE))
-        except re.error:
-            return False
+        return bool(regexp(alias.pattern, text))
     return False
 
 
+def _alias_response(alias: MerchantAlias) -> MerchantAliasResponse:
+    """Serialize an alias, flagging a stored regex pattern that is refused and never matches."""
+    response = MerchantAliasResponse.model_validate(alias)
+    if alias.match_type == MerchantAliasMatchType.regex:
+        response.pattern_error = pattern_error(alias.pattern)
+    return response
+
+
 @router.get("/")
 async def list_merchants(limit: int = Query(100, ge=1, le=500), session: AsyncSession = Depends(get_session)):
     """
@@ -61,7 +71,7 @@ async def list_merchants(limit: int = Query(100, ge=1, le=500), session: AsyncSe
 async def list_aliases(session: AsyncSession = Depends(get_session)):
     """List all merchant aliases, ordered by priority (highest first)"""
     result = await session.execute(select(MerchantAlias).order_by(MerchantAlias.priority.desc()))
-    return result.scalars().all()
+    return [_alias_response(alias) for alias in result.scalars()]
 
 
 @router.get("/aliases/suggestions")
@@ -136,7 +146,7 @@ async def get_alias(alias_id: int, session: AsyncSession = Depends(get_session))
     alias = result.scalar_one_or_none()
     if not alias:
         raise not_found(ErrorCode.ALIAS_NOT_FOUND, alias_id=alias_id)
-    return alias
+    return _alias_response(alias)
 
 
 @router.post("/aliases", response_model=MerchantAliasResponse, status_code=201)
@@ -144,10 +154,9 @@ async def create_alias(alias: MerchantAliasCreate, session: AsyncSession = Depen
     """Create a new merchant alias"""
     # Validate regex pattern if match_type is regex
     if alias.match_type == MerchantAliasMatchType.regex:
-        try:
-            re.compile(alias.pattern)
-        except re.error as e:
-            raise bad_request(ErrorCode.INVALID_REGEX, str(e), pattern=alias.pattern)
+        error = pattern_error(alias.pattern)
+        if error is not None:
+            raise bad_request(ErrorCode.INVALID_REGEX, error, pattern=alias.pattern)
 
     # Check for duplicate pattern
     result = await session.execute(
@@ -180,10 +189,9 @@ async def update_alias(alias_id: int, alias: MerchantAliasUpdate, session: Async
     new_pattern = update_data.get("pattern", db_alias.pattern)
 
     if new_match_type == MerchantAliasMatchType.regex:
-        try:
-            re.compile(new_pattern)
-        except re.error as e:
-            raise bad_request(ErrorCode.INVALID_REGEX, str(e), pattern=new_pattern)
+        error = pattern_error(new_pattern)
+        if error is not None:
+            raise bad_request(ErrorCode.INVALID_REGEX, error, pattern=new_pattern)
 
     for key, value in update_data.items():
         setattr(db_alias, key, value)
@@ -206,6 +214,55 @@ async def delete_alias(alias_id: int, session: AsyncSession = Depends(get_sessio
     await session.commit()
 
 
+# Entries per chunk when streaming the dry-run preview
+PREVIEW_STREAM_BATCH = 500
+
+
+def _alias_update_entry(change: Tuple[int, str, Optional[str], AliasEntry]) -> dict:
+    txn_id, description, old_merchant, alias = change
+    return {
+        "transaction_id": txn_id,
+        "description": description,
+        "old_merchant": old_merchant,
+        "new_merchant": alias.canonical_name,
+        "matched_alias_id": alias.id,
+        "matched_pattern": alias.pattern,
+    }
+
+
+def _pending_change(
+    matcher: AliasMatcher, txn_id: int, description: str, merchant: Optional[str]
+) -> Optional[Tuple[int, str, Optional[str], AliasEntry]]:
+    """The rename the highest priority matching alias makes, or None if the merchant is already right."""
+    alias = matcher.match(description)
+    if alias is None or merchant == alias.canonical_name:
+        return None
+    return txn_id, description, merchant, alias
+
+
+async def _stream_alias_preview(matcher: AliasMatcher, rows: AsyncResult[Any]) -> AsyncIterator[str]:
+    """Match candidate rows as the cursor yields them and serialize the dry-run preview as JSON.
+
+    Entries are sent a batch at a time; the total follows them as ``updated_count``.
+    """
+    yield '{"dry_run": true, "updates": ['
+    count = 0
+    batch: List[str] = []
+    async for txn_id, description, merchant in rows:
+        change = _pending_change(matcher, txn_id, description, merchant)
+        if change is None:
+            continue
+        batch.append(json.dumps(_alias_update_entry(change)))
+        if len(batch) == PREVIEW_STREAM_BATCH:
+            yield ("," if count else "") + ",".join(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        yield ("," if count else "") + ",".join(batch)
+        count += len(batch)
+    yield f'], "updated_count": {count}}}'
+
+
 @router.post("/aliases/apply")
 async def apply_aliases(
     dry_run: bool = Query(False, description="Preview changes without applying"),
@@ -214,70 +271,62 @@ async def apply_aliases(
     """
     Apply all aliases to transactions.
     Updates the merchant field on matching transactions.
-    """
-    from sqlalchemy import update
 
-    # Get all aliases ordered by priority
-    result = await session.execute(select(MerchantAlias).order_by(MerchantAlias.priority.desc()))
-    aliases = result.scalars().all()
+    A dry run streams every pending change; an applied run returns the first 100.
+    """
+    # Compiled matcher over all aliases (cached; priority order preserved)
+    matcher = await get_alias_matcher(session)
 
-    if not aliases:
+    if not len(matcher):
         return {"message": "No aliases defined", "updated_count": 0, "updates": []}
 
-    # Get transactions with descriptions that might need aliasing
-    result = await session.execute(
-        select(Transaction.id, Transaction.description, Transaction.merchant).where(Transaction.description.isnot(None))
+    # Get transactions with descriptions that might need aliasing; the candidate
+    # filter lets the database skip rows no alias can match
+    query = select(Transaction.id, Transaction.description, Transaction.merchant).where(
+        Transaction.description.isnot(None)
     )
-    transactions = result.all()
-
-    updates = []
-    alias_match_counts = {a.id: 0 for a in aliases}
-
-    for txn in transactions:
-        txn_id, txn_description, txn_merchant = txn
-        # Check description against aliases (highest priority first)
-        for alias in aliases:
-            if apply_alias_to_text(alias, txn_description):
-                old_merchant = txn_merchant
-                new_merchant = alias.canonical_name
-
-                if old_merchant != new_merchant:
-                    updates.append(
-                        {
-                            "transaction_id": txn_id,
-                            "description": txn_description,
-                            "old_merchant": old_merchant,
-                            "new_merchant": new_merchant,
-                            "matched_alias_id": alias.id,
-                            "matched_pattern": alias.pattern,
-                        }
-                    )
-                    alias_match_counts[alias.id] += 1
-                break  # Stop at first matching alias
-
-    # Apply updates using explicit SQL UPDATE statements
-    if not dry_run and updates:
+    candidates = matcher.candidate_clause(Transaction.description, session.get_bind().dialect.name)
+    if candidates is not None:
+        query = query.where(candidates)
+
+    if dry_run:
+        # Started here so SQL errors surface before the response begins
+        rows = await session.stream(query.execution_options(yield_per=PREVIEW_STREAM_BATCH))
+        return StreamingResponse(_stream_alias_preview(matcher, rows), media_type="application/json")
+
+    result = await session.execute(query)
+    updates: List[Tuple[int, str, Optional[str], AliasEntry]] = []
+    for txn_id, txn_description, txn_merchant in result:
+        change = _pending_change(matcher, txn_id, txn_description, txn_merchant)
+        if change is not None:
+            updates.append(change)
+
+    if updates:
         now = datetime.now(UTC)
-        for upd in updates:
-            await session.execute(
-                update(Transaction)
-                .where(Transaction.id == upd["transaction_id"])
-                .values(merchant=upd["new_merchant"], updated_at=now)
-            )
-
-        # Update alias match counts
-        for alias in aliases:
-            if alias_match_counts[alias.id] > 0:
+
+        # One UPDATE ... WHERE id IN (...) per canonical name (chunked), not one per row
+        ids_by_name: Dict[str, List[int]] = {}
+        alias_match_counts: Dict[int, int] = {}
+        for txn_id, _, _, alias in updates:
+            ids_by_name.setdefault(alias.canonical_name, []).append(txn_id)
+            alias_match_counts[alias.id] = alias_match_counts.get(alias.id, 0) + 1
+
+        for canonical_name, txn_ids in ids_by_name.items():
+            for ids in chunked(txn_ids):
                 await session.execute(
-                    update(MerchantAlias)
-                    .where(MerchantAlias.id == alias.id)
-                    .values(match_count=MerchantAlias.match_count + alias_match_counts[alias.id], last_matched_date=now)
+                    update(Transaction).where(Transaction.id.in_(ids)).values(merchant=canonical_name, updated_at=now)
                 )
 
+        # Update alias match counts (stats only; the cached matcher stays valid)
+        alias_result = await session.execute(select(MerchantAlias).where(MerchantAlias.id.in_(alias_match_counts)))
+        for db_alias in alias_result.scalars():
+            db_alias.match_count += alias_match_counts[db_alias.id]
+            db_alias.last_matched_date = now
+
         await session.commit()
 
     return {
         "dry_run": dry_run,
         "updated_count": len(updates),
-        "updates": updates[:100],  # Limit response size
+        "updates": [_alias_update_entry(change) for change in updates[:100]],  # Limit response size
     }
@@ -1,19 +1,31 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import UTC, datetime, date, timedelta
 from collections import defaultdict
+from dataclasses import dataclass
 import statistics
 
 from app.database import get_session
-from app.orm import RecurringFrequency, RecurringPattern, RecurringStatus, Transaction
+from app.orm import RecurringFrequency, RecurringMerchantWatermark, RecurringPattern, RecurringStatus, Transaction
 from app.schemas import RecurringPatternCreate, RecurringPatternUpdate, RecurringPatternResponse
 from app.errors import ErrorCode, not_found
+from app.services.import_pipeline import chunked
 
 router = APIRouter(prefix="/api/v1/recurring", tags=["recurring"])
 
 
+@dataclass
+class MerchantFingerprint:
+    """Aggregate state of one merchant's transactions, compared against its watermark."""
+
+    names: List[str]  # Merchant spellings grouped under the lowercased key
+    transaction_count: int
+    amount_total: float
+    last_updated_at: Optional[datetime]
+
+
 def detect_frequency(intervals: List[int]) -> Tuple[Optional[RecurringFrequency], float]:
     """
     Detect frequency from interval days
@@ -103,6 +115,70 @@ async def delete_recurring_pattern(pattern_id: int, session: AsyncSession = Depe
     await session.commit()
 
 
+def next_expected_date(last_date: date, frequency: RecurringFrequency) -> date:
+    """Project the next occurrence after last_date for a frequency."""
+    if frequency == RecurringFrequency.weekly:
+        return last_date + timedelta(days=7)
+    elif frequency == RecurringFrequency.biweekly:
+        return last_date + timedelta(days=14)
+    elif frequency == RecurringFrequency.monthly:
+        return last_date + timedelta(days=30)
+    elif frequency == RecurringFrequency.quarterly:
+        return last_date + timedelta(days=90)
+    else:  # yearly
+        return last_date + timedelta(days=365)
+
+
+async def merchant_fingerprints(session: AsyncSession) -> Dict[str, MerchantFingerprint]:
+    """
+    Fingerprint each merchant's transactions with one grouped query.
+
+    Keys are lowercased merchant names (grouped in Python to match str.lower()).
+    """
+    result = await session.execute(
+        select(
+            Transaction.merchant,
+            func.count(Transaction.id),
+            func.coalesce(func.sum(Transaction.amount), 0.0),
+            func.max(Transaction.updated_at),
+        )
+        .where(Transaction.merchant.isnot(None), Transaction.merchant != "")
+        .group_by(Transaction.merchant)
+    )
+    fingerprints: Dict[str, MerchantFingerprint] = {}
+    for merchant, count, amount_total, last_updated_at in result:
+        key = merchant.lower()
+        current = fingerprints.get(key)
+        if current is None:
+            fingerprints[key] = MerchantFingerprint([merchant], count, amount_total, last_updated_at)
+        else:
+            current.names.append(merchant)
+            current.transaction_count += count
+            current.amount_total += amount_total
+            if last_updated_at is not None and (
+                current.last_updated_at is None or last_updated_at > current.last_updated_at
+            ):
+                current.last_updated_at = last_updated_at
+    return fingerprints
+
+
+def watermark_is_current(
+    watermark: Optional[RecurringMerchantWatermark],
+    fingerprint: MerchantFingerprint,
+    min_occurrences: int,
+    min_confidence: float,
+) -> bool:
+    """True if the merchant was last analyzed with the same data and thresholds."""
+    return (
+        watermark is not None
+        and watermark.transaction_count == fingerprint.transaction_count
+        and round(watermark.amount_total, 2) == round(fingerprint.amount_total, 2)
+        and watermark.last_updated_at == fingerprint.last_updated_at
+        and watermark.min_occurrences == min_occurrences
+        and watermark.min_confidence == min_confidence
+    )
+
+
 @router.post("/detect")
 async def detect_recurring_patterns(
     min_occurrences: int = Query(3, ge=2, le=10),
@@ -112,26 +188,60 @@ async def detect_recurring_patterns(
     """
     Detect recurring transaction patterns
 
-    Analyzes transaction history to find subscriptions and recurring bills
+    Analyzes transaction history to find subscriptions and recurring bills.
+    Detection is incremental: only merchants whose transactions changed since
+    their last analysis (or whose detected pattern was removed) are re-analyzed.
     """
-    # Get all transactions
-    result = await session.execute(select(Transaction).order_by(Transaction.date))
-    all_transactions = result.scalars().all()
-
-    # Group transactions by merchant
-    merchant_transactions = defaultdict(list)
-    for txn in all_transactions:
-        if txn.merchant:
-            merchant_transactions[txn.merchant.lower()].append(txn)
+    fingerprints = await merchant_fingerprints(session)
 
-    detected_patterns = []
+    # Prefetch watermarks and existing patterns in one query each
+    watermark_result = await session.execute(select(RecurringMerchantWatermark))
+    watermarks = {w.merchant: w for w in watermark_result.scalars().all()}
+    pattern_result = await session.execute(select(RecurringPattern.merchant, RecurringPattern.frequency))
+    existing_patterns = {(merchant, frequency) for merchant, frequency in pattern_result}
 
-    for merchant, transactions in merchant_transactions.items():
-        if len(transactions) < min_occurrences:
+    changed = []
+    for merchant, fingerprint in fingerprints.items():
+        if fingerprint.transaction_count < min_occurrences:
+            continue
+        watermark = watermarks.get(merchant)
+        if watermark_is_current(watermark, fingerprint, min_occurrences, min_confidence) and (
+            watermark.detected_frequency is None or (merchant, watermark.detected_frequency) in existing_patterns
+        ):
             continue
+        changed.append(merchant)
+
+    # Load only the columns detection needs, for changed merchants only
+    merchant_transactions: Dict[str, List[Any]] = defaultdict(list)
+    names = [name for merchant in changed for name in fingerprints[merchant].names]
+    for chunk in chunked(names):
+        result = await session.execute(
+            select(Transaction.merchant, Transaction.date, Transaction.amount, Transaction.category)
+            .where(Transaction.merchant.in_(chunk))
+            .order_by(Transaction.date, Transaction.id)
+        )
+        for txn in result:
+            merchant_transactions[txn.merchant.lower()].append(txn)
 
-        # Sort by date
-        transactions.sort(key=lambda t: t.date)
+    detected_patterns = []
+    now = datetime.now(UTC)
+
+    for merchant in changed:
+        transactions = sorted(merchant_transactions[merchant], key=lambda t: t.date)
+        fingerprint = fingerprints[merchant]
+
+        # Record what was analyzed, whether or not a pattern is found
+        watermark = watermarks.get(merchant)
+        if watermark is None:
+            watermark = RecurringMerchantWatermark(merchant=merchant)
+            session.add(watermark)
+        watermark.transaction_count = fingerprint.transaction_count
+        watermark.amount_total = fingerprint.amount_total
+        watermark.last_updated_at = fingerprint.last_updated_at
+        watermark.min_occurrences = min_occurrences
+        watermark.min_confidence = min_confidence
+        watermark.detected_frequency = None
+        watermark.analyzed_at = now
 
         # Calculate intervals between transactions
         intervals = []
@@ -144,6 +254,7 @@ async def detect_recurring_patterns(
 
         if not frequency or confidence < min_confidence:
             continue
+        watermark.detected_frequency = frequency.value
 
         # Calculate amount range (allow 10% variance)
         amounts = [abs(txn.amount) for txn in transactions]
@@ -157,24 +268,9 @@ async def detect_recurring_patterns(
 
         # Calculate next expected date
         last_date = transactions[-1].date
-        if frequency == RecurringFrequency.weekly:
-            next_date = last_date + timedelta(days=7)
-        elif frequency == RecurringFrequency.biweekly:
-            next_date = last_date + timedelta(days=14)
-        elif frequency == RecurringFrequency.monthly:
-            next_date = last_date + timedelta(days=30)
-        elif frequency == RecurringFrequency.quarterly:
-            next_date = last_date + timedelta(days=90)
-        else:  # yearly
-            next_date = last_date + timedelta(days=365)
-
-        # Check if pattern already exists
-        existing = await session.execute(
-            select(RecurringPattern).where(
-                RecurringPattern.merchant == merchant, RecurringPattern.frequency == frequency
-            )
-        )
-        if existing.scalar_one_or_none():
+        next_date = next_expected_date(last_date, frequency)
+
+        if (merchant, frequency) in existing_patterns:
             continue  # Skip if already exists
 
         # Create pattern
@@ -191,6 +287,7 @@ async def detect_recurring_patterns(
         )
 
         session.add(pattern)
+        existing_patterns.add((merchant, frequency))
         detected_patterns.append(
             {
                 "merchant": merchant,
@@ -202,6 +299,10 @@ async def detect_recurring_patterns(
             }
         )
 
+    # Merchants that no longer have transactions
+    for merchant in watermarks.keys() - fingerprints.keys():
+        await session.delete(watermarks[merchant])
+
     await session.commit()
 
     return {"detected_count": len(detected_patterns), "patterns": detected_patterns}
@@ -1,102 +1,76 @@
-"""Analytics report endpoints: month-over-month, spending velocity, anomalies, sankey, treemap, heatmap."""
+"""Analytics report endpoints: month-over-month, spending velocity, anomalies, sankey, treemap, heatmap.
+
+Like the core reports, these aggregate in the database: each endpoint runs a
+fixed number of GROUP BY queries (see report_helpers.aggregate_window) and
+builds its response from the grouped rows, so its cost does not grow with the
+number of transactions returned to Python.
+"""
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, and_
+from sqlalchemy import ColumnElement, Select, and_, case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any, DefaultDict, Dict, Optional, List, cast
+from typing import Any, DefaultDict, Dict, Iterable, Optional, List, Sequence, Tuple, cast
+from dataclasses import dataclass
 from datetime import date, timedelta
 from collections import defaultdict
 import calendar
+import math
 import statistics
 
 from app.database import get_session
+from app.routers.conditional import TRANSACTION_TABLES, conditional_get
 from app.orm import Transaction
 from app.routers.report_helpers import (
-    get_transaction_tags,
-    apply_transaction_filters,
+    UNCATEGORIZED,
+    UNTAGGED,
+    aggregate_window,
+    month_range,
+    previous_month,
+    report_filters,
+    transaction_bucket,
 )
 
-router = APIRouter(prefix="/api/v1/reports", tags=["reports"])
-
-
-@router.get("/month-over-month")
-async def month_over_month_comparison(
-    current_year: int = Query(..., description="Year to compare (e.g., 2024)"),
-    current_month: int = Query(..., ge=1, le=12, description="Month to compare (1-12)"),
-    session: AsyncSession = Depends(get_session),
-):
-    """
-    Compare current month with previous month to identify spending changes.
-
-    Returns:
-    - **current/previous**: Totals for income, expenses, net
-    - **changes**: Absolute dollar and percentage changes
-    - **bucket_changes**: Per-bucket spending comparison
-    - **insights**: Biggest increase/decrease categories
-
-    Use this to identify where spending increased or decreased month-over-month.
-    """
-    # Calculate previous month
-    if current_month == 1:
-        prev_year = current_year - 1
-        prev_month = 12
-    else:
-        prev_year = current_year
-        prev_month = current_month - 1
+router = APIRouter(
+    prefix="/api/v1/reports", tags=["reports"], dependencies=[conditional_get(*TRANSACTION_TABLES)]
+)
 
-    async def get_month_transactions(year: int, month: int):
-        start_date = date(year, month, 1)
-        if month == 12:
-            end_date = date(year + 1, 1, 1)
-        else:
-            end_date = date(year, month + 1, 1)
 
-        result = await session.execute(
-            select(Transaction).where(
-                Transaction.date >= start_date,
-                Transaction.date < end_date,
-                Transaction.is_transfer.is_(False),  # Exclude transfers
-            )
-        )
-        return result.scalars().all()
+def rows_in_month(rows: Iterable[Any], year: int, month: int) -> List[Any]:
+    """Aggregate rows grouped by "year" and "month" that belong to one month."""
+    return [row for row in rows if int(row.year) == year and int(row.month) == month]
 
-    def summarize_transactions(transactions, txn_tags):
-        total_income = sum(txn.amount for txn in transactions if txn.amount > 0)
-        total_expenses = abs(sum(txn.amount for txn in transactions if txn.amount < 0))
 
-        # Legacy category breakdown
-        category_totals: DefaultDict[str, float] = defaultdict(float)
-        for txn in transactions:
-            if txn.amount < 0 and txn.category:
-                category_totals[txn.category] += abs(txn.amount)
+def summarize_month(category_rows: Sequence[Any], bucket_rows: Sequence[Any]) -> Dict[str, Any]:
+    """Income/expense totals and per-category/per-bucket expenses from one month's aggregate rows."""
+    total_income = sum(float(row.income) for row in category_rows)
+    total_expenses = sum(float(row.expenses) for row in category_rows)
 
+    return {
+        "income": total_income,
+        "expenses": total_expenses,
+        "net": total_income - total_expenses,
+        "transaction_count": sum(row.count for row in category_rows),
+        # Legacy category breakdown; transactions without a category are left out
+        "categories": {
+            row.category: float(row.expenses) for row in category_rows if row.expenses and row.category != UNCATEGORIZED
+        },
         # Bucket tag breakdown
-        bucket_totals: DefaultDict[str, float] = defaultdict(float)
-        for txn in transactions:
-            if txn.amount < 0:
-                bucket = txn_tags.get(txn.id, "Untagged")
-                bucket_totals[bucket] += abs(txn.amount)
-
-        return {
-            "income": total_income,
-            "expenses": total_expenses,
-            "net": total_income - total_expenses,
-            "transaction_count": len(transactions),
-            "categories": dict(category_totals),
-            "buckets": dict(bucket_totals),
-        }
-
-    # Get transactions for both months
-    current_txns = await get_month_transactions(current_year, current_month)
-    previous_txns = await get_month_transactions(prev_year, prev_month)
+        "buckets": {row.bucket: float(row.expenses) for row in bucket_rows if row.expenses},
+    }
 
-    # Get bucket tags for all transactions
-    all_txn_ids = [txn.id for txn in current_txns] + [txn.id for txn in previous_txns]
-    all_txn_tags = await get_transaction_tags(session, all_txn_ids)
 
-    # Summarize
-    current = summarize_transactions(current_txns, all_txn_tags)
-    previous = summarize_transactions(previous_txns, all_txn_tags)
+def month_over_month_payload(
+    current_year: int, current_month: int, category_rows: Sequence[Any], bucket_rows: Sequence[Any]
+) -> Dict[str, Any]:
+    """Response body of /month-over-month from the two months' "year" x "month" x "category"/"bucket" rows."""
+    prev_year, prev_month = previous_month(current_year, current_month)
+    current = summarize_month(
+        rows_in_month(category_rows, current_year, current_month),
+        rows_in_month(bucket_rows, current_year, current_month),
+    )
+    previous = summarize_month(
+        rows_in_month(category_rows, prev_year, prev_month), rows_in_month(bucket_rows, prev_year, prev_month)
+    )
 
     # Calculate changes
     def calc_change(current_val, prev_val):
@@ -158,31 +132,37 @@ async def month_over_month_comparison(
     }
 
 
-@router.get("/spending-velocity")
-async def spending_velocity(
-    year: int = Query(..., description="Year (e.g., 2024)"),
-    month: int = Query(..., ge=1, le=12, description="Month (1-12)"),
+@router.get("/month-over-month")
+async def month_over_month_comparison(
+    current_year: int = Query(..., description="Year to compare (e.g., 2024)"),
+    current_month: int = Query(..., ge=1, le=12, description="Month to compare (1-12)"),
     session: AsyncSession = Depends(get_session),
 ):
     """
-    Calculate daily spending rate and project monthly total.
+    Compare current month with previous month to identify spending changes.
 
     Returns:
-    - **daily_burn_rate**: Average spending per day so far
-    - **projected_monthly_total**: Estimated month-end total at current pace
-    - **days_elapsed / days_remaining**: Progress through the month
-    - **pace**: "on_track", "under_budget", or "over_budget" vs previous month
-    - **previous_month_total**: Last month's total for comparison
+    - **current/previous**: Totals for income, expenses, net
+    - **changes**: Absolute dollar and percentage changes
+    - **bucket_changes**: Per-bucket spending comparison
+    - **insights**: Biggest increase/decrease categories
 
-    Use this to catch overspending early in the month.
+    Use this to identify where spending increased or decreased month-over-month.
     """
-    # Calculate date range
-    start_date = date(year, month, 1)
-    if month == 12:
-        end_date = date(year + 1, 1, 1)
-    else:
-        end_date = date(year, month + 1, 1)
+    start_date, _ = month_range(*previous_month(current_year, current_month))
+    _, end_date = month_range(current_year, current_month)
 
+    # Both months grouped by category and by bucket (transfers excluded); whole
+    # months, so this reads the monthly rollups
+    group_by = ["year", "month"]
+    category_rows = await aggregate_window(session, [*group_by, "category"], start_date, end_date)
+    bucket_rows = await aggregate_window(session, [*group_by, "bucket"], start_date, end_date)
+
+    return month_over_month_payload(current_year, current_month, category_rows, bucket_rows)
+
+
+def spending_velocity_payload(year: int, month: int, month_rows: Sequence[Any]) -> Dict[str, Any]:
+    """Response body of /spending-velocity from the month's and previous month's "year" x "month" rows."""
     today = date.today()
 
     # If analyzing past month, use full month; if current month, use today
@@ -193,19 +173,10 @@ async def spending_velocity(
         # Current month - use days elapsed so far
         days_elapsed = today.day
 
-    # Get transactions for the month (excluding transfers)
-    result = await session.execute(
-        select(Transaction).where(
-            Transaction.date >= start_date,
-            Transaction.date < end_date,
-            Transaction.is_transfer.is_(False),  # Exclude transfers
-        )
-    )
-    transactions = result.scalars().all()
-
     # Calculate totals
-    total_income = sum(txn.amount for txn in transactions if txn.amount > 0)
-    total_expenses = abs(sum(txn.amount for txn in transactions if txn.amount < 0))
+    current_rows = rows_in_month(month_rows, year, month)
+    total_income = sum(float(row.income) for row in current_rows)
+    total_expenses = sum(float(row.expenses) for row in current_rows)
 
     # Daily rate
     daily_expense_rate = total_expenses / days_elapsed if days_elapsed > 0 else 0
@@ -217,27 +188,7 @@ async def spending_velocity(
     projected_monthly_income = daily_income_rate * days_in_month
     projected_net = projected_monthly_income - projected_monthly_expenses
 
-    # Get previous month for comparison
-    if month == 1:
-        prev_year, prev_month = year - 1, 12
-    else:
-        prev_year, prev_month = year, month - 1
-
-    prev_start = date(prev_year, prev_month, 1)
-    if prev_month == 12:
-        prev_end = date(prev_year + 1, 1, 1)
-    else:
-        prev_end = date(prev_year, prev_month + 1, 1)
-
-    prev_result = await session.execute(
-        select(Transaction).where(
-            Transaction.date >= prev_start,
-            Transaction.date < prev_end,
-            Transaction.is_transfer.is_(False),  # Exclude transfers
-        )
-    )
-    prev_transactions = prev_result.scalars().all()
-    prev_month_expenses = abs(sum(txn.amount for txn in prev_transactions if txn.amount < 0))
+    prev_month_expenses = sum(float(row.expenses) for row in rows_in_month(month_rows, *previous_month(year, month)))
 
     # Determine pace
     if year == today.year and month == today.month:
@@ -279,196 +230,234 @@ async def spending_velocity(
     }
 
 
-@router.get("/anomalies")
-async def detect_anomalies(
+@router.get("/spending-velocity")
+async def spending_velocity(
     year: int = Query(..., description="Year (e.g., 2024)"),
     month: int = Query(..., ge=1, le=12, description="Month (1-12)"),
-    threshold: float = Query(
-        2.0, ge=1.0, le=5.0, description="Sensitivity: standard deviations from mean (lower = more sensitive)"
-    ),
     session: AsyncSession = Depends(get_session),
 ):
     """
-    Detect unusual transactions that might indicate waste or errors.
-
-    Analyzes transactions using a 3-month baseline to identify:
-    - **Large transactions**: Spending significantly above your average (z-score > threshold)
-    - **New merchants**: First-time purchases at merchants you haven't used before
-    - **Unusual categories**: Category spending far above historical average
-    - **Unusual buckets**: Bucket spending far above historical average
+    Calculate daily spending rate and project monthly total.
 
     Returns:
-    - **summary**: Counts of each anomaly type, plus `large_threshold_amount` showing the dollar threshold
-    - **anomalies**: Detailed lists of flagged items with amounts and explanations
+    - **daily_burn_rate**: Average spending per day so far
+    - **projected_monthly_total**: Estimated month-end total at current pace
+    - **days_elapsed / days_remaining**: Progress through the month
+    - **pace**: "on_track", "under_budget", or "over_budget" vs previous month
+    - **previous_month_total**: Last month's total for comparison
 
-    The `threshold` parameter controls sensitivity (default 2.0 = ~95th percentile).
-    Lower values flag more transactions; higher values only flag extreme outliers.
+    Use this to catch overspending early in the month.
     """
-    # Get current month transactions
+    # Totals of the month and the previous month for comparison (excluding transfers)
+    start_date, _ = month_range(*previous_month(year, month))
+    _, end_date = month_range(year, month)
+    month_rows = await aggregate_window(session, ["year", "month"], start_date, end_date)
+
+    return spending_velocity_payload(year, month, month_rows)
+
+
+def anomaly_baseline_range(year: int, month: int) -> Tuple[date, date]:
+    """Baseline window for /anomalies: the 180 days before the month (end exclusive)."""
     start_date = date(year, month, 1)
-    if month == 12:
-        end_date = date(year + 1, 1, 1)
-    else:
-        end_date = date(year, month + 1, 1)
+    return start_date - timedelta(days=180), start_date
 
-    result = await session.execute(
-        select(Transaction).where(
-            Transaction.date >= start_date,
-            Transaction.date < end_date,
-            Transaction.is_transfer.is_(False),  # Exclude transfers
-        )
-    )
-    current_transactions = result.scalars().all()
 
-    # Get last 6 months for baseline (excluding current month)
-    lookback_start = date(year, month, 1) - timedelta(days=180)
-    lookback_end = start_date
+@dataclass(frozen=True)
+class ExpenseStats:
+    """Transaction count, and count, sum and sum of squares of expense amounts, of a window.
+
+    Enough for the mean and standard deviation of expense sizes, and cheap to
+    compute in one pass (see expense_stats_query()).
+    """
 
-    baseline_result = await session.execute(
-        select(Transaction).where(
-            Transaction.date >= lookback_start,
-            Transaction.date < lookback_end,
-            Transaction.is_transfer.is_(False),  # Exclude transfers
+    transaction_count: int = 0
+    expense_count: int = 0
+    expense_total: float = 0.0
+    expense_squares: float = 0.0
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Any]) -> "ExpenseStats":
+        """The statistics of transaction rows held in memory."""
+        expenses = [-row.amount for row in rows if row.amount < 0]
+        return cls(len(rows), len(expenses), sum(expenses), sum(amount * amount for amount in expenses))
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean expense size; None with fewer than two expenses."""
+        if self.expense_count < 2:
+            return None
+        return self.expense_total / self.expense_count
+
+    @property
+    def stdev(self) -> Optional[float]:
+        """Sample standard deviation of expense sizes; None with fewer than two expenses."""
+        if self.expense_count < 2:
+            return None
+        deviations = self.expense_squares - self.expense_total * self.expense_total / self.expense_count
+        # Equal amounts leave only rounding noise behind
+        if deviations <= self.expense_squares * 1e-12:
+            return 0.0
+        return math.sqrt(deviations / (self.expense_count - 1))
+
+    def large_threshold(self, threshold: float) -> Optional[float]:
+        """Expense size ``threshold`` standard deviations above the mean; None without spread."""
+        if not self.stdev:
+            return None
+        return cast(float, self.mean) + threshold * self.stdev
+
+
+def expense_stats_query(start_date: date, end_date: date) -> Select[Any]:
+    """One row of ExpenseStats fields for non-transfer transactions in [start_date, end_date)."""
+    expense = case((Transaction.amount < 0, -Transaction.amount))
+    return select(
+        func.count(Transaction.id),
+        func.count(expense),
+        func.coalesce(func.sum(expense), 0.0),
+        func.coalesce(func.sum(expense * expense), 0.0),
+    ).where(*report_filters(start_date, end_date))
+
+
+# Rows are pre-selected in SQL by amount with this much slack, so rounding never
+# drops one that the z-score test in anomalies_payload() would flag
+LARGE_AMOUNT_SLACK = 0.01
+
+
+def anomaly_candidates_query(year: int, month: int, large_threshold: Optional[float]) -> Select[Any]:
+    """Expenses of the month that are large or from a merchant unseen in the baseline.
+
+    Rows carry id, date, merchant, amount, category, bucket (None when
+    untagged) and ``new_merchant``.
+    """
+    start_date, end_date = month_range(year, month)
+    baseline_merchants = select(Transaction.merchant).where(
+        *report_filters(*anomaly_baseline_range(year, month)), Transaction.merchant.isnot(None)
+    )
+    new_merchant = and_(
+        Transaction.merchant.isnot(None),
+        Transaction.merchant != "",
+        Transaction.merchant.notin_(baseline_merchants),
+    )
+    flagged: ColumnElement[bool] = new_merchant
+    if large_threshold is not None:
+        flagged = flagged | (-Transaction.amount > large_threshold - LARGE_AMOUNT_SLACK)
+    return (
+        select(
+            Transaction.id,
+            Transaction.date,
+            Transaction.merchant,
+            Transaction.amount,
+            Transaction.category,
+            transaction_bucket.label("bucket"),
+            new_merchant.label("new_merchant"),
         )
+        .where(*report_filters(start_date, end_date, expenses_only=True), flagged)
+        .order_by(Transaction.date, Transaction.id)
     )
-    baseline_transactions = baseline_result.scalars().all()
 
-    anomalies: Dict[str, List[Dict[str, Any]]] = {"large_transactions": [], "new_merchants": [], "unusual_categories": [], "unusual_buckets": []}
 
-    # Get bucket tags for all transactions
-    all_txn_ids = [txn.id for txn in current_transactions] + [txn.id for txn in baseline_transactions]
-    all_txn_tags = await get_transaction_tags(session, all_txn_ids)
+def _unusual_groups(
+    rows: Sequence[Any], dimension: str, year: int, month: int, threshold: float
+) -> List[Dict[str, Any]]:
+    """Groups whose spending this month is ``threshold`` standard deviations above their monthly baseline.
+
+    ``rows`` are "year" x "month" x ``dimension`` aggregate rows covering the
+    baseline and the month.
+    """
+    baseline_amounts: DefaultDict[str, List[float]] = defaultdict(list)
+    current_amounts: Dict[str, float] = {}
+    for row in rows:
+        name = getattr(row, dimension)
+        if not row.expenses or (dimension == "category" and name == UNCATEGORIZED):
+            continue
+        if int(row.year) == year and int(row.month) == month:
+            current_amounts[name] = float(row.expenses)
+        else:
+            baseline_amounts[name].append(float(row.expenses))
+
+    unusual = []
+    for name, current_amount in current_amounts.items():
+        amounts = baseline_amounts.get(name, [])
+        if len(amounts) < 2:
+            continue
+        avg = statistics.mean(amounts)
+        std = statistics.stdev(amounts)
+        if std > 0:
+            z_score = (current_amount - avg) / std
+            if z_score > threshold:
+                percent_increase = ((current_amount - avg) / avg) * 100
+                unusual.append(
+                    {
+                        dimension: name,
+                        "current_spending": round(current_amount, 2),
+                        "average_spending": round(avg, 2),
+                        "z_score": round(z_score, 2),
+                        "percent_increase": round(percent_increase, 1),
+                        "reason": f"Spending ${current_amount:.2f} vs usual ${avg:.2f} (+{percent_increase:.0f}%)",
+                    }
+                )
+    return unusual
+
+
+def anomalies_payload(
+    year: int,
+    month: int,
+    threshold: float,
+    baseline_stats: ExpenseStats,
+    candidates: Sequence[Any],
+    category_rows: Sequence[Any],
+    bucket_rows: Sequence[Any],
+) -> Dict[str, Any]:
+    """Response body of /anomalies.
+
+    ``candidates`` are rows shaped like anomaly_candidates_query() results
+    (any superset of the flagged expenses will do); ``category_rows`` and
+    ``bucket_rows`` are "year" x "month" x "category"/"bucket" aggregate rows
+    covering the baseline and the month.
+    """
+    lookback_start, lookback_end = anomaly_baseline_range(year, month)
+
+    anomalies: Dict[str, List[Dict[str, Any]]] = {"large_transactions": [], "new_merchants": [], "unusual_categories": [], "unusual_buckets": []}
 
     # 1. Detect large transactions (> threshold std devs from mean)
-    expense_amounts = [abs(txn.amount) for txn in baseline_transactions if txn.amount < 0]
-    large_threshold_amount = None
-    mean_expense = None
-    std_expense = None
-
-    if len(expense_amounts) >= 2:
-        mean_expense = statistics.mean(expense_amounts)
-        std_expense = statistics.stdev(expense_amounts)
-        if std_expense > 0:
-            large_threshold_amount = mean_expense + (threshold * std_expense)
-
-        for txn in current_transactions:
-            if txn.amount < 0:
-                amount = abs(txn.amount)
-                if std_expense > 0:
-                    z_score = (amount - mean_expense) / std_expense
-                    if z_score > threshold:
-                        anomalies["large_transactions"].append(
-                            {
-                                "id": txn.id,
-                                "date": str(txn.date),
-                                "merchant": txn.merchant,
-                                "amount": amount,
-                                "category": txn.category,
-                                "bucket": all_txn_tags.get(txn.id),
-                                "z_score": round(z_score, 2),
-                                "reason": f"${amount:.2f} is {z_score:.1f}x above average (${mean_expense:.2f})",
-                            }
-                        )
-
-    # 2. Detect new merchants (not seen in baseline)
-    baseline_merchants = set(txn.merchant for txn in baseline_transactions if txn.merchant)
-    for txn in current_transactions:
-        if txn.merchant and txn.merchant not in baseline_merchants and txn.amount < 0:
+    mean_expense = baseline_stats.mean
+    std_expense = baseline_stats.stdev
+    large_threshold_amount = baseline_stats.large_threshold(threshold)
+
+    for txn in candidates:
+        amount = abs(txn.amount)
+        if mean_expense is not None and std_expense:
+            z_score = (amount - mean_expense) / std_expense
+            if z_score > threshold:
+                anomalies["large_transactions"].append(
+                    {
+                        "id": txn.id,
+                        "date": str(txn.date),
+                        "merchant": txn.merchant,
+                        "amount": amount,
+                        "category": txn.category,
+                        "bucket": txn.bucket,
+                        "z_score": round(z_score, 2),
+                        "reason": f"${amount:.2f} is {z_score:.1f}x above average (${mean_expense:.2f})",
+                    }
+                )
+
+        # 2. Detect new merchants (not seen in baseline)
+        if txn.new_merchant:
             anomalies["new_merchants"].append(
                 {
                     "id": txn.id,
                     "date": str(txn.date),
                     "merchant": txn.merchant,
-                    "amount": abs(txn.amount),
+                    "amount": amount,
                     "category": txn.category,
-                    "bucket": all_txn_tags.get(txn.id),
+                    "bucket": txn.bucket,
                     "reason": "First transaction with this merchant",
                 }
             )
 
-    # 3. Detect unusual category spending
-    # Calculate average monthly spending per category from baseline
-    baseline_months: DefaultDict[str, DefaultDict[str, float]] = defaultdict(lambda: defaultdict(float))
-    for txn in baseline_transactions:
-        if txn.amount < 0 and txn.category:
-            month_key = f"{txn.date.year}-{txn.date.month:02d}"
-            baseline_months[month_key][txn.category] += abs(txn.amount)
-
-    # Calculate average per category
-    category_averages = defaultdict(list)
-    for month_data in baseline_months.values():
-        for cat, amount in month_data.items():
-            category_averages[cat].append(amount)
-
-    # Current month category totals
-    current_category_totals: DefaultDict[str, float] = defaultdict(float)
-    for txn in current_transactions:
-        if txn.amount < 0 and txn.category:
-            current_category_totals[txn.category] += abs(txn.amount)
-
-    # Compare current to baseline
-    for cat, current_amount in current_category_totals.items():
-        if cat in category_averages and len(category_averages[cat]) >= 2:
-            avg = statistics.mean(category_averages[cat])
-            std = statistics.stdev(category_averages[cat])
-
-            if std > 0:
-                z_score = (current_amount - avg) / std
-                if z_score > threshold:
-                    percent_increase = ((current_amount - avg) / avg) * 100
-                    anomalies["unusual_categories"].append(
-                        {
-                            "category": cat,
-                            "current_spending": round(current_amount, 2),
-                            "average_spending": round(avg, 2),
-                            "z_score": round(z_score, 2),
-                            "percent_increase": round(percent_increase, 1),
-                            "reason": f"Spending ${current_amount:.2f} vs usual ${avg:.2f} (+{percent_increase:.0f}%)",
-                        }
-                    )
-
-    # 4. Detect unusual bucket spending
-    # Calculate average monthly spending per bucket from baseline
-    baseline_bucket_months: DefaultDict[str, DefaultDict[str, float]] = defaultdict(lambda: defaultdict(float))
-    for txn in baseline_transactions:
-        if txn.amount < 0:
-            month_key = f"{txn.date.year}-{txn.date.month:02d}"
-            bucket = all_txn_tags.get(txn.id, "Untagged")
-            baseline_bucket_months[month_key][bucket] += abs(txn.amount)
-
-    # Calculate average per bucket
-    bucket_averages = defaultdict(list)
-    for month_data in baseline_bucket_months.values():
-        for bucket, amount in month_data.items():
-            bucket_averages[bucket].append(amount)
-
-    # Current month bucket totals
-    current_bucket_totals: DefaultDict[str, float] = defaultdict(float)
-    for txn in current_transactions:
-        if txn.amount < 0:
-            bucket = all_txn_tags.get(txn.id, "Untagged")
-            current_bucket_totals[bucket] += abs(txn.amount)
-
-    # Compare current to baseline
-    for bucket, current_amount in current_bucket_totals.items():
-        if bucket in bucket_averages and len(bucket_averages[bucket]) >= 2:
-            avg = statistics.mean(bucket_averages[bucket])
-            std = statistics.stdev(bucket_averages[bucket])
-
-            if std > 0:
-                z_score = (current_amount - avg) / std
-                if z_score > threshold:
-                    percent_increase = ((current_amount - avg) / avg) * 100
-                    anomalies["unusual_buckets"].append(
-                        {
-                            "bucket": bucket,
-                            "current_spending": round(current_amount, 2),
-                            "average_spending": round(avg, 2),
-                            "z_score": round(z_score, 2),
-                            "percent_increase": round(percent_increase, 1),
-                            "reason": f"Spending ${current_amount:.2f} vs usual ${avg:.2f} (+{percent_increase:.0f}%)",
-                        }
-                    )
+    # 3./4. Detect unusual category and bucket spending against their monthly baseline averages
+    anomalies["unusual_categories"] = _unusual_groups(category_rows, "category", year, month, threshold)
+    anomalies["unusual_buckets"] = _unusual_groups(bucket_rows, "bucket", year, month, threshold)
 
     # Sort each list by severity
     anomalies["large_transactions"].sort(key=lambda x: x["z_score"], reverse=True)
@@ -499,56 +488,67 @@ async def detect_anomalies(
         "baseline_period": {
             "start": str(lookback_start),
             "end": str(lookback_end),
-            "transaction_count": len(baseline_transactions),
+            "transaction_count": baseline_stats.transaction_count,
         },
     }
 
 
-@router.get("/sankey-flow")
-async def sankey_flow(
+@router.get("/anomalies")
+async def detect_anomalies(
     year: int = Query(..., description="Year (e.g., 2024)"),
-    month: Optional[int] = Query(None, ge=1, le=12, description="Month (1-12), omit for full year"),
-    buckets: Optional[str] = Query(None, description="Comma-separated bucket tags to filter by"),
-    accounts: Optional[str] = Query(None, description="Comma-separated account sources to filter by"),
-    merchants: Optional[str] = Query(None, description="Comma-separated merchants to filter by"),
+    month: int = Query(..., ge=1, le=12, description="Month (1-12)"),
+    threshold: float = Query(
+        2.0, ge=1.0, le=5.0, description="Sensitivity: standard deviations from mean (lower = more sensitive)"
+    ),
     session: AsyncSession = Depends(get_session),
 ):
     """
-    Get money flow data for Sankey diagram visualization.
+    Detect unusual transactions that might indicate waste or errors.
 
-    Shows flow from income sources → accounts → spending buckets.
+    Analyzes transactions using a 3-month baseline to identify:
+    - **Large transactions**: Spending significantly above your average (z-score > threshold)
+    - **New merchants**: First-time purchases at merchants you haven't used before
+    - **Unusual categories**: Category spending far above historical average
+    - **Unusual buckets**: Bucket spending far above historical average
 
-    Returns nodes and links in Recharts Sankey format.
-    If month is omitted, returns data for the full year.
+    Returns:
+    - **summary**: Counts of each anomaly type, plus `large_threshold_amount` showing the dollar threshold
+    - **anomalies**: Detailed lists of flagged items with amounts and explanations
+
+    The `threshold` parameter controls sensitivity (default 2.0 = ~95th percentile).
+    Lower values flag more transactions; higher values only flag extreme outliers.
     """
+    # Count, sum and sum of squares of baseline expenses: their mean and spread
+    lookback_start, lookback_end = anomaly_baseline_range(year, month)
+    result = await session.execute(expense_stats_query(lookback_start, lookback_end))
+    baseline_stats = ExpenseStats(*result.one())
+
+    # Only the month's expenses that are large or from a new merchant
+    result = await session.execute(anomaly_candidates_query(year, month, baseline_stats.large_threshold(threshold)))
+    candidates = result.all()
+
+    # Monthly category and bucket spending over the baseline and the month
+    _, end_date = month_range(year, month)
+    group_by = ["year", "month"]
+    category_rows = await aggregate_window(session, [*group_by, "category"], lookback_start, end_date)
+    bucket_rows = await aggregate_window(session, [*group_by, "bucket"], lookback_start, end_date)
+
+    return anomalies_payload(year, month, threshold, baseline_stats, candidates, category_rows, bucket_rows)
+
+
+def period_range(year: int, month: Optional[int]) -> Tuple[date, date]:
+    """First and last day (inclusive) of a month, or of the year when month is None."""
     if month is not None:
-        start_date = date(year, month, 1)
         last_day = calendar.monthrange(year, month)[1]
-        end_date = date(year, month, last_day)
-    else:
-        start_date = date(year, 1, 1)
-        end_date = date(year, 12, 31)
+        return date(year, month, 1), date(year, month, last_day)
+    return date(year, 1, 1), date(year, 12, 31)
 
-    # Get all transactions for the period (excluding transfers)
-    result = await session.execute(
-        select(Transaction).where(
-            and_(Transaction.date >= start_date, Transaction.date <= end_date, Transaction.is_transfer.is_(False))
-        )
-    )
-    transactions = list(result.scalars().all())
-
-    # Apply filters
-    transactions = await apply_transaction_filters(
-        transactions, session, buckets=buckets, accounts=accounts, merchants=merchants
-    )
 
-    if not transactions:
+def sankey_payload(year: int, month: Optional[int], rows: Sequence[Any]) -> Dict[str, Any]:
+    """Response body of /sankey-flow from the period's filtered "account" x "bucket" aggregate rows."""
+    if not rows:
         return {"nodes": [], "links": []}
 
-    # Get bucket tags for all transactions
-    txn_ids = [t.id for t in transactions]
-    txn_tags = await get_transaction_tags(session, txn_ids)
-
     # Build nodes and links
     nodes: List[Dict[str, str]] = []
     node_index: Dict[str, int] = {}
@@ -558,16 +558,16 @@ async def sankey_flow(
     income_to_account: DefaultDict[str, float] = defaultdict(float)  # "Income" -> account_source
     account_to_bucket: DefaultDict[str, DefaultDict[str, float]] = defaultdict(lambda: defaultdict(float))  # account_source -> bucket
 
-    for txn in transactions:
-        account = txn.account_source or "Unknown"
-        bucket = txn_tags.get(txn.id, "uncategorized")
+    for row in rows:
+        account = row.account or "Unknown"
+        bucket = "uncategorized" if row.bucket == UNTAGGED else row.bucket
 
-        if txn.amount > 0:
+        if row.income:
             # Income: flows from "Income" node to account
-            income_to_account[account] += txn.amount
-        else:
+            income_to_account[account] += float(row.income)
+        if row.expenses:
             # Expense: flows from account to bucket
-            account_to_bucket[account][bucket] += abs(txn.amount)
+            account_to_bucket[account][bucket] += float(row.expenses)
 
     # Create nodes
     def get_node_index(name: str, node_type: str) -> int:
@@ -597,8 +597,8 @@ async def sankey_flow(
     return {"year": year, "month": month, "nodes": nodes, "links": links}
 
 
-@router.get("/treemap")
-async def treemap_data(
+@router.get("/sankey-flow")
+async def sankey_flow(
     year: int = Query(..., description="Year (e.g., 2024)"),
     month: Optional[int] = Query(None, ge=1, le=12, description="Month (1-12), omit for full year"),
     buckets: Optional[str] = Query(None, description="Comma-separated bucket tags to filter by"),
@@ -607,51 +607,42 @@ async def treemap_data(
     session: AsyncSession = Depends(get_session),
 ):
     """
-    Get hierarchical spending data for Treemap visualization.
+    Get money flow data for Sankey diagram visualization.
 
-    Returns spending organized as: Bucket → Merchant hierarchy.
+    Shows flow from income sources → accounts → spending buckets.
+
+    Returns nodes and links in Recharts Sankey format.
     If month is omitted, returns data for the full year.
     """
-    if month is not None:
-        start_date = date(year, month, 1)
-        last_day = calendar.monthrange(year, month)[1]
-        end_date = date(year, month, last_day)
-    else:
-        start_date = date(year, 1, 1)
-        end_date = date(year, 12, 31)
-
-    # Get expense transactions only (excluding transfers)
-    result = await session.execute(
-        select(Transaction).where(
-            and_(
-                Transaction.date >= start_date,
-                Transaction.date <= end_date,
-                Transaction.amount < 0,
-                Transaction.is_transfer.is_(False),
-            )
-        )
+    start_date, end_date = period_range(year, month)
+
+    # Income and expenses per account and bucket for the period (excluding transfers)
+    rows = await aggregate_window(
+        session,
+        ["account", "bucket"],
+        start_date,
+        end_date,
+        end_inclusive=True,
+        buckets=buckets,
+        accounts=accounts,
+        merchants=merchants,
     )
-    transactions = list(result.scalars().all())
 
-    # Apply filters
-    transactions = await apply_transaction_filters(
-        transactions, session, buckets=buckets, accounts=accounts, merchants=merchants
-    )
+    return sankey_payload(year, month, rows)
 
-    if not transactions:
-        return {"year": year, "month": month, "data": {"name": "Spending", "children": []}}
 
-    # Get bucket tags
-    txn_ids = [t.id for t in transactions]
-    txn_tags = await get_transaction_tags(session, txn_ids)
+def treemap_payload(year: int, month: Optional[int], rows: Sequence[Any]) -> Dict[str, Any]:
+    """Response body of /treemap from the period's filtered "bucket" x "merchant" expense rows."""
+    if not rows:
+        return {"year": year, "month": month, "data": {"name": "Spending", "children": []}}
 
     # Build hierarchy: bucket -> merchant -> amount
     hierarchy: DefaultDict[str, DefaultDict[str, float]] = defaultdict(lambda: defaultdict(float))
 
-    for txn in transactions:
-        bucket = txn_tags.get(txn.id, "Uncategorized")
-        merchant = txn.merchant or "Unknown"
-        hierarchy[bucket][merchant] += abs(txn.amount)
+    for row in rows:
+        bucket = UNCATEGORIZED if row.bucket == UNTAGGED else row.bucket
+        merchant = row.merchant or "Unknown"
+        hierarchy[bucket][merchant] += float(row.expenses)
 
     # Convert to treemap format
     children: List[Dict[str, Any]] = []
@@ -675,8 +666,8 @@ async def treemap_data(
     return {"year": year, "month": month, "data": {"name": "Spending", "children": children}}
 
 
-@router.get("/spending-heatmap")
-async def spending_heatmap(
+@router.get("/treemap")
+async def treemap_data(
     year: int = Query(..., description="Year (e.g., 2024)"),
     month: Optional[int] = Query(None, ge=1, le=12, description="Month (1-12), omit for full year"),
     buckets: Optional[str] = Query(None, description="Comma-separated bucket tags to filter by"),
@@ -685,43 +676,48 @@ async def spending_heatmap(
     session: AsyncSession = Depends(get_session),
 ):
     """
-    Get spending data for calendar heatmap visualization.
+    Get hierarchical spending data for Treemap visualization.
 
-    If month is provided, returns daily spending for that month.
-    If month is omitted, returns monthly spending for the full year.
+    Returns spending organized as: Bucket → Merchant hierarchy.
+    If month is omitted, returns data for the full year.
     """
+    start_date, end_date = period_range(year, month)
+
+    # Expenses only (excluding transfers), per bucket and merchant
+    rows = await aggregate_window(
+        session,
+        ["bucket", "merchant"],
+        start_date,
+        end_date,
+        end_inclusive=True,
+        buckets=buckets,
+        accounts=accounts,
+        merchants=merchants,
+        expenses_only=True,
+    )
+
+    return treemap_payload(year, month, rows)
+
+
+def heatmap_payload(year: int, month: Optional[int], rows: Sequence[Any]) -> Dict[str, Any]:
+    """Response body of /spending-heatmap from the period's filtered expense rows.
+
+    ``rows`` are grouped by "date" for a month and by "month" for a year.
+    """
+    days: List[Dict[str, Any]] = []
+
     if month is not None:
         # Monthly view: daily breakdown
-        start_date = date(year, month, 1)
         last_day = calendar.monthrange(year, month)[1]
-        end_date = date(year, month, last_day)
-
-        result = await session.execute(
-            select(Transaction).where(
-                and_(
-                    Transaction.date >= start_date,
-                    Transaction.date <= end_date,
-                    Transaction.amount < 0,
-                    Transaction.is_transfer.is_(False),
-                )
-            )
-        )
-        transactions = list(result.scalars().all())
-
-        # Apply filters
-        transactions = await apply_transaction_filters(
-            transactions, session, buckets=buckets, accounts=accounts, merchants=merchants
-        )
 
         daily_spending: DefaultDict[int, float] = defaultdict(float)
         daily_count: DefaultDict[int, int] = defaultdict(int)
 
-        for txn in transactions:
-            day = txn.date.day
-            daily_spending[day] += abs(txn.amount)
-            daily_count[day] += 1
+        for row in rows:
+            day = row.date.day
+            daily_spending[day] += float(row.expenses)
+            daily_count[day] += row.count
 
-        days: List[Dict[str, Any]] = []
         max_spending = max(daily_spending.values()) if daily_spending else 0
 
         for day in range(1, last_day + 1):
@@ -746,35 +742,15 @@ async def spending_heatmap(
             )
     else:
         # Year view: monthly breakdown
-        start_date = date(year, 1, 1)
-        end_date = date(year, 12, 31)
-
-        result = await session.execute(
-            select(Transaction).where(
-                and_(
-                    Transaction.date >= start_date,
-                    Transaction.date <= end_date,
-                    Transaction.amount < 0,
-                    Transaction.is_transfer.is_(False),
-                )
-            )
-        )
-        transactions = list(result.scalars().all())
-
-        # Apply filters
-        transactions = await apply_transaction_filters(
-            transactions, session, buckets=buckets, accounts=accounts, merchants=merchants
-        )
-
         monthly_spending: DefaultDict[int, float] = defaultdict(float)
         monthly_count: DefaultDict[int, int] = defaultdict(int)
 
-        for txn in transactions:
-            m = txn.date.month
-            monthly_spending[m] += abs(txn.amount)
-            monthly_count[m] += 1
+        for row in rows:
+            m = int(row.month)
+            monthly_spending[m] += float(row.expenses)
+            monthly_count[m] += row.count
 
-        days = []  # Using 'days' key for consistency, but contains months
+        # Using 'days' key for consistency, but contains months
         max_spending = max(monthly_spending.values()) if monthly_spending else 0
 
         month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
@@ -818,3 +794,36 @@ async def spending_heatmap(
         }
 
     return {"year": year, "month": month, "days": days, "summary": summary}
+
+
+@router.get("/spending-heatmap")
+async def spending_heatmap(
+    year: int = Query(..., description="Year (e.g., 2024)"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Month (1-12), omit for full year"),
+    buckets: Optional[str] = Query(None, description="Comma-separated bucket tags to filter by"),
+    accounts: Optional[str] = Query(None, description="Comma-separated account sources to filter by"),
+    merchants: Optional[str] = Query(None, description="Comma-separated merchants to filter by"),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Get spending data for calendar heatmap visualization.
+
+    If month is provided, returns daily spending for that month.
+    If month is omitted, returns monthly spending for the full year.
+    """
+    start_date, end_date = period_range(year, month)
+
+    # Expenses per day of the month, or per month of the year (a year reads the monthly rollups)
+    rows = await aggregate_window(
+        session,
+        ["date"] if month is not None else ["month"],
+        start_date,
+        end_date,
+        end_inclusive=True,
+        buckets=buckets,
+        accounts=accounts,
+        merchants=merchants,
+        expenses_only=True,
+    )
+
+    return heatmap_payload(year, month, rows)
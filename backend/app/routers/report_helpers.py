@@ -1,10 +1,16 @@
 """Shared helpers for report routes (core + analytics)."""
 
-from sqlalchemy import select, and_
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import ColumnElement, Row, Select, and_, case, extract, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
 
 from app.orm import Tag, Transaction, TransactionTag
+from app.services.monthly_rollups import ROLLUP_DIMENSIONS, aggregate_rollups, whole_months
+
+# Transaction or a read-only projection row (app.projections)
+TxnT = TypeVar("TxnT", bound=Any)
 
 
 async def get_transaction_tags(session: AsyncSession, transaction_ids: List[int]) -> dict:
@@ -22,25 +28,14 @@ async def get_transaction_tags(session: AsyncSession, transaction_ids: List[int]
     return {row[0]: row[1] for row in result.all()}
 
 
-async def get_transaction_ids_by_buckets(session: AsyncSession, buckets: List[str]) -> set:
-    """Get transaction IDs that have any of the specified bucket tags."""
-    if not buckets:
-        return set()
-
-    result = await session.execute(
-        select(TransactionTag.transaction_id).join(Tag).where(and_(Tag.namespace == "bucket", Tag.value.in_(buckets)))
-    )
-    return {row[0] for row in result.all()}
-
-
-def filter_transactions_by_accounts(transactions: List[Transaction], accounts: List[str]) -> List[Transaction]:
+def filter_transactions_by_accounts(transactions: List[TxnT], accounts: List[str]) -> List[TxnT]:
     """Filter transactions to only those from specified accounts."""
     if not accounts:
         return transactions
     return [txn for txn in transactions if txn.account_source in accounts]
 
 
-def filter_transactions_by_merchants(transactions: List[Transaction], merchants: List[str]) -> List[Transaction]:
+def filter_transactions_by_merchants(transactions: List[TxnT], merchants: List[str]) -> List[TxnT]:
     """Filter transactions to only those from specified merchants."""
     if not merchants:
         return transactions
@@ -49,6 +44,18 @@ def filter_transactions_by_merchants(transactions: List[Transaction], merchants:
     return [txn for txn in transactions if txn.merchant and txn.merchant.lower() in merchants_lower]
 
 
+def month_range(year: int, month: int) -> Tuple[date, date]:
+    """First day of the month and first day of the next month (end exclusive)."""
+    if month == 12:
+        return date(year, 12, 1), date(year + 1, 1, 1)
+    return date(year, month, 1), date(year, month + 1, 1)
+
+
+def previous_month(year: int, month: int) -> Tuple[int, int]:
+    """(year, month) of the month before."""
+    return (year - 1, 12) if month == 1 else (year, month - 1)
+
+
 def parse_filter_param(param: Optional[str]) -> List[str]:
     """Parse comma-separated filter parameter into a list."""
     if not param:
@@ -56,28 +63,157 @@ def parse_filter_param(param: Optional[str]) -> List[str]:
     return [v.strip() for v in param.split(",") if v.strip()]
 
 
-async def apply_transaction_filters(
-    transactions: List[Transaction],
-    session: AsyncSession,
+# ============================================================================
+# SQL aggregation builder
+# ============================================================================
+#
+# Report endpoints aggregate in the database instead of hydrating Transaction
+# rows: each query groups by one or more named dimensions and returns income,
+# expenses and count per group.  Dimensions are deliberately portable
+# (EXTRACT renders as strftime on SQLite); ISO weeks are rolled up from the
+# "date" dimension in Python since SQLite has no portable ISO-week format.
+
+# Group names of transactions without a category / bucket tag
+UNCATEGORIZED = "Uncategorized"
+UNTAGGED = "Untagged"
+
+# One bucket per transaction (None when untagged), matching get_transaction_tags()
+# semantics. Correlated so a narrow date window only probes the transaction_tags
+# primary key for its rows.
+transaction_bucket = (
+    select(func.max(Tag.value))
+    .join(TransactionTag, TransactionTag.tag_id == Tag.id)
+    .where(TransactionTag.transaction_id == Transaction.id, Tag.namespace == "bucket")
+    .correlate(Transaction)
+    .scalar_subquery()
+)
+
+REPORT_DIMENSIONS: Dict[str, ColumnElement[Any]] = {
+    "year": extract("year", Transaction.date),
+    "month": extract("month", Transaction.date),
+    "date": Transaction.date.expression,
+    "category": func.coalesce(func.nullif(Transaction.category, ""), UNCATEGORIZED),
+    "account": Transaction.account_source.expression,
+    "merchant": Transaction.merchant.expression,
+    "bucket": func.coalesce(transaction_bucket, UNTAGGED),
+}
+
+
+def income_sum() -> ColumnElement[float]:
+    """SUM of positive amounts."""
+    return func.coalesce(func.sum(case((Transaction.amount > 0, Transaction.amount), else_=0.0)), 0.0)
+
+
+def expense_sum() -> ColumnElement[float]:
+    """SUM of negative amounts, as a positive number."""
+    return func.coalesce(func.sum(case((Transaction.amount < 0, -Transaction.amount), else_=0.0)), 0.0)
+
+
+def report_filters(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    *,
+    end_inclusive: bool = False,
     buckets: Optional[str] = None,
     accounts: Optional[str] = None,
     merchants: Optional[str] = None,
-) -> List[Transaction]:
-    """Apply bucket, account, and merchant filters to a list of transactions."""
-    # Filter by buckets
+    expenses_only: bool = False,
+) -> List[ColumnElement[bool]]:
+    """Build WHERE clauses equivalent to the in-Python report filters.
+
+    Transfers are always excluded. ``end_date`` is exclusive unless
+    ``end_inclusive`` is set.
+    """
+    clauses: List[ColumnElement[bool]] = [Transaction.is_transfer.is_(False)]
+    if start_date:
+        clauses.append(Transaction.date >= start_date)
+    if end_date:
+        clauses.append(Transaction.date <= end_date if end_inclusive else Transaction.date < end_date)
+    if expenses_only:
+        clauses.append(Transaction.amount < 0)
+
     bucket_list = parse_filter_param(buckets)
     if bucket_list:
-        valid_txn_ids = await get_transaction_ids_by_buckets(session, bucket_list)
-        transactions = [txn for txn in transactions if txn.id in valid_txn_ids]
+        clauses.append(
+            Transaction.id.in_(
+                select(TransactionTag.transaction_id)
+                .join(Tag)
+                .where(and_(Tag.namespace == "bucket", Tag.value.in_(bucket_list)))
+            )
+        )
 
-    # Filter by accounts
     account_list = parse_filter_param(accounts)
     if account_list:
-        transactions = filter_transactions_by_accounts(transactions, account_list)
+        clauses.append(Transaction.account_source.in_(account_list))
 
-    # Filter by merchants
     merchant_list = parse_filter_param(merchants)
     if merchant_list:
-        transactions = filter_transactions_by_merchants(transactions, merchant_list)
+        clauses.append(func.lower(Transaction.merchant).in_([m.lower() for m in merchant_list]))
+
+    return clauses
 
-    return transactions
+
+def aggregate_query(group_by: Sequence[str], filters: Sequence[ColumnElement[bool]]) -> Select[Any]:
+    """Build a GROUP BY query over the named REPORT_DIMENSIONS.
+
+    Each row carries one labelled column per dimension plus ``income``,
+    ``expenses`` (positive), ``count`` and ``first_date`` (earliest date in
+    the group, used to keep first-seen ordering).
+    """
+    dimensions = [REPORT_DIMENSIONS[name].label(name) for name in group_by]
+    query = select(
+        *dimensions,
+        income_sum().label("income"),
+        expense_sum().label("expenses"),
+        func.count(Transaction.id).label("count"),
+        func.min(Transaction.date).label("first_date"),
+    ).select_from(Transaction)
+    return query.where(*filters).group_by(*(REPORT_DIMENSIONS[name] for name in group_by))
+
+
+async def aggregate(
+    session: AsyncSession, group_by: Sequence[str], filters: Sequence[ColumnElement[bool]]
+) -> List[Row[Any]]:
+    """Run aggregate_query() and return rows ordered by first occurrence."""
+    result = await session.execute(aggregate_query(group_by, filters).order_by(func.min(Transaction.date)))
+    return list(result.all())
+
+
+def month_key(row: Row[Any]) -> str:
+    """Format the year/month dimensions of an aggregate row as YYYY-MM."""
+    return f"{int(row.year)}-{int(row.month):02d}"
+
+
+async def aggregate_window(
+    session: AsyncSession,
+    group_by: Sequence[str],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    *,
+    end_inclusive: bool = False,
+    buckets: Optional[str] = None,
+    accounts: Optional[str] = None,
+    merchants: Optional[str] = None,
+    expenses_only: bool = False,
+) -> List[Row[Any]]:
+    """aggregate() over report_filters(...) with the same arguments.
+
+    Windows made of whole months are read from the monthly rollups when the
+    grouping and filters are ones the rollups keep; everything else scans
+    transactions.
+    """
+    months = whole_months(start_date, end_date, end_inclusive=end_inclusive)
+    if months is not None and not buckets and not merchants and set(group_by) <= ROLLUP_DIMENSIONS.keys():
+        return await aggregate_rollups(
+            session, group_by, months, accounts=parse_filter_param(accounts), expenses_only=expenses_only
+        )
+    filters = report_filters(
+        start_date,
+        end_date,
+        end_inclusive=end_inclusive,
+        buckets=buckets,
+        accounts=accounts,
+        merchants=merchants,
+        expenses_only=expenses_only,
+    )
+    return await aggregate(session, group_by, filters)
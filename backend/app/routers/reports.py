@@ -1,23 +1,43 @@
 """Core report endpoints: filter options, monthly/annual summaries, trends, top merchants, account/bucket summaries."""
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func
+from sqlalchemy import ColumnElement, Row, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import noload
-from typing import DefaultDict, Dict, Optional
+from typing import Any, DefaultDict, Dict, List, Optional, Sequence, Tuple
 from datetime import date
 from collections import defaultdict
 import calendar
 
 from app.database import get_session
+from app.routers.conditional import TRANSACTION_TABLES, conditional_get
 from app.orm import Transaction
 from app.routers.report_helpers import (
-    get_transaction_tags,
-    get_transaction_ids_by_buckets,
-    apply_transaction_filters,
+    aggregate,
+    aggregate_query,
+    aggregate_window,
+    expense_sum,
+    month_key,
+    month_range,
+    report_filters,
 )
 
-router = APIRouter(prefix="/api/v1/reports", tags=["reports"])
+router = APIRouter(
+    prefix="/api/v1/reports", tags=["reports"], dependencies=[conditional_get(*TRANSACTION_TABLES)]
+)
+
+
+async def _top_merchant_totals(
+    session: AsyncSession, filters: Sequence[ColumnElement[bool]], limit: int
+) -> List[Row[Any]]:
+    """Top merchants by expense total, computed with a single GROUP BY."""
+    query = (
+        aggregate_query(["merchant"], filters)
+        .where(Transaction.merchant.isnot(None), Transaction.merchant != "")
+        .order_by(expense_sum().desc(), func.min(Transaction.date))
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return list(result.all())
 
 
 @router.get("/filter-options")
@@ -44,182 +64,108 @@ async def get_filter_options(session: AsyncSession = Depends(get_session)):
     return {"accounts": accounts, "merchants": merchants}
 
 
-@router.get("/monthly-summary")
-async def monthly_summary(
-    year: int = Query(..., description="Year (e.g., 2024)"),
-    month: int = Query(..., ge=1, le=12, description="Month (1-12)"),
-    buckets: Optional[str] = Query(None, description="Comma-separated bucket tags to filter by"),
-    session: AsyncSession = Depends(get_session),
-):
-    """
-    Get comprehensive spending summary for a specific month.
-
-    Returns:
-    - **total_income**: Sum of all positive transactions
-    - **total_expenses**: Sum of all negative transactions (as positive number)
-    - **net**: Income minus expenses
-    - **category_breakdown**: Spending grouped by legacy category
-    - **bucket_breakdown**: Spending grouped by bucket tags
-    - **top_merchants**: Top 5 merchants by spending
-    - **transaction_count**: Total number of transactions
-
-    Note: Transfers are excluded from all calculations.
-    """
-    # Calculate date range
-    start_date = date(year, month, 1)
-    if month == 12:
-        end_date = date(year + 1, 1, 1)
-    else:
-        end_date = date(year, month + 1, 1)
-
-    # Get all transactions for the month (excluding transfers)
-    result = await session.execute(
-        select(Transaction).where(
-            Transaction.date >= start_date,
-            Transaction.date < end_date,
-            Transaction.is_transfer.is_(False),  # Exclude transfers from spending reports
-        )
-    )
-    transactions = list(result.scalars().all())
-
-    # Filter by bucket tags if specified
-    if buckets:
-        bucket_list = [b.strip() for b in buckets.split(",") if b.strip()]
-        if bucket_list:
-            valid_txn_ids = await get_transaction_ids_by_buckets(session, bucket_list)
-            transactions = [txn for txn in transactions if txn.id in valid_txn_ids]
-
-    # Calculate totals
-    total_income = sum(txn.amount for txn in transactions if txn.amount > 0)
-    total_expenses = abs(sum(txn.amount for txn in transactions if txn.amount < 0))
+def monthly_summary_payload(
+    year: int,
+    month: int,
+    category_rows: Sequence[Any],
+    bucket_rows: Sequence[Any],
+    top_merchants: Sequence[Any],
+) -> Dict[str, Any]:
+    """Response body of /monthly-summary from "category" and "bucket" aggregate rows and top merchant rows."""
+    total_income = sum(float(row.income) for row in category_rows)
+    total_expenses = sum(float(row.expenses) for row in category_rows)
     net = total_income - total_expenses
 
-    # Group by legacy category
-    category_breakdown: DefaultDict[str, Dict[str, float]] = defaultdict(lambda: {"amount": 0.0, "count": 0.0})
-    for txn in transactions:
-        cat = txn.category or "Uncategorized"
-        category_breakdown[cat]["amount"] += abs(txn.amount) if txn.amount < 0 else 0
-        category_breakdown[cat]["count"] += 1
+    category_breakdown = {row.category: {"amount": float(row.expenses), "count": float(row.count)} for row in category_rows}
 
     # Sort by amount
     sorted_category_breakdown = dict(sorted(category_breakdown.items(), key=lambda x: x[1]["amount"], reverse=True))
 
     # Group by bucket tag (new tag system)
-    txn_ids = [txn.id for txn in transactions]
-    txn_tags = await get_transaction_tags(session, txn_ids)
-
-    bucket_breakdown: DefaultDict[str, Dict[str, float]] = defaultdict(lambda: {"amount": 0.0, "count": 0.0})
-    for txn in transactions:
-        bucket = txn_tags.get(txn.id, "Untagged")
-        bucket_breakdown[bucket]["amount"] += abs(txn.amount) if txn.amount < 0 else 0
-        bucket_breakdown[bucket]["count"] += 1
+    bucket_breakdown = {row.bucket: {"amount": float(row.expenses), "count": float(row.count)} for row in bucket_rows}
 
     # Sort by amount
     sorted_bucket_breakdown = dict(sorted(bucket_breakdown.items(), key=lambda x: x[1]["amount"], reverse=True))
 
-    # Top merchants
-    merchant_totals: DefaultDict[str, float] = defaultdict(float)
-    for txn in transactions:
-        if txn.merchant and txn.amount < 0:
-            merchant_totals[txn.merchant] += abs(txn.amount)
-
-    top_merchants = sorted(merchant_totals.items(), key=lambda x: x[1], reverse=True)[:10]
-
     return {
         "year": year,
         "month": month,
         "total_income": total_income,
         "total_expenses": total_expenses,
         "net": net,
-        "transaction_count": len(transactions),
+        "transaction_count": sum(row.count for row in category_rows),
         "category_breakdown": sorted_category_breakdown,
         "bucket_breakdown": sorted_bucket_breakdown,
-        "top_merchants": [{"merchant": m, "amount": a} for m, a in top_merchants],
+        "top_merchants": [{"merchant": row.merchant, "amount": float(row.expenses)} for row in top_merchants],
     }
 
 
-@router.get("/annual-summary")
-async def annual_summary(
+@router.get("/monthly-summary")
+async def monthly_summary(
     year: int = Query(..., description="Year (e.g., 2024)"),
+    month: int = Query(..., ge=1, le=12, description="Month (1-12)"),
     buckets: Optional[str] = Query(None, description="Comma-separated bucket tags to filter by"),
     session: AsyncSession = Depends(get_session),
 ):
     """
-    Get comprehensive spending summary for a full year.
+    Get comprehensive spending summary for a specific month.
 
     Returns:
-    - **total_income**: Sum of all positive transactions for the year
+    - **total_income**: Sum of all positive transactions
     - **total_expenses**: Sum of all negative transactions (as positive number)
     - **net**: Income minus expenses
-    - **monthly_breakdown**: Monthly spending totals
+    - **category_breakdown**: Spending grouped by legacy category
     - **bucket_breakdown**: Spending grouped by bucket tags
-    - **top_merchants**: Top 10 merchants by spending
+    - **top_merchants**: Top 5 merchants by spending
     - **transaction_count**: Total number of transactions
 
     Note: Transfers are excluded from all calculations.
     """
-    start_date = date(year, 1, 1)
-    end_date = date(year + 1, 1, 1)
+    start_date, end_date = month_range(year, month)
 
-    # Get all transactions for the year (excluding transfers)
-    # Use noload('*') to skip eager loading of relationships - we fetch tags separately
-    result = await session.execute(
-        select(Transaction)
-        .where(
-            Transaction.date >= start_date, Transaction.date < end_date, Transaction.is_transfer.is_(False)
-        )
-        .options(noload("*"))
+    # Group by legacy category and bucket tag; totals are derived from the category groups.
+    # Transfers are excluded; without a bucket filter this reads the monthly rollups.
+    category_rows = await aggregate_window(session, ["category"], start_date, end_date, buckets=buckets)
+    bucket_rows = await aggregate_window(session, ["bucket"], start_date, end_date, buckets=buckets)
+
+    # Top merchants
+    top_merchants = await _top_merchant_totals(
+        session, report_filters(start_date, end_date, buckets=buckets, expenses_only=True), 10
     )
-    transactions = list(result.scalars().all())
 
-    # Filter by bucket tags if specified
-    if buckets:
-        bucket_list = [b.strip() for b in buckets.split(",") if b.strip()]
-        if bucket_list:
-            valid_txn_ids = await get_transaction_ids_by_buckets(session, bucket_list)
-            transactions = [txn for txn in transactions if txn.id in valid_txn_ids]
+    return monthly_summary_payload(year, month, category_rows, bucket_rows, top_merchants)
 
-    # Calculate totals
-    total_income = sum(txn.amount for txn in transactions if txn.amount > 0)
-    total_expenses = abs(sum(txn.amount for txn in transactions if txn.amount < 0))
-    net = total_income - total_expenses
+
+def annual_summary_payload(
+    year: int, month_rows: Sequence[Any], bucket_rows: Sequence[Any], top_merchants: Sequence[Any]
+) -> Dict[str, Any]:
+    """Response body of /annual-summary from "month" and "bucket" aggregate rows and top merchant rows."""
+    start_date = date(year, 1, 1)
 
     # Monthly breakdown
     monthly_breakdown: Dict[int, Dict[str, float]] = {}
     for month_num in range(1, 13):
         monthly_breakdown[month_num] = {"income": 0.0, "expenses": 0.0, "net": 0.0, "count": 0.0}
 
-    for txn in transactions:
-        month = txn.date.month
-        if txn.amount > 0:
-            monthly_breakdown[month]["income"] += txn.amount
-        else:
-            monthly_breakdown[month]["expenses"] += abs(txn.amount)
-        monthly_breakdown[month]["count"] += 1
+    for row in month_rows:
+        month = int(row.month)
+        monthly_breakdown[month]["income"] = float(row.income)
+        monthly_breakdown[month]["expenses"] = float(row.expenses)
+        monthly_breakdown[month]["count"] = float(row.count)
 
     for month in monthly_breakdown:
         monthly_breakdown[month]["net"] = monthly_breakdown[month]["income"] - monthly_breakdown[month]["expenses"]
 
-    # Group by bucket tag
-    txn_ids = [txn.id for txn in transactions]
-    txn_tags = await get_transaction_tags(session, txn_ids)
+    # Calculate totals
+    total_income = sum(float(row.income) for row in month_rows)
+    total_expenses = sum(float(row.expenses) for row in month_rows)
+    net = total_income - total_expenses
 
-    bucket_breakdown_dd: DefaultDict[str, Dict[str, float]] = defaultdict(lambda: {"amount": 0.0, "count": 0.0})
-    for txn in transactions:
-        bucket = txn_tags.get(txn.id, "Untagged")
-        bucket_breakdown_dd[bucket]["amount"] += abs(txn.amount) if txn.amount < 0 else 0
-        bucket_breakdown_dd[bucket]["count"] += 1
+    # Group by bucket tag
+    bucket_breakdown_dd = {row.bucket: {"amount": float(row.expenses), "count": float(row.count)} for row in bucket_rows}
 
     bucket_breakdown = dict(sorted(bucket_breakdown_dd.items(), key=lambda x: x[1]["amount"], reverse=True))
 
-    # Top merchants
-    merchant_totals: DefaultDict[str, float] = defaultdict(float)
-    for txn in transactions:
-        if txn.merchant and txn.amount < 0:
-            merchant_totals[txn.merchant] += abs(txn.amount)
-
-    top_merchants = sorted(merchant_totals.items(), key=lambda x: x[1], reverse=True)[:10]
-
     # Calculate days in year for velocity
     today = date.today()
     if year == today.year:
@@ -232,99 +178,59 @@ async def annual_summary(
         "total_income": total_income,
         "total_expenses": total_expenses,
         "net": net,
-        "transaction_count": len(transactions),
+        "transaction_count": sum(row.count for row in month_rows),
         "monthly_breakdown": monthly_breakdown,
         "bucket_breakdown": bucket_breakdown,
-        "top_merchants": [{"merchant": m, "amount": a} for m, a in top_merchants],
+        "top_merchants": [{"merchant": row.merchant, "amount": float(row.expenses)} for row in top_merchants],
         "daily_average": round(total_expenses / days_elapsed, 2) if days_elapsed > 0 else 0,
         "days_elapsed": days_elapsed,
     }
 
 
-@router.get("/trends")
-async def spending_trends(
-    start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
-    end_date: date = Query(..., description="End date (YYYY-MM-DD)"),
-    group_by: str = Query(
-        "month",
-        pattern="^(month|week|category|account|tag)$",
-        description="Grouping: month, week, category, account, or tag",
-    ),
-    buckets: Optional[str] = Query(None, description="Comma-separated bucket tags to filter by"),
-    accounts: Optional[str] = Query(None, description="Comma-separated account sources to filter by"),
-    merchants: Optional[str] = Query(None, description="Comma-separated merchants to filter by"),
-    session: AsyncSession = Depends(get_session),
-):
-    """
-    Get spending trends over a date range.
-
-    Supports multiple grouping modes:
-    - **month**: Income, expenses, and net by month (for line charts)
-    - **week**: Income, expenses, and net by week (for line charts)
-    - **category**: Spending breakdown by category
-    - **account**: Spending breakdown by account
-    - **tag**: Spending breakdown by bucket tag
-
-    Transfers are excluded from all calculations.
-    """
-    # Get transactions in date range (excluding transfers)
-    # Use noload('*') to skip eager loading of relationships
-    result = await session.execute(
-        select(Transaction)
-        .where(
-            Transaction.date >= start_date,
-            Transaction.date <= end_date,
-            Transaction.is_transfer.is_(False),  # Exclude transfers
-        )
-        .order_by(Transaction.date)
-        .options(noload("*"))
-    )
-    transactions = list(result.scalars().all())
+# Aggregate dimensions and expenses-only flag behind each /trends grouping
+TREND_GROUPINGS: Dict[str, Tuple[List[str], bool]] = {
+    "month": (["year", "month"], False),
+    "week": (["date"], False),
+    "category": (["category", "year", "month"], True),
+    "account": (["account", "year", "month"], False),
+    "tag": (["bucket", "year", "month"], True),
+}
 
-    # Apply filters
-    transactions = await apply_transaction_filters(
-        transactions, session, buckets=buckets, accounts=accounts, merchants=merchants
-    )
 
+def trends_payload(group_by: str, rows: Sequence[Any]) -> Dict[str, Any]:
+    """Response body of /trends from aggregate rows over TREND_GROUPINGS[group_by]."""
     if group_by == "month":
         # Group by month
-        monthly_data: DefaultDict[str, Dict[str, float]] = defaultdict(lambda: {"income": 0.0, "expenses": 0.0, "net": 0.0})
-
-        for txn in transactions:
-            month_key = f"{txn.date.year}-{txn.date.month:02d}"
-            if txn.amount > 0:
-                monthly_data[month_key]["income"] += txn.amount
-            else:
-                monthly_data[month_key]["expenses"] += abs(txn.amount)
-            monthly_data[month_key]["net"] = monthly_data[month_key]["income"] - monthly_data[month_key]["expenses"]
+        monthly_data = {
+            month_key(row): {
+                "income": float(row.income),
+                "expenses": float(row.expenses),
+                "net": float(row.income) - float(row.expenses),
+            }
+            for row in rows
+        }
 
         return {"group_by": "month", "data": [{"period": k, **v} for k, v in sorted(monthly_data.items())]}
 
     elif group_by == "week":
-        # Group by ISO week
+        # Group by ISO week, rolled up from per-day sums
         weekly_data: DefaultDict[str, Dict[str, float]] = defaultdict(lambda: {"income": 0.0, "expenses": 0.0, "net": 0.0})
 
-        for txn in transactions:
+        for row in rows:
             # ISO week: YYYY-Www format
-            iso_cal = txn.date.isocalendar()
+            iso_cal = row.date.isocalendar()
             week_key = f"{iso_cal[0]}-W{iso_cal[1]:02d}"
-            if txn.amount > 0:
-                weekly_data[week_key]["income"] += txn.amount
-            else:
-                weekly_data[week_key]["expenses"] += abs(txn.amount)
+            weekly_data[week_key]["income"] += float(row.income)
+            weekly_data[week_key]["expenses"] += float(row.expenses)
             weekly_data[week_key]["net"] = weekly_data[week_key]["income"] - weekly_data[week_key]["expenses"]
 
         return {"group_by": "week", "data": [{"period": k, **v} for k, v in sorted(weekly_data.items())]}
 
     elif group_by == "category":
-        # Group by category over time
-        category_monthly: DefaultDict[str, DefaultDict[str, float]] = defaultdict(lambda: defaultdict(float))
-
-        for txn in transactions:
-            if txn.amount < 0:  # Only expenses
-                month_key = f"{txn.date.year}-{txn.date.month:02d}"
-                cat = txn.category or "Uncategorized"
-                category_monthly[cat][month_key] += abs(txn.amount)
+        # Group by category over time (expenses only)
+        category_monthly: DefaultDict[str, Dict[str, float]] = defaultdict(dict)
+        for row in rows:
+            category_monthly[row.category][month_key(row)] = float(row.expenses)
 
         return {
             "group_by": "category",
@@ -337,14 +243,12 @@ async def spending_trends(
 
     elif group_by == "account":
         # Group by account over time
-        account_monthly: DefaultDict[str, DefaultDict[str, Dict[str, float]]] = defaultdict(lambda: defaultdict(lambda: {"income": 0.0, "expenses": 0.0}))
-
-        for txn in transactions:
-            month_key = f"{txn.date.year}-{txn.date.month:02d}"
-            if txn.amount > 0:
-                account_monthly[txn.account_source][month_key]["income"] += txn.amount
-            else:
-                account_monthly[txn.account_source][month_key]["expenses"] += abs(txn.amount)
+        account_monthly: DefaultDict[str, Dict[str, Dict[str, float]]] = defaultdict(dict)
+        for row in rows:
+            account_monthly[row.account][month_key(row)] = {
+                "income": float(row.income),
+                "expenses": float(row.expenses),
+            }
 
         return {
             "group_by": "account",
@@ -355,18 +259,11 @@ async def spending_trends(
             },
         }
 
-    elif group_by == "tag":
-        # Group by bucket tag over time
-        txn_ids = [txn.id for txn in transactions]
-        txn_tags = await get_transaction_tags(session, txn_ids)
-
-        tag_monthly: DefaultDict[str, DefaultDict[str, float]] = defaultdict(lambda: defaultdict(float))
-
-        for txn in transactions:
-            if txn.amount < 0:  # Only expenses
-                month_key = f"{txn.date.year}-{txn.date.month:02d}"
-                bucket = txn_tags.get(txn.id, "Untagged")
-                tag_monthly[bucket][month_key] += abs(txn.amount)
+    else:
+        # Group by bucket tag over time (expenses only)
+        tag_monthly: DefaultDict[str, Dict[str, float]] = defaultdict(dict)
+        for row in rows:
+            tag_monthly[row.bucket][month_key(row)] = float(row.expenses)
 
         return {
             "group_by": "tag",
@@ -378,6 +275,102 @@ async def spending_trends(
         }
 
 
+@router.get("/annual-summary")
+async def annual_summary(
+    year: int = Query(..., description="Year (e.g., 2024)"),
+    buckets: Optional[str] = Query(None, description="Comma-separated bucket tags to filter by"),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Get comprehensive spending summary for a full year.
+
+    Returns:
+    - **total_income**: Sum of all positive transactions for the year
+    - **total_expenses**: Sum of all negative transactions (as positive number)
+    - **net**: Income minus expenses
+    - **monthly_breakdown**: Monthly spending totals
+    - **bucket_breakdown**: Spending grouped by bucket tags
+    - **top_merchants**: Top 10 merchants by spending
+    - **transaction_count**: Total number of transactions
+
+    Note: Transfers are excluded from all calculations.
+    """
+    start_date = date(year, 1, 1)
+    end_date = date(year + 1, 1, 1)
+
+    # Group by month and bucket tag; totals are derived from the month groups.
+    # Transfers are excluded; without a bucket filter this reads the monthly rollups.
+    month_rows = await aggregate_window(session, ["month"], start_date, end_date, buckets=buckets)
+    bucket_rows = await aggregate_window(session, ["bucket"], start_date, end_date, buckets=buckets)
+
+    # Top merchants
+    top_merchants = await _top_merchant_totals(
+        session, report_filters(start_date, end_date, buckets=buckets, expenses_only=True), 10
+    )
+
+    return annual_summary_payload(year, month_rows, bucket_rows, top_merchants)
+
+
+@router.get("/trends")
+async def spending_trends(
+    start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: date = Query(..., description="End date (YYYY-MM-DD)"),
+    group_by: str = Query(
+        "month",
+        pattern="^(month|week|category|account|tag)$",
+        description="Grouping: month, week, category, account, or tag",
+    ),
+    buckets: Optional[str] = Query(None, description="Comma-separated bucket tags to filter by"),
+    accounts: Optional[str] = Query(None, description="Comma-separated account sources to filter by"),
+    merchants: Optional[str] = Query(None, description="Comma-separated merchants to filter by"),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Get spending trends over a date range.
+
+    Supports multiple grouping modes:
+    - **month**: Income, expenses, and net by month (for line charts)
+    - **week**: Income, expenses, and net by week (for line charts)
+    - **category**: Spending breakdown by category
+    - **account**: Spending breakdown by account
+    - **tag**: Spending breakdown by bucket tag
+
+    Transfers are excluded from all calculations.
+    """
+    # Transactions in date range (inclusive), excluding transfers, with filters applied.
+    # Ranges of whole months are read from the monthly rollups where possible;
+    # weeks are rolled up from per-day sums, which always scan transactions.
+    group_dimensions, expenses_only = TREND_GROUPINGS[group_by]
+    filter_args: Dict[str, Any] = {"buckets": buckets, "accounts": accounts, "merchants": merchants}
+
+    if group_by == "week":
+        filters = report_filters(start_date, end_date, end_inclusive=True, **filter_args)
+        rows = await aggregate(session, group_dimensions, filters)
+    else:
+        rows = await aggregate_window(
+            session,
+            group_dimensions,
+            start_date,
+            end_date,
+            end_inclusive=True,
+            expenses_only=expenses_only,
+            **filter_args,
+        )
+
+    return trends_payload(group_by, rows)
+
+
+def top_merchants_payload(period: str, top: Sequence[Any]) -> Dict[str, Any]:
+    """Response body of /top-merchants from "merchant" aggregate rows."""
+    return {
+        "period": period,
+        "merchants": [
+            {"merchant": row.merchant, "amount": float(row.expenses), "transaction_count": float(row.count)}
+            for row in top
+        ],
+    }
+
+
 @router.get("/top-merchants")
 async def top_merchants(
     limit: int = Query(10, ge=1, le=100),
@@ -393,6 +386,7 @@ async def top_merchants(
     today = date.today()
 
     # If year is provided, use it instead of period
+    end_date: Optional[date]
     if year is not None:
         if month is not None:
             # Specific month
@@ -421,63 +415,27 @@ async def top_merchants(
         else:  # all_time
             start_date = date(2000, 1, 1)
 
-    # Get transactions (excluding transfers)
-    # Use noload('*') to skip eager loading of relationships
-    query = (
-        select(Transaction)
-        .where(
-            Transaction.date >= start_date,
-            Transaction.amount < 0,  # Only expenses
-            Transaction.is_transfer.is_(False),  # Exclude transfers
-        )
-        .options(noload("*"))
-    )
-    if end_date:
-        query = query.where(Transaction.date < end_date)
-    result = await session.execute(query)
-    transactions = list(result.scalars().all())
-
-    # Apply filters (no merchants filter - this endpoint groups by merchant)
-    transactions = await apply_transaction_filters(transactions, session, buckets=buckets, accounts=accounts)
-
-    # Aggregate by merchant
-    merchant_totals: DefaultDict[str, Dict[str, float]] = defaultdict(lambda: {"amount": 0.0, "count": 0.0})
-    for txn in transactions:
-        if txn.merchant:
-            merchant_totals[txn.merchant]["amount"] += abs(txn.amount)
-            merchant_totals[txn.merchant]["count"] += 1
-
-    # Sort and limit
-    top = sorted(merchant_totals.items(), key=lambda x: x[1]["amount"], reverse=True)[:limit]
+    # Expenses only, excluding transfers (no merchants filter - this endpoint groups by merchant)
+    filters = report_filters(start_date, end_date, buckets=buckets, accounts=accounts, expenses_only=True)
+    top = await _top_merchant_totals(session, filters, limit)
 
-    return {
-        "period": period,
-        "merchants": [{"merchant": m, "amount": data["amount"], "transaction_count": data["count"]} for m, data in top],
-    }
+    return top_merchants_payload(period, top)
 
 
 @router.get("/account-summary")
 async def account_summary(session: AsyncSession = Depends(get_session)):
     """Get summary by account"""
-    result = await session.execute(
-        select(Transaction)
-        .where(Transaction.is_transfer.is_(False))
-        .options(noload("*"))
-    )
-    transactions = result.scalars().all()
-
-    account_data: DefaultDict[str, Dict[str, float]] = defaultdict(lambda: {"income": 0.0, "expenses": 0.0, "net": 0.0, "count": 0.0})
-
-    for txn in transactions:
-        if txn.amount > 0:
-            account_data[txn.account_source]["income"] += txn.amount
-        else:
-            account_data[txn.account_source]["expenses"] += abs(txn.amount)
-
-        account_data[txn.account_source]["net"] = (
-            account_data[txn.account_source]["income"] - account_data[txn.account_source]["expenses"]
-        )
-        account_data[txn.account_source]["count"] += 1
+    rows = await aggregate_window(session, ["account"])
+
+    account_data = {
+        row.account: {
+            "income": float(row.income),
+            "expenses": float(row.expenses),
+            "net": float(row.income) - float(row.expenses),
+            "count": float(row.count),
+        }
+        for row in rows
+    }
 
     return {"accounts": [{"account": acc, **data} for acc, data in sorted(account_data.items())]}
 
@@ -487,31 +445,17 @@ async def bucket_summary(
     start_date: Optional[date] = None, end_date: Optional[date] = None, session: AsyncSession = Depends(get_session)
 ):
     """Get spending summary by bucket tag"""
-    query = select(Transaction).where(Transaction.is_transfer.is_(False))
-
-    if start_date:
-        query = query.where(Transaction.date >= start_date)
-    if end_date:
-        query = query.where(Transaction.date <= end_date)
-
-    result = await session.execute(query)
-    transactions = result.scalars().all()
-
-    # Get bucket tags for all transactions
-    txn_ids = [txn.id for txn in transactions]
-    txn_tags = await get_transaction_tags(session, txn_ids)
-
-    bucket_data: DefaultDict[str, Dict[str, float]] = defaultdict(lambda: {"income": 0.0, "expenses": 0.0, "net": 0.0, "count": 0.0})
-
-    for txn in transactions:
-        bucket = txn_tags.get(txn.id, "Untagged")
-        if txn.amount > 0:
-            bucket_data[bucket]["income"] += txn.amount
-        else:
-            bucket_data[bucket]["expenses"] += abs(txn.amount)
-
-        bucket_data[bucket]["net"] = bucket_data[bucket]["income"] - bucket_data[bucket]["expenses"]
-        bucket_data[bucket]["count"] += 1
+    rows = await aggregate_window(session, ["bucket"], start_date, end_date, end_inclusive=True)
+
+    bucket_data = {
+        row.bucket: {
+            "income": float(row.income),
+            "expenses": float(row.expenses),
+            "net": float(row.income) - float(row.expenses),
+            "count": float(row.count),
+        }
+        for row in rows
+    }
 
     # Sort by expenses descending
     sorted_buckets = sorted(bucket_data.items(), key=lambda x: x[1]["expenses"], reverse=True)
@@ -1,66 +1,66 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy import select, and_
+from sqlalchemy import Table, bindparam, delete, insert, select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any, Dict, List
+from typing import Dict, List, Optional, Sequence, Set, Tuple, cast
 from datetime import UTC, datetime
 
 from app.database import get_session
 from app.orm import Tag, TagRule, Transaction, TransactionTag
+from app.projections import TRANSACTION_ROWS
 from app.schemas import TagRuleCreate, TagRuleUpdate, TagRuleResponse
 from app.errors import ErrorCode, not_found, bad_request
 
 router = APIRouter(prefix="/api/v1/tag-rules", tags=["tag-rules"])
 
 
-def match_rule(transaction: Transaction, rule: TagRule) -> bool:
+class CompiledRule:
     """
-    Check if a transaction matches a tag rule
+    A tag rule prepared for evaluation against many transactions.
 
-    Returns True if the transaction matches the rule conditions
+    Patterns are lowercased once; callers pass the transaction's merchant and
+    description already lowercased and its absolute amount.
     """
-    matches = []
-
-    # Check merchant pattern
-    if rule.merchant_pattern:
-        merchant = transaction.merchant or ""
-        # Case-insensitive substring match
-        pattern_match = rule.merchant_pattern.lower() in merchant.lower()
-        matches.append(pattern_match)
-
-    # Check description pattern
-    if rule.description_pattern:
-        description = transaction.description or ""
-        # Case-insensitive substring match
-        pattern_match = rule.description_pattern.lower() in description.lower()
-        matches.append(pattern_match)
-
-    # Check amount range
-    if rule.amount_min is not None or rule.amount_max is not None:
-        amount = abs(transaction.amount)  # Use absolute value for comparison
-        if rule.amount_min is not None and rule.amount_max is not None:
-            amount_match = rule.amount_min <= amount <= rule.amount_max
-        elif rule.amount_min is not None:
-            amount_match = amount >= rule.amount_min
-        elif rule.amount_max is not None:
-            amount_match = amount <= rule.amount_max
-        else:
-            amount_match = True  # unreachable, but satisfies mypy
-        matches.append(amount_match)
-
-    # Check account source
-    if rule.account_source:
-        account_match = transaction.account_source == rule.account_source
-        matches.append(account_match)
-
-    # If no conditions specified, don't match
-    if not matches:
-        return False
-
-    # Apply AND/OR logic
-    if rule.match_all:
-        return all(matches)  # All conditions must match
-    else:
-        return any(matches)  # Any condition can match
+
+    __slots__ = ("merchant_pattern", "description_pattern", "amount_min", "amount_max", "account_source", "match_all")
+
+    def __init__(self, rule: TagRule):
+        self.merchant_pattern = rule.merchant_pattern.lower() if rule.merchant_pattern else None
+        self.description_pattern = rule.description_pattern.lower() if rule.description_pattern else None
+        self.amount_min = rule.amount_min
+        self.amount_max = rule.amount_max
+        self.account_source = rule.account_source or None
+        self.match_all = rule.match_all
+
+    def matches(self, merchant: str, description: str, amount: float, account_source: Optional[str]) -> bool:
+        has_amount = self.amount_min is not None or self.amount_max is not None
+        amount_match = (self.amount_min is None or amount >= self.amount_min) and (
+            self.amount_max is None or amount <= self.amount_max
+        )
+
+        if self.match_all:
+            # All conditions must match (and at least one must be specified)
+            if self.merchant_pattern is not None and self.merchant_pattern not in merchant:
+                return False
+            if self.description_pattern is not None and self.description_pattern not in description:
+                return False
+            if has_amount and not amount_match:
+                return False
+            if self.account_source is not None and account_source != self.account_source:
+                return False
+            return (
+                self.merchant_pattern is not None
+                or self.description_pattern is not None
+                or has_amount
+                or self.account_source is not None
+            )
+
+        # Any condition can match
+        return (
+            (self.merchant_pattern is not None and self.merchant_pattern in merchant)
+            or (self.description_pattern is not None and self.description_pattern in description)
+            or (has_amount and amount_match)
+            or (self.account_source is not None and account_source == self.account_source)
+        )
 
 
 def parse_tag_string(tag_str: str) -> tuple[str, str]:
@@ -178,14 +178,16 @@ async def test_rule(rule_id: int, session: AsyncSession = Depends(get_session)):
     if not rule:
         raise not_found(ErrorCode.RULE_NOT_FOUND, rule_id=rule_id)
 
-    # Get all transactions
-    txn_result = await session.execute(select(Transaction))
-    transactions = txn_result.scalars().all()
+    # Get all transactions (read-only columns)
+    transactions = await TRANSACTION_ROWS.fetch(session, TRANSACTION_ROWS.select())
 
     # Test rule against each transaction
+    compiled = CompiledRule(rule)
     matching_transactions = []
     for txn in transactions:
-        if match_rule(txn, rule):
+        if compiled.matches(
+            (txn.merchant or "").lower(), (txn.description or "").lower(), abs(txn.amount), txn.account_source
+        ):
             matching_transactions.append(
                 {
                     "id": txn.id,
@@ -207,45 +209,110 @@ async def test_rule(rule_id: int, session: AsyncSession = Depends(get_session)):
     }
 
 
-async def apply_tag_to_transaction(session: AsyncSession, transaction_id: int, tag_str: str) -> bool:
-    """
-    Apply a tag to a transaction via the junction table.
-    For bucket tags, removes any existing bucket tag first (only one allowed).
-    Returns True if tag was applied, False if already present.
+# Columns needed to evaluate rules; avoids loading Transaction objects and their relationships
+RULE_MATCH_COLUMNS = (
+    Transaction.id,
+    Transaction.merchant,
+    Transaction.description,
+    Transaction.amount,
+    Transaction.account_source,
+)
+
+
+def has_assigned_bucket():
+    """EXISTS clause for transactions that already carry a bucket other than bucket:none."""
+    return (
+        select(TransactionTag.transaction_id)
+        .join(Tag, Tag.id == TransactionTag.tag_id)
+        .where(
+            TransactionTag.transaction_id == Transaction.id,
+            Tag.namespace == "bucket",
+            Tag.value != "none",
+        )
+        .exists()
+    )
+
+
+async def apply_rules_in_bulk(
+    session: AsyncSession, rules: Sequence[TagRule], unbucketed_only: bool
+) -> Tuple[int, int, Dict[int, int]]:
     """
-    namespace, value = parse_tag_string(tag_str)
+    Evaluate rules against transactions in memory and write the resulting tags in bulk.
 
-    # Get the tag
-    tag_result = await session.execute(select(Tag).where(and_(Tag.namespace == namespace, Tag.value == value)))
-    tag = tag_result.scalar_one_or_none()
-    if not tag:
-        return False
-
-    # For bucket namespace, remove existing bucket tag first
-    if namespace == "bucket":
-        # Find and remove existing bucket tags
-        existing_bucket_result = await session.execute(
-            select(TransactionTag)
-            .join(Tag)
-            .where(and_(TransactionTag.transaction_id == transaction_id, Tag.namespace == "bucket"))
+    Rules are tried in the given order. A bucket rule replaces any existing bucket
+    tag and stops evaluation for that transaction; other tags are added unless
+    already present. With unbucketed_only, only transactions without a bucket (or
+    with bucket:none) are considered, selected with a single anti-join.
+
+    Returns (applied_count, transactions_checked, {rule_id: applied_count}) and
+    updates each rule's match_count/last_matched_date. Does not commit.
+    """
+    # Resolve every rule's target tag in one query
+    parsed = {rule.id: parse_tag_string(rule.tag) for rule in rules}
+    tag_result = await session.execute(
+        select(Tag.id, Tag.namespace, Tag.value).where(Tag.value.in_({value for _, value in parsed.values()}))
+    )
+    tag_ids = {(namespace, value): tag_id for tag_id, namespace, value in tag_result}
+    compiled = [
+        (rule, CompiledRule(rule), parsed[rule.id][0] == "bucket", tag_ids.get(parsed[rule.id])) for rule in rules
+    ]
+
+    # Existing non-bucket links for the rules' tags, so re-applying a tag is a no-op
+    other_tag_ids = {tag_id for _, _, is_bucket, tag_id in compiled if not is_bucket and tag_id is not None}
+    existing_links: Set[Tuple[int, int]] = set()
+    if other_tag_ids:
+        links_result = await session.execute(
+            select(TransactionTag.transaction_id, TransactionTag.tag_id).where(TransactionTag.tag_id.in_(other_tag_ids))
         )
-        existing_buckets = existing_bucket_result.scalars().all()
-        for existing in existing_buckets:
-            await session.delete(existing)
-
-    # Check if this exact tag is already applied
-    existing_result = await session.execute(
-        select(TransactionTag).where(
-            and_(TransactionTag.transaction_id == transaction_id, TransactionTag.tag_id == tag.id)
+        existing_links = {(txn_id, tag_id) for txn_id, tag_id in links_result}
+
+    query = select(*RULE_MATCH_COLUMNS)
+    if unbucketed_only:
+        query = query.where(~has_assigned_bucket())
+    candidates = (await session.execute(query)).all()
+
+    rebucketed_ids: List[int] = []
+    new_links: List[Dict[str, int]] = []
+    rule_counts: Dict[int, int] = {}
+    for txn in candidates:
+        merchant = (txn.merchant or "").lower()
+        description = (txn.description or "").lower()
+        amount = abs(txn.amount)
+        for rule, matcher, is_bucket, tag_id in compiled:
+            if not matcher.matches(merchant, description, amount, txn.account_source):
+                continue
+            if tag_id is not None and (is_bucket or (txn.id, tag_id) not in existing_links):
+                if is_bucket:
+                    rebucketed_ids.append(txn.id)
+                else:
+                    existing_links.add((txn.id, tag_id))
+                new_links.append({"transaction_id": txn.id, "tag_id": tag_id})
+                rule_counts[rule.id] = rule_counts.get(rule.id, 0) + 1
+            # For bucket tags, stop after first match
+            if is_bucket:
+                break
+
+    # Replace existing bucket tags (only one allowed), then insert all new links;
+    # both are single executemany statements
+    transaction_tags = cast(Table, TransactionTag.__table__)
+    if rebucketed_ids:
+        await session.execute(
+            delete(transaction_tags).where(
+                transaction_tags.c.transaction_id == bindparam("txn_id"),
+                transaction_tags.c.tag_id.in_(select(Tag.id).where(Tag.namespace == "bucket").scalar_subquery()),
+            ),
+            [{"txn_id": txn_id} for txn_id in rebucketed_ids],
         )
-    )
-    if existing_result.scalar_one_or_none():
-        return False  # Already has this tag
+    if new_links:
+        await session.execute(insert(transaction_tags), new_links)
 
-    # Apply the tag
-    txn_tag = TransactionTag(transaction_id=transaction_id, tag_id=tag.id)
-    session.add(txn_tag)
-    return True
+    now = datetime.now(UTC)
+    for rule in rules:
+        if rule.id in rule_counts:
+            rule.match_count += rule_counts[rule.id]
+            rule.last_matched_date = now
+
+    return len(new_links), len(candidates), rule_counts
 
 
 @router.post("/apply")
@@ -264,58 +331,22 @@ async def apply_rules(session: AsyncSession = Depends(get_session)):
     if not rules:
         return {"applied_count": 0, "message": "No enabled rules found"}
 
-    # Get transactions without a bucket tag (have bucket:none or no bucket at all)
-    # For simplicity, we check all transactions and skip those with non-none bucket tags
-    txn_result = await session.execute(select(Transaction))
-    transactions = txn_result.scalars().all()
-
-    applied_count = 0
-    rule_stats: Dict[int, Dict[str, Any]] = {}
-
-    for txn in transactions:
-        # Check current bucket tag
-        current_bucket_result = await session.execute(
-            select(Tag)
-            .join(TransactionTag)
-            .where(and_(TransactionTag.transaction_id == txn.id, Tag.namespace == "bucket"))
-        )
-        current_bucket = current_bucket_result.scalar_one_or_none()
-
-        # Skip if already has a non-none bucket
-        if current_bucket and current_bucket.value != "none":
-            continue
-
-        # Try each rule in priority order
-        for rule in rules:
-            if match_rule(txn, rule):
-                # Apply the tag
-                applied = await apply_tag_to_transaction(session, txn.id, rule.tag)
-
-                if applied:
-                    # Update rule stats
-                    rule.match_count += 1
-                    rule.last_matched_date = datetime.now(UTC)
-
-                    # Track stats for response
-                    if rule.id not in rule_stats:
-                        rule_stats[rule.id] = {"name": rule.name, "tag": rule.tag, "count": 0}
-                    rule_stats[rule.id]["count"] += 1
-
-                    applied_count += 1
-
-                # For bucket tags, stop after first match
-                namespace, _ = parse_tag_string(rule.tag)
-                if namespace == "bucket":
-                    break
+    applied_count, checked_count, rule_counts = await apply_rules_in_bulk(session, rules, unbucketed_only=True)
 
     await session.commit()
 
+    rules_by_id = {rule.id: rule for rule in rules}
     return {
         "applied_count": applied_count,
-        "total_transactions_checked": len(transactions),
+        "total_transactions_checked": checked_count,
         "rules_applied": [
-            {"rule_id": rule_id, "rule_name": stats["name"], "tag": stats["tag"], "matches": stats["count"]}
-            for rule_id, stats in rule_stats.items()
+            {
+                "rule_id": rule_id,
+                "rule_name": rules_by_id[rule_id].name,
+                "tag": rules_by_id[rule_id].tag,
+                "matches": count,
+            }
+            for rule_id, count in rule_counts.items()
         ],
     }
 
@@ -336,22 +367,7 @@ async def apply_single_rule(rule_id: int, session: AsyncSession = Depends(get_se
     if not rule.enabled:
         raise bad_request(ErrorCode.RULE_DISABLED, rule_id=rule_id)
 
-    # Get all transactions
-    txn_result = await session.execute(select(Transaction))
-    transactions = txn_result.scalars().all()
-
-    applied_count = 0
-
-    for txn in transactions:
-        if match_rule(txn, rule):
-            applied = await apply_tag_to_transaction(session, txn.id, rule.tag)
-            if applied:
-                applied_count += 1
-
-    # Update rule stats
-    if applied_count > 0:
-        rule.match_count += applied_count
-        rule.last_matched_date = datetime.now(UTC)
+    applied_count, _, _ = await apply_rules_in_bulk(session, [rule], unbucketed_only=False)
 
     await session.commit()
 
@@ -1,23 +1,30 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func
 from typing import List, Optional
 from datetime import UTC, datetime
 from app.database import get_session
-from app.orm import Tag, TransactionTag, Transaction
-from app.schemas import TagCreate, TagUpdate, TagResponse, TagOrderUpdate
+from app.routers.conditional import TRANSACTION_TABLES, conditional_get
+from app.orm import Tag, TransactionTag
+from app.schemas import TagCreate, TagUpdate, TagResponse, TagUsageResponse, TagOrderUpdate
+from app.services.tag_stats import tag_stats, tags_with_usage
 from app.errors import ErrorCode, not_found, bad_request
 
-router = APIRouter(prefix="/api/v1/tags", tags=["tags"])
+router = APIRouter(prefix="/api/v1/tags", tags=["tags"], dependencies=[conditional_get(*TRANSACTION_TABLES)])
 
 
-@router.get("/", response_model=List[TagResponse])
+@router.get("/", response_model=List[TagUsageResponse])
 async def list_tags(
     namespace: Optional[str] = Query(None, description="Filter by namespace (e.g., 'bucket', 'occasion')"),
+    with_usage: bool = Query(False, description="Include each tag's usage_count"),
     session: AsyncSession = Depends(get_session),
 ):
     """List all tags, optionally filtered by namespace"""
+    if with_usage:
+        rows = await tags_with_usage(session, namespace)
+        return [TagUsageResponse.model_validate(tag).model_copy(update={"usage_count": count}) for tag, count in rows]
+
     query = select(Tag)
     if namespace:
         query = query.where(Tag.namespace == namespace)
@@ -154,118 +161,18 @@ async def reorder_tags(order: TagOrderUpdate, session: AsyncSession = Depends(ge
 
 
 @router.get("/accounts/stats")
-async def get_account_stats(session: AsyncSession = Depends(get_session)):
+async def get_account_stats(request: Request, session: AsyncSession = Depends(get_session)):
     """Get account statistics using account_tag_id foreign key for reliable counts"""
-    # Get account tags with aggregated transaction stats via account_tag_id FK
-    result = await session.execute(
-        select(
-            Tag,
-            func.count(Transaction.id).label("count"),
-            func.coalesce(func.sum(Transaction.amount), 0).label("total"),
-        )
-        .outerjoin(Transaction, Transaction.account_tag_id == Tag.id)
-        .where(Tag.namespace == "account")
-        .group_by(Tag.id)
-        .order_by(Tag.sort_order, Tag.value)
-    )
-
-    accounts = []
-    for row in result.fetchall():
-        tag = row[0]
-        accounts.append(
-            {
-                "id": tag.id,
-                "value": tag.value,
-                "description": tag.description,
-                "color": tag.color,
-                "sort_order": tag.sort_order,
-                "transaction_count": row[1],
-                "total_amount": float(row[2]),
-            }
-        )
-
-    return {"accounts": accounts}
+    return {"accounts": await tag_stats(session, "account", getattr(request.state, "data_tokens", None))}
 
 
 @router.get("/buckets/stats")
-async def get_bucket_stats(session: AsyncSession = Depends(get_session)):
+async def get_bucket_stats(request: Request, session: AsyncSession = Depends(get_session)):
     """Get bucket statistics including transaction counts and totals"""
-    # Get bucket tags
-    tags_result = await session.execute(
-        select(Tag).where(Tag.namespace == "bucket").order_by(Tag.sort_order, Tag.value)
-    )
-    bucket_tags = tags_result.scalars().all()
-
-    # Get usage counts for each bucket via transaction_tags
-    buckets = []
-    for tag in bucket_tags:
-        # Count transactions with this tag
-        count_result = await session.execute(
-            select(func.count()).select_from(TransactionTag).where(TransactionTag.tag_id == tag.id)
-        )
-        txn_count = count_result.scalar() or 0
-
-        # Get total amount for transactions with this tag
-        amount_result = await session.execute(
-            select(func.sum(Transaction.amount))
-            .select_from(Transaction)
-            .join(TransactionTag, Transaction.id == TransactionTag.transaction_id)
-            .where(TransactionTag.tag_id == tag.id)
-        )
-        total_amount = amount_result.scalar() or 0
-
-        buckets.append(
-            {
-                "id": tag.id,
-                "value": tag.value,
-                "description": tag.description,
-                "color": tag.color,
-                "sort_order": tag.sort_order,
-                "transaction_count": txn_count,
-                "total_amount": total_amount,
-            }
-        )
-
-    return {"buckets": buckets}
+    return {"buckets": await tag_stats(session, "bucket", getattr(request.state, "data_tokens", None))}
 
 
 @router.get("/occasions/stats")
-async def get_occasion_stats(session: AsyncSession = Depends(get_session)):
+async def get_occasion_stats(request: Request, session: AsyncSession = Depends(get_session)):
     """Get occasion statistics including transaction counts and totals"""
-    # Get occasion tags
-    tags_result = await session.execute(
-        select(Tag).where(Tag.namespace == "occasion").order_by(Tag.sort_order, Tag.value)
-    )
-    occasion_tags = tags_result.scalars().all()
-
-    # Get usage counts for each occasion via transaction_tags
-    occasions = []
-    for tag in occasion_tags:
-        # Count transactions with this tag
-        count_result = await session.execute(
-            select(func.count()).select_from(TransactionTag).where(TransactionTag.tag_id == tag.id)
-        )
-        txn_count = count_result.scalar() or 0
-
-        # Get total amount for transactions with this tag
-        amount_result = await session.execute(
-            select(func.sum(Transaction.amount))
-            .select_from(Transaction)
-            .join(TransactionTag, Transaction.id == TransactionTag.transaction_id)
-            .where(TransactionTag.tag_id == tag.id)
-        )
-        total_amount = amount_result.scalar() or 0
-
-        occasions.append(
-            {
-                "id": tag.id,
-                "value": tag.value,
-                "description": tag.description,
-                "color": tag.color,
-                "sort_order": tag.sort_order,
-                "transaction_count": txn_count,
-                "total_amount": total_amount,
-            }
-        )
-
-    return {"occasions": occasions}
+    return {"occasions": await tag_stats(session, "occasion", getattr(request.state, "data_tokens", None))}
@@ -2,12 +2,14 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import UTC, date, datetime
-import re
 
 from app.database import get_session
+from app.routers.conditional import TRANSACTION_TABLES, conditional_get
+from app.loader_profiles import TRANSACTION_WITH_TAGS, load_profile
 from app.orm import Transaction, Tag, TransactionTag, ReconciliationStatus
+from app.projections import EXPORT_ROWS
 from app.schemas import (
     TransactionCreate,
     TransactionUpdate,
@@ -17,8 +19,11 @@ from app.schemas import (
     TransactionSplitResponse,
     PaginatedTransactions,
 )
+from app.services.transaction_export import EXPORT_MEDIA_TYPES, export_chunks
+from app.services.transaction_search import search_clause, search_relevance
 from app.utils.hashing import compute_transaction_content_hash
 from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.regexp import MAX_REGEX_LENGTH, pattern_error
 from app.errors import ErrorCode, not_found, bad_request
 from sqlalchemy import and_
 from pydantic import BaseModel
@@ -33,24 +38,16 @@ class AddTagWithAmountRequest(BaseModel):
     amount: Optional[float] = None  # Split amount
 
 
-router = APIRouter(prefix="/api/v1/transactions", tags=["transactions"])
-
-# Maximum regex pattern length to prevent ReDoS attacks
-MAX_REGEX_LENGTH = 200
+router = APIRouter(
+    prefix="/api/v1/transactions", tags=["transactions"], dependencies=[conditional_get(*TRANSACTION_TABLES)]
+)
 
 
 def validate_regex_pattern(pattern: str) -> None:
     """Validate a regex pattern before use. Raises AppException on invalid patterns."""
-    if len(pattern) > MAX_REGEX_LENGTH:
-        raise bad_request(
-            ErrorCode.INVALID_REGEX,
-            f"Regex pattern too long (max {MAX_REGEX_LENGTH} characters)",
-            max_length=MAX_REGEX_LENGTH,
-        )
-    try:
-        re.compile(pattern)
-    except re.error as e:
-        raise bad_request(ErrorCode.INVALID_REGEX, f"Invalid regex pattern: {e}")
+    error = pattern_error(pattern)
+    if error is not None:
+        raise bad_request(ErrorCode.INVALID_REGEX, error, max_length=MAX_REGEX_LENGTH)
 
 
 def build_transaction_filter_query(
@@ -103,26 +100,20 @@ def build_transaction_filter_query(
         if search_regex:
             # Validate regex pattern before use to prevent ReDoS
             validate_regex_pattern(search)
-            # Regex search using SQLite REGEXP or PostgreSQL ~*
-            # SQLite requires regexp extension, PostgreSQL has built-in
-            # Use op('REGEXP') for SQLite compatibility
+            # Case-insensitive regex: SQLite REGEXP (app.utils.regexp, registered
+            # by app.database) or PostgreSQL ~*
             from sqlalchemy import or_
 
             query = query.where(
                 or_(
-                    Transaction.merchant.op("REGEXP")(search),
-                    Transaction.description.op("REGEXP")(search),
-                    Transaction.notes.op("REGEXP")(search),
+                    Transaction.merchant.regexp_match(search, flags="i"),
+                    Transaction.description.regexp_match(search, flags="i"),
+                    Transaction.notes.regexp_match(search, flags="i"),
                 )
             )
         else:
-            # Standard ILIKE search (case-insensitive substring)
-            search_pattern = f"%{search}%"
-            query = query.where(
-                (Transaction.merchant.ilike(search_pattern))
-                | (Transaction.description.ilike(search_pattern))
-                | (Transaction.notes.ilike(search_pattern))
-            )
+            # Full-text index search (word-prefix phrase match)
+            query = query.where(search_clause(search))
     if amount_min is not None:
         query = query.where(Transaction.amount >= amount_min)
     if amount_max is not None:
@@ -245,7 +236,7 @@ async def list_transactions_paginated(
     """
     from sqlalchemy import or_
 
-    base_query = select(Transaction)
+    base_query = TRANSACTION_WITH_TAGS.apply(select(Transaction))
     query = build_transaction_filter_query(
         base_query,
         account=account,
@@ -320,6 +311,7 @@ async def list_transactions(
     is_transfer: Optional[bool] = Query(
         None, description="Filter by transfer status (true=transfers only, false=non-transfers only)"
     ),
+    search_rank: bool = Query(False, description="Order search results by relevance (bm25) instead of date"),
     session: AsyncSession = Depends(get_session),
 ):
     """List transactions with filtering and pagination
@@ -330,10 +322,11 @@ async def list_transactions(
     - tag: Include transactions with specific tags (AND logic)
     - tag_exclude: Exclude transactions with specific tags
     - is_transfer: Filter by transfer status
-    - search: Search in merchant, description, and notes (substring or regex)
+    - search: Search in merchant, description, and notes (word prefix or regex)
     - search_regex: Enable regex pattern matching for search
+    - search_rank: Order search results by relevance, most relevant first
     """
-    base_query = select(Transaction)
+    base_query = TRANSACTION_WITH_TAGS.apply(select(Transaction))
     query = build_transaction_filter_query(
         base_query,
         account=account,
@@ -352,7 +345,12 @@ async def list_transactions(
         is_transfer=is_transfer,
     )
 
-    query = query.order_by(Transaction.date.desc()).offset(skip).limit(limit)
+    rank = search_relevance(search) if search and search_rank and not search_regex else None
+    if rank is not None:
+        query = query.order_by(rank, Transaction.date.desc())
+    else:
+        query = query.order_by(Transaction.date.desc())
+    query = query.offset(skip).limit(limit)
 
     result = await session.execute(query)
     transactions = result.scalars().all()
@@ -362,7 +360,9 @@ async def list_transactions(
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(transaction_id: int, session: AsyncSession = Depends(get_session)):
     """Get a single transaction by ID"""
-    result = await session.execute(select(Transaction).where(Transaction.id == transaction_id))
+    result = await session.execute(
+        TRANSACTION_WITH_TAGS.apply(select(Transaction).where(Transaction.id == transaction_id))
+    )
     transaction = result.scalar_one_or_none()
     if not transaction:
         raise not_found(ErrorCode.TRANSACTION_NOT_FOUND, transaction_id=transaction_id)
@@ -387,6 +387,7 @@ async def create_transaction(transaction: TransactionCreate, session: AsyncSessi
     session.add(db_transaction)
     await session.commit()
     await session.refresh(db_transaction)
+    await load_profile(session, [db_transaction], TRANSACTION_WITH_TAGS)
     return db_transaction
 
 
@@ -408,6 +409,7 @@ async def update_transaction(
 
     await session.commit()
     await session.refresh(db_transaction)
+    await load_profile(session, [db_transaction], TRANSACTION_WITH_TAGS)
     return db_transaction
 
 
@@ -711,8 +713,9 @@ async def clear_transaction_splits(transaction_id: int, session: AsyncSession =
     return {"message": "Splits cleared", "transaction_id": transaction_id, "removed": deleted_count}
 
 
-@router.get("/export/csv")
-async def export_transactions_csv(
+@router.get("/export/{export_format}")
+async def export_transactions(
+    export_format: Literal["csv", "ndjson"],
     account_source: Optional[str] = None,
     account: Optional[List[str]] = Query(
         None, description="Filter by account tag values (can specify multiple, OR logic)"
@@ -733,21 +736,20 @@ async def export_transactions_csv(
         None, description="Exclude tags in namespace:value format (can specify multiple)"
     ),
     is_transfer: Optional[bool] = Query(None, description="Filter by transfer status"),
+    gzip: bool = Query(False, description="Compress the response (Content-Encoding: gzip)"),
     session: AsyncSession = Depends(get_session),
 ):
-    """Export transactions matching filters as CSV.
+    """Export transactions matching filters as CSV or NDJSON.
 
-    Returns a streaming CSV response with all matching transactions.
-    No pagination limit - exports all matching records.
+    Rows are streamed from the database and encoded as they arrive, so
+    memory use does not depend on the size of the export. No pagination
+    limit - exports all matching records.
     """
     from fastapi.responses import StreamingResponse
-    import csv
-    import io
 
-    # Build query (no limit for export)
-    base_query = select(Transaction)
+    # Build query (no limit for export), selecting only the exported columns
     query = build_transaction_filter_query(
-        base_query,
+        EXPORT_ROWS.select(),
         account=account,
         account_exclude=account_exclude,
         account_source=account_source,
@@ -763,61 +765,22 @@ async def export_transactions_csv(
         tag_exclude=tag_exclude,
         is_transfer=is_transfer,
     )
-
     query = query.order_by(Transaction.date.desc())
 
-    result = await session.execute(query)
-    transactions = result.scalars().all()
-
-    # Generate CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Write header
-    writer.writerow(
-        [
-            "Date",
-            "Amount",
-            "Merchant",
-            "Description",
-            "Account",
-            "Category",
-            "Status",
-            "Notes",
-            "Is Transfer",
-            "Reference ID",
-        ]
-    )
-
-    # Write data
-    for txn in transactions:
-        writer.writerow(
-            [
-                txn.date.isoformat() if txn.date else "",
-                txn.amount,
-                txn.merchant or "",
-                txn.description or "",
-                txn.account_source or "",
-                txn.category or "",
-                txn.reconciliation_status or "",  # Already a string
-                txn.notes or "",
-                "Yes" if txn.is_transfer else "No",
-                txn.reference_id or "",
-            ]
-        )
-
-    output.seek(0)
-
     # Generate filename with date range if provided
     filename_parts = ["transactions"]
     if start_date:
         filename_parts.append(f"from_{start_date.isoformat()}")
     if end_date:
         filename_parts.append(f"to_{end_date.isoformat()}")
-    filename = "_".join(filename_parts) + ".csv"
+    filename = "_".join(filename_parts) + f".{export_format}"
 
+    chunks = await export_chunks(session, query, export_format, compress=gzip)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=headers,
     )
@@ -10,6 +10,7 @@ import re
 
 from app.database import get_session
 from app.orm import Transaction
+from app.projections import TRANSACTION_ROWS
 from app.errors import ErrorCode, not_found, bad_request
 
 
@@ -74,13 +75,12 @@ async def get_transfer_suggestions(limit: int = 50, session: AsyncSession = Depe
     Useful for reviewing and confirming suggested transfers.
     """
     # Get transactions not already marked as transfer
-    result = await session.execute(
-        select(Transaction)
-        .where(Transaction.is_transfer.is_(False))
+    transactions = await TRANSACTION_ROWS.fetch(
+        session,
+        TRANSACTION_ROWS.select(Transaction.is_transfer.is_(False))
         .order_by(Transaction.date.desc())
-        .limit(500)  # Check more than we return to find matches
+        .limit(500),  # Check more than we return to find matches
     )
-    transactions = result.scalars().all()
 
     suggestions = []
     for txn in transactions:
@@ -85,6 +85,10 @@ class TagResponse(TimestampResponse):
     credit_limit: Optional[float] = None
 
 
+class TagUsageResponse(TagResponse):
+    usage_count: Optional[int] = None  # Transactions assigned the tag; set when listed with_usage
+
+
 # ============================================================================
 # Transaction Schemas
 # ============================================================================
@@ -404,6 +408,8 @@ class MerchantAliasResponse(TimestampResponse):
     priority: int
     match_count: int
     last_matched_date: Optional[datetime] = None
+    # Why a stored regex pattern is refused; such an alias never matches
+    pattern_error: Optional[str] = None
 
 
 # ============================================================================
@@ -26,6 +26,7 @@ from sqlalchemy import ColumnElement, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.errors import ErrorCode, bad_request, not_found
+from app.loader_profiles import DASHBOARD_WITH_WIDGETS
 from app.orm import (
     Budget,
     BudgetPeriod,
@@ -36,7 +37,8 @@ from app.orm import (
     Transaction,
     TransactionTag,
 )
-from app.routers.report_helpers import get_transaction_tags
+from app.projections import REPORT_ROWS
+from app.routers.report_helpers import aggregate_window, get_transaction_tags
 
 from .tokenizer import Tokenizer
 
@@ -148,35 +150,26 @@ async def _read_list_budgets(ctx: AssistantContext, args: dict) -> Any:
 
 async def _read_spending_summary(ctx: AssistantContext, args: dict) -> Any:
     start, end = _parse_date(args.get("start_date")), _parse_date(args.get("end_date"))
-    rows = (await ctx.session.execute(select(Transaction).where(*_spending_filters(start, end)))).scalars().all()
-    income = sum(t.amount for t in rows if t.amount > 0)
-    expenses = abs(sum(t.amount for t in rows if t.amount < 0))
+    # Transfers excluded; whole-month ranges are read from the monthly rollups
+    (totals,) = await aggregate_window(ctx.session, [], start, end, end_inclusive=True)
+    income, expenses = float(totals.income), float(totals.expenses)
     return {
         "start_date": start.isoformat() if start else None,
         "end_date": end.isoformat() if end else None,
         "total_income": round(income, 2),
         "total_expenses": round(expenses, 2),
         "net": round(income - expenses, 2),
-        "transaction_count": len(rows),
+        "transaction_count": int(totals._mapping["count"]),
     }
 
 
 async def _read_spending_by_bucket(ctx: AssistantContext, args: dict) -> Any:
     start, end = _parse_date(args.get("start_date")), _parse_date(args.get("end_date"))
-    rows = (await ctx.session.execute(select(Transaction).where(*_spending_filters(start, end)))).scalars().all()
-    txn_tags = await get_transaction_tags(ctx.session, [t.id for t in rows])
-    breakdown: dict[str, dict[str, float]] = {}
-    for t in rows:
-        if t.amount >= 0:
-            continue
-        bucket = txn_tags.get(t.id, "Untagged")  # bucket values are categories, not PII
-        entry = breakdown.setdefault(bucket, {"amount": 0.0, "count": 0})
-        entry["amount"] += abs(t.amount)
-        entry["count"] += 1
-    # Sort the (typed) breakdown by amount first, then shape the response dicts.
+    rows = await aggregate_window(ctx.session, ["bucket"], start, end, end_inclusive=True, expenses_only=True)
+    # bucket values are categories, not PII
     ranked = [
-        {"bucket": k, "amount": round(v["amount"], 2), "count": int(v["count"])}
-        for k, v in sorted(breakdown.items(), key=lambda kv: kv[1]["amount"], reverse=True)
+        {"bucket": row.bucket, "amount": round(float(row.expenses), 2), "count": int(row._mapping["count"])}
+        for row in sorted(rows, key=lambda row: float(row.expenses), reverse=True)
     ]
     return {"by_bucket": ranked}
 
@@ -184,7 +177,7 @@ async def _read_spending_by_bucket(ctx: AssistantContext, args: dict) -> Any:
 async def _read_top_merchants(ctx: AssistantContext, args: dict) -> Any:
     start, end = _parse_date(args.get("start_date")), _parse_date(args.get("end_date"))
     limit = min(int(args.get("limit", 10) or 10), 50)
-    rows = (await ctx.session.execute(select(Transaction).where(*_spending_filters(start, end)))).scalars().all()
+    rows = await REPORT_ROWS.fetch(ctx.session, REPORT_ROWS.select(*_spending_filters(start, end)))
     totals: dict[str, float] = {}
     for t in rows:
         if t.merchant and t.amount < 0:
@@ -226,7 +219,8 @@ async def _read_list_transactions(ctx: AssistantContext, args: dict) -> Any:
 
 
 async def _read_list_dashboards(ctx: AssistantContext, args: dict) -> Any:
-    rows = (await ctx.session.execute(select(Dashboard).order_by(Dashboard.position))).scalars().all()
+    query = DASHBOARD_WITH_WIDGETS.apply(select(Dashboard).order_by(Dashboard.position))
+    rows = (await ctx.session.execute(query)).scalars().all()
     # Dashboard names/widget types are user-defined labels, not PII.
     return {
         "dashboards": [
@@ -406,7 +400,7 @@ def _sum_update_dashboard(args: dict) -> str:
 
 async def _exec_add_widget(ctx: AssistantContext, args: dict) -> Any:
     dashboard_id = int(args["dashboard_id"])
-    dashboard = await ctx.session.get(Dashboard, dashboard_id)
+    dashboard = await ctx.session.get(Dashboard, dashboard_id, options=DASHBOARD_WITH_WIDGETS.options())
     if dashboard is None:
         raise not_found(ErrorCode.DASHBOARD_NOT_FOUND, f"Dashboard {dashboard_id} not found.")
     widget_type = str(args["widget_type"])
@@ -1,22 +1,106 @@
 """
 SQLite backup service for creating, restoring, and managing database backups.
 
-Backups are stored as gzip-compressed copies of the SQLite database file.
+Backups are compressed snapshots of the SQLite database. The snapshot is taken
+with SQLite's online backup API (sqlite3.Connection.backup), BACKUP_STEP_PAGES
+pages per step: other connections keep reading and writing between steps, and
+the copy is always a consistent database that includes pages still in the WAL.
+It is then stored in one of two BACKUP_FORMATs, compressed with
+BACKUP_COMPRESSION at BACKUP_COMPRESSION_LEVEL:
+
+- archive: one compressed copy of the database per backup
+- chunked: the snapshot is split into BACKUP_CHUNK_KIB chunks stored once each
+  under chunks/, named by their SHA-256; the backup file only lists the
+  hashes. SQLite updates pages in place, so fixed-size, page-aligned chunks
+  of an unchanged page always hash the same, and a backup after a small
+  change only writes the few chunks that differ. Chunks no backup lists are
+  removed by collect_garbage()
+
+create_backup() blocks until the file is written, so async callers run it in a
+worker thread. A running backup reports its progress in
+BackupService.progress; a finished one records its size, duration and
+throughput in its metadata.
+
 A manifest.json file tracks backup metadata.
 """
 
+import bz2
 import gzip
+import hashlib
 import json
+import lzma
 import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Literal
+from typing import IO, Any, Callable, Literal
 
 from pydantic import BaseModel
 
 from app.config import settings
 from app.database import DATABASE_URL
 
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:  # pragma: no cover - older interpreters
+    zstd = None
+
+# Bytes moved per read/write while compressing or restoring
+COPY_CHUNK_BYTES = 1024 * 1024
+# Directory of chunked backups' chunks, inside BACKUP_DIR
+CHUNKS_DIR = "chunks"
+# Suffix of a chunked backup's list of chunks
+CHUNK_INDEX_SUFFIX = ".chunks.json"
+
+BackupFormat = Literal["archive", "chunked"]
+
+
+def _open_zstd(path: Path, mode: str, **kwargs: Any) -> IO[bytes]:
+    if zstd is None:
+        raise ValueError("zstd backups need Python 3.14 or newer")
+    return zstd.open(path, mode, **kwargs)
+
+
+@dataclass(frozen=True)
+class Compression:
+    """How backup files of one BACKUP_COMPRESSION algorithm are named and opened."""
+
+    suffix: str  # Appended to ".db" in the filename
+    open_read: Callable[[Path], IO[bytes]]
+    open_write: Callable[[Path, int], IO[bytes]]  # (path, level)
+
+
+COMPRESSIONS: dict[str, Compression] = {
+    "gzip": Compression(".gz", gzip.open, lambda path, level: gzip.open(path, "wb", compresslevel=level)),
+    "bz2": Compression(".bz2", bz2.open, lambda path, level: bz2.open(path, "wb", compresslevel=level)),
+    "xz": Compression(".xz", lzma.open, lambda path, level: lzma.open(path, "wb", preset=level)),
+    "zstd": Compression(
+        ".zst", lambda path: _open_zstd(path, "rb"), lambda path, level: _open_zstd(path, "wb", level=level)
+    ),
+    "none": Compression("", lambda path: open(path, "rb"), lambda path, level: open(path, "wb")),
+}
+
+
+def get_compression(name: str) -> Compression:
+    """The Compression for a BACKUP_COMPRESSION value."""
+    try:
+        return COMPRESSIONS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported backup compression: {name} (expected one of {', '.join(COMPRESSIONS)})")
+
+
+class BackupProgress(BaseModel):
+    """Progress of the backup being created."""
+
+    id: str
+    started_at: datetime
+    phase: Literal["snapshot", "compress"] = "snapshot"
+    pages_total: int = 0
+    pages_copied: int = 0  # Of pages_total; the snapshot restarts if another connection writes
+
 
 class BackupMetadata(BaseModel):
     """Metadata for a database backup."""
@@ -30,6 +114,13 @@ class BackupMetadata(BaseModel):
     source: Literal["manual", "scheduled", "pre_import", "demo_seed"] = "manual"
     db_version: str | None = None
     tier: Literal["hourly", "daily", "weekly", "monthly"] = "hourly"
+    format: BackupFormat = "archive"
+    compression: str = "gzip"  # BACKUP_COMPRESSION the file was written with
+    database_bytes: int | None = None  # Snapshot size before compression
+    duration_seconds: float | None = None  # Snapshot plus compression
+    throughput_bytes_per_second: float | None = None  # database_bytes / duration_seconds
+    chunk_count: int | None = None  # Chunks the database was split into (chunked)
+    new_chunk_count: int | None = None  # Chunks not already stored by an earlier backup (chunked)
 
 
 class BackupManifest(BaseModel):
@@ -46,6 +137,11 @@ class BackupService:
         self.backup_dir = Path(settings.backup_dir)
         self.manifest_path = self.backup_dir / "manifest.json"
         self._db_path: Path | None = None
+        self.progress: BackupProgress | None = None
+        # One backup at a time, re-entered by the cleanup that ends it; manifest
+        # updates from worker threads do not interleave
+        self._backup_lock = threading.RLock()
+        self._manifest_lock = threading.RLock()
 
     @property
     def db_path(self) -> Path:
@@ -82,6 +178,150 @@ class BackupService:
         with open(self.manifest_path, "w") as f:
             json.dump(manifest.model_dump(mode="json"), f, indent=2, default=str)
 
+    def _snapshot(self, target: Path) -> None:
+        """Copy the database to ``target`` with the online backup API.
+
+        Each step holds a read lock for BACKUP_STEP_PAGES pages only. If
+        another connection writes in between, SQLite restarts the copy, so the
+        result is always one consistent state of the database.
+        """
+
+        def record(status: int, remaining: int, total: int) -> None:
+            if self.progress is not None:
+                self.progress.pages_total = total
+                self.progress.pages_copied = total - remaining
+
+        source = sqlite3.connect(self.db_path)
+        try:
+            dest = sqlite3.connect(target)
+            try:
+                source.backup(dest, pages=max(settings.backup_step_pages, 1), progress=record)
+                # A WAL-mode database hands its journal mode to the copy; store it as one file
+                dest.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                dest.close()
+        finally:
+            source.close()
+
+    def _backup_suffix(self, backup_format: str, compression: str) -> str:
+        """Filename suffix after the backup ID."""
+        if backup_format == "chunked":
+            return CHUNK_INDEX_SUFFIX
+        return f".db{get_compression(compression).suffix}"
+
+    def _chunk_path(self, digest: str, compression: Compression) -> Path:
+        return self.backup_dir / CHUNKS_DIR / digest[:2] / f"{digest}{compression.suffix}"
+
+    def _store_chunks(self, snapshot_path: Path, index_path: Path, compression_name: str) -> tuple[int, int, int]:
+        """Write the chunks of ``snapshot_path`` that are not stored yet, and the backup's index.
+
+        Returns the number of chunks, how many of them were new and the bytes written.
+        """
+        compression = get_compression(compression_name)
+        chunk_bytes = max(settings.backup_chunk_kib, 1) * 1024
+        digests: list[str] = []
+        new_chunks = 0
+        written = 0
+        with open(snapshot_path, "rb") as f_in:
+            while chunk := f_in.read(chunk_bytes):
+                digest = hashlib.sha256(chunk).hexdigest()
+                digests.append(digest)
+                path = self._chunk_path(digest, compression)
+                if path.exists():
+                    continue
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Write under a temporary name so an interrupted write is never taken for the chunk
+                partial = path.with_name(f"{path.name}.partial")
+                with compression.open_write(partial, settings.backup_compression_level) as f_out:
+                    f_out.write(chunk)
+                partial.replace(path)
+                new_chunks += 1
+                written += path.stat().st_size
+
+        index = {
+            "version": 1,
+            "database_bytes": snapshot_path.stat().st_size,
+            "chunk_bytes": chunk_bytes,
+            "compression": compression_name,
+            "chunks": digests,
+        }
+        index_path.write_text(json.dumps(index))
+        return len(digests), new_chunks, written + index_path.stat().st_size
+
+    def _replace_database(self, write: Callable[[IO[bytes]], None]) -> None:
+        """Write a new database file with ``write`` beside the live one, then swap it in."""
+        target = Path(f"{self.db_path}.restoring")
+        try:
+            with open(target, "wb") as f_out:
+                write(f_out)
+            # The live database is only replaced once the whole backup has been read
+            target.replace(self.db_path)
+        except BaseException:
+            target.unlink(missing_ok=True)
+            raise
+
+    def _restore_chunks(self, index_path: Path) -> None:
+        """Reassemble the database from a chunked backup, checking every chunk's hash."""
+        index = json.loads(index_path.read_text())
+        compression = get_compression(index["compression"])
+
+        def write(f_out: IO[bytes]) -> None:
+            for digest in index["chunks"]:
+                with compression.open_read(self._chunk_path(digest, compression)) as f_in:
+                    chunk = f_in.read()
+                if hashlib.sha256(chunk).hexdigest() != digest:
+                    raise ValueError(f"Backup chunk is corrupt: {digest}")
+                f_out.write(chunk)
+
+        self._replace_database(write)
+
+    def _restore_archive(self, archive_path: Path, compression_name: str) -> None:
+        """Decompress a single-file backup over the database."""
+
+        def write(f_out: IO[bytes]) -> None:
+            with get_compression(compression_name).open_read(archive_path) as f_in:
+                shutil.copyfileobj(f_in, f_out, COPY_CHUNK_BYTES)
+
+        self._replace_database(write)
+
+    def collect_garbage(self) -> int:
+        """
+        Delete stored chunks that no chunked backup in the manifest lists.
+
+        Skipped while another thread is creating a backup, since its new
+        chunks are not in the manifest yet; the next cleanup collects them.
+
+        Returns:
+            Number of chunks deleted
+        """
+        chunks_dir = self.backup_dir / CHUNKS_DIR
+        if not chunks_dir.exists() or not self._backup_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._manifest_lock:
+                referenced: set[str] = set()
+                for backup in self._load_manifest().backups:
+                    index_path = self.backup_dir / backup.filename
+                    if backup.format != "chunked" or not index_path.exists():
+                        continue
+                    index = json.loads(index_path.read_text())
+                    suffix = get_compression(index["compression"]).suffix
+                    referenced.update(f"{digest}{suffix}" for digest in index["chunks"])
+
+                deleted = 0
+                for path in chunks_dir.glob("*/*"):
+                    if path.name not in referenced:
+                        path.unlink()
+                        deleted += 1
+                return deleted
+        finally:
+            self._backup_lock.release()
+
+    def _remove_wal_files(self) -> None:
+        """Remove -wal/-shm sidecars that belong to the database being replaced."""
+        for suffix in ("-wal", "-shm"):
+            Path(f"{self.db_path}{suffix}").unlink(missing_ok=True)
+
     def _get_app_version(self) -> str | None:
         """Get the current app version from pyproject.toml or package."""
         try:
@@ -114,44 +354,81 @@ class BackupService:
         Returns:
             BackupMetadata for the created backup
         """
-        self._ensure_backup_dir()
-
-        # Generate backup ID and filename (new backups start as "hourly")
-        backup_id = self._generate_backup_id()
-        filename = f"wallet_hourly_{backup_id}.db.gz"
-        backup_path = self.backup_dir / filename
-
-        # Copy and compress the database
-        with open(self.db_path, "rb") as f_in:
-            with gzip.open(backup_path, "wb") as f_out:
-                shutil.copyfileobj(f_in, f_out)
-
-        # Create metadata (new backups start as "hourly" tier)
-        metadata = BackupMetadata(
-            id=backup_id,
-            filename=filename,
-            description=description or f"Backup created at {datetime.now(timezone.utc).isoformat()}",
-            created_at=datetime.now(timezone.utc),
-            size_bytes=backup_path.stat().st_size,
-            is_demo_backup=is_demo_backup,
-            source=source,
-            db_version=self._get_app_version(),
-            tier="hourly",
-        )
-
-        # Update manifest
-        manifest = self._load_manifest()
-
-        # If this is a demo backup, unmark any existing demo backup
-        if is_demo_backup:
-            for backup in manifest.backups:
-                backup.is_demo_backup = False
-
-        manifest.backups.append(metadata)
-        self._save_manifest(manifest)
-
-        # Run cleanup after creating backup
-        self.cleanup_old_backups(retention_count=retention_count)
+        with self._backup_lock:
+            backup_format = settings.backup_format.lower()
+            if backup_format not in ("archive", "chunked"):
+                raise ValueError(f"Unsupported backup format: {settings.backup_format} (expected archive or chunked)")
+            compression_name = settings.backup_compression.lower()
+            compression = get_compression(compression_name)
+            if not self.db_path.exists():
+                raise FileNotFoundError(f"Database file not found: {self.db_path}")
+            self._ensure_backup_dir()
+
+            # Generate backup ID and filename (new backups start as "hourly")
+            backup_id = self._generate_backup_id()
+            filename = f"wallet_hourly_{backup_id}{self._backup_suffix(backup_format, compression_name)}"
+            backup_path = self.backup_dir / filename
+            snapshot_path = self.backup_dir / f".snapshot_{backup_id}.db"
+
+            started = time.monotonic()
+            progress = BackupProgress(id=backup_id, started_at=datetime.now(timezone.utc))
+            self.progress = progress
+            try:
+                self._snapshot(snapshot_path)
+                database_bytes = snapshot_path.stat().st_size
+                progress.phase = "compress"
+                chunk_count = new_chunk_count = None
+                if backup_format == "chunked":
+                    chunk_count, new_chunk_count, size_bytes = self._store_chunks(
+                        snapshot_path, backup_path, compression_name
+                    )
+                else:
+                    with open(snapshot_path, "rb") as f_in:
+                        with compression.open_write(backup_path, settings.backup_compression_level) as f_out:
+                            shutil.copyfileobj(f_in, f_out, COPY_CHUNK_BYTES)
+                    size_bytes = backup_path.stat().st_size
+            except BaseException:
+                backup_path.unlink(missing_ok=True)
+                raise
+            finally:
+                for suffix in ("", "-journal", "-wal", "-shm"):
+                    Path(f"{snapshot_path}{suffix}").unlink(missing_ok=True)
+                self.progress = None
+            duration = time.monotonic() - started
+
+            # Create metadata (new backups start as "hourly" tier)
+            metadata = BackupMetadata(
+                id=backup_id,
+                filename=filename,
+                description=description or f"Backup created at {datetime.now(timezone.utc).isoformat()}",
+                created_at=datetime.now(timezone.utc),
+                size_bytes=size_bytes,
+                is_demo_backup=is_demo_backup,
+                source=source,
+                db_version=self._get_app_version(),
+                tier="hourly",
+                format=backup_format,
+                compression=compression_name,
+                database_bytes=database_bytes,
+                duration_seconds=round(duration, 3),
+                throughput_bytes_per_second=round(database_bytes / duration) if duration > 0 else None,
+                chunk_count=chunk_count,
+                new_chunk_count=new_chunk_count,
+            )
+
+            with self._manifest_lock:
+                manifest = self._load_manifest()
+
+                # If this is a demo backup, unmark any existing demo backup
+                if is_demo_backup:
+                    for backup in manifest.backups:
+                        backup.is_demo_backup = False
+
+                manifest.backups.append(metadata)
+                self._save_manifest(manifest)
+
+                # Run cleanup after creating backup
+                self.cleanup_old_backups(retention_count=retention_count)
 
         return metadata
 
@@ -172,6 +449,10 @@ class BackupService:
         """
         Restore the database from a backup.
 
+        Blocking; waits for a backup or garbage collection in progress, so
+        neither reads the database or chunks while they are replaced. Call it
+        from a worker thread.
+
         Args:
             backup_id: ID of the backup to restore
 
@@ -186,10 +467,14 @@ class BackupService:
         if not backup_path.exists():
             raise FileNotFoundError(f"Backup file not found: {backup_path}")
 
-        # Decompress and replace the database
-        with gzip.open(backup_path, "rb") as f_in:
-            with open(self.db_path, "wb") as f_out:
-                shutil.copyfileobj(f_in, f_out)
+        with self._backup_lock:
+            # Decompress beside the database and swap it in; a leftover WAL
+            # would be replayed on top of the restored file
+            if backup.format == "chunked":
+                self._restore_chunks(backup_path)
+            else:
+                self._restore_archive(backup_path, backup.compression)
+            self._remove_wal_files()
 
         return True
 
@@ -217,9 +502,12 @@ class BackupService:
             backup_path.unlink()
 
         # Update manifest
-        manifest = self._load_manifest()
-        manifest.backups = [b for b in manifest.backups if b.id != backup_id]
-        self._save_manifest(manifest)
+        with self._manifest_lock:
+            manifest = self._load_manifest()
+            manifest.backups = [b for b in manifest.backups if b.id != backup_id]
+            self._save_manifest(manifest)
+        if backup.format == "chunked":
+            self.collect_garbage()
 
         return True
 
@@ -244,109 +532,114 @@ class BackupService:
         """
         from datetime import timedelta
 
-        manifest = self._load_manifest()
-        now = datetime.now(timezone.utc)
+        with self._manifest_lock:
+            manifest = self._load_manifest()
+            now = datetime.now(timezone.utc)
 
-        # Separate demo backup from regular backups
-        demo_backup = next((b for b in manifest.backups if b.is_demo_backup), None)
-        regular_backups = [b for b in manifest.backups if not b.is_demo_backup]
+            # Separate demo backup from regular backups
+            demo_backup = next((b for b in manifest.backups if b.is_demo_backup), None)
+            regular_backups = [b for b in manifest.backups if not b.is_demo_backup]
 
-        # Sort by creation date (newest first)
-        regular_backups.sort(key=lambda b: b.created_at, reverse=True)
+            # Sort by creation date (newest first)
+            regular_backups.sort(key=lambda b: b.created_at, reverse=True)
 
-        # Track which backups to keep and their tier
-        # Higher tier = more important (monthly > weekly > daily > hourly)
-        backup_tiers: dict[str, Literal["hourly", "daily", "weekly", "monthly"]] = {}
+            # Track which backups to keep and their tier
+            # Higher tier = more important (monthly > weekly > daily > hourly)
+            backup_tiers: dict[str, Literal["hourly", "daily", "weekly", "monthly"]] = {}
 
-        # Tier 1: Keep all backups from last 24 hours (hourly)
-        cutoff_24h = now - timedelta(hours=24)
-        for backup in regular_backups:
-            if backup.created_at >= cutoff_24h:
-                backup_tiers[backup.id] = "hourly"
+            # Tier 1: Keep all backups from last 24 hours (hourly)
+            cutoff_24h = now - timedelta(hours=24)
+            for backup in regular_backups:
+                if backup.created_at >= cutoff_24h:
+                    backup_tiers[backup.id] = "hourly"
+
+            # Tier 2: Keep one backup per day for last 7 days (daily)
+            for days_ago in range(1, 8):
+                day_start = (now - timedelta(days=days_ago)).replace(hour=0, minute=0, second=0, microsecond=0)
+                day_end = day_start + timedelta(days=1)
+
+                # Find the newest backup from that day
+                for backup in regular_backups:
+                    if day_start <= backup.created_at < day_end:
+                        # Upgrade tier if this is a higher tier
+                        if backup.id not in backup_tiers or backup_tiers[backup.id] == "hourly":
+                            backup_tiers[backup.id] = "daily"
+                        break  # Keep only the newest from that day
+
+            # Tier 3: Keep one backup per week for last 4 weeks (weekly)
+            for weeks_ago in range(1, 5):
+                # Start of the week (Monday)
+                week_start = now - timedelta(weeks=weeks_ago)
+                week_start = week_start - timedelta(days=week_start.weekday())
+                week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
+                week_end = week_start + timedelta(weeks=1)
+
+                # Find the newest backup from that week
+                for backup in regular_backups:
+                    if week_start <= backup.created_at < week_end:
+                        # Upgrade tier if this is a higher tier
+                        if backup.id not in backup_tiers or backup_tiers[backup.id] in ("hourly", "daily"):
+                            backup_tiers[backup.id] = "weekly"
+                        break
+
+            # Tier 4: Keep one backup per month for last 12 months (monthly)
+            for months_ago in range(1, 13):
+                # Calculate month boundaries
+                year = now.year
+                month = now.month - months_ago
+                while month <= 0:
+                    month += 12
+                    year -= 1
+
+                month_start = datetime(year, month, 1, tzinfo=timezone.utc)
+                if month == 12:
+                    month_end = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+                else:
+                    month_end = datetime(year, month + 1, 1, tzinfo=timezone.utc)
 
-        # Tier 2: Keep one backup per day for last 7 days (daily)
-        for days_ago in range(1, 8):
-            day_start = (now - timedelta(days=days_ago)).replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start + timedelta(days=1)
+                # Find the newest backup from that month
+                for backup in regular_backups:
+                    if month_start <= backup.created_at < month_end:
+                        # Monthly is highest tier
+                        backup_tiers[backup.id] = "monthly"
+                        break
 
-            # Find the newest backup from that day
-            for backup in regular_backups:
-                if day_start <= backup.created_at < day_end:
-                    # Upgrade tier if this is a higher tier
-                    if backup.id not in backup_tiers or backup_tiers[backup.id] == "hourly":
-                        backup_tiers[backup.id] = "daily"
-                    break  # Keep only the newest from that day
-
-        # Tier 3: Keep one backup per week for last 4 weeks (weekly)
-        for weeks_ago in range(1, 5):
-            # Start of the week (Monday)
-            week_start = now - timedelta(weeks=weeks_ago)
-            week_start = week_start - timedelta(days=week_start.weekday())
-            week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-            week_end = week_start + timedelta(weeks=1)
-
-            # Find the newest backup from that week
-            for backup in regular_backups:
-                if week_start <= backup.created_at < week_end:
-                    # Upgrade tier if this is a higher tier
-                    if backup.id not in backup_tiers or backup_tiers[backup.id] in ("hourly", "daily"):
-                        backup_tiers[backup.id] = "weekly"
-                    break
-
-        # Tier 4: Keep one backup per month for last 12 months (monthly)
-        for months_ago in range(1, 13):
-            # Calculate month boundaries
-            year = now.year
-            month = now.month - months_ago
-            while month <= 0:
-                month += 12
-                year -= 1
-
-            month_start = datetime(year, month, 1, tzinfo=timezone.utc)
-            if month == 12:
-                month_end = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
-            else:
-                month_end = datetime(year, month + 1, 1, tzinfo=timezone.utc)
+            # Process backups: delete those not kept, rename those with tier changes
+            deleted_count = 0
+            remaining_backups: list[BackupMetadata] = []
 
-            # Find the newest backup from that month
             for backup in regular_backups:
-                if month_start <= backup.created_at < month_end:
-                    # Monthly is highest tier
-                    backup_tiers[backup.id] = "monthly"
-                    break
-
-        # Process backups: delete those not kept, rename those with tier changes
-        deleted_count = 0
-        remaining_backups: list[BackupMetadata] = []
-
-        for backup in regular_backups:
-            if backup.id in backup_tiers:
-                new_tier = backup_tiers[backup.id]
-
-                # Rename file if tier changed
-                if backup.tier != new_tier:
-                    old_path = self.backup_dir / backup.filename
-                    new_filename = f"wallet_{new_tier}_{backup.id}.db.gz"
-                    new_path = self.backup_dir / new_filename
-
-                    if old_path.exists():
-                        old_path.rename(new_path)
-                        backup.filename = new_filename
-                    backup.tier = new_tier
-
-                remaining_backups.append(backup)
-            else:
-                # Delete the file
-                backup_path = self.backup_dir / backup.filename
-                if backup_path.exists():
-                    backup_path.unlink()
-                deleted_count += 1
-
-        # Rebuild manifest with remaining backups
-        if demo_backup:
-            remaining_backups.append(demo_backup)
-        manifest.backups = remaining_backups
-        self._save_manifest(manifest)
+                if backup.id in backup_tiers:
+                    new_tier = backup_tiers[backup.id]
+
+                    # Rename file if tier changed
+                    if backup.tier != new_tier:
+                        old_path = self.backup_dir / backup.filename
+                        new_filename = (
+                            f"wallet_{new_tier}_{backup.id}{self._backup_suffix(backup.format, backup.compression)}"
+                        )
+                        new_path = self.backup_dir / new_filename
+
+                        if old_path.exists():
+                            old_path.rename(new_path)
+                            backup.filename = new_filename
+                        backup.tier = new_tier
+
+                    remaining_backups.append(backup)
+                else:
+                    # Delete the file
+                    backup_path = self.backup_dir / backup.filename
+                    if backup_path.exists():
+                        backup_path.unlink()
+                    deleted_count += 1
+
+            # Rebuild manifest with remaining backups
+            if demo_backup:
+                remaining_backups.append(demo_backup)
+            manifest.backups = remaining_backups
+            self._save_manifest(manifest)
+            if deleted_count:
+                self.collect_garbage()
 
         return deleted_count
 
@@ -365,20 +658,21 @@ class BackupService:
         Returns:
             True if successful
         """
-        manifest = self._load_manifest()
+        with self._manifest_lock:
+            manifest = self._load_manifest()
 
-        found = False
-        for backup in manifest.backups:
-            if backup.id == backup_id:
-                backup.is_demo_backup = True
-                found = True
-            else:
-                backup.is_demo_backup = False
+            found = False
+            for backup in manifest.backups:
+                if backup.id == backup_id:
+                    backup.is_demo_backup = True
+                    found = True
+                else:
+                    backup.is_demo_backup = False
 
-        if not found:
-            raise ValueError(f"Backup not found: {backup_id}")
+            if not found:
+                raise ValueError(f"Backup not found: {backup_id}")
 
-        self._save_manifest(manifest)
+            self._save_manifest(manifest)
         return True
 
 
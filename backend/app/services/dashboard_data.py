@@ -0,0 +1,369 @@
+"""
+Whole-dashboard widget data from one shared transaction scan.
+
+Each dashboard widget is backed by one or more report endpoints (summary,
+month-over-month, velocity, anomalies, trends, top merchants, sankey,
+treemap, heatmap).  Loading them one request at a time re-reads the same
+transactions and bucket tags once per widget.  ``dashboard_widget_data``
+instead works out the date window every visible widget needs, loads the
+non-transfer transactions in that window and their bucket tags once, and
+builds each widget's payload in memory with the same payload builders the
+report endpoints use, so a widget's data matches what its endpoint returns.
+
+Datasets are memoized per (dataset, filters), so widgets that share a
+dataset (summary and velocity both show the summary) compute it once.
+"""
+
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.orm import DashboardWidget, DateRangeType, Tag, Transaction, TransactionTag
+from app.projections import REPORT_ROWS, ReportRow
+from app.routers.report_analytics import (
+    ExpenseStats,
+    anomalies_payload,
+    anomaly_baseline_range,
+    heatmap_payload,
+    month_over_month_payload,
+    period_range,
+    sankey_payload,
+    spending_velocity_payload,
+    treemap_payload,
+)
+from app.routers.report_helpers import UNCATEGORIZED, UNTAGGED, month_range, previous_month
+from app.routers.reports import (
+    TREND_GROUPINGS,
+    annual_summary_payload,
+    monthly_summary_payload,
+    top_merchants_payload,
+    trends_payload,
+)
+
+# Date ranges the dashboard UI shows at month scale (monthly summary, velocity,
+# anomalies, daily heatmap); the others show the year of the range's end date.
+MONTHLY_SCALE_RANGES = {DateRangeType.mtd, DateRangeType.last_30_days}
+# Ranges whose trends chart is grouped by month rather than ISO week
+YEARLY_TREND_RANGES = {DateRangeType.ytd, DateRangeType.last_year, DateRangeType.last_90_days}
+
+ANOMALY_THRESHOLD = 2.0
+TOP_MERCHANT_LIMIT = 10
+
+# Datasets each widget type displays
+WIDGET_DATASETS: Dict[str, Tuple[str, ...]] = {
+    "summary": ("summary", "month_over_month"),
+    "velocity": ("summary", "spending_velocity"),
+    "anomalies": ("anomalies",),
+    "bucket_pie": ("summary",),
+    "top_merchants": ("top_merchants",),
+    "trends": ("trends",),
+    "sankey": ("sankey",),
+    "treemap": ("treemap",),
+    "heatmap": ("heatmap",),
+}
+# Datasets that honour a widget's bucket/account/merchant filters
+FILTERED_DATASETS = {"top_merchants", "trends", "sankey", "treemap", "heatmap"}
+
+
+class WidgetFilters(NamedTuple):
+    """Bucket/account/merchant filters from a widget's JSON config."""
+
+    buckets: Tuple[str, ...] = ()
+    accounts: Tuple[str, ...] = ()
+    merchants: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_config(cls, config: Optional[str]) -> "WidgetFilters":
+        """Parse ``DashboardWidget.config``; malformed config means no filters."""
+        if not config:
+            return cls()
+        try:
+            parsed = json.loads(config)
+        except ValueError:
+            return cls()
+        if not isinstance(parsed, dict):
+            return cls()
+
+        def values(key: str) -> Tuple[str, ...]:
+            raw = parsed.get(key)
+            return tuple(str(v) for v in raw if v) if isinstance(raw, list) else ()
+
+        return cls(values("buckets"), values("accounts"), values("merchants"))
+
+    def __bool__(self) -> bool:
+        return bool(self.buckets or self.accounts or self.merchants)
+
+
+@dataclass(frozen=True)
+class DashboardScope:
+    """The report parameters the dashboard UI derives from its date range."""
+
+    range_type: DateRangeType
+    start_date: date
+    end_date: date  # inclusive
+
+    @property
+    def year(self) -> int:
+        return self.end_date.year
+
+    @property
+    def month(self) -> int:
+        return self.end_date.month
+
+    @property
+    def monthly_scale(self) -> bool:
+        return self.range_type in MONTHLY_SCALE_RANGES
+
+    @property
+    def trend_group_by(self) -> str:
+        return "month" if self.range_type in YEARLY_TREND_RANGES else "week"
+
+    def period(self) -> Tuple[date, date]:
+        """[start, end) of the month or year shown by summary-style widgets."""
+        if self.monthly_scale:
+            return month_range(self.year, self.month)
+        return date(self.year, 1, 1), date(self.year + 1, 1, 1)
+
+    def dataset_window(self, name: str) -> Optional[Tuple[date, date]]:
+        """[start, end) of the transactions a dataset reads; None if it is not shown."""
+        if name in ("month_over_month", "spending_velocity", "anomalies"):
+            if not self.monthly_scale:
+                return None
+            _, month_end = month_range(self.year, self.month)
+            if name == "anomalies":
+                return anomaly_baseline_range(self.year, self.month)[0], month_end
+            return month_range(*previous_month(self.year, self.month))[0], month_end
+        if name == "trends":
+            return self.start_date, self.end_date + timedelta(days=1)
+        return self.period()
+
+
+@dataclass
+class WorkingSet:
+    """Non-transfer transactions in a date window plus their bucket tags."""
+
+    rows: List[ReportRow]
+    # transaction id -> every bucket value on the transaction
+    bucket_values: Dict[int, List[str]] = field(default_factory=dict)
+
+    def bucket(self, row: ReportRow) -> Optional[str]:
+        """The row's bucket as report_helpers.transaction_bucket picks it; None when untagged."""
+        values = self.bucket_values.get(row.id)
+        return max(values) if values else None
+
+    def select(
+        self,
+        start: date,
+        end: date,
+        *,
+        end_inclusive: bool = False,
+        expenses_only: bool = False,
+        filters: WidgetFilters = WidgetFilters(),
+    ) -> List[ReportRow]:
+        """Rows in [start, end) (or [start, end]) matching the filters."""
+        buckets = set(filters.buckets)
+        accounts = set(filters.accounts)
+        merchants = {m.lower() for m in filters.merchants}
+        selected = []
+        for row in self.rows:
+            if row.date < start or (row.date > end if end_inclusive else row.date >= end):
+                continue
+            if expenses_only and row.amount >= 0:
+                continue
+            if buckets and buckets.isdisjoint(self.bucket_values.get(row.id, ())):
+                continue
+            if accounts and row.account_source not in accounts:
+                continue
+            if merchants and not (row.merchant and row.merchant.lower() in merchants):
+                continue
+            selected.append(row)
+        return selected
+
+    def group(self, rows: Iterable[ReportRow], group_by: Sequence[str]) -> List[SimpleNamespace]:
+        """In-memory counterpart of report_helpers.aggregate() over REPORT_DIMENSIONS.
+
+        Rows carry the dimension attributes plus income, expenses, count and
+        first_date, ordered by first occurrence.
+        """
+        dimensions: Dict[str, Callable[[ReportRow], Any]] = {
+            "year": lambda row: row.date.year,
+            "month": lambda row: row.date.month,
+            "date": lambda row: row.date,
+            "category": lambda row: row.category or UNCATEGORIZED,
+            "account": lambda row: row.account_source,
+            "merchant": lambda row: row.merchant,
+            "bucket": lambda row: self.bucket(row) or UNTAGGED,
+        }
+        keys = [dimensions[name] for name in group_by]
+        groups: Dict[Tuple[Any, ...], SimpleNamespace] = {}
+        for row in sorted(rows, key=lambda r: r.date):
+            key = tuple(fn(row) for fn in keys)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = SimpleNamespace(
+                    **dict(zip(group_by, key)), income=0.0, expenses=0.0, count=0, first_date=row.date
+                )
+            if row.amount > 0:
+                group.income += row.amount
+            elif row.amount < 0:
+                group.expenses -= row.amount
+            group.count += 1
+        return list(groups.values())
+
+
+async def load_working_set(session: AsyncSession, start: date, end: date) -> WorkingSet:
+    """One projection scan of [start, end) plus one bucket-tag query for the same window."""
+    window = (Transaction.date >= start, Transaction.date < end, Transaction.is_transfer.is_(False))
+    rows = await REPORT_ROWS.fetch(session, REPORT_ROWS.select(*window).order_by(Transaction.date, Transaction.id))
+
+    result = await session.execute(
+        select(TransactionTag.transaction_id, Tag.value)
+        .join(Tag, TransactionTag.tag_id == Tag.id)
+        .join(Transaction, TransactionTag.transaction_id == Transaction.id)
+        .where(Tag.namespace == "bucket", *window)
+    )
+    bucket_values: Dict[int, List[str]] = defaultdict(list)
+    for transaction_id, value in result.all():
+        bucket_values[transaction_id].append(value)
+    return WorkingSet(rows, dict(bucket_values))
+
+
+def _top_merchants(working_set: WorkingSet, rows: Iterable[ReportRow]) -> List[SimpleNamespace]:
+    """Top merchants by expense total, like reports._top_merchant_totals()."""
+    groups = working_set.group((row for row in rows if row.merchant), ["merchant"])
+    groups.sort(key=lambda g: (-g.expenses, g.first_date))
+    return groups[:TOP_MERCHANT_LIMIT]
+
+
+def _anomaly_candidates(
+    working_set: WorkingSet, current: Iterable[ReportRow], baseline: Iterable[ReportRow]
+) -> List[SimpleNamespace]:
+    """The month's expenses shaped like report_analytics.anomaly_candidates_query() rows."""
+    baseline_merchants = {row.merchant for row in baseline if row.merchant}
+    return [
+        SimpleNamespace(
+            id=row.id,
+            date=row.date,
+            merchant=row.merchant,
+            amount=row.amount,
+            category=row.category,
+            bucket=working_set.bucket(row),
+            new_merchant=bool(row.merchant) and row.merchant not in baseline_merchants,
+        )
+        for row in current
+        if row.amount < 0
+    ]
+
+
+def build_dataset(scope: DashboardScope, working_set: WorkingSet, name: str, filters: WidgetFilters) -> Any:
+    """Payload of one dataset, identical in shape to its report endpoint's response."""
+    year, month = scope.year, scope.month
+    period_month = month if scope.monthly_scale else None
+
+    if name == "summary":
+        start, end = scope.period()
+        rows = working_set.select(start, end)
+        top = _top_merchants(working_set, (row for row in rows if row.amount < 0))
+        bucket_rows = working_set.group(rows, ["bucket"])
+        if scope.monthly_scale:
+            return monthly_summary_payload(year, month, working_set.group(rows, ["category"]), bucket_rows, top)
+        return annual_summary_payload(year, working_set.group(rows, ["month"]), bucket_rows, top)
+
+    if name in ("month_over_month", "spending_velocity", "anomalies"):
+        if not scope.monthly_scale:
+            return None
+        month_start, month_end = month_range(year, month)
+        if name == "anomalies":
+            baseline_start, _ = anomaly_baseline_range(year, month)
+            baseline = working_set.select(baseline_start, month_start)
+            candidates = _anomaly_candidates(working_set, working_set.select(month_start, month_end), baseline)
+            rows = working_set.select(baseline_start, month_end)
+            return anomalies_payload(
+                year,
+                month,
+                ANOMALY_THRESHOLD,
+                ExpenseStats.from_rows(baseline),
+                candidates,
+                working_set.group(rows, ["year", "month", "category"]),
+                working_set.group(rows, ["year", "month", "bucket"]),
+            )
+        rows = working_set.select(month_range(*previous_month(year, month))[0], month_end)
+        if name == "month_over_month":
+            return month_over_month_payload(
+                year,
+                month,
+                working_set.group(rows, ["year", "month", "category"]),
+                working_set.group(rows, ["year", "month", "bucket"]),
+            )
+        return spending_velocity_payload(year, month, working_set.group(rows, ["year", "month"]))
+
+    if name == "top_merchants":
+        start, end = scope.period()
+        # Top merchants is grouped by merchant, so a merchant filter does not apply
+        rows = working_set.select(start, end, expenses_only=True, filters=filters._replace(merchants=()))
+        return top_merchants_payload("current_month", _top_merchants(working_set, rows))
+
+    if name == "trends":
+        group_dimensions, expenses_only = TREND_GROUPINGS[scope.trend_group_by]
+        rows = working_set.select(
+            scope.start_date, scope.end_date, end_inclusive=True, expenses_only=expenses_only, filters=filters
+        )
+        return trends_payload(scope.trend_group_by, working_set.group(rows, group_dimensions))
+
+    start, end = period_range(year, period_month)
+    if name == "sankey":
+        rows = working_set.select(start, end, end_inclusive=True, filters=filters)
+        return sankey_payload(year, period_month, working_set.group(rows, ["account", "bucket"]))
+    rows = working_set.select(start, end, end_inclusive=True, expenses_only=True, filters=filters)
+    if name == "treemap":
+        return treemap_payload(year, period_month, working_set.group(rows, ["bucket", "merchant"]))
+    return heatmap_payload(year, period_month, working_set.group(rows, ["date"] if period_month else ["month"]))
+
+
+def widget_datasets(widget: DashboardWidget) -> List[Tuple[str, WidgetFilters]]:
+    """(dataset, filters) pairs a widget displays; unknown widget types display none."""
+    filters = WidgetFilters.from_config(widget.config)
+    names = WIDGET_DATASETS.get(widget.widget_type, ())
+    if widget.widget_type == "bucket_pie" and filters:
+        # A filtered pie chart shows the filtered top merchants instead of buckets
+        names = ("top_merchants",)
+    return [(name, filters if name in FILTERED_DATASETS else WidgetFilters()) for name in names]
+
+
+async def dashboard_widget_data(
+    session: AsyncSession, scope: DashboardScope, widgets: Sequence[DashboardWidget]
+) -> List[Dict[str, Any]]:
+    """Data for each widget, computed from a single working set.
+
+    Returns one ``{"id", "widget_type", "data"}`` entry per widget, where
+    ``data`` maps dataset name to the payload its report endpoint returns
+    (None for month-scale datasets on a year-scale dashboard).
+    """
+    requested = {widget.id: widget_datasets(widget) for widget in widgets}
+    windows = [
+        window
+        for datasets in requested.values()
+        for name, _ in datasets
+        if (window := scope.dataset_window(name)) is not None
+    ]
+    if windows:
+        working_set = await load_working_set(session, min(w[0] for w in windows), max(w[1] for w in windows))
+    else:
+        working_set = WorkingSet([])
+
+    cache: Dict[Tuple[str, WidgetFilters], Any] = {}
+    results = []
+    for widget in widgets:
+        data = {}
+        for name, filters in requested[widget.id]:
+            if (name, filters) not in cache:
+                cache[name, filters] = build_dataset(scope, working_set, name, filters)
+            data[name] = cache[name, filters]
+        results.append({"id": widget.id, "widget_type": widget.widget_type, "data": data})
+    return results
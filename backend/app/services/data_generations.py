@@ -0,0 +1,106 @@
+"""
+Data generations: per-table change counters for HTTP conditional requests.
+
+The data_generations table holds one row per tracked table with a counter and
+a random token. Any commit that changed a tracked table bumps its row inside
+the same database transaction, so a reader that sees the new token also sees
+the new data. Read endpoints build weak ETags from the tokens of the tables
+they read (see app.routers.conditional) and answer a matching If-None-Match
+with 304 after a single lookup of this table.
+
+Changes are collected from Session events:
+
+- ORM changes (create, edit, delete) in after_flush
+- bulk INSERT/UPDATE/DELETE executed through a Session in do_orm_execute
+
+SQL that bypasses the Session (raw connections, other processes, text()
+statements) is not seen. Call mark_changed() after it.
+"""
+
+import uuid
+from typing import Any, Collection, Dict, Iterable, Set
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.orm import DataGeneration
+
+# Tables whose changes invalidate cached reads
+TRACKED_TABLES = frozenset({"transactions", "transaction_tags", "tags", "budgets", "dashboards", "dashboard_widgets"})
+
+_CHANGED_KEY = "data_generations_changed"
+
+
+def mark_changed(session: Session, *table_names: str) -> None:
+    """Record that ``table_names`` changed; their generations bump on commit."""
+    tracked = TRACKED_TABLES.intersection(table_names)
+    if tracked:
+        session.info.setdefault(_CHANGED_KEY, set()).update(tracked)
+
+
+def bump(session: Session, table_names: Collection[str]) -> None:
+    """Increment the generation of ``table_names`` and give them a new token.
+
+    Rows missing from the table (a database created without migrations) are
+    inserted at generation 1.
+    """
+    if not table_names:
+        return
+    token = uuid.uuid4().hex
+    names = sorted(table_names)
+    result: Any = session.execute(
+        update(DataGeneration)
+        .where(DataGeneration.table_name.in_(names))
+        .values(generation=DataGeneration.generation + 1, token=token)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == len(names):
+        return
+    existing = set(session.scalars(select(DataGeneration.table_name).where(DataGeneration.table_name.in_(names))))
+    missing = [name for name in names if name not in existing]
+    session.execute(insert(DataGeneration), [{"table_name": name, "generation": 1, "token": token} for name in missing])
+
+
+async def current_tokens(session: AsyncSession, table_names: Iterable[str]) -> Dict[str, str]:
+    """Token per table; tables that never changed are absent."""
+    result = await session.execute(
+        select(DataGeneration.table_name, DataGeneration.token).where(DataGeneration.table_name.in_(set(table_names)))
+    )
+    return {name: token for name, token in result.all()}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_changes(session: Session, flush_context: Any) -> None:
+    tables: Set[str] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        name = getattr(obj, "__tablename__", None)
+        if name in TRACKED_TABLES:
+            tables.add(name)
+    if tables:
+        mark_changed(session, *tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_changes(orm_execute_state: ORMExecuteState) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    table_name = getattr(table, "name", None)
+    if table_name in TRACKED_TABLES:
+        mark_changed(orm_execute_state.session, table_name)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_before_commit(session: Session) -> None:
+    if not (session.info.get(_CHANGED_KEY) or session.new or session.dirty or session.deleted):
+        return
+    # Flush here so the final flush's changes are collected and included
+    session.flush()
+    bump(session, session.info.pop(_CHANGED_KEY, set()))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_changes(session: Session, previous_transaction: Any) -> None:
+    if not session.in_transaction():
+        session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,460 @@
+"""
+Batched import pipeline for parsed statement transactions.
+
+Import endpoints hand parsed transaction dicts to a TransactionImporter, which
+consumes them lazily CHUNK_SIZE at a time (so a streamed upload is never held
+in memory whole), resolves duplicates with chunked IN (...) lookups, pre-resolves account and
+bucket tags once per batch, and writes transactions and their bucket tags with
+executemany INSERTs. Statement count grows with rows / CHUNK_SIZE rather than
+with rows. Hashing and bucket inference for each chunk run on the worker pool
+(app.services.worker_pool) so the event loop stays free between round trips.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import batched
+from typing import (
+    Any,
+    AsyncIterable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.orm import ImportSession, ReconciliationStatus, Tag, Transaction, TransactionTag
+from app.services.merchant_aliases import AliasMatcher
+from app.services.worker_pool import run_cpu
+from app.tag_inference import top_bucket_tags
+from app.utils.hashing import hash_transaction_dicts
+
+# Rows per lookup/insert round trip. Kept well under SQLite's bound-parameter limit.
+CHUNK_SIZE = 500
+
+T = TypeVar("T")
+
+# Legacy duplicate key used when a row cannot be content-hashed
+FALLBACK_MATCH_FIELDS = ("date", "amount", "merchant")
+
+# Duplicate key shared by batch preview and batch confirm
+BATCH_MATCH_FIELDS = ("date", "amount", "reference_id")
+
+
+def chunked(items: Sequence[T], size: int = CHUNK_SIZE) -> Iterator[Sequence[T]]:
+    """Yield successive slices of at most ``size`` items."""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+@dataclass
+class ImportResult:
+    """Outcome of importing one file's transactions."""
+
+    imported: int = 0
+    duplicates: int = 0
+    total_amount: float = 0.0
+    dates: List[date] = field(default_factory=list)
+    cross_account_warnings: List[Dict[str, Any]] = field(default_factory=list)
+
+    def apply_to(self, import_session: ImportSession) -> None:
+        """Record final stats on the import session and mark it completed."""
+        import_session.transaction_count = self.imported
+        import_session.duplicate_count = self.duplicates
+        import_session.total_amount = self.total_amount
+        import_session.status = "completed"
+        if self.dates:
+            import_session.date_range_start = min(self.dates)
+            import_session.date_range_end = max(self.dates)
+
+
+@dataclass
+class BatchDuplicateReport:
+    """How one file of a batch overlaps the files before it."""
+
+    cross_file_duplicates: int = 0
+    # Duplicates whose date, amount, description and account also match (overlapping statements)
+    exact_duplicates: int = 0
+    # Earlier filename -> number of this file's rows it already contains
+    duplicates_by_file: Dict[str, int] = field(default_factory=dict)
+    # Same date/amount/description as a row of an earlier file under another account
+    cross_account_matches: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class BatchDuplicateIndex:
+    """Hash-indexed rows of the files already checked in a batch.
+
+    Rows are indexed on the BATCH_MATCH_FIELDS key (the duplicate test batch
+    confirm applies), content_hash and content_hash_no_account, so checking a
+    file costs one set lookup per row however large the batch is.
+    """
+
+    def __init__(self) -> None:
+        self._keys: Dict[Tuple[Any, ...], str] = {}
+        self._hashes: Set[str] = set()
+        self._accounts: Dict[str, Dict[Optional[str], str]] = {}
+
+    def add_file(
+        self,
+        filename: str,
+        transactions: Sequence[Dict[str, Any]],
+        hashes: Sequence[Tuple[Optional[str], Optional[str]]],
+    ) -> BatchDuplicateReport:
+        """Flag ``is_cross_file_duplicate`` on rows of earlier files, then index the file.
+
+        ``hashes`` are the rows' hash_transaction_dicts() values. Rows already
+        flagged ``is_db_duplicate`` are indexed but not counted again.
+        """
+        report = BatchDuplicateReport()
+        for txn_data, (content_hash, content_hash_no_account) in zip(transactions, hashes):
+            key = tuple(txn_data.get(name) for name in BATCH_MATCH_FIELDS)
+            earlier_file = self._keys.get(key)
+            txn_data["is_cross_file_duplicate"] = False
+            if txn_data.get("is_db_duplicate"):
+                pass
+            elif earlier_file is not None:
+                txn_data["is_cross_file_duplicate"] = True
+                report.cross_file_duplicates += 1
+                report.duplicates_by_file[earlier_file] = report.duplicates_by_file.get(earlier_file, 0) + 1
+                if content_hash in self._hashes:
+                    report.exact_duplicates += 1
+            elif content_hash_no_account:
+                accounts = self._accounts.get(content_hash_no_account, {})
+                other = next((acc for acc in accounts if acc != txn_data.get("account_source")), None)
+                if other is not None:
+                    report.cross_account_matches.append(
+                        {
+                            "date": str(txn_data["date"]),
+                            "amount": txn_data["amount"],
+                            "description": txn_data["description"][:50],
+                            "existing_account": other,
+                            "existing_file": accounts[other],
+                            "importing_account": txn_data.get("account_source"),
+                        }
+                    )
+
+        # Index after checking: duplicates within the file are not cross-file duplicates
+        for txn_data, (content_hash, content_hash_no_account) in zip(transactions, hashes):
+            self._keys.setdefault(tuple(txn_data.get(name) for name in BATCH_MATCH_FIELDS), filename)
+            if content_hash:
+                self._hashes.add(content_hash)
+            if content_hash_no_account:
+                self._accounts.setdefault(content_hash_no_account, {}).setdefault(
+                    txn_data.get("account_source"), filename
+                )
+        return report
+
+
+async def existing_content_hashes(session: AsyncSession, hashes: Iterable[str]) -> Set[str]:
+    """Return the subset of ``hashes`` already stored as Transaction.content_hash."""
+    unique = sorted(set(hashes))
+    found: Set[str] = set()
+    for chunk in chunked(unique):
+        result = await session.execute(select(Transaction.content_hash).where(Transaction.content_hash.in_(chunk)))
+        found.update(row[0] for row in result.all())
+    return found
+
+
+async def accounts_by_hash_no_account(session: AsyncSession, hashes: Iterable[str]) -> Dict[str, List[str]]:
+    """Map each content_hash_no_account to the account sources it is stored under."""
+    unique = sorted(set(hashes))
+    accounts: Dict[str, List[str]] = {}
+    for chunk in chunked(unique):
+        result = await session.execute(
+            select(Transaction.content_hash_no_account, Transaction.account_source)
+            .where(Transaction.content_hash_no_account.in_(chunk))
+            .order_by(Transaction.id)
+        )
+        for hash_value, account_source in result.all():
+            accounts.setdefault(hash_value, []).append(account_source)
+    return accounts
+
+
+async def existing_match_keys(
+    session: AsyncSession, keys: Iterable[Tuple[Any, ...]], match_fields: Sequence[str]
+) -> Set[Tuple[Any, ...]]:
+    """Return the subset of ``keys`` matching stored transactions on ``match_fields``.
+
+    ``match_fields[0]`` must be "date": candidates are fetched per chunk of
+    distinct dates and compared in Python, so NULL fields match NULL like the
+    per-row ``==`` lookups this replaces.
+    """
+    if match_fields[0] != "date":
+        raise ValueError("match_fields must start with 'date'")
+    wanted = set(keys)
+    dates = sorted({key[0] for key in wanted if key[0] is not None})
+    columns = [getattr(Transaction, name) for name in match_fields]
+    found: Set[Tuple[Any, ...]] = set()
+    for chunk in chunked(dates):
+        result = await session.execute(select(*columns).where(Transaction.date.in_(chunk)))
+        found.update(key for key in (tuple(row) for row in result.all()) if key in wanted)
+    return found
+
+
+async def resolve_tag_ids(
+    session: AsyncSession, namespace: str, values: Iterable[str], descriptions: Optional[Dict[str, str]] = None
+) -> Dict[str, int]:
+    """Get tag ids for ``values`` in ``namespace``, creating missing tags with one flush."""
+    unique = sorted(set(values))
+    tag_ids: Dict[str, int] = {}
+    for chunk in chunked(unique):
+        result = await session.execute(
+            select(Tag.value, Tag.id).where(Tag.namespace == namespace, Tag.value.in_(chunk))
+        )
+        tag_ids.update({value: tag_id for value, tag_id in result.all()})
+
+    missing = [
+        Tag(namespace=namespace, value=value, description=(descriptions or {}).get(value))
+        for value in unique
+        if value not in tag_ids
+    ]
+    if missing:
+        session.add_all(missing)
+        await session.flush()
+        tag_ids.update({tag.value: tag.id for tag in missing})
+    return tag_ids
+
+
+def account_tag_value(account_source: str) -> str:
+    """Normalize an account source to its account tag value."""
+    return account_source.lower().replace(" ", "-")
+
+
+# Columns returned by the transaction INSERT to pair generated ids with their rows
+_RETURNED_COLUMNS = (
+    Transaction.id,
+    Transaction.date,
+    Transaction.amount,
+    Transaction.description,
+    Transaction.merchant,
+    Transaction.account_source,
+    Transaction.reference_id,
+)
+
+
+def _returned_row_key(row: Any) -> Tuple[Any, ...]:
+    return (
+        row["date"],
+        round(float(row["amount"]), 2),
+        row["description"],
+        row["merchant"],
+        row["account_source"],
+        row["reference_id"],
+    )
+
+
+def bucket_value(bucket_tag: Optional[str]) -> str:
+    """Return the value of an inferred bucket tag ("none" if unknown)."""
+    if bucket_tag and ":" in bucket_tag:
+        return bucket_tag.split(":", 1)[1]
+    return "none"
+
+
+class TransactionImporter:
+    """Imports parsed transaction dicts in bounded, set-based batches.
+
+    By default duplicates are detected by content hash (falling back to
+    date/amount/merchant for rows that cannot be hashed) and cross-account
+    matches are reported. Passing ``match_fields`` switches to matching on
+    those Transaction columns instead (the batch import's date/amount/
+    reference_id key).
+
+    One importer may be reused for several files: rows already imported by
+    it count as duplicates for later files, and resolved tag ids are cached.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        user_history: Optional[Mapping[str, str]] = None,
+        merchant_aliases: Optional[AliasMatcher] = None,
+        match_fields: Optional[Sequence[str]] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        self.session = session
+        self.user_history = user_history
+        self.merchant_aliases = merchant_aliases
+        self.match_fields = tuple(match_fields) if match_fields else None
+        self.chunk_size = chunk_size
+
+        self._seen_hashes: Set[str] = set()
+        self._seen_keys: Set[Tuple[Any, ...]] = set()
+        self._staged_accounts: Dict[str, List[str]] = {}
+        self._account_tag_ids: Dict[str, int] = {}
+        self._bucket_tag_ids: Dict[str, int] = {}
+
+    def _key(self, txn_data: Dict[str, Any]) -> Tuple[Any, ...]:
+        fields = self.match_fields or FALLBACK_MATCH_FIELDS
+        return tuple(txn_data.get(name) for name in fields)
+
+    async def import_transactions(
+        self,
+        transactions: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        import_session: ImportSession,
+    ) -> ImportResult:
+        """Deduplicate and insert ``transactions`` under ``import_session``.
+
+        ``transactions`` may be lazy, sync (a parser's iter_parse()) or async (a
+        parse advanced on the worker pool); only one chunk of it is held at a time.
+        """
+        result = ImportResult()
+        if isinstance(transactions, AsyncIterable):
+            chunk: List[Dict[str, Any]] = []
+            async for txn_data in transactions:
+                chunk.append(txn_data)
+                if len(chunk) == self.chunk_size:
+                    await self._import_chunk(chunk, import_session, result)
+                    chunk = []
+            if chunk:
+                await self._import_chunk(chunk, import_session, result)
+        else:
+            for batch in batched(transactions, self.chunk_size):
+                await self._import_chunk(batch, import_session, result)
+        return result
+
+    async def _import_chunk(
+        self, chunk: Sequence[Dict[str, Any]], import_session: ImportSession, result: ImportResult
+    ) -> None:
+        # Hash everything up front (hashes are stored even when matching on match_fields)
+        hashes = await run_cpu(hash_transaction_dicts, chunk)
+
+        # Rows matched on a field key: everything in match_fields mode, unhashable rows otherwise
+        keyed = [bool(self.match_fields) or not content_hash for content_hash, _ in hashes]
+
+        # Resolve duplicates against the database in set-based lookups
+        keys = [self._key(txn_data) for txn_data in chunk]
+        keyed_rows = [key for key, use_key in zip(keys, keyed) if use_key]
+        existing_keys = (
+            await existing_match_keys(self.session, keyed_rows, self.match_fields or FALLBACK_MATCH_FIELDS)
+            if keyed_rows
+            else set()
+        )
+        hashed_rows = [content_hash for (content_hash, _), use_key in zip(hashes, keyed) if not use_key]
+        existing_hashes = await existing_content_hashes(self.session, hashed_rows) if hashed_rows else set()
+
+        staged: List[Tuple[Dict[str, Any], Optional[str], Optional[str]]] = []
+        for txn_data, key, use_key, (content_hash, content_hash_no_account) in zip(chunk, keys, keyed, hashes):
+            if use_key:
+                if key in existing_keys or key in self._seen_keys:
+                    result.duplicates += 1
+                    continue
+            elif content_hash in existing_hashes or content_hash in self._seen_hashes:
+                result.duplicates += 1
+                continue
+            if content_hash:
+                self._seen_hashes.add(content_hash)
+            self._seen_keys.add(key)
+            staged.append((txn_data, content_hash, content_hash_no_account))
+
+        if not staged:
+            return
+
+        # Cross-account duplicates (same transaction already imported under another account)
+        if not self.match_fields:
+            stored_accounts = await accounts_by_hash_no_account(self.session, [h for _, _, h in staged if h])
+            for txn_data, content_hash, content_hash_no_account in staged:
+                if not (content_hash and content_hash_no_account):
+                    continue
+                accounts = stored_accounts.get(content_hash_no_account, []) + self._staged_accounts.get(
+                    content_hash_no_account, []
+                )
+                other = next((acc for acc in accounts if acc != txn_data["account_source"]), None)
+                if other is not None:
+                    result.cross_account_warnings.append(
+                        {
+                            "date": str(txn_data["date"]),
+                            "amount": txn_data["amount"],
+                            "description": txn_data["description"][:50],
+                            "existing_account": other,
+                            "importing_account": txn_data["account_source"],
+                        }
+                    )
+                self._staged_accounts.setdefault(content_hash_no_account, []).append(txn_data["account_source"])
+
+        # Pre-resolve account and bucket tags once for the whole chunk
+        bucket_tags = await run_cpu(top_bucket_tags, [txn_data for txn_data, _, _ in staged], self.user_history)
+        bucket_values = [bucket_value(tag) for tag in bucket_tags]
+        account_sources = {txn_data["account_source"] for txn_data, _, _ in staged if txn_data["account_source"]}
+        await self._resolve_tags(account_sources, set(bucket_values))
+
+        rows = []
+        for (txn_data, content_hash, content_hash_no_account), bucket in zip(staged, bucket_values):
+            # Apply merchant alias to normalize merchant name
+            merchant_name = txn_data.get("merchant")
+            if self.merchant_aliases:
+                aliased_merchant = self.merchant_aliases.canonical_name(txn_data["description"])
+                if aliased_merchant:
+                    merchant_name = aliased_merchant
+
+            account_source = txn_data["account_source"]
+            rows.append(
+                {
+                    "date": txn_data["date"],
+                    "amount": txn_data["amount"],
+                    "description": txn_data["description"],
+                    "merchant": merchant_name,
+                    "account_source": account_source,
+                    "account_tag_id": self._account_tag_ids[account_tag_value(account_source)]
+                    if account_source
+                    else None,
+                    "card_member": txn_data.get("card_member"),
+                    # Keep category field for backwards compatibility during migration
+                    "category": bucket.replace("-", " ").title() if bucket != "none" else None,
+                    "reconciliation_status": ReconciliationStatus.unreconciled.value,
+                    "reference_id": txn_data.get("reference_id"),
+                    "import_session_id": import_session.id,
+                    "content_hash": content_hash,
+                    "content_hash_no_account": content_hash_no_account,
+                }
+            )
+
+        # Batched INSERT ... RETURNING, then the bucket tag links in one more statement.
+        # SQLite has no insert sentinel, so sort_by_parameter_order would degrade to one
+        # INSERT per row; returned ids are matched back to their rows by content instead.
+        # Rows that match on every returned column are interchangeable for tagging.
+        pending_buckets: Dict[Tuple[Any, ...], List[str]] = {}
+        for row, bucket in zip(rows, bucket_values):
+            pending_buckets.setdefault(_returned_row_key(row), []).append(bucket)
+
+        inserted = await self.session.execute(insert(Transaction).returning(*_RETURNED_COLUMNS), rows)
+        await self.session.execute(
+            insert(TransactionTag),
+            [
+                {
+                    "transaction_id": returned.id,
+                    "tag_id": self._bucket_tag_ids[pending_buckets[_returned_row_key(returned._mapping)].pop()],
+                }
+                for returned in inserted
+            ],
+        )
+
+        for txn_data, _, _ in staged:
+            result.imported += 1
+            result.total_amount += txn_data["amount"]
+            result.dates.append(txn_data["date"])
+
+    async def _resolve_tags(self, account_sources: Set[str], bucket_values: Set[str]) -> None:
+        new_accounts = {
+            account_tag_value(source): source
+            for source in account_sources
+            if account_tag_value(source) not in self._account_tag_ids
+        }
+        if new_accounts:
+            # Original account_source is the default display name
+            self._account_tag_ids.update(
+                await resolve_tag_ids(self.session, "account", new_accounts.keys(), descriptions=new_accounts)
+            )
+
+        new_buckets = bucket_values - self._bucket_tag_ids.keys()
+        if new_buckets:
+            self._bucket_tag_ids.update(await resolve_tag_ids(self.session, "bucket", new_buckets))
@@ -0,0 +1,272 @@
+"""
+Compiled merchant alias matching.
+
+AliasMatcher is built once from the MerchantAlias table and answers "which
+alias applies to this description" without looping over every alias:
+
+- exact aliases are a dict lookup on the lowercased text
+- contains aliases share one Aho-Corasick automaton, so a single pass over
+  the text finds every pattern it contains
+- regex aliases are compiled once and only tried while they could still beat
+  the best exact/contains match; stored patterns app.utils.regexp refuses
+  are logged and listed in ``refused`` instead of matching
+
+candidate_clause() turns the same aliases into a SQL filter, so a scan over
+transactions only returns rows some alias could match. Regex aliases use
+REGEXP, which only SQLite evaluates with app.utils.regexp and the same
+semantics as match(); elsewhere they disable the filter.
+
+Priority semantics match the original linear scan: aliases are ranked by
+priority (highest first) and the highest ranked matching alias wins.
+
+The matcher is cached per engine and rebuilt after a commit that creates,
+deletes or edits an alias, or after clear_cache() when the database file
+was replaced.
+"""
+
+import logging
+import re
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import ColumnElement, event, func, inspect, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.orm import MerchantAlias, MerchantAliasMatchType
+from app.utils.regexp import MAX_SUBJECT_LENGTH, compile_pattern, pattern_error
+
+logger = logging.getLogger(__name__)
+
+# Larger than any alias rank
+_NO_MATCH = 1 << 62
+# Above this many aliases candidate_clause() gives up rather than build a huge OR
+MAX_CANDIDATE_TERMS = 200
+
+
+@dataclass(frozen=True, slots=True)
+class AliasEntry:
+    """Detached copy of the MerchantAlias fields needed for matching and reporting."""
+
+    id: int
+    pattern: str
+    canonical_name: str
+    match_type: str
+
+
+class _ContainsAutomaton:
+    """Aho-Corasick automaton reporting the best (lowest) rank of any pattern in a text."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, int]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.best: List[int] = [_NO_MATCH]
+
+        for pattern, rank in patterns:
+            node = 0
+            for char in pattern:
+                next_node = self.goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto[node][char] = next_node
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(_NO_MATCH)
+                node = next_node
+            self.best[node] = min(self.best[node], rank)
+
+        # Breadth-first fail links; each node's best rank includes its suffixes'
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.best[child] = min(self.best[child], self.best[self.fail[child]])
+
+    def best_rank(self, text: str) -> int:
+        goto, fail, best = self.goto, self.fail, self.best
+        result = best[0]
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if best[node] < result:
+                result = best[node]
+        return result
+
+
+class AliasMatcher:
+    """Finds the highest-priority merchant alias matching a description."""
+
+    def __init__(self, aliases: Iterable[Any]):
+        # Rank 0 is the highest priority; ties keep the given (id) order
+        ranked = sorted(aliases, key=lambda alias: -(alias.priority or 0))
+        self.entries: List[AliasEntry] = [
+            AliasEntry(alias.id, alias.pattern, alias.canonical_name, alias.match_type) for alias in ranked
+        ]
+
+        self._exact: Dict[str, int] = {}
+        contains: List[Tuple[str, int]] = []
+        self._regexes: List[Tuple[int, re.Pattern[str]]] = []
+        # Regex aliases whose stored pattern is invalid or refused as too slow
+        self.refused: List[AliasEntry] = []
+        for rank, entry in enumerate(self.entries):
+            if entry.match_type == MerchantAliasMatchType.exact:
+                self._exact.setdefault(entry.pattern.lower(), rank)
+            elif entry.match_type == MerchantAliasMatchType.contains:
+                contains.append((entry.pattern.lower(), rank))
+            elif entry.match_type == MerchantAliasMatchType.regex:
+                regex = compile_pattern(entry.pattern)
+                if regex is not None:
+                    self._regexes.append((rank, regex))
+                else:
+                    self.refused.append(entry)
+                    logger.warning(
+                        "Merchant alias %d is not applied: %s (%r)",
+                        entry.id,
+                        pattern_error(entry.pattern),
+                        entry.pattern,
+                    )
+        self._contains = _ContainsAutomaton(contains) if contains else None
+        self._contains_patterns = sorted({pattern for pattern, _ in contains})
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def match(self, text: Optional[str]) -> Optional[AliasEntry]:
+        """Return the highest-priority alias matching ``text``, or None."""
+        if not text:
+            return None
+
+        text_lower = text.lower()
+        best = self._exact.get(text_lower, _NO_MATCH)
+        if self._contains is not None:
+            best = min(best, self._contains.best_rank(text_lower))
+        for rank, regex in self._regexes:
+            if rank >= best:
+                break
+            if regex.search(text, 0, MAX_SUBJECT_LENGTH):
+                best = rank
+                break
+
+        return self.entries[best] if best != _NO_MATCH else None
+
+    def canonical_name(self, text: Optional[str]) -> Optional[str]:
+        """Return the canonical merchant name for ``text`` if an alias matches."""
+        entry = self.match(text)
+        return entry.canonical_name if entry else None
+
+    def candidate_clause(self, column: ColumnElement[str], dialect_name: str) -> Optional[ColumnElement[bool]]:
+        """SQL filter true for every value of ``column`` that match() could map to an alias.
+
+        Rows it excludes have no matching alias; rows it keeps still go
+        through match() for priority. None when there are too many aliases,
+        exact/contains patterns SQL cannot lowercase the way Python does
+        (SQLite's lower() and LIKE only fold ASCII), or regex aliases on a
+        dialect other than SQLite, whose regex syntax differs from Python's
+        (PostgreSQL reads ``\\b`` as a backspace).
+        """
+        if self._regexes and dialect_name != "sqlite":
+            return None
+        terms = len(self._contains_patterns) + len(self._regexes) + (1 if self._exact else 0)
+        if not terms or terms > MAX_CANDIDATE_TERMS:
+            return None
+        if not all(pattern.isascii() for pattern in (*self._exact, *self._contains_patterns)):
+            return None
+
+        conditions: List[ColumnElement[bool]] = []
+        if self._exact:
+            conditions.append(func.lower(column).in_(sorted(self._exact)))
+        conditions.extend(column.icontains(pattern, autoescape=True) for pattern in self._contains_patterns)
+        conditions.extend(column.regexp_match(regex.pattern, flags="i") for _, regex in self._regexes)
+        return or_(*conditions)
+
+
+# ============================================================================
+# Per-engine cache
+# ============================================================================
+
+# Session.info flag set when a flush or bulk statement changed alias definitions
+_CHANGED_KEY = "merchant_aliases_changed"
+
+# Fields that affect matching; match_count/last_matched_date updates do not
+_MATCH_FIELDS = ("pattern", "canonical_name", "match_type", "priority")
+
+
+class _CachedMatcher:
+    def __init__(self) -> None:
+        self.matcher: Optional[AliasMatcher] = None
+        self.version = 0
+
+
+_matchers: "weakref.WeakKeyDictionary[Engine, _CachedMatcher]" = weakref.WeakKeyDictionary()
+
+
+def _cache_for(session: Session) -> _CachedMatcher:
+    engine = session.get_bind().engine
+    cached = _matchers.get(engine)
+    if cached is None:
+        cached = _matchers[engine] = _CachedMatcher()
+    return cached
+
+
+def clear_cache() -> None:
+    """Discard every cached matcher, e.g. after the database file was replaced."""
+    for cached in list(_matchers.values()):
+        cached.matcher = None
+        cached.version += 1
+
+
+async def get_alias_matcher(session: AsyncSession) -> AliasMatcher:
+    """Return the compiled alias matcher, building it with one query if needed."""
+    cached = _cache_for(session.sync_session)
+    if cached.matcher is not None:
+        return cached.matcher
+
+    version = cached.version
+    result = await session.execute(select(MerchantAlias).order_by(MerchantAlias.id))
+    matcher = AliasMatcher(result.scalars().all())
+    # Don't cache alias edits this session has not committed yet
+    if version == cached.version and not session.info.get(_CHANGED_KEY):
+        cached.matcher = matcher
+    return matcher
+
+
+def _alias_changed(obj: Any) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in _MATCH_FIELDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_alias_changes(session: Session, flush_context: Any) -> None:
+    if any(isinstance(obj, MerchantAlias) for obj in session.new) or any(
+        isinstance(obj, MerchantAlias) for obj in session.deleted
+    ):
+        session.info[_CHANGED_KEY] = True
+    elif any(isinstance(obj, MerchantAlias) and _alias_changed(obj) for obj in session.dirty):
+        session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_alias_changes(orm_execute_state: ORMExecuteState) -> None:
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not MerchantAlias:
+        return
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if session.info.pop(_CHANGED_KEY, False) and session.bind is not None:
+        cached = _cache_for(session)
+        cached.matcher = None
+        cached.version += 1
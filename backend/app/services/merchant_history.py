@@ -0,0 +1,175 @@
+"""
+Merchant -> bucket history index used for bucket inference on import.
+
+The index maps a lowercased merchant name to the bucket tag ("bucket:value")
+derived from the category the user last gave that merchant. It is built once
+per engine with a two-column projection query and then kept current from
+Session events: changes are collected per session as they are flushed (or
+bulk-inserted) and applied to the cached index on commit. Changes that can
+remove a mapping (deletes, bulk updates, clearing a category, renaming a
+merchant) mark the index stale instead, and the next reader rebuilds it.
+Replacing the database file bypasses those events; call clear_cache() after.
+"""
+
+import weakref
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.orm import Transaction
+
+# session.info keys holding changes not yet committed
+_PENDING_KEY = "merchant_history_pending"
+_STALE_KEY = "merchant_history_stale"
+
+
+def history_bucket(category: str) -> str:
+    """Convert a legacy category name to the bucket tag used in user history."""
+    return f"bucket:{category.lower().replace(' ', '-').replace('&', 'and')}"
+
+
+class MerchantHistoryIndex:
+    """Cached merchant -> bucket tag map for one database engine."""
+
+    def __init__(self) -> None:
+        self._history: Optional[Dict[str, str]] = None
+        # Bumped whenever the cached map is discarded, so a rebuild that raced
+        # with a commit does not store stale results
+        self.version = 0
+
+    async def get(self, session: AsyncSession) -> Mapping[str, str]:
+        """Return the history map, building it with one query if needed."""
+        if self._history is not None:
+            return self._history
+
+        version = self.version
+        result = await session.execute(
+            select(Transaction.merchant, Transaction.category)
+            .where(Transaction.merchant.isnot(None), Transaction.category.isnot(None))
+            .order_by(Transaction.id)
+        )
+        history: Dict[str, str] = {}
+        for merchant, category in result:
+            if merchant and category:
+                history[merchant.lower()] = history_bucket(category)
+
+        # Only cache what other sessions can see
+        if version == self.version and not _has_pending(session.sync_session):
+            self._history = history
+        return history
+
+    def apply(self, updates: Dict[str, str]) -> None:
+        """Merge committed merchant -> bucket updates into the cached map."""
+        if self._history is not None:
+            self._history.update(updates)
+
+    def invalidate(self) -> None:
+        """Discard the cached map; the next reader rebuilds it."""
+        self._history = None
+        self.version += 1
+
+
+_indexes: "weakref.WeakKeyDictionary[Engine, MerchantHistoryIndex]" = weakref.WeakKeyDictionary()
+
+
+def _engine_for(session: Session) -> Engine:
+    bind = session.get_bind()
+    return bind.engine
+
+
+def get_index(session: Session) -> MerchantHistoryIndex:
+    """Return the history index for the engine ``session`` is bound to."""
+    engine = _engine_for(session)
+    index = _indexes.get(engine)
+    if index is None:
+        index = _indexes[engine] = MerchantHistoryIndex()
+    return index
+
+
+def clear_cache() -> None:
+    """Discard every cached history map, e.g. after the database file was replaced."""
+    for index in list(_indexes.values()):
+        index.invalidate()
+
+
+async def get_merchant_history(session: AsyncSession) -> Mapping[str, str]:
+    """Return the merchant -> bucket tag history for bucket inference (read-only)."""
+    return await get_index(session.sync_session).get(session)
+
+
+# ============================================================================
+# Session event hooks
+# ============================================================================
+
+
+def _has_pending(session: Session) -> bool:
+    return bool(session.info.get(_PENDING_KEY)) or session.info.get(_STALE_KEY, False)
+
+
+def _record(session: Session, merchant: Any, category: Any) -> None:
+    if merchant and category:
+        session.info.setdefault(_PENDING_KEY, {})[merchant.lower()] = history_bucket(category)
+
+
+def _mark_stale(session: Session) -> None:
+    session.info[_STALE_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_changes(session: Session, flush_context: Any) -> None:
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            _record(session, obj.merchant, obj.category)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Transaction):
+            continue
+        state = inspect(obj)
+        if state.attrs.merchant.history.has_changes():
+            _mark_stale(session)
+        elif state.attrs.category.history.has_changes():
+            if obj.category:
+                _record(session, obj.merchant, obj.category)
+            else:
+                _mark_stale(session)
+
+    if any(isinstance(obj, Transaction) and obj.category for obj in session.deleted):
+        _mark_stale(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_changes(orm_execute_state: ORMExecuteState) -> None:
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not Transaction:
+        return
+    session = orm_execute_state.session
+    if orm_execute_state.is_insert:
+        params = orm_execute_state.parameters or []
+        for row in params if isinstance(params, list) else [params]:
+            _record(session, row.get("merchant"), row.get("category"))
+    elif orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_stale(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_changes(session: Session) -> None:
+    updates = session.info.pop(_PENDING_KEY, None)
+    stale = session.info.pop(_STALE_KEY, False)
+    if not (updates or stale) or session.bind is None:
+        return
+    index = get_index(session)
+    if stale:
+        index.invalidate()
+    else:
+        index.apply(updates)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_changes(session: Session, previous_transaction: Any) -> None:
+    # A savepoint rollback may have undone only some of the collected changes;
+    # rebuilding on the next commit is always correct
+    if session.info.pop(_PENDING_KEY, None):
+        _mark_stale(session)
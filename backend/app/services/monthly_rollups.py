@@ -0,0 +1,515 @@
+"""
+Monthly rollups: per-month transaction totals for reports.
+
+The monthly_rollups table holds one row per (month, account, bucket tag,
+category, is_transfer) group with income, expenses and counts. A report over
+whole months reads about one row per group and month instead of every
+transaction in the window.
+
+Rows are never adjusted by deltas. Whenever transactions or their bucket tags
+change, each affected month is recomputed from the transactions table inside
+the same database transaction, just before commit. Changes are collected from
+Session events:
+
+- ORM changes (create, edit, delete, re-tag, split) in after_flush
+- bulk INSERT/UPDATE/DELETE on transactions or transaction_tags executed
+  through a Session in do_orm_execute
+
+Statements that cannot be narrowed to specific months mark the whole table
+for a rebuild instead. SQL that bypasses the Session (raw connections, other
+processes, text() statements) is not seen. Call mark_rebuild() after it, or
+run ``python -m scripts.rebuild_rollups`` (``--check`` compares the table
+with the transactions it summarizes).
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Collection, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import (
+    ColumnElement,
+    Integer,
+    Row,
+    Select,
+    case,
+    cast,
+    delete,
+    event,
+    extract,
+    func,
+    insert,
+    inspect,
+    literal,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+from sqlalchemy.sql.operators import eq
+from sqlalchemy.sql.visitors import iterate
+
+from app.orm import MonthlyRollup, Tag, Transaction, TransactionTag
+
+# session.info keys holding changes not yet applied to the rollups
+_MONTHS_KEY = "monthly_rollups_months"
+_TRANSACTIONS_KEY = "monthly_rollups_transaction_ids"
+_TAGS_KEY = "monthly_rollups_tag_ids"
+_REBUILD_KEY = "monthly_rollups_rebuild"
+
+# Transaction columns that feed a rollup row
+_ROLLUP_COLUMNS = frozenset({"date", "amount", "account_tag_id", "account_source", "category", "is_transfer"})
+
+# Transaction ids per month-lookup query
+_ID_CHUNK = 5000
+
+
+def year_month(day: date) -> int:
+    """YYYYMM key of the month containing ``day``."""
+    return day.year * 100 + day.month
+
+
+def _month_start(key: int) -> date:
+    return date(key // 100, key % 100, 1)
+
+
+def _next_month(key: int) -> int:
+    year, month = divmod(key, 100)
+    return (year + 1) * 100 + 1 if month == 12 else key + 1
+
+
+def whole_months(
+    start_date: Optional[date], end_date: Optional[date], *, end_inclusive: bool = False
+) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """First and last YYYYMM of a window made of whole months, else None.
+
+    ``None`` for either bound means open-ended. ``end_date`` is exclusive
+    unless ``end_inclusive`` is set, matching report_filters().
+    """
+    if start_date is not None and start_date.day != 1:
+        return None
+    first = year_month(start_date) if start_date is not None else None
+    if end_date is None:
+        return first, None
+    if end_inclusive:
+        if (end_date + timedelta(days=1)).day != 1:
+            return None
+        last = year_month(end_date)
+    else:
+        if end_date.day != 1:
+            return None
+        last = year_month(end_date - timedelta(days=1))
+    if first is not None and last < first:
+        return None
+    return first, last
+
+
+# ============================================================================
+# Computing rollup rows from transactions
+# ============================================================================
+
+_TRANSACTION_YEAR_MONTH = cast(extract("year", Transaction.date), Integer) * 100 + cast(
+    extract("month", Transaction.date), Integer
+)
+
+# The bucket a transaction reports under: the highest bucket tag value, as in
+# the report "bucket" dimension (split transactions carry several)
+_bucket_tag_id = (
+    select(Tag.id)
+    .join(TransactionTag, TransactionTag.tag_id == Tag.id)
+    .where(TransactionTag.transaction_id == Transaction.id, Tag.namespace == "bucket")
+    .order_by(Tag.value.desc())
+    .limit(1)
+    .correlate(Transaction)
+    .scalar_subquery()
+)
+
+
+def _source_query(*where: ColumnElement[bool]) -> Select[Any]:
+    """Rollup rows computed from the transactions matching ``where``."""
+    per_transaction = (
+        select(
+            _TRANSACTION_YEAR_MONTH.label("year_month"),
+            Transaction.account_tag_id,
+            Transaction.account_source,
+            _bucket_tag_id.label("bucket_tag_id"),
+            func.coalesce(func.nullif(Transaction.category, ""), "Uncategorized").label("category"),
+            Transaction.is_transfer,
+            Transaction.amount,
+            Transaction.date,
+        )
+        .where(*where)
+        .subquery()
+    )
+    keys = (
+        per_transaction.c.year_month,
+        per_transaction.c.account_tag_id,
+        per_transaction.c.account_source,
+        per_transaction.c.bucket_tag_id,
+        per_transaction.c.category,
+        per_transaction.c.is_transfer,
+    )
+    amount = per_transaction.c.amount
+    return select(
+        *keys,
+        func.sum(case((amount > 0, amount), else_=0.0)),
+        func.sum(case((amount < 0, -amount), else_=0.0)),
+        func.count(),
+        func.sum(case((amount < 0, 1), else_=0)),
+        func.min(per_transaction.c.date),
+    ).group_by(*keys)
+
+
+_INSERT_COLUMNS = [
+    "year_month",
+    "account_tag_id",
+    "account_source",
+    "bucket_tag_id",
+    "category",
+    "is_transfer",
+    "income",
+    "expenses",
+    "transaction_count",
+    "expense_count",
+    "first_date",
+]
+
+
+def refresh_months(session: Session, months: Collection[int]) -> None:
+    """Recompute the rollup rows of ``months`` (YYYYMM) from transactions."""
+    if not months:
+        return
+    start = _month_start(min(months))
+    end = _month_start(_next_month(max(months)))
+    session.execute(
+        delete(MonthlyRollup).where(MonthlyRollup.year_month.in_(months)),
+        execution_options={"synchronize_session": False},
+    )
+    session.execute(
+        insert(MonthlyRollup).from_select(
+            _INSERT_COLUMNS,
+            _source_query(Transaction.date >= start, Transaction.date < end, _TRANSACTION_YEAR_MONTH.in_(months)),
+        )
+    )
+
+
+def rebuild(session: Session) -> None:
+    """Recompute every rollup row from transactions."""
+    session.execute(delete(MonthlyRollup), execution_options={"synchronize_session": False})
+    session.execute(insert(MonthlyRollup).from_select(_INSERT_COLUMNS, _source_query()))
+
+
+async def rebuild_rollups(session: AsyncSession) -> None:
+    """Rebuild the rollup table; the caller commits."""
+    await session.run_sync(rebuild)
+    _clear_pending(session.sync_session)
+
+
+# ============================================================================
+# Consistency check
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class RollupMismatch:
+    """One rollup group whose stored totals differ from its transactions."""
+
+    key: Tuple[Any, ...]  # (year_month, account_tag_id, account_source, bucket_tag_id, category, is_transfer)
+    stored: Optional[Tuple[float, float, int, int]]  # income, expenses, count, expense count
+    actual: Optional[Tuple[float, float, int, int]]
+
+
+def _totals(rows: Iterable[Any]) -> Dict[Tuple[Any, ...], Tuple[float, float, int, int]]:
+    return {tuple(row[:6]): (float(row[6]), float(row[7]), int(row[8]), int(row[9])) for row in rows}
+
+
+def _same(a: Tuple[float, float, int, int], b: Tuple[float, float, int, int]) -> bool:
+    return a[2:] == b[2:] and abs(a[0] - b[0]) < 0.005 and abs(a[1] - b[1]) < 0.005
+
+
+async def check_rollups(session: AsyncSession) -> List[RollupMismatch]:
+    """Compare every stored rollup row with a fresh computation from transactions."""
+    stored = _totals(
+        await session.execute(
+            select(
+                MonthlyRollup.year_month,
+                MonthlyRollup.account_tag_id,
+                MonthlyRollup.account_source,
+                MonthlyRollup.bucket_tag_id,
+                MonthlyRollup.category,
+                MonthlyRollup.is_transfer,
+                MonthlyRollup.income,
+                MonthlyRollup.expenses,
+                MonthlyRollup.transaction_count,
+                MonthlyRollup.expense_count,
+            )
+        )
+    )
+    actual = _totals(await session.execute(_source_query()))
+    mismatches = []
+    for key in sorted(stored.keys() | actual.keys(), key=repr):
+        stored_totals, actual_totals = stored.get(key), actual.get(key)
+        if stored_totals is None or actual_totals is None or not _same(stored_totals, actual_totals):
+            mismatches.append(RollupMismatch(key, stored_totals, actual_totals))
+    return mismatches
+
+
+# ============================================================================
+# Reading rollups
+# ============================================================================
+
+ROLLUP_DIMENSIONS: Dict[str, ColumnElement[Any]] = {
+    "year": MonthlyRollup.year_month // 100,
+    "month": MonthlyRollup.year_month % 100,
+    "category": MonthlyRollup.category.expression,
+    "account": MonthlyRollup.account_source.expression,
+    "bucket": func.coalesce(Tag.value, "Untagged"),
+}
+
+
+async def aggregate_rollups(
+    session: AsyncSession,
+    group_by: Sequence[str],
+    months: Tuple[Optional[int], Optional[int]],
+    *,
+    accounts: Sequence[str] = (),
+    expenses_only: bool = False,
+) -> List[Row[Any]]:
+    """Rows shaped like report_helpers.aggregate(), read from the rollups.
+
+    ``months`` is the inclusive (first, last) YYYYMM range; None is
+    open-ended. Transfers are excluded. With ``expenses_only`` the rows
+    describe only the negative transactions of each group, as if filtered by
+    ``amount < 0``.
+    """
+    first, last = months
+    dimensions = [ROLLUP_DIMENSIONS[name].label(name) for name in group_by]
+    income: ColumnElement[Any]
+    count: ColumnElement[Any]
+    if expenses_only:
+        income = literal(0.0)
+        count = func.coalesce(func.sum(MonthlyRollup.expense_count), 0)
+    else:
+        income = func.coalesce(func.sum(MonthlyRollup.income), 0.0)
+        count = func.coalesce(func.sum(MonthlyRollup.transaction_count), 0)
+
+    query: Select[Any] = select(
+        *dimensions,
+        income.label("income"),
+        func.coalesce(func.sum(MonthlyRollup.expenses), 0.0).label("expenses"),
+        count.label("count"),
+        func.min(MonthlyRollup.first_date).label("first_date"),
+    ).select_from(MonthlyRollup)
+    if "bucket" in group_by:
+        query = query.outerjoin(Tag, Tag.id == MonthlyRollup.bucket_tag_id)
+
+    query = query.where(MonthlyRollup.is_transfer.is_(False))
+    if first is not None:
+        query = query.where(MonthlyRollup.year_month >= first)
+    if last is not None:
+        query = query.where(MonthlyRollup.year_month <= last)
+    if accounts:
+        query = query.where(MonthlyRollup.account_source.in_(accounts))
+    if expenses_only:
+        query = query.where(MonthlyRollup.expense_count > 0)
+    if group_by:
+        query = query.group_by(*(ROLLUP_DIMENSIONS[name] for name in group_by))
+
+    result = await session.execute(query.order_by(func.min(MonthlyRollup.first_date)))
+    return list(result.all())
+
+
+# ============================================================================
+# Change tracking
+# ============================================================================
+
+
+def mark_months(session: Session, months: Iterable[int]) -> None:
+    """Schedule ``months`` (YYYYMM) for recomputation at commit."""
+    session.info.setdefault(_MONTHS_KEY, set()).update(months)
+
+
+def mark_transactions(session: Session, transaction_ids: Iterable[int]) -> None:
+    """Schedule the months of existing transactions for recomputation at commit."""
+    session.info.setdefault(_TRANSACTIONS_KEY, set()).update(transaction_ids)
+
+
+def mark_rebuild(session: Session) -> None:
+    """Schedule a full rebuild at commit, for changes made with raw SQL."""
+    session.info[_REBUILD_KEY] = True
+
+
+def _has_pending(session: Session) -> bool:
+    return any(session.info.get(key) for key in (_MONTHS_KEY, _TRANSACTIONS_KEY, _TAGS_KEY, _REBUILD_KEY))
+
+
+def _clear_pending(session: Session) -> None:
+    for key in (_MONTHS_KEY, _TRANSACTIONS_KEY, _TAGS_KEY, _REBUILD_KEY):
+        session.info.pop(key, None)
+
+
+def _chunks(values: Sequence[int]) -> Iterable[Sequence[int]]:
+    for i in range(0, len(values), _ID_CHUNK):
+        yield values[i : i + _ID_CHUNK]
+
+
+def _resolve_months(session: Session, transaction_ids: Set[int], tag_ids: Set[int]) -> Set[int]:
+    """Months of the given transactions and of transactions carrying the given tags."""
+    months: Set[int] = set()
+    for chunk in _chunks(sorted(transaction_ids)):
+        months.update(
+            session.execute(select(_TRANSACTION_YEAR_MONTH).distinct().where(Transaction.id.in_(chunk))).scalars()
+        )
+    if tag_ids:
+        months.update(
+            session.execute(
+                select(_TRANSACTION_YEAR_MONTH)
+                .distinct()
+                .join(TransactionTag, TransactionTag.transaction_id == Transaction.id)
+                .where(TransactionTag.tag_id.in_(tag_ids))
+            ).scalars()
+        )
+    return months
+
+
+def _date_months(state: Any) -> Set[int]:
+    """Months of a Transaction's current and (if changed) previous date."""
+    history = state.attrs.date.history
+    return {year_month(day) for day in (*history.unchanged, *history.added, *history.deleted) if day is not None}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_changes(session: Session, flush_context: Any) -> None:
+    months: Set[int] = set()
+    transaction_ids: Set[int] = set()
+    tag_ids: Set[int] = set()
+
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            months.update(_date_months(inspect(obj)))
+        elif isinstance(obj, TransactionTag):
+            transaction_ids.add(obj.transaction_id)
+
+    for obj in session.dirty:
+        if isinstance(obj, Transaction):
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in _ROLLUP_COLUMNS):
+                months.update(_date_months(state))
+        elif isinstance(obj, Tag):
+            # Renaming a bucket can change which bucket a split transaction reports under
+            if obj.namespace == "bucket" and inspect(obj).attrs.value.history.has_changes():
+                tag_ids.add(obj.id)
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            months.update(_date_months(inspect(obj)))
+        elif isinstance(obj, TransactionTag):
+            transaction_ids.add(obj.transaction_id)
+
+    if months:
+        mark_months(session, months)
+    if transaction_ids:
+        mark_transactions(session, transaction_ids)
+    if tag_ids:
+        session.info.setdefault(_TAGS_KEY, set()).update(tag_ids)
+
+
+def _parameter_sets(orm_execute_state: ORMExecuteState) -> List[Dict[str, Any]]:
+    params = orm_execute_state.parameters
+    if not params:
+        return [{}]
+    if isinstance(params, Mapping):
+        return [dict(params)]
+    return [dict(p) for p in params]
+
+
+def _bound_ids(whereclause: Any, column_name: str, parameter_sets: List[Dict[str, Any]]) -> Optional[Set[int]]:
+    """Values of ``column = :param`` in an executemany WHERE clause, if it has one."""
+    for element in iterate(whereclause):
+        if not isinstance(element, BinaryExpression) or element.operator is not eq:
+            continue
+        for column, other in ((element.left, element.right), (element.right, element.left)):
+            if getattr(column, "name", None) == column_name and isinstance(other, BindParameter):
+                if all(other.key in params for params in parameter_sets):
+                    return {params[other.key] for params in parameter_sets}
+    return None
+
+
+def _collect_dml(orm_execute_state: ORMExecuteState, table_name: str) -> None:
+    session = orm_execute_state.session
+    statement: Any = orm_execute_state.statement
+    parameter_sets = _parameter_sets(orm_execute_state)
+    id_column = "id" if table_name == "transactions" else "transaction_id"
+
+    if orm_execute_state.is_insert:
+        if table_name == "transactions" and all(isinstance(p.get("date"), date) for p in parameter_sets):
+            mark_months(session, {year_month(p["date"]) for p in parameter_sets})
+        elif table_name == "transaction_tags" and all(p.get("transaction_id") for p in parameter_sets):
+            mark_transactions(session, {p["transaction_id"] for p in parameter_sets})
+        else:
+            mark_rebuild(session)
+        return
+
+    if orm_execute_state.is_update:
+        changed = set(statement.compile().params) | {key for p in parameter_sets for key in p}
+        if table_name == "transactions" and not changed & _ROLLUP_COLUMNS:
+            return
+        if "date" in changed:
+            mark_rebuild(session)
+            return
+
+    # UPDATE or DELETE: find the affected months before the rows change
+    whereclause = statement.whereclause
+    if len(parameter_sets) > 1 or whereclause is None:
+        # executemany (ORM bulk by primary key, or a WHERE on a bound id), or no WHERE at all
+        ids: Optional[Set[int]] = None
+        if parameter_sets and all(id_column in p for p in parameter_sets):
+            ids = {p[id_column] for p in parameter_sets}
+        elif whereclause is not None:
+            ids = _bound_ids(whereclause, id_column, parameter_sets)
+        if ids is None:
+            mark_rebuild(session)
+        else:
+            mark_transactions(session, ids)
+        return
+
+    table = statement.table
+    id_query = select(table.c[id_column]).where(whereclause)
+    months_query = select(_TRANSACTION_YEAR_MONTH).distinct().where(Transaction.id.in_(id_query))
+    mark_months(session, session.execute(months_query, parameter_sets[0] if parameter_sets else {}).scalars())
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_changes(orm_execute_state: ORMExecuteState) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    table_name = getattr(table, "name", None)
+    if table_name in ("transactions", "transaction_tags"):
+        _collect_dml(orm_execute_state, table_name)
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_before_commit(session: Session) -> None:
+    if not (_has_pending(session) or session.new or session.dirty or session.deleted):
+        return
+    # Flush here so the final flush's changes are collected and included
+    session.flush()
+    if not _has_pending(session):
+        return
+    if session.info.get(_REBUILD_KEY):
+        _clear_pending(session)
+        rebuild(session)
+        return
+    months = set(session.info.get(_MONTHS_KEY, ()))
+    months |= _resolve_months(session, session.info.get(_TRANSACTIONS_KEY, set()), session.info.get(_TAGS_KEY, set()))
+    _clear_pending(session)
+    refresh_months(session, months)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_changes(session: Session, previous_transaction: Any) -> None:
+    # Rolled back to the last commit, whose rollups are current. After a
+    # savepoint rollback the collected months may include undone changes;
+    # recomputing them anyway is harmless.
+    if not session.in_transaction():
+        _clear_pending(session)
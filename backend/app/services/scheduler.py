@@ -4,6 +4,7 @@ Scheduler service for automated backup and demo reset operations.
 Uses APScheduler with AsyncIOScheduler to run background tasks.
 """
 
+import asyncio
 import logging
 from datetime import date, datetime
 from typing import Optional
@@ -14,6 +15,7 @@ from pydantic import BaseModel
 from sqlalchemy import text
 
 from app.config import settings
+from app.services import merchant_aliases, merchant_history
 from app.services.backup import backup_service
 
 logger = logging.getLogger(__name__)
@@ -135,7 +137,8 @@ class SchedulerService:
         """Execute an automatic backup."""
         try:
             logger.info("Running scheduled backup...")
-            backup = backup_service.create_backup(
+            backup = await asyncio.to_thread(
+                backup_service.create_backup,
                 description="Scheduled automatic backup",
                 source="scheduled",
             )
@@ -152,7 +155,12 @@ class SchedulerService:
                 logger.warning("No demo backup configured - skipping reset")
                 return
 
-            backup_service.restore_backup(demo_backup.id)
+            from app.database import engine
+
+            await engine.dispose()
+            await asyncio.to_thread(backup_service.restore_backup, demo_backup.id)
+            merchant_aliases.clear_cache()
+            merchant_history.clear_cache()
             logger.info(f"Demo reset completed - restored from backup {demo_backup.id}")
 
             # Shift transaction dates so data always looks fresh
@@ -168,6 +176,8 @@ class SchedulerService:
         relative to "now" rather than the original seed date.
         """
         from app.database import async_session
+        from app.services.monthly_rollups import mark_rebuild
+        from app.services.data_generations import mark_changed
 
         try:
             async with async_session() as session:
@@ -203,6 +213,9 @@ class SchedulerService:
                     """),
                     {"offset": days_offset},
                 )
+                # Raw SQL bypasses rollup and generation change tracking; every month moved
+                mark_rebuild(session.sync_session)
+                mark_changed(session.sync_session, "transactions")
 
                 # Update import session date ranges
                 await session.execute(
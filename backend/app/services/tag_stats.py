@@ -0,0 +1,123 @@
+"""
+Tag statistics: usage of every tag in a namespace from one grouped query.
+
+The tag management pages show, per tag, how many transactions use it, their
+total amount and the first and last dates it was used. tag_stats() computes
+all of it with a single GROUP BY over the tags outer-joined to their
+transactions, instead of a count and a sum per tag:
+
+- account tags are joined through transactions.account_tag_id
+- every other namespace is joined through transaction_tags
+
+Results are kept for TAG_STATS_CACHE_SECONDS, keyed by the data generation
+tokens of the tables they read (see app.services.data_generations). Any commit
+that changes tags, tag assignments or transactions gives those tables new
+tokens, so a cached entry is never served after a write made through the app.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.orm import Tag, Transaction, TransactionTag
+from app.services.data_generations import current_tokens
+
+# Tables the statistics are computed from
+STATS_TABLES = ("transactions", "transaction_tags", "tags")
+
+
+@dataclass(frozen=True)
+class _Entry:
+    tokens: Tuple[Tuple[str, str], ...]
+    expires_at: float
+    stats: Tuple[Dict[str, Any], ...]
+
+
+_cache: Dict[str, _Entry] = {}
+
+
+def clear_cache() -> None:
+    """Drop all cached statistics."""
+    _cache.clear()
+
+
+def _stats_query(namespace: str) -> Any:
+    query = select(
+        Tag,
+        func.count(Transaction.id).label("count"),
+        func.coalesce(func.sum(Transaction.amount), 0).label("total"),
+        func.min(Transaction.date).label("first_used"),
+        func.max(Transaction.date).label("last_used"),
+    )
+    if namespace == "account":
+        query = query.outerjoin(Transaction, Transaction.account_tag_id == Tag.id)
+    else:
+        query = query.outerjoin(TransactionTag, TransactionTag.tag_id == Tag.id).outerjoin(
+            Transaction, Transaction.id == TransactionTag.transaction_id
+        )
+    return query.where(Tag.namespace == namespace).group_by(Tag.id).order_by(Tag.sort_order, Tag.value)
+
+
+async def _query_stats(session: AsyncSession, namespace: str) -> List[Dict[str, Any]]:
+    result = await session.execute(_stats_query(namespace))
+    return [
+        {
+            "id": tag.id,
+            "value": tag.value,
+            "description": tag.description,
+            "color": tag.color,
+            "sort_order": tag.sort_order,
+            "transaction_count": count,
+            "total_amount": float(total),
+            "first_used": first_used,
+            "last_used": last_used,
+        }
+        for tag, count, total, first_used, last_used in result.all()
+    ]
+
+
+async def tag_stats(
+    session: AsyncSession, namespace: str, tokens: Optional[Mapping[str, str]] = None
+) -> List[Dict[str, Any]]:
+    """Usage statistics of every tag in ``namespace``, ordered for display.
+
+    ``tokens`` are the current data generation tokens if the caller already
+    read them (conditional GETs do); otherwise they are looked up when the
+    cache is enabled.
+    """
+    ttl = settings.tag_stats_cache_seconds
+    if ttl <= 0:
+        return await _query_stats(session, namespace)
+
+    if tokens is None:
+        tokens = await current_tokens(session, STATS_TABLES)
+    key = tuple(sorted((name, token) for name, token in tokens.items() if name in STATS_TABLES))
+    entry = _cache.get(namespace)
+    now = time.monotonic()
+    if entry is None or entry.tokens != key or entry.expires_at <= now:
+        stats = await _query_stats(session, namespace)
+        entry = _Entry(tokens=key, expires_at=now + ttl, stats=tuple(stats))
+        _cache[namespace] = entry
+    return [dict(row) for row in entry.stats]
+
+
+async def tags_with_usage(session: AsyncSession, namespace: Optional[str] = None) -> Sequence[Tuple[Tag, int]]:
+    """Tags (optionally of one namespace) with how many transactions they are assigned to.
+
+    Counts come from transaction_tags, the same rows that keep a tag from
+    being deleted.
+    """
+    query = (
+        select(Tag, func.count(TransactionTag.transaction_id))
+        .outerjoin(TransactionTag, TransactionTag.tag_id == Tag.id)
+        .group_by(Tag.id)
+        .order_by(Tag.namespace, Tag.sort_order, Tag.value)
+    )
+    if namespace:
+        query = query.where(Tag.namespace == namespace)
+    result = await session.execute(query)
+    return [(tag, count) for tag, count in result.all()]
@@ -0,0 +1,115 @@
+"""
+Streaming transaction export (CSV and NDJSON).
+
+Rows are read on a streaming cursor as ExportRow projections (only the
+exported columns, no ORM objects) and encoded into chunks of about
+CHUNK_SIZE bytes as they arrive, so an export holds one fetch batch and one
+chunk in memory whatever its size. Optionally gzip-compressed on the fly.
+"""
+
+import csv
+import io
+import json
+import zlib
+from typing import Any, AsyncIterator, Dict, List
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.projections import EXPORT_ROWS, ExportRow
+
+# Bytes of encoded output collected before a chunk is sent
+CHUNK_SIZE = 64 * 1024
+# Rows fetched from the database per round trip
+FETCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+CSV_HEADER = [
+    "Date",
+    "Amount",
+    "Merchant",
+    "Description",
+    "Account",
+    "Category",
+    "Status",
+    "Notes",
+    "Is Transfer",
+    "Reference ID",
+]
+
+
+def csv_record(row: ExportRow) -> List[Any]:
+    """One CSV line, in CSV_HEADER order."""
+    return [
+        row.date.isoformat() if row.date else "",
+        row.amount,
+        row.merchant or "",
+        row.description or "",
+        row.account_source or "",
+        row.category or "",
+        row.reconciliation_status or "",
+        row.notes or "",
+        "Yes" if row.is_transfer else "No",
+        row.reference_id or "",
+    ]
+
+
+def json_record(row: ExportRow) -> Dict[str, Any]:
+    """One NDJSON object, keyed by column name."""
+    record = row._asdict()
+    record["date"] = row.date.isoformat() if row.date else None
+    return record
+
+
+async def csv_chunks(rows: AsyncIterator[ExportRow]) -> AsyncIterator[bytes]:
+    """Encode rows as CSV (header first), yielding UTF-8 chunks."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    async for row in rows:
+        writer.writerow(csv_record(row))
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+async def ndjson_chunks(rows: AsyncIterator[ExportRow]) -> AsyncIterator[bytes]:
+    """Encode rows as newline-delimited JSON, yielding UTF-8 chunks."""
+    lines: List[str] = []
+    size = 0
+    async for row in rows:
+        line = json.dumps(json_record(row)) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(lines).encode()
+            lines.clear()
+            size = 0
+    if lines:
+        yield "".join(lines).encode()
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a byte stream into one gzip member as it is produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def export_chunks(
+    session: AsyncSession, statement: Select[Any], export_format: str, *, compress: bool = False
+) -> AsyncIterator[bytes]:
+    """Run ``statement`` (built by ``EXPORT_ROWS.select()``) and return its encoded export.
+
+    The query starts here, so errors surface before a response is begun.
+    ``export_format`` is a key of EXPORT_MEDIA_TYPES.
+    """
+    rows = await EXPORT_ROWS.stream(session, statement, FETCH_SIZE)
+    chunks = csv_chunks(rows) if export_format == "csv" else ndjson_chunks(rows)
+    return gzip_chunks(chunks) if compress else chunks
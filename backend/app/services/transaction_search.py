@@ -0,0 +1,177 @@
+"""
+Full-text transaction search.
+
+``search`` on the transaction endpoints matches merchant, description and
+notes through a full-text index instead of ``ILIKE '%term%'``, which scans
+every row:
+
+- SQLite: the FTS5 external-content table ``transactions_fts``, kept in sync
+  with ``transactions`` by triggers
+- PostgreSQL: a GIN index over ``to_tsvector('simple', ...)`` of the three
+  columns
+- other dialects, and searches with no indexable words: ILIKE
+
+The search text is matched as a phrase whose last word is a prefix, so
+"whole fo" finds "WHOLE FOODS MARKET" while the user is still typing. Words
+are matched from their start: "mart" no longer finds "WALMART".
+
+The index is created by the add_transaction_search migration. The same DDL
+is attached to the transactions table here so databases built with
+``metadata.create_all()`` (tests, E2E fixtures) get it too.
+"""
+
+import re
+from typing import Any, List, Optional
+
+from sqlalchemy import DDL, Float, bindparam, event, func, literal_column, or_, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import column, table
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+from app.orm import Transaction
+
+FTS_TABLE = "transactions_fts"
+
+# Statements creating the SQLite index; mirrored in the migration
+SQLITE_INDEX_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "merchant, description, notes, content='transactions', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON transactions BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, merchant, description, notes) "
+    "VALUES (new.id, new.merchant, new.description, new.notes); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON transactions BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, merchant, description, notes) "
+    "VALUES ('delete', old.id, old.merchant, old.description, old.notes); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF merchant, description, notes ON transactions BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, merchant, description, notes) "
+    "VALUES ('delete', old.id, old.merchant, old.description, old.notes); "
+    f"INSERT INTO {FTS_TABLE}(rowid, merchant, description, notes) "
+    "VALUES (new.id, new.merchant, new.description, new.notes); END",
+]
+
+# Must match the PostgreSQL index expression exactly for the planner to use it
+POSTGRES_SEARCH_VECTOR = (
+    "to_tsvector('simple', coalesce(transactions.merchant, '') || ' ' || "
+    "coalesce(transactions.description, '') || ' ' || coalesce(transactions.notes, ''))"
+)
+POSTGRES_INDEX_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_transactions_search ON transactions USING gin ("
+    "to_tsvector('simple', coalesce(merchant, '') || ' ' || "
+    "coalesce(description, '') || ' ' || coalesce(notes, '')))",
+]
+
+# Word characters as the unicode61 tokenizer and PostgreSQL's parser see them
+_WORD = re.compile(r"[^\W_]+")
+
+_fts = table(FTS_TABLE, column("rowid"), column(FTS_TABLE))
+
+
+def search_words(search: str) -> List[str]:
+    """Indexable words of ``search``, lowercased."""
+    return _WORD.findall(search.lower())
+
+
+def fts_query(words: List[str]) -> str:
+    """FTS5 MATCH expression: the words as a phrase, the last one a prefix."""
+    return '"' + " ".join(words) + '"*'
+
+
+def tsquery(words: List[str]) -> str:
+    """PostgreSQL tsquery: the words as a phrase, the last one a prefix."""
+    return " <-> ".join(words) + ":*"
+
+
+def _ilike_clause(search: str) -> ColumnElement[bool]:
+    pattern = f"%{search}%"
+    return or_(
+        Transaction.merchant.ilike(pattern),
+        Transaction.description.ilike(pattern),
+        Transaction.notes.ilike(pattern),
+    )
+
+
+def _fts_match(words: List[str]) -> ColumnElement[bool]:
+    return _fts.c[FTS_TABLE].op("MATCH")(bindparam("fts_query", fts_query(words), unique=True))
+
+
+def _ts_query(words: List[str]) -> ColumnElement[Any]:
+    return func.to_tsquery(literal_column("'simple'"), bindparam("ts_query", tsquery(words), unique=True))
+
+
+class _DialectChoice(ColumnElement[Any]):
+    """Compiles to ``sqlite``, ``postgresql`` or ``default`` depending on the dialect."""
+
+    inherit_cache = True
+    _traverse_internals = [
+        ("sqlite", InternalTraversal.dp_clauseelement),
+        ("postgresql", InternalTraversal.dp_clauseelement),
+        ("default", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, sqlite: ColumnElement[Any], postgresql: ColumnElement[Any], default: ColumnElement[Any]):
+        self.sqlite = sqlite
+        self.postgresql = postgresql
+        self.default = default
+        self.type = default.type
+        # A boolean choice is a WHERE clause as is, not a value compared with 1
+        self._is_implicitly_boolean = default._is_implicitly_boolean
+
+
+@compiles(_DialectChoice)
+def _compile_default(element: _DialectChoice, compiler: Any, **kw: Any) -> str:
+    return compiler.process(element.default, **kw)
+
+
+@compiles(_DialectChoice, "sqlite")
+def _compile_sqlite(element: _DialectChoice, compiler: Any, **kw: Any) -> str:
+    return compiler.process(element.sqlite, **kw)
+
+
+@compiles(_DialectChoice, "postgresql")
+def _compile_postgresql(element: _DialectChoice, compiler: Any, **kw: Any) -> str:
+    return compiler.process(element.postgresql, **kw)
+
+
+def search_clause(search: str) -> ColumnElement[bool]:
+    """WHERE clause matching ``search`` against merchant, description and notes."""
+    words = search_words(search)
+    if not words:
+        return _ilike_clause(search)
+    return _DialectChoice(
+        sqlite=Transaction.id.in_(select(_fts.c.rowid).where(_fts_match(words))),
+        postgresql=literal_column(POSTGRES_SEARCH_VECTOR).op("@@")(_ts_query(words)),
+        default=_ilike_clause(search),
+    )
+
+
+def search_relevance(search: str) -> Optional[ColumnElement[float]]:
+    """Relevance of a matching transaction to ``search``, best first when sorted ascending.
+
+    bm25 on SQLite, negated ts_rank on PostgreSQL. Only meaningful together
+    with search_clause(); None when ``search`` has no indexable words.
+    """
+    words = search_words(search)
+    if not words:
+        return None
+    bm25 = (
+        select(literal_column(f"bm25({FTS_TABLE})", Float))
+        .select_from(_fts)
+        .where(_fts_match(words), _fts.c.rowid == Transaction.id)
+        .scalar_subquery()
+    )
+    ts_rank = -func.ts_rank(literal_column(POSTGRES_SEARCH_VECTOR), _ts_query(words), type_=Float)
+    return _DialectChoice(sqlite=bm25, postgresql=ts_rank, default=literal_column("0", Float))
+
+
+def _attach_ddl() -> None:
+    transactions = Transaction.__table__
+    for statement in SQLITE_INDEX_DDL:
+        event.listen(transactions, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in POSTGRES_INDEX_DDL:
+        event.listen(transactions, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    event.listen(transactions, "before_drop", DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"))
+
+
+_attach_ddl()
@@ -0,0 +1,102 @@
+"""
+Worker pools for CPU-bound import work.
+
+Parsing statements, detecting their format, hashing rows and inferring bucket
+tags is pure Python. Run directly in an ``async def`` route it holds the event
+loop, and every other request with it, for the whole import. Routes hand that
+work to this module instead:
+
+- run_blocking(): call a function on the worker threads. For work tied to
+  objects that cannot leave the process, like upload streams and lazy parsers
+- run_cpu(): call a function on the CPU pool. With IMPORT_EXECUTOR=process the
+  function and its arguments must be picklable
+- iterate_blocking(): advance a blocking iterator on the worker threads, a
+  batch of items per hop
+
+IMPORT_EXECUTOR selects the CPU pool:
+
+- thread (default): the worker threads. The event loop stays responsive, but
+  the GIL still runs one parser at a time
+- process: a ProcessPoolExecutor, so parses of several files run on several
+  cores
+- inline: no pools; everything runs on the event loop (debugging, profiling)
+
+Pools are created on first use and stopped by shutdown() when the app exits.
+"""
+
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+_threads: Optional[ThreadPoolExecutor] = None
+_processes: Optional[ProcessPoolExecutor] = None
+
+
+def worker_count() -> int:
+    """Workers per pool: IMPORT_WORKERS, or one per CPU."""
+    return settings.import_workers or os.cpu_count() or 1
+
+
+def _thread_pool() -> Optional[Executor]:
+    global _threads
+    if settings.import_executor == "inline":
+        return None
+    if _threads is None:
+        _threads = ThreadPoolExecutor(max_workers=worker_count(), thread_name_prefix="import-worker")
+    return _threads
+
+
+def _cpu_pool() -> Optional[Executor]:
+    global _processes
+    if settings.import_executor != "process":
+        return _thread_pool()
+    if _processes is None:
+        _processes = ProcessPoolExecutor(max_workers=worker_count())
+    return _processes
+
+
+async def _run(executor: Optional[Executor], func: Callable[..., T], args: tuple) -> T:
+    if executor is None:
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, partial(func, *args))
+
+
+async def run_blocking(func: Callable[..., T], *args: Any) -> T:
+    """Run ``func(*args)`` on a worker thread."""
+    return await _run(_thread_pool(), func, args)
+
+
+async def run_cpu(func: Callable[..., T], *args: Any) -> T:
+    """Run ``func(*args)`` on the CPU pool; both must be picklable for process pools."""
+    return await _run(_cpu_pool(), func, args)
+
+
+def _take(iterator: Iterator[T], count: int) -> List[T]:
+    return list(islice(iterator, count))
+
+
+async def iterate_blocking(iterator: Iterator[T], batch_size: int) -> AsyncIterator[T]:
+    """Yield the items of a blocking iterator, pulling ``batch_size`` at a time on a worker thread.
+
+    The iterator is only ever advanced by one thread at a time.
+    """
+    while batch := await run_blocking(_take, iterator, batch_size):
+        for item in batch:
+            yield item
+
+
+def shutdown() -> None:
+    """Stop the pools without waiting for queued work; they restart on next use."""
+    global _threads, _processes
+    for pool in (_threads, _processes):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _threads = None
+    _processes = None
@@ -1,4 +1,4 @@
-from typing import List, Dict, Tuple, Optional
+from typing import List, Mapping, Tuple, Optional
 import re
 
 # Default bucket tag patterns - maps bucket value to keyword patterns
@@ -161,7 +161,7 @@ def normalize_text(text: str) -> str:
 
 
 def infer_bucket_tag(
-    merchant: str, description: str, amount: float, user_history: Optional[Dict[str, str]] = None
+    merchant: str, description: str, amount: float, user_history: Optional[Mapping[str, str]] = None
 ) -> List[Tuple[str, float]]:
     """
     Infer bucket tag for a transaction
@@ -170,7 +170,7 @@ def infer_bucket_tag(
         merchant: Merchant name
         description: Transaction description
         amount: Transaction amount
-        user_history: Optional dict of merchant -> bucket tag from user's past categorizations
+        user_history: Optional map of merchant -> bucket tag from user's past categorizations
 
     Returns:
         List of (tag, confidence) tuples, sorted by confidence (max 3)
@@ -209,3 +209,22 @@ def infer_bucket_tag(
 
     sorted_tags = sorted(scores.items(), key=lambda x: x[1], reverse=True)
     return sorted_tags[:3]
+
+
+def top_bucket_tags(transactions: List[dict], user_history: Optional[Mapping[str, str]] = None) -> List[Optional[str]]:
+    """
+    Best inferred bucket tag for each parsed transaction dict
+
+    Batch form of infer_bucket_tag() for running a whole import chunk in one
+    worker pool call.
+
+    Returns:
+        One full-format tag ("bucket:value") or None per transaction
+    """
+    tags: List[Optional[str]] = []
+    for txn in transactions:
+        suggestions = infer_bucket_tag(
+            txn.get("merchant", ""), txn.get("description", ""), txn.get("amount", 0), user_history
+        )
+        tags.append(suggestions[0][0] if suggestions else None)
+    return tags
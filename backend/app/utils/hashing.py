@@ -2,7 +2,7 @@
 
 import hashlib
 from datetime import date as date_type
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 
 
 def compute_transaction_content_hash(
@@ -69,3 +69,19 @@ def compute_transaction_hash_from_dict(txn_data: dict, include_account: bool = T
         )
     except (KeyError, TypeError, AttributeError):
         return None
+
+
+def hash_transaction_dicts(transactions: Iterable[dict]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Compute (content_hash, content_hash_no_account) for each transaction dictionary.
+
+    Batch form of compute_transaction_hash_from_dict(), so a whole import chunk
+    can be hashed in one worker pool call.
+    """
+    return [
+        (
+            compute_transaction_hash_from_dict(txn_data, include_account=True),
+            compute_transaction_hash_from_dict(txn_data, include_account=False),
+        )
+        for txn_data in transactions
+    ]
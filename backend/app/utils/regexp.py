@@ -0,0 +1,178 @@
+"""Regular expression matching shared by search, merchant aliases and the SQLite REGEXP function
+
+Patterns are matched case-insensitively with ``re.search`` semantics. Compiled
+patterns are kept in an LRU cache, so a REGEXP filter compiles its pattern
+once per query rather than once per row.
+
+Python's ``re`` cannot be interrupted mid-match, so evaluation is guarded
+up front instead:
+
+- patterns with an unbounded repeat nested inside another repeat
+  (``(a+)+``, ``(\\w+\\s?)*``), which can backtrack exponentially, are
+  refused unless each pass of the outer repeat must consume a literal the
+  inner repeats cannot match (``\\d+(,\\d+)*``), which splits the subject
+  between passes one way only
+- only the first MAX_SUBJECT_LENGTH characters of a value are searched
+"""
+
+import re
+from functools import lru_cache
+from re import _constants as sre_constants  # type: ignore[attr-defined]
+from re import _parser as sre_parse  # type: ignore[attr-defined]
+from typing import Any, List, Optional
+
+# Maximum regex pattern length to prevent ReDoS attacks
+MAX_REGEX_LENGTH = 200
+# Characters of each value a pattern is searched in
+MAX_SUBJECT_LENGTH = 4096
+# Compiled patterns kept between calls
+PATTERN_CACHE_SIZE = 256
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+# Whether a character matches a \\d, \\s or \\w class (or its negation)
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: str.isdecimal,
+    sre_constants.CATEGORY_NOT_DIGIT: lambda char: not char.isdecimal(),
+    sre_constants.CATEGORY_SPACE: str.isspace,
+    sre_constants.CATEGORY_NOT_SPACE: lambda char: not char.isspace(),
+    sre_constants.CATEGORY_WORD: lambda char: char.isalnum() or char == "_",
+    sre_constants.CATEGORY_NOT_WORD: lambda char: not (char.isalnum() or char == "_"),
+}
+
+
+def _in_set(items: Any, char: str) -> bool:
+    """Whether a ``[...]`` set may match ``char`` in either case (True when unsure)."""
+    cases = {char.lower(), char.upper()}
+    negate = False
+    matched = False
+    for op, arg in items:
+        if op == sre_constants.NEGATE:
+            negate = True
+        elif op == sre_constants.LITERAL:
+            matched = matched or chr(arg) in cases
+        elif op == sre_constants.RANGE:
+            matched = matched or any(arg[0] <= ord(case) <= arg[1] for case in cases)
+        elif op == sre_constants.CATEGORY and arg in _CATEGORIES:
+            matched = matched or _CATEGORIES[arg](char)
+        else:
+            return True
+    return not matched if negate else matched
+
+
+def _may_match(parsed: Any, char: str) -> bool:
+    """Whether any part of a parsed pattern may consume ``char`` (True when unsure)."""
+    for op, arg in parsed:
+        if op == sre_constants.LITERAL:
+            if chr(arg).lower() == char.lower():
+                return True
+        elif op == sre_constants.NOT_LITERAL:
+            if chr(arg).lower() != char.lower():
+                return True
+        elif op == sre_constants.IN:
+            if _in_set(arg, char):
+                return True
+        elif op in _REPEATS:
+            if _may_match(arg[2], char):
+                return True
+        elif op == sre_constants.SUBPATTERN:
+            if _may_match(arg[-1], char):
+                return True
+        elif op == sre_constants.BRANCH:
+            if any(_may_match(branch, char) for branch in arg[1]):
+                return True
+        elif op not in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            return True
+    return False
+
+
+def _unbounded_repeats(parsed: Any) -> List[Any]:
+    """Bodies of every unbounded repeat in a parsed pattern."""
+    found: List[Any] = []
+    for op, arg in parsed:
+        if op in _REPEATS:
+            if arg[1] == sre_constants.MAXREPEAT:
+                found.append(arg[2])
+            found.extend(_unbounded_repeats(arg[2]))
+        elif op == sre_constants.SUBPATTERN:
+            found.extend(_unbounded_repeats(arg[-1]))
+        elif op == sre_constants.BRANCH:
+            for branch in arg[1]:
+                found.extend(_unbounded_repeats(branch))
+    return found
+
+
+def _required_literals(parsed: Any) -> List[str]:
+    """Literal characters every match of a parsed pattern consumes."""
+    found: List[str] = []
+    for op, arg in parsed:
+        if op == sre_constants.LITERAL:
+            found.append(chr(arg))
+        elif op == sre_constants.SUBPATTERN:
+            found.extend(_required_literals(arg[-1]))
+        elif op in _REPEATS and arg[0] >= 1:
+            found.extend(_required_literals(arg[2]))
+    return found
+
+
+def _ambiguous_repeat(body: Any) -> bool:
+    """Whether a repeated ``body`` contains unbounded repeats with no literal separating its passes."""
+    inner = _unbounded_repeats(body)
+    if not inner:
+        return False
+    for separator in _required_literals(body):
+        if not any(_may_match(repeat, separator) for repeat in inner):
+            return False
+    return True
+
+
+def _nested_repeat(parsed: Any) -> bool:
+    """Whether a parsed pattern repeats a group of unbounded repeats ambiguously."""
+    for op, arg in parsed:
+        if op in _REPEATS:
+            _low, high, item = arg
+            if high > 1 and _ambiguous_repeat(item):
+                return True
+            if _nested_repeat(item):
+                return True
+        elif op == sre_constants.SUBPATTERN:
+            if _nested_repeat(arg[-1]):
+                return True
+        elif op == sre_constants.BRANCH:
+            if any(_nested_repeat(branch) for branch in arg[1]):
+                return True
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if _nested_repeat(arg[1]):
+                return True
+    return False
+
+
+def pattern_error(pattern: str) -> Optional[str]:
+    """Why ``pattern`` cannot be used, or None if it can."""
+    if len(pattern) > MAX_REGEX_LENGTH:
+        return f"Regex pattern too long (max {MAX_REGEX_LENGTH} characters)"
+    try:
+        parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error as e:
+        return f"Invalid regex pattern: {e}"
+    if _nested_repeat(parsed):
+        return "Regex pattern has nested repetition and could take exponential time"
+    return None
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern: str) -> Optional[re.Pattern[str]]:
+    """Compiled case-insensitive pattern, or None if pattern_error() refuses it."""
+    if pattern_error(pattern) is not None:
+        return None
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def regexp(pattern: Optional[str], value: Optional[str]) -> Optional[bool]:
+    """SQL ``value REGEXP pattern``: NULL for NULL input, false for refused patterns."""
+    if pattern is None or value is None:
+        return None
+    compiled = compile_pattern(pattern)
+    if compiled is None:
+        return False
+    return compiled.search(value, 0, MAX_SUBJECT_LENGTH) is not None
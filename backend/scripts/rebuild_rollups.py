@@ -0,0 +1,59 @@
+"""
+Rebuild or check the monthly rollup table used by reports.
+
+Rollups are kept current by the application; rebuild them after changing
+transactions outside the app (raw SQL, restoring an old table dump).
+
+Usage:
+    python -m scripts.rebuild_rollups          # rebuild from transactions
+    python -m scripts.rebuild_rollups --check  # report mismatches, exit 1 if any
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.database import async_session, engine
+from app.services.monthly_rollups import check_rollups, rebuild_rollups
+
+
+async def rebuild() -> None:
+    async with async_session() as session:
+        await rebuild_rollups(session)
+        await session.commit()
+    print("Monthly rollups rebuilt.")
+
+
+async def check() -> bool:
+    """Print rollup groups that disagree with transactions; True if consistent."""
+    async with async_session() as session:
+        mismatches = await check_rollups(session)
+    for mismatch in mismatches:
+        print(f"{mismatch.key}: stored {mismatch.stored}, transactions {mismatch.actual}")
+    if mismatches:
+        print(f"{len(mismatches)} rollup group(s) out of date; run without --check to rebuild.")
+        return False
+    print("Monthly rollups are consistent.")
+    return True
+
+
+async def run(check_only: bool) -> bool:
+    try:
+        if check_only:
+            return await check()
+        await rebuild()
+        return True
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or check the monthly rollup table")
+    parser.add_argument("--check", action="store_true", help="Only compare rollups with transactions")
+    args = parser.parse_args()
+    if not asyncio.run(run(args.check)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
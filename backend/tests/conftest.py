@@ -2,6 +2,7 @@
 
 import pytest
 import asyncio
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from httpx import AsyncClient, ASGITransport
@@ -14,8 +15,9 @@ os.environ["OTEL_TRACING_ENABLED"] = "false"
 os.environ["OTEL_METRICS_ENABLED"] = "false"
 
 from app.main import app
-from app.database import get_session
+from app.database import get_session, register_sqlite_functions
 from app.orm import Base, Transaction, Tag, TransactionTag
+from app.services import tag_stats
 
 
 # Use in-memory SQLite for tests
@@ -33,16 +35,33 @@ def event_loop():
 @pytest.fixture(scope="function")
 async def async_engine():
     """Create async engine for tests"""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False, connect_args={"check_same_thread": False})
+    engine = register_sqlite_functions(
+        create_async_engine(TEST_DATABASE_URL, echo=False, connect_args={"check_same_thread": False})
+    )
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # Each test has a new database; drop results cached for the previous one
+    tag_stats.clear_cache()
 
     yield engine
 
     await engine.dispose()
 
 
+@pytest.fixture
+def statement_counter(async_engine):
+    """Count SQL statements executed against the test engine."""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
 @pytest.fixture(scope="function")
 async def async_session(async_engine) -> AsyncGenerator[AsyncSession, None]:
     """Create async session for tests"""
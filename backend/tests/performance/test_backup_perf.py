@@ -0,0 +1,99 @@
+"""
+Backup cost on a large database (app.services.backup).
+
+POST /admin/backup snapshots and compresses the database on a worker thread,
+so other requests keep being answered while a backup of a large database is
+written. Chunked backups of a database that barely changed only write the
+list of chunk hashes. Uses dedicated database files so the shared dataset is
+untouched.
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.services.backup import BackupService, backup_service
+
+DATABASE_MB = 64
+# Longest the event loop may stall while the backup runs
+MAX_LOOP_STALL_MS = 100
+
+
+def _build_database(path: Path) -> None:
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("CREATE TABLE t (payload BLOB)")
+        # Random bytes compress poorly, so compression takes its full time
+        conn.executemany("INSERT INTO t VALUES (?)", ((os.urandom(4096),) for _ in range(DATABASE_MB * 256)))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.mark.performance
+class TestBackupLatency:
+    async def test_event_loop_stays_responsive_during_backup(self, perf_client, tmp_path):
+        db_path = tmp_path / "wallet.db"
+        _build_database(db_path)
+        backup_dir = tmp_path / "backups"
+
+        with (
+            patch.object(backup_service, "_db_path", db_path),
+            patch.object(backup_service, "backup_dir", backup_dir),
+            patch.object(backup_service, "manifest_path", backup_dir / "manifest.json"),
+        ):
+            # Warm up the client and app so only the backup is measured
+            assert (await perf_client.get("/api/v1/admin/backup/progress")).json() is None
+
+            stalls: list[float] = []
+            backup = asyncio.create_task(perf_client.post("/api/v1/admin/backup"))
+            while backup_service.progress is None and not backup.done():
+                await asyncio.sleep(0)
+            while not backup.done():
+                before = time.perf_counter()
+                await asyncio.sleep(0.005)
+                stalls.append((time.perf_counter() - before) * 1000 - 5)
+            response = await backup
+
+        assert response.status_code == 200
+        data = response.json()
+        print(
+            f"\nBackup of {data['database_bytes'] / 1e6:.0f} MB took {data['duration_seconds']:.2f}s "
+            f"({data['throughput_bytes_per_second'] / 1e6:.0f} MB/s); "
+            f"{len(stalls)} loop ticks, worst stall {max(stalls):.1f} ms"
+        )
+        assert data["database_bytes"] >= DATABASE_MB * 1_000_000
+        assert len(stalls) > 10
+        assert max(stalls) < MAX_LOOP_STALL_MS, f"Event loop stalled {max(stalls):.0f} ms during the backup"
+
+
+@pytest.mark.performance
+class TestChunkedBackupSize:
+    def test_hourly_backups_of_a_static_database_are_small(self, tmp_path, monkeypatch):
+        db_path = tmp_path / "wallet.db"
+        _build_database(db_path)
+        monkeypatch.setattr("app.services.backup.settings.backup_format", "chunked")
+        monkeypatch.setattr("app.services.backup.settings.backup_dir", str(tmp_path / "backups"))
+        service = BackupService()
+        service._db_path = db_path
+
+        full = service.create_backup(description="First", source="scheduled")
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO t VALUES (?)", (b"one new row",))
+        conn.commit()
+        conn.close()
+        hourly = service.create_backup(description="Next hour", source="scheduled")
+
+        print(
+            f"\nFirst backup {full.size_bytes / 1e6:.1f} MB in {full.duration_seconds:.2f}s; "
+            f"next {hourly.size_bytes / 1e3:.0f} KB ({hourly.new_chunk_count} of {hourly.chunk_count} chunks) "
+            f"in {hourly.duration_seconds:.2f}s"
+        )
+        assert hourly.new_chunk_count <= 3
+        assert hourly.size_bytes < full.database_bytes / 100
+        assert hourly.duration_seconds < full.duration_seconds
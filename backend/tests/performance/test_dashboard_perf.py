@@ -71,7 +71,7 @@ class TestDashboardDataPerformance:
             response = await perf_client.get("/api/v1/reports/monthly-summary", params={"year": 2024, "month": 6})
 
         assert response.status_code == 200
-        timing.assert_under(thresholds.REPORT_GENERATION_MS, f"Monthly summary too slow ({timing.query_count} queries)")
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, f"Monthly summary too slow ({timing.query_count} queries)")
         query_counter.assert_max_queries(thresholds.MAX_QUERIES_REPORT, "Monthly summary has too many queries")
 
     async def test_annual_summary_performance(self, perf_client, seed_large_dataset, query_counter, thresholds):
@@ -80,7 +80,8 @@ class TestDashboardDataPerformance:
             response = await perf_client.get("/api/v1/reports/annual-summary", params={"year": 2024})
 
         assert response.status_code == 200
-        timing.assert_under(thresholds.REPORT_GENERATION_MS, f"Annual summary too slow ({timing.query_count} queries)")
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, f"Annual summary too slow ({timing.query_count} queries)")
+        query_counter.assert_max_queries(thresholds.MAX_QUERIES_REPORT, "Annual summary has too many queries")
 
     async def test_spending_heatmap_performance(self, perf_client, seed_large_dataset, query_counter, thresholds):
         """Spending heatmap should generate quickly."""
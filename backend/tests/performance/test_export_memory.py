@@ -0,0 +1,88 @@
+"""
+Memory benchmark for streaming transaction export (app.services.transaction_export).
+
+Exports are read on a streaming cursor and encoded chunk by chunk, so peak
+memory while exporting 100k transactions should be about the same as for
+1k. Uses dedicated databases so the shared performance dataset is untouched.
+"""
+
+import tracemalloc
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Transaction
+from app.projections import EXPORT_ROWS
+from app.services.transaction_export import export_chunks
+
+from .conftest import MERCHANTS
+
+SMALL_EXPORT = 1_000
+LARGE_EXPORT = 100_000
+
+
+async def _export_peak(row_count: int, export_format: str, compress: bool) -> tuple[int, int]:
+    """Peak bytes allocated while exporting ``row_count`` rows, and the bytes produced."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", connect_args={"check_same_thread": False})
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Transaction.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        start = date.today() - timedelta(days=365)
+        async with session_factory() as session:
+            rows = []
+            for i in range(row_count):
+                merchant, bucket, min_amt, _ = MERCHANTS[i % len(MERCHANTS)]
+                rows.append(
+                    {
+                        "date": start + timedelta(days=i % 365),
+                        "amount": float(min_amt),
+                        "description": f"{merchant.upper()} PURCHASE #{i}",
+                        "merchant": merchant,
+                        "account_source": "PERF",
+                        "category": bucket,
+                        "notes": "imported by benchmark",
+                    }
+                )
+            await session.execute(insert(Transaction), rows)
+            await session.commit()
+            del rows
+
+        async with session_factory() as session:
+            produced = 0
+            tracemalloc.start()
+            try:
+                chunks = await export_chunks(session, EXPORT_ROWS.select(), export_format, compress=compress)
+                async for chunk in chunks:
+                    produced += len(chunk)
+                _current, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        return peak, produced
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.performance
+class TestExportMemory:
+    """Peak memory of an export does not grow with its size."""
+
+    @pytest.mark.parametrize(
+        "export_format,compress", [("csv", False), ("ndjson", False), ("csv", True)], ids=["csv", "ndjson", "csv-gzip"]
+    )
+    async def test_export_memory_is_flat(self, export_format, compress):
+        small_peak, small_bytes = await _export_peak(SMALL_EXPORT, export_format, compress)
+        large_peak, large_bytes = await _export_peak(LARGE_EXPORT, export_format, compress)
+
+        print(
+            f"\n{export_format}{' gzip' if compress else ''}: {SMALL_EXPORT} rows peak {small_peak / 1e6:.2f} MB, "
+            f"{LARGE_EXPORT} rows peak {large_peak / 1e6:.2f} MB ({large_bytes / 1e6:.1f} MB exported)"
+        )
+        assert large_bytes > 50 * small_bytes
+        # 100x the rows; allow for allocator noise but nothing proportional to the output
+        assert large_peak < small_peak * 2 + 1_000_000, (
+            f"Export peak grew from {small_peak} to {large_peak} bytes for {LARGE_EXPORT // SMALL_EXPORT}x the rows"
+        )
@@ -0,0 +1,91 @@
+"""
+Memory benchmark for column projections (app.projections).
+
+Scanning 100k transactions as Transaction objects keeps an InstanceState,
+an instance dict and every column alive per row; a ReportRow projection keeps
+one six-field tuple. Uses a dedicated database so the shared performance
+dataset is untouched.
+"""
+
+import tracemalloc
+from datetime import date, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Transaction
+from app.projections import REPORT_ROWS
+
+from .conftest import MERCHANTS
+
+SCAN_TXN_COUNT = 100_000
+
+
+@pytest_asyncio.fixture
+async def scan_session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", connect_args={"check_same_thread": False})
+    async with engine.begin() as conn:
+        await conn.run_sync(Transaction.metadata.create_all)
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    start = date.today() - timedelta(days=365)
+    async with session_factory() as session:
+        rows = []
+        for i in range(SCAN_TXN_COUNT):
+            merchant, bucket, min_amt, _ = MERCHANTS[i % len(MERCHANTS)]
+            rows.append(
+                {
+                    "date": start + timedelta(days=i % 365),
+                    "amount": float(min_amt),
+                    "description": f"{merchant.upper()} PURCHASE #{i}",
+                    "merchant": merchant,
+                    "account_source": "PERF",
+                    "category": bucket,
+                    "notes": "imported by benchmark",
+                }
+            )
+        await session.execute(insert(Transaction), rows)
+        await session.commit()
+
+    yield session_factory
+    await engine.dispose()
+
+
+async def _retained_bytes(session_factory, load) -> tuple[int, float]:
+    """Bytes still allocated while the loaded rows are held, and their expense total."""
+    async with session_factory() as session:
+        tracemalloc.start()
+        try:
+            rows = await load(session)
+            retained, _peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert len(rows) == SCAN_TXN_COUNT
+        return retained, sum(row.amount for row in rows)
+
+
+@pytest.mark.performance
+class TestProjectionMemory:
+    """Read-only scans hold far less memory as projection rows than as ORM objects."""
+
+    async def test_report_rows_use_less_memory_than_orm(self, scan_session_factory):
+        async def load_orm(session):
+            return (await session.execute(select(Transaction).where(Transaction.amount < 0))).scalars().all()
+
+        async def load_projection(session):
+            return await REPORT_ROWS.fetch(session, REPORT_ROWS.select(Transaction.amount < 0))
+
+        orm_bytes, orm_total = await _retained_bytes(scan_session_factory, load_orm)
+        projection_bytes, projection_total = await _retained_bytes(scan_session_factory, load_projection)
+
+        print(
+            f"\n{SCAN_TXN_COUNT} rows: ORM {orm_bytes / 1e6:.1f} MB, "
+            f"projection {projection_bytes / 1e6:.1f} MB ({orm_bytes / projection_bytes:.1f}x less)"
+        )
+        assert projection_total == pytest.approx(orm_total)
+        assert projection_bytes * 3 < orm_bytes, (
+            f"Projection rows retained {projection_bytes} bytes vs {orm_bytes} for ORM objects"
+        )
@@ -6,6 +6,8 @@ These tests focus on query counts rather than response times.
 
 import pytest
 
+from app.services import tag_stats
+
 from .conftest import timed_request
 
 
@@ -71,6 +73,28 @@ class TestQueryPatterns:
         # Tags list should be a single query or very few
         assert query_counter.count <= 5, f"Tag listing may have N+1: {tag_count} tags, {query_counter.count} queries"
 
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/api/v1/tags/buckets/stats",
+            "/api/v1/tags/occasions/stats",
+            "/api/v1/tags/accounts/stats",
+            "/api/v1/tags/?namespace=bucket&with_usage=true",
+        ],
+    )
+    async def test_tag_statistics_single_query(self, perf_client, seed_large_dataset, query_counter, path):
+        """
+        Tag management pages load usage for every tag from one grouped query.
+        """
+        tag_stats.clear_cache()
+        query_counter.reset()
+        async with timed_request(query_counter):
+            response = await perf_client.get(path)
+
+        assert response.status_code == 200
+        # Data generation tokens (ETag) plus one grouped query
+        assert query_counter.count <= 2, f"Tag statistics may have N+1: {query_counter.count} queries"
+
     async def test_budgets_with_spending_efficient(self, perf_client, seed_large_dataset, query_counter):
         """
         Budget status with spending should batch calculations.
@@ -81,8 +105,8 @@ class TestQueryPatterns:
 
         assert response.status_code == 200
         budgets = response.json()
-        # Budget status requires aggregation queries but should be bounded
-        assert query_counter.count <= 20, (
+        # The budget list plus one grouped spending query, however many budgets exist
+        assert query_counter.count <= 2, (
             f"Budget spending calculation may be N+1: {len(budgets)} budgets, {query_counter.count} queries"
         )
 
@@ -174,13 +198,13 @@ class TestAggregationEfficiency:
 
 @pytest.mark.performance
 class TestRelationshipLoading:
-    """Tests for ORM relationship loading efficiency (selectin strategy)."""
+    """Tests for ORM relationship loading efficiency (loader profiles)."""
 
     async def test_transaction_tags_selectin_loading(self, perf_client, seed_large_dataset, query_counter):
         """
-        Transaction.tags relationship uses selectin loading.
+        Transaction.tags relationship is loaded with selectinload via a loader profile.
 
-        With selectin, loading N transactions should use ~2 queries:
+        With selectinload, loading N transactions should use ~2 queries:
         1. SELECT transactions
         2. SELECT tags WHERE transaction_id IN (...)
 
@@ -198,16 +222,16 @@ class TestRelationshipLoading:
         transactions_with_tags = sum(1 for t in transactions if t.get("tags"))
 
         # Selectin should give us O(1) queries regardless of result count
-        # Allow up to 5 queries (main query, tags selectin, account_tag selectin, etc.)
+        # Allow up to 5 queries (main query, tags selectinload, etc.)
         assert query_counter.count <= 6, (
             f"Possible N+1 in relationship loading: {len(transactions)} transactions "
             f"({transactions_with_tags} with tags), {query_counter.count} queries. "
-            "Expected ~2-4 queries with selectin loading."
+            "Expected ~2-4 queries with selectinload."
         )
 
     async def test_transaction_account_tag_selectin_loading(self, perf_client, seed_large_dataset, query_counter):
         """
-        Transaction.account_tag FK relationship uses selectin loading.
+        Transaction.account_tag is lazy="raise" and never loaded per row.
         """
         query_counter.reset()
         async with timed_request(query_counter):
@@ -215,14 +239,14 @@ class TestRelationshipLoading:
 
         assert response.status_code == 200
 
-        # With selectin on account_tag relationship, should not see O(n) queries
+        # No per-row account_tag loads, so no O(n) queries
         assert query_counter.count <= 5, (
             f"account_tag relationship may have N+1: {query_counter.count} queries for 50 transactions"
         )
 
     async def test_dashboard_widgets_relationship_efficiency(self, perf_client, seed_large_dataset, query_counter):
         """
-        Dashboard.widgets relationship uses selectin loading.
+        Fetching dashboard widgets does not load relationships per widget.
         """
         # First get all dashboards
         dashboards_response = await perf_client.get("/api/v1/dashboards")
@@ -240,8 +264,8 @@ class TestRelationshipLoading:
             assert response.status_code == 200
 
         # Each dashboard fetch should use at most 5 queries
-        # (1 for dashboard lookup, 1 for widgets via selectin, 1 for actual endpoint query,
-        #  plus potential selectin loads for back-references)
+        # (1 for dashboard lookup, 1 for widgets, 1 for actual endpoint query,
+        #  relationships are never loaded implicitly)
         max_expected = len(dashboards[:5]) * 5
         assert query_counter.count <= max_expected, (
             f"Dashboard widget loading may have N+1: {query_counter.count} queries "
@@ -252,7 +276,7 @@ class TestRelationshipLoading:
         """
         Query count should not scale with result size for relationship loading.
 
-        This is the definitive N+1 detection test for selectin loading.
+        This is the definitive N+1 detection test for relationship loading.
         """
         # Fetch 10 transactions
         query_counter.reset()
@@ -266,11 +290,11 @@ class TestRelationshipLoading:
             await perf_client.get("/api/v1/transactions/", params={"limit": 100})
         queries_100 = query_counter.count
 
-        # With selectin loading, queries should be approximately constant
+        # With selectinload, queries should be approximately constant
         # Allow 50% growth maximum (not 10x growth)
         assert queries_100 <= queries_10 * 1.5, (
             f"N+1 detected in relationship loading! "
             f"10 transactions: {queries_10} queries, "
             f"100 transactions: {queries_100} queries. "
-            f"With selectin loading, query count should be nearly constant."
+            f"With selectinload, query count should be nearly constant."
         )
@@ -29,7 +29,7 @@ class TestReportPerformance:
         assert len(data.get("data", [])) > 0
 
         timing.assert_under(
-            thresholds.REPORT_GENERATION_MS,
+            thresholds.AGGREGATE_REPORT_MS,
             f"Weekly trends too slow: {timing.duration_ms:.0f}ms, {timing.query_count} queries",
         )
 
@@ -45,7 +45,7 @@ class TestReportPerformance:
             )
 
         assert response.status_code == 200
-        timing.assert_under(thresholds.REPORT_GENERATION_MS, "Monthly trends too slow")
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, "Monthly trends too slow")
 
     async def test_top_merchants_report(self, perf_client, seed_large_dataset, query_counter, thresholds):
         """Top merchants report should be fast."""
@@ -56,16 +56,38 @@ class TestReportPerformance:
         data = response.json()
         assert "merchants" in data
 
-        timing.assert_under(thresholds.REPORT_GENERATION_MS, "Top merchants too slow")
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, "Top merchants too slow")
         query_counter.assert_max_queries(thresholds.MAX_QUERIES_REPORT, "Top merchants has too many queries")
 
+    async def test_account_summary_single_query(self, perf_client, seed_large_dataset, query_counter, thresholds):
+        """Account summary should be one GROUP BY, not a scan of every transaction."""
+        async with timed_request(query_counter) as timing:
+            response = await perf_client.get("/api/v1/reports/account-summary")
+
+        assert response.status_code == 200
+        assert len(response.json()["accounts"]) > 0
+
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, "Account summary too slow")
+        query_counter.assert_max_queries(1, "Account summary should aggregate in a single query")
+
+    async def test_bucket_summary_single_query(self, perf_client, seed_large_dataset, query_counter, thresholds):
+        """Bucket summary should resolve bucket tags inside the aggregate query."""
+        async with timed_request(query_counter) as timing:
+            response = await perf_client.get("/api/v1/reports/bucket-summary")
+
+        assert response.status_code == 200
+
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, "Bucket summary too slow")
+        query_counter.assert_max_queries(1, "Bucket summary should aggregate in a single query")
+
     async def test_sankey_flow_report(self, perf_client, seed_large_dataset, query_counter, thresholds):
         """Sankey flow chart data should generate efficiently."""
         async with timed_request(query_counter) as timing:
             response = await perf_client.get("/api/v1/reports/sankey-flow", params={"year": 2024})
 
         assert response.status_code == 200
-        timing.assert_under(thresholds.REPORT_GENERATION_MS, "Sankey flow too slow")
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, "Sankey flow too slow")
+        query_counter.assert_max_queries(1, "Sankey flow should aggregate in a single query")
 
     async def test_treemap_report(self, perf_client, seed_large_dataset, query_counter, thresholds):
         """Treemap spending breakdown should be efficient."""
@@ -73,7 +95,18 @@ class TestReportPerformance:
             response = await perf_client.get("/api/v1/reports/treemap", params={"year": 2024})
 
         assert response.status_code == 200
-        timing.assert_under(thresholds.REPORT_GENERATION_MS, "Treemap too slow")
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, "Treemap too slow")
+        query_counter.assert_max_queries(1, "Treemap should aggregate in a single query")
+
+    async def test_spending_heatmap_report(self, perf_client, seed_large_dataset, query_counter, thresholds):
+        """Daily and monthly heatmaps should each be one GROUP BY."""
+        for params in ({"year": 2024}, {"year": 2024, "month": 6}):
+            async with timed_request(query_counter) as timing:
+                response = await perf_client.get("/api/v1/reports/spending-heatmap", params=params)
+
+            assert response.status_code == 200
+            timing.assert_under(thresholds.AGGREGATE_REPORT_MS, "Spending heatmap too slow")
+            query_counter.assert_max_queries(1, "Spending heatmap should aggregate in a single query")
 
     async def test_month_over_month_report(self, perf_client, seed_large_dataset, query_counter, thresholds):
         """Month-over-month comparison should be fast."""
@@ -83,7 +116,8 @@ class TestReportPerformance:
             )
 
         assert response.status_code == 200
-        timing.assert_under(thresholds.REPORT_GENERATION_MS, "Month-over-month too slow")
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, "Month-over-month too slow")
+        query_counter.assert_max_queries(2, "Month-over-month should group both months by category and by bucket")
 
     async def test_spending_velocity_report(self, perf_client, seed_large_dataset, query_counter, thresholds):
         """Spending velocity should calculate quickly."""
@@ -91,7 +125,8 @@ class TestReportPerformance:
             response = await perf_client.get("/api/v1/reports/spending-velocity", params={"year": 2024, "month": 6})
 
         assert response.status_code == 200
-        timing.assert_under(thresholds.REPORT_GENERATION_MS, "Spending velocity too slow")
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, "Spending velocity too slow")
+        query_counter.assert_max_queries(1, "Spending velocity should aggregate in a single query")
 
     async def test_anomalies_report(self, perf_client, seed_large_dataset, query_counter, thresholds):
         """Anomaly detection should be efficient."""
@@ -101,7 +136,8 @@ class TestReportPerformance:
             )
 
         assert response.status_code == 200
-        timing.assert_under(thresholds.REPORT_GENERATION_MS, "Anomaly detection too slow")
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, "Anomaly detection too slow")
+        query_counter.assert_max_queries(4, "Anomaly detection should not scale with the transactions it reads")
 
 
 @pytest.mark.performance
@@ -125,7 +161,7 @@ class TestReportFilterPerformance:
             )
 
         assert response.status_code == 200
-        timing.assert_under(thresholds.REPORT_GENERATION_MS, "Filtered trends too slow")
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, "Filtered trends too slow")
 
     async def test_trends_with_account_filter(self, perf_client, seed_large_dataset, query_counter, thresholds):
         """Account-filtered trends should be efficient."""
@@ -144,4 +180,4 @@ class TestReportFilterPerformance:
             )
 
         assert response.status_code == 200
-        timing.assert_under(thresholds.REPORT_GENERATION_MS, "Account-filtered trends too slow")
+        timing.assert_under(thresholds.AGGREGATE_REPORT_MS, "Account-filtered trends too slow")
@@ -0,0 +1,93 @@
+"""
+Benchmark for full-text transaction search (app.services.transaction_search).
+
+Search goes through the FTS5 index instead of ILIKE '%term%' over three
+columns, so a search over 500k transactions is answered from the index
+rather than a table scan. Uses a dedicated database so the shared
+performance dataset is untouched.
+"""
+
+import time
+from datetime import date, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Transaction
+from app.services.transaction_search import search_clause
+
+from .conftest import MERCHANTS
+
+SEARCH_TXN_COUNT = 500_000
+SEARCH_MS = 50
+
+
+@pytest_asyncio.fixture
+async def search_session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", connect_args={"check_same_thread": False})
+    async with engine.begin() as conn:
+        await conn.run_sync(Transaction.metadata.create_all)
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    start = date.today() - timedelta(days=365)
+    async with session_factory() as session:
+        for offset in range(0, SEARCH_TXN_COUNT, 50_000):
+            rows = []
+            for i in range(offset, offset + 50_000):
+                merchant, bucket, min_amt, _ = MERCHANTS[i % len(MERCHANTS)]
+                rows.append(
+                    {
+                        "date": start + timedelta(days=i % 365),
+                        "amount": float(min_amt),
+                        "description": f"{merchant.upper()} PURCHASE #{i}",
+                        "merchant": merchant,
+                        "account_source": "PERF",
+                        "category": bucket,
+                        "notes": f"receipt {i}",
+                    }
+                )
+            await session.execute(insert(Transaction), rows)
+        await session.commit()
+
+    yield session_factory
+    await engine.dispose()
+
+
+async def _timed(session_factory, where) -> tuple[float, int]:
+    """Milliseconds to fetch the first page of matches, and the number of matches."""
+    async with session_factory() as session:
+        started = time.perf_counter()
+        page = (
+            await session.execute(select(Transaction.id).where(where).order_by(Transaction.date.desc()).limit(50))
+        ).all()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        total = (await session.execute(select(func.count()).select_from(Transaction).where(where))).scalar_one()
+    assert len(page) == min(50, total)
+    return elapsed_ms, total
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestSearchPerformance:
+    """Selective searches over 500k transactions are answered from the full-text index."""
+
+    async def test_selective_search_is_fast(self, search_session_factory):
+        # The warm-up query pays for page cache and statement compilation
+        await _timed(search_session_factory, search_clause("receipt 4999"))
+        fts_ms, fts_total = await _timed(search_session_factory, search_clause("receipt 499999"))
+
+        pattern = "%receipt 499999%"
+        ilike = or_(
+            Transaction.merchant.ilike(pattern),
+            Transaction.description.ilike(pattern),
+            Transaction.notes.ilike(pattern),
+        )
+        scan_ms, scan_total = await _timed(search_session_factory, ilike)
+
+        print(f"\n{SEARCH_TXN_COUNT} rows: FTS {fts_ms:.1f} ms, ILIKE scan {scan_ms:.1f} ms")
+        assert fts_total == scan_total == 1
+        assert fts_ms < SEARCH_MS, f"Full-text search took {fts_ms:.1f} ms"
+        assert fts_ms * 5 < scan_ms
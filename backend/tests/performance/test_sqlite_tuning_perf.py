@@ -0,0 +1,154 @@
+"""
+Concurrent read-while-import benchmark for the SQLite connection profile.
+
+An import inserts rows in chunks inside one long transaction while dashboard
+reads (the monthly summary report) run against the same file database. With
+the tuned profile (journal_mode=WAL, busy_timeout) every read completes
+during the import without waiting for the writer's lock; with library
+defaults the writer's lock blocks readers once its changes spill to the
+database file. Each case uses its own database file because journal_mode=WAL
+is persisted in the file.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import configure_engine, get_session
+from app.main import app
+from app.models import Transaction
+
+from .conftest import MERCHANTS
+
+SEED_TXN_COUNT = 5_000
+IMPORT_CHUNKS = 40
+IMPORT_CHUNK_SIZE = 2_000
+
+
+def _rows(start_index: int, count: int) -> list[dict]:
+    start = date.today().replace(day=1)
+    rows = []
+    for i in range(start_index, start_index + count):
+        merchant, bucket, min_amt, _ = MERCHANTS[i % len(MERCHANTS)]
+        rows.append(
+            {
+                "date": start + timedelta(days=i % 28),
+                "amount": float(min_amt),
+                "description": f"{merchant.upper()} PURCHASE #{i}",
+                "merchant": merchant,
+                "account_source": "PERF",
+                "category": bucket,
+            }
+        )
+    return rows
+
+
+async def _make_engine(db_path, tuned: bool):
+    with patch("app.database.settings.sqlite_tuning", tuned):
+        engine = configure_engine(create_async_engine(f"sqlite+aiosqlite:///{db_path}"))
+    async with engine.begin() as conn:
+        await conn.run_sync(Transaction.metadata.create_all)
+        await conn.execute(insert(Transaction), _rows(0, SEED_TXN_COUNT))
+    return engine
+
+
+@pytest_asyncio.fixture
+async def import_client_factory():
+    """Build an API client on a fresh file database, tuned or with library defaults."""
+    engines = []
+
+    async def factory(db_path, tuned: bool) -> tuple:
+        engine = await _make_engine(db_path, tuned)
+        engines.append(engine)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def override_get_session() -> AsyncGenerator[AsyncSession, None]:
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_session] = override_get_session
+        return engine, session_factory
+
+    yield factory
+    app.dependency_overrides.clear()
+    for engine in engines:
+        await engine.dispose()
+
+
+async def _read_while_importing(session_factory) -> dict:
+    """Run monthly-summary reads until a chunked import commits; return read stats."""
+    done = asyncio.Event()
+    latencies: list[float] = []
+    failures: list[str] = []
+    today = date.today()
+    # Built up front so the event loop is free for the readers between chunks
+    chunks = [_rows(SEED_TXN_COUNT + i * IMPORT_CHUNK_SIZE, IMPORT_CHUNK_SIZE) for i in range(IMPORT_CHUNKS)]
+
+    async def importer():
+        try:
+            async with session_factory() as session:
+                for rows in chunks:
+                    await session.execute(insert(Transaction), rows)
+                    await asyncio.sleep(0.005)
+                await session.commit()
+        finally:
+            done.set()
+
+    async def reader(client):
+        while not done.is_set():
+            start = time.perf_counter()
+            response = await client.get(
+                "/api/v1/reports/monthly-summary", params={"year": today.year, "month": today.month}
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                failures.append(f"{response.status_code}: {response.text[:200]}")
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app, raise_app_exceptions=False), base_url="http://test"
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(importer(), reader(client), reader(client))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "reads": len(latencies),
+        "max_ms": max(latencies, default=0.0),
+        "failures": failures,
+        "elapsed_ms": elapsed_ms,
+    }
+
+
+@pytest.mark.performance
+class TestReadWhileImport:
+    """Dashboard reads keep being served while a long import is writing."""
+
+    async def test_reads_not_blocked_by_import(self, tmp_path, import_client_factory):
+        _, baseline_factory = await import_client_factory(tmp_path / "defaults.db", tuned=False)
+        baseline = await _read_while_importing(baseline_factory)
+
+        _, tuned_factory = await import_client_factory(tmp_path / "tuned.db", tuned=True)
+        tuned = await _read_while_importing(tuned_factory)
+
+        print(
+            f"\nimport of {IMPORT_CHUNKS * IMPORT_CHUNK_SIZE} rows over {SEED_TXN_COUNT}: "
+            f"defaults {baseline['reads']} reads, max {baseline['max_ms']:.0f}ms, "
+            f"{len(baseline['failures'])} failed ({baseline['elapsed_ms']:.0f}ms total); "
+            f"tuned {tuned['reads']} reads, max {tuned['max_ms']:.0f}ms, "
+            f"{len(tuned['failures'])} failed ({tuned['elapsed_ms']:.0f}ms total)"
+        )
+        assert tuned["failures"] == []
+        # Readers keep being served instead of queueing behind the writer's lock
+        assert tuned["reads"] > 5 * baseline["reads"], "Reads stalled while the import was running"
+        assert tuned["max_ms"] * 2 < baseline["max_ms"], (
+            f"Slowest read during import took {tuned['max_ms']:.0f}ms tuned vs {baseline['max_ms']:.0f}ms with defaults"
+        )
@@ -0,0 +1,111 @@
+"""
+Performance tests for tag lookups on heavily used tags.
+
+Tag relationships are lazy="raise", so fetching a tag must not load the
+transactions carrying it. Uses a dedicated database with one bucket holding
+50k transactions and one empty bucket; both must cost the same.
+"""
+
+from collections.abc import AsyncGenerator
+from datetime import date, timedelta
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import get_session
+from app.main import app
+from app.models import Tag, Transaction, TransactionTag
+
+from .conftest import QueryCounter, timed_request
+
+BUCKET_TXN_COUNT = 50_000
+
+
+@pytest_asyncio.fixture
+async def tag_engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", connect_args={"check_same_thread": False})
+    async with engine.begin() as conn:
+        await conn.run_sync(Transaction.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def tag_dataset(tag_engine) -> dict[str, int]:
+    """A "groceries" bucket on 50k transactions and an unused "empty" bucket."""
+    session_factory = sessionmaker(tag_engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        busy = Tag(namespace="bucket", value="groceries")
+        empty = Tag(namespace="bucket", value="empty")
+        session.add_all([busy, empty])
+        await session.flush()
+
+        start = date.today() - timedelta(days=365)
+        rows = [
+            {
+                "date": start + timedelta(days=i % 365),
+                "amount": -10.0,
+                "description": f"GROCER #{i}",
+                "merchant": "Grocer",
+                "account_source": "PERF",
+            }
+            for i in range(BUCKET_TXN_COUNT)
+        ]
+        await session.execute(insert(Transaction), rows)
+        ids = (await session.execute(select(Transaction.id))).scalars().all()
+        await session.execute(insert(TransactionTag), [{"transaction_id": i, "tag_id": busy.id} for i in ids])
+        await session.commit()
+
+    return {"busy": busy.id, "empty": empty.id}
+
+
+@pytest_asyncio.fixture
+async def tag_client(tag_engine) -> AsyncGenerator[AsyncClient, None]:
+    session_factory = sessionmaker(tag_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_session() -> AsyncGenerator[AsyncSession, None]:
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_get_session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.performance
+class TestBucketLookupPerformance:
+    """Fetching a bucket costs the same whether it has 0 or 50k transactions."""
+
+    @pytest.fixture
+    def counter(self, tag_engine):
+        counter = QueryCounter()
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            counter.queries.append(statement)
+
+        event.listen(tag_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        yield counter
+        event.remove(tag_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    @pytest.mark.parametrize(
+        "path",
+        ["/api/v1/tags/{id}", "/api/v1/tags/by-name/bucket/{value}", "/api/v1/tags/buckets", "/api/v1/tags/"],
+    )
+    async def test_lookup_independent_of_transaction_count(self, tag_dataset, tag_client, counter, thresholds, path):
+        timings = {}
+        for name, value in (("empty", "empty"), ("busy", "groceries")):
+            url = path.format(id=tag_dataset[name], value=value)
+            async with timed_request(counter) as timing:
+                response = await tag_client.get(url)
+            assert response.status_code == 200
+            # Only the tags table is read
+            assert not any("transaction" in q.lower() for q in counter.queries), counter.queries
+            timings[name] = timing
+
+        assert timings["busy"].query_count == timings["empty"].query_count
+        timings["busy"].assert_under(thresholds.TAG_LOOKUP_MS, f"GET {path} on a bucket with {BUCKET_TXN_COUNT} rows")
@@ -0,0 +1,121 @@
+"""
+Performance tests for bulk tag rule application.
+
+Uses a dedicated database so applying rules does not tag the shared
+performance dataset used by the report tests.
+"""
+
+from collections.abc import AsyncGenerator
+from datetime import date, timedelta
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import get_session
+from app.main import app
+from app.models import Tag, TagRule, Transaction, TransactionTag
+
+from .conftest import MERCHANTS, QueryCounter, timed_request
+
+RULES_TXN_COUNT = 50_000
+
+
+@pytest_asyncio.fixture
+async def rules_engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", connect_args={"check_same_thread": False})
+    async with engine.begin() as conn:
+        await conn.run_sync(Transaction.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def rules_dataset(rules_engine) -> dict[str, int]:
+    """50k transactions: 10% with an assigned bucket, 10% bucket:none, the rest untagged."""
+    session_factory = sessionmaker(rules_engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        buckets = sorted({bucket for _, bucket, _, _ in MERCHANTS} | {"none"})
+        tags = [Tag(namespace="bucket", value=bucket) for bucket in buckets]
+        session.add_all(tags)
+        await session.flush()
+        tag_ids = {tag.value: tag.id for tag in tags}
+
+        start = date.today() - timedelta(days=365)
+        rows = []
+        for i in range(RULES_TXN_COUNT):
+            merchant, _, min_amt, _ = MERCHANTS[i % len(MERCHANTS)]
+            rows.append(
+                {
+                    "date": start + timedelta(days=i % 365),
+                    "amount": float(min_amt),
+                    "description": f"{merchant.upper()} #{i}",
+                    "merchant": merchant,
+                    "account_source": "PERF",
+                }
+            )
+        await session.execute(insert(Transaction), rows)
+        ids = (await session.execute(select(Transaction.id).order_by(Transaction.id))).scalars().all()
+
+        links = []
+        for i, txn_id in enumerate(ids):
+            if i % 10 == 0:
+                links.append({"transaction_id": txn_id, "tag_id": tag_ids["dining"]})
+            elif i % 10 == 1:
+                links.append({"transaction_id": txn_id, "tag_id": tag_ids["none"]})
+        await session.execute(insert(TransactionTag), links)
+
+        # One rule per merchant, as a user with a full rule set would have
+        for priority, (merchant, bucket, _, _) in enumerate(MERCHANTS):
+            session.add(TagRule(name=merchant, tag=f"bucket:{bucket}", merchant_pattern=merchant, priority=priority))
+        await session.commit()
+
+    return {"candidates": RULES_TXN_COUNT - RULES_TXN_COUNT // 10}
+
+
+@pytest_asyncio.fixture
+async def rules_client(rules_engine) -> AsyncGenerator[AsyncClient, None]:
+    session_factory = sessionmaker(rules_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_session() -> AsyncGenerator[AsyncSession, None]:
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_get_session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.performance
+class TestTagRulesApplyPerformance:
+    """POST /tag-rules/apply should be set-based, not per transaction."""
+
+    async def test_apply_rules_50k(self, rules_engine, rules_dataset, rules_client, thresholds):
+        counter = QueryCounter()
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            counter.queries.append(statement)
+
+        event.listen(rules_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            async with timed_request(counter) as timing:
+                response = await rules_client.post("/api/v1/tag-rules/apply")
+        finally:
+            event.remove(rules_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_transactions_checked"] == rules_dataset["candidates"]
+        assert data["applied_count"] == rules_dataset["candidates"]
+
+        timing.assert_under(thresholds.TAG_RULES_APPLY_MS, f"Applying rules to {RULES_TXN_COUNT} transactions")
+        counter.assert_max_queries(thresholds.MAX_QUERIES_TAG_RULES_APPLY, "Rule application issues per-row queries")
+
+        async with rules_engine.connect() as conn:
+            links = await conn.execute(select(func.count()).select_from(TransactionTag))
+            # Every transaction now has exactly one bucket link
+            assert links.scalar() == RULES_TXN_COUNT
@@ -3,11 +3,18 @@ Tests for advanced search features.
 
 Tests cover:
 - Search including notes field
+- Full-text search index (prefix matching, sync triggers, ranking)
 - Saved filters CRUD
 - Saved filter apply
 - CSV export
+- Streaming NDJSON / gzip export
 """
 
+import csv
+import gzip
+import io
+import json
+
 import pytest
 from httpx import AsyncClient
 
@@ -78,6 +85,91 @@ class TestSearchIncludesNotes:
         assert "DISTINCTIVE_DESCRIPTION" in data[0]["description"]
 
 
+class TestFullTextSearch:
+    """Search through the full-text index (app.services.transaction_search)"""
+
+    @pytest.fixture
+    async def indexed(self, client: AsyncClient, seed_categories):
+        ids = {}
+        for day, merchant, description in (
+            (1, "WHOLE FOODS", "WHOLE FOODS MARKET #123"),
+            (2, "FOOD LION", "FOOD LION 0042"),
+            (3, "DEL MAR", "Café del Mar"),
+        ):
+            tx = {
+                "date": f"2024-12-0{day}",
+                "amount": -10.0,
+                "description": description,
+                "merchant": merchant,
+                "account_source": "TEST-ACCT",
+            }
+            ids[merchant] = (await client.post("/api/v1/transactions", json=tx)).json()["id"]
+        return ids
+
+    async def _merchants(self, client: AsyncClient, search: str, **params):
+        response = await client.get("/api/v1/transactions/", params={"search": search, **params})
+        assert response.status_code == 200
+        return [t["merchant"] for t in response.json()]
+
+    @pytest.mark.asyncio
+    async def test_last_word_is_prefix(self, client: AsyncClient, indexed):
+        assert await self._merchants(client, "whole fo") == ["WHOLE FOODS"]
+        assert await self._merchants(client, "foo") == ["FOOD LION", "WHOLE FOODS"]
+        # Words are matched as a phrase, in order
+        assert await self._merchants(client, "foods whole") == []
+
+    @pytest.mark.asyncio
+    async def test_punctuation_and_accents(self, client: AsyncClient, indexed):
+        assert await self._merchants(client, "market #123") == ["WHOLE FOODS"]
+        assert await self._merchants(client, "cafe") == ["DEL MAR"]
+
+    @pytest.mark.asyncio
+    async def test_no_indexable_words_falls_back_to_substring(self, client: AsyncClient, indexed):
+        assert await self._merchants(client, "#") == ["WHOLE FOODS"]
+
+    @pytest.mark.asyncio
+    async def test_index_follows_updates_and_deletes(self, client: AsyncClient, indexed):
+        await client.patch(f"/api/v1/transactions/{indexed['FOOD LION']}", json={"notes": "picnic supplies"})
+        assert await self._merchants(client, "picnic") == ["FOOD LION"]
+
+        await client.patch(f"/api/v1/transactions/{indexed['FOOD LION']}", json={"merchant": "HARRIS TEETER"})
+        assert await self._merchants(client, "lion") == ["HARRIS TEETER"]  # still in description
+        assert await self._merchants(client, "harris") == ["HARRIS TEETER"]
+
+        await client.delete(f"/api/v1/transactions/{indexed['WHOLE FOODS']}")
+        assert await self._merchants(client, "whole") == []
+
+    @pytest.mark.asyncio
+    async def test_search_rank_orders_by_relevance(self, client: AsyncClient, indexed):
+        tx = {
+            "date": "2024-11-01",
+            "amount": -10.0,
+            "description": "FOOD FOOD FOOD",
+            "merchant": "FOOD TRUCK",
+            "account_source": "TEST-ACCT",
+            "notes": "food",
+        }
+        await client.post("/api/v1/transactions", json=tx)
+
+        by_date = await self._merchants(client, "food")
+        assert by_date[-1] == "FOOD TRUCK"
+        by_rank = await self._merchants(client, "food", search_rank=True)
+        assert by_rank[0] == "FOOD TRUCK"
+        assert sorted(by_rank) == sorted(by_date)
+
+    def test_sqlite_uses_fts_index(self):
+        from sqlalchemy import select
+        from sqlalchemy.dialects import postgresql, sqlite
+
+        from app.orm import Transaction
+        from app.services.transaction_search import search_clause
+
+        statement = select(Transaction.id).where(search_clause("whole fo"))
+        assert "transactions_fts MATCH" in str(statement.compile(dialect=sqlite.dialect()))
+        compiled = str(statement.compile(dialect=postgresql.dialect()))
+        assert "to_tsvector('simple'" in compiled and "@@ to_tsquery('simple'" in compiled
+
+
 # =============================================================================
 # Regex Search Validation Tests
 # =============================================================================
@@ -455,3 +547,64 @@ class TestCSVExport:
         content = response.text
         lines = content.strip().split("\n")
         assert len(lines) == 1  # Header only
+
+
+class TestStreamingExport:
+    """NDJSON export, gzip and chunked encoding (app.services.transaction_export)"""
+
+    @pytest.fixture
+    async def exported(self, client: AsyncClient, seed_categories):
+        for day, merchant in ((1, "AMAZON"), (2, "TARGET"), (3, "COSTCO")):
+            tx = {
+                "date": f"2024-12-0{day}",
+                "amount": -10.0 * day,
+                "description": f"{merchant} purchase",
+                "merchant": merchant,
+                "account_source": "ACCT1",
+                "notes": 'has "quotes", commas',
+            }
+            await client.post("/api/v1/transactions", json=tx)
+
+    @pytest.mark.asyncio
+    async def test_export_ndjson(self, client: AsyncClient, exported):
+        response = await client.get("/api/v1/transactions/export/ndjson", params={"amount_max": -15})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["content-disposition"].endswith('.ndjson"')
+
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["merchant"] for r in records] == ["COSTCO", "TARGET"]
+        assert records[0]["date"] == "2024-12-03"
+        assert records[0]["amount"] == -30.0
+        assert records[0]["is_transfer"] is False
+        assert records[0]["notes"] == 'has "quotes", commas'
+
+    @pytest.mark.asyncio
+    async def test_export_gzip(self, client: AsyncClient, exported):
+        async with client.stream("GET", "/api/v1/transactions/export/csv", params={"gzip": True}) as response:
+            assert response.status_code == 200
+            assert response.headers["content-encoding"] == "gzip"
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+
+        rows = list(csv.reader(io.StringIO(gzip.decompress(raw).decode())))
+        assert rows[0][:3] == ["Date", "Amount", "Merchant"]
+        assert [row[2] for row in rows[1:]] == ["COSTCO", "TARGET", "AMAZON"]
+        assert rows[1][7] == 'has "quotes", commas'
+
+    @pytest.mark.asyncio
+    async def test_export_unknown_format(self, client: AsyncClient):
+        response = await client.get("/api/v1/transactions/export/xlsx")
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_chunks_follow_chunk_size(self, async_session, exported, monkeypatch):
+        from app.projections import EXPORT_ROWS
+        from app.services import transaction_export
+
+        monkeypatch.setattr(transaction_export, "CHUNK_SIZE", 100)
+        for export_format in ("csv", "ndjson"):
+            chunks = await transaction_export.export_chunks(async_session, EXPORT_ROWS.select(), export_format)
+            sizes = [len(chunk) async for chunk in chunks]
+            assert len(sizes) >= 3, export_format
+            # Each chunk closes after the row that crossed the threshold
+            assert all(size < 300 for size in sizes), export_format
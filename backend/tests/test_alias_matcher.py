@@ -0,0 +1,226 @@
+"""Tests for the compiled merchant alias matcher (app.services.merchant_aliases)."""
+
+import random
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+
+from app.orm import MerchantAliasMatchType
+from app.routers.merchants import apply_alias_to_text
+from app.services.merchant_aliases import AliasMatcher, clear_cache, get_alias_matcher
+
+
+def _alias(alias_id: int, pattern: str, match_type: MerchantAliasMatchType, priority: int = 0) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=alias_id,
+        pattern=pattern,
+        canonical_name=f"Canonical {alias_id}",
+        match_type=match_type,
+        priority=priority,
+    )
+
+
+def _linear_match(aliases, text):
+    """Reference implementation: first matching alias in priority order."""
+    for alias in sorted(aliases, key=lambda a: -a.priority):
+        if apply_alias_to_text(alias, text):
+            return alias.id
+    return None
+
+
+class TestAliasMatcher:
+    def test_exact_is_case_insensitive_full_match(self):
+        matcher = AliasMatcher([_alias(1, "Amazon", MerchantAliasMatchType.exact)])
+
+        assert matcher.canonical_name("AMAZON") == "Canonical 1"
+        assert matcher.match("Amazon Prime") is None
+
+    def test_contains_finds_overlapping_patterns(self):
+        matcher = AliasMatcher(
+            [
+                _alias(1, "hers", MerchantAliasMatchType.contains, priority=1),
+                _alias(2, "she", MerchantAliasMatchType.contains, priority=5),
+                _alias(3, "he", MerchantAliasMatchType.contains, priority=3),
+            ]
+        )
+
+        # "ushers" contains all three; highest priority wins
+        assert matcher.match("USHERS").id == 2
+        assert matcher.match("other").id == 3
+        assert matcher.match("xyz") is None
+
+    def test_priority_across_match_types(self):
+        matcher = AliasMatcher(
+            [
+                _alias(1, "AMZN", MerchantAliasMatchType.contains, priority=1),
+                _alias(2, r"^AMZN MKTP", MerchantAliasMatchType.regex, priority=10),
+                _alias(3, "amzn mktp us", MerchantAliasMatchType.exact, priority=0),
+            ]
+        )
+
+        assert matcher.match("AMZN MKTP US").id == 2
+        assert matcher.match("AMZN DIGITAL").id == 1
+
+    def test_invalid_regex_is_skipped(self):
+        matcher = AliasMatcher(
+            [
+                _alias(1, "[invalid(", MerchantAliasMatchType.regex, priority=10),
+                _alias(2, "invalid", MerchantAliasMatchType.contains),
+            ]
+        )
+
+        assert matcher.match("[invalid(").id == 2
+
+    def test_empty_text(self):
+        matcher = AliasMatcher([_alias(1, "a", MerchantAliasMatchType.contains)])
+
+        assert matcher.match("") is None
+        assert matcher.match(None) is None
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(42)
+        alphabet = "abcde "
+        aliases = []
+        for alias_id in range(1, 121):
+            pattern = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 5)))
+            match_type = rng.choice(list(MerchantAliasMatchType))
+            if match_type == MerchantAliasMatchType.regex:
+                pattern = f"{pattern}+$"
+            aliases.append(_alias(alias_id, pattern, match_type, priority=rng.randint(0, 20)))
+        # Ties resolve in input order, as in the linear scan over aliases ordered by id
+        matcher = AliasMatcher(aliases)
+
+        for _ in range(2000):
+            text = "".join(rng.choice(alphabet.upper() + alphabet) for _ in range(rng.randint(1, 15)))
+            entry = matcher.match(text)
+            assert (entry.id if entry else None) == _linear_match(aliases, text), text
+
+
+class TestRefusedAliases:
+    def test_refused_regex_is_logged_and_listed(self, caplog):
+        aliases = [
+            _alias(1, r"^SQ \*(\w+ ?)+", MerchantAliasMatchType.regex, priority=5),
+            _alias(2, r"\d+(,\d+)*", MerchantAliasMatchType.regex),
+        ]
+        with caplog.at_level("WARNING", logger="app.services.merchant_aliases"):
+            matcher = AliasMatcher(aliases)
+
+        assert [entry.id for entry in matcher.refused] == [1]
+        assert "Merchant alias 1 is not applied" in caplog.text
+        assert matcher.match("SQ *COFFEE 1,200").id == 2
+
+
+class TestCandidateClause:
+    @pytest.mark.asyncio
+    async def test_keeps_every_row_match_would_map(self, async_session):
+        from sqlalchemy import insert, select
+
+        from app.orm import Transaction
+
+        rng = random.Random(7)
+        alphabet = "abcde %_"
+        aliases = []
+        for alias_id in range(1, 41):
+            pattern = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+            match_type = rng.choice(list(MerchantAliasMatchType))
+            if match_type == MerchantAliasMatchType.regex:
+                pattern = f"^({pattern.replace('%', '').replace('_', '') or 'a'})+"
+            aliases.append(_alias(alias_id, pattern, match_type))
+        matcher = AliasMatcher(aliases)
+
+        descriptions = [
+            "".join(rng.choice(alphabet.upper() + alphabet) for _ in range(rng.randint(1, 10))) for _ in range(500)
+        ]
+        await async_session.execute(
+            insert(Transaction),
+            [
+                {"date": date(2024, 1, 1), "amount": -1.0, "description": text, "account_source": "TEST"}
+                for text in descriptions
+            ],
+        )
+        clause = matcher.candidate_clause(Transaction.description, "sqlite")
+        kept = set((await async_session.execute(select(Transaction.description).where(clause))).scalars())
+
+        expected = {text for text in descriptions if matcher.match(text) is not None}
+        assert kept == expected
+
+    def test_gives_up_on_non_ascii_patterns(self):
+        from app.orm import Transaction
+
+        matcher = AliasMatcher([_alias(1, "CAFÉ", MerchantAliasMatchType.contains)])
+        assert matcher.candidate_clause(Transaction.description, "sqlite") is None
+
+    def test_regex_aliases_only_filter_on_sqlite(self):
+        from app.orm import Transaction
+
+        matcher = AliasMatcher(
+            [
+                _alias(1, "STARBUCKS", MerchantAliasMatchType.contains),
+                _alias(2, r"\bAMZN\b", MerchantAliasMatchType.regex),
+            ]
+        )
+        assert matcher.candidate_clause(Transaction.description, "sqlite") is not None
+        assert matcher.candidate_clause(Transaction.description, "postgresql") is None
+
+        contains_only = AliasMatcher([_alias(1, "STARBUCKS", MerchantAliasMatchType.contains)])
+        assert contains_only.candidate_clause(Transaction.description, "postgresql") is not None
+
+
+class TestAliasMatcherCache:
+    @pytest.mark.asyncio
+    async def test_cached_until_aliases_change(self, client: AsyncClient, async_session):
+        response = await client.post(
+            "/api/v1/merchants/aliases",
+            json={"pattern": "STARBUCKS", "canonical_name": "Starbucks", "match_type": "contains"},
+        )
+        alias_id = response.json()["id"]
+
+        matcher = await get_alias_matcher(async_session)
+        assert matcher.canonical_name("STARBUCKS #123") == "Starbucks"
+        assert await get_alias_matcher(async_session) is matcher
+
+        await client.patch(f"/api/v1/merchants/aliases/{alias_id}", json={"canonical_name": "Starbucks Coffee"})
+        updated = await get_alias_matcher(async_session)
+        assert updated is not matcher
+        assert updated.canonical_name("STARBUCKS #123") == "Starbucks Coffee"
+
+        await client.delete(f"/api/v1/merchants/aliases/{alias_id}")
+        assert (await get_alias_matcher(async_session)).match("STARBUCKS #123") is None
+
+    @pytest.mark.asyncio
+    async def test_applying_aliases_keeps_matcher(self, client: AsyncClient, async_session, seed_transactions):
+        await client.post(
+            "/api/v1/merchants/aliases",
+            json={"pattern": "Paycheck", "canonical_name": "Employer Inc", "match_type": "contains"},
+        )
+        matcher = await get_alias_matcher(async_session)
+
+        response = await client.post("/api/v1/merchants/aliases/apply")
+
+        assert response.json()["updated_count"] >= 1
+        # Updating match statistics does not invalidate the compiled matcher
+        assert await get_alias_matcher(async_session) is matcher
+
+    @pytest.mark.asyncio
+    async def test_clear_cache_rebuilds(self, async_engine, async_session):
+        from sqlalchemy import insert
+
+        from app.orm import MerchantAlias
+
+        matcher = await get_alias_matcher(async_session)
+        assert matcher.match("STARBUCKS #123") is None
+
+        # Bypasses the Session hooks, as restoring a backup file does
+        async with async_engine.begin() as conn:
+            await conn.execute(
+                insert(MerchantAlias.__table__).values(
+                    pattern="STARBUCKS", canonical_name="Starbucks", match_type="contains"
+                )
+            )
+        assert await get_alias_matcher(async_session) is matcher
+
+        clear_cache()
+
+        assert (await get_alias_matcher(async_session)).canonical_name("STARBUCKS #123") == "Starbucks"
@@ -2,6 +2,8 @@
 
 import gzip
 import os
+import sqlite3
+import threading
 import pytest
 import tempfile
 from datetime import datetime, timedelta, timezone
@@ -10,7 +12,16 @@ from unittest.mock import patch
 
 from freezegun import freeze_time
 
-from app.services.backup import BackupService, BackupMetadata, BackupManifest
+from app.config import settings
+from app.services.backup import (
+    CHUNKS_DIR,
+    COMPRESSIONS,
+    BackupManifest,
+    BackupMetadata,
+    BackupProgress,
+    BackupService,
+    zstd,
+)
 
 
 @pytest.fixture
@@ -20,23 +31,39 @@ def temp_backup_dir():
         yield tmpdir
 
 
+def _write_database(path, content: str) -> None:
+    """Replace ``path`` with a SQLite database holding ``content`` in one row."""
+    Path(path).unlink(missing_ok=True)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("CREATE TABLE t (content TEXT)")
+        conn.execute("INSERT INTO t VALUES (?)", (content,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _read_database(path) -> str:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT content FROM t").fetchone()[0]
+    finally:
+        conn.close()
+
+
 @pytest.fixture
 def temp_db_file():
     """Create a temporary database file for testing."""
-    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-        # Write some test data to simulate a database
-        f.write(b"SQLite test database content for backup testing")
-        f.flush()
-        yield f.name
-    # Cleanup
-    if os.path.exists(f.name):
-        os.unlink(f.name)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "wallet.db")
+        _write_database(path, "SQLite test database content for backup testing")
+        yield path
 
 
 @pytest.fixture
 def backup_service(temp_backup_dir, temp_db_file):
     """Create a backup service with test configuration."""
-    with patch("app.services.backup.settings") as mock_settings:
+    with patch("app.services.backup.settings", settings.model_copy()) as mock_settings:
         mock_settings.backup_dir = temp_backup_dir
 
         service = BackupService()
@@ -106,8 +133,7 @@ class TestBackupService:
         metadata = backup_service.create_backup(description="To restore", source="manual")
 
         # Modify the database
-        with open(temp_db_file, "wb") as f:
-            f.write(b"Modified database content")
+        _write_database(temp_db_file, "Modified database content")
 
         # Restore
         result = backup_service.restore_backup(metadata.id)
@@ -115,9 +141,7 @@ class TestBackupService:
         assert result is True
 
         # Verify content was restored
-        with open(temp_db_file, "rb") as f:
-            content = f.read()
-            assert b"SQLite test database content" in content
+        assert _read_database(temp_db_file) == "SQLite test database content for backup testing"
 
     def test_restore_backup_not_found(self, backup_service):
         """Test restoring a non-existent backup."""
@@ -207,7 +231,7 @@ class TestBackupService:
         backup_service.create_backup(description="Persistent", source="manual")
 
         # Create a new service instance (simulating restart)
-        with patch("app.services.backup.settings") as mock_settings:
+        with patch("app.services.backup.settings", settings.model_copy()) as mock_settings:
             mock_settings.backup_dir = temp_backup_dir
 
             new_service = BackupService()
@@ -273,7 +297,7 @@ class TestBackupServiceEdgeCases:
         with tempfile.TemporaryDirectory() as tmpdir:
             nonexistent_dir = os.path.join(tmpdir, "nested", "backup", "dir")
 
-            with patch("app.services.backup.settings") as mock_settings:
+            with patch("app.services.backup.settings", settings.model_copy()) as mock_settings:
                 mock_settings.backup_dir = nonexistent_dir
 
                 service = BackupService()
@@ -317,41 +341,35 @@ class TestBackupServiceEdgeCases:
 
     def test_backup_file_compression(self, backup_service, temp_backup_dir, temp_db_file):
         """Test that backup files are properly compressed."""
-        # Write more data to test compression
-        with open(temp_db_file, "wb") as f:
-            f.write(b"A" * 10000)  # Highly compressible data
+        # Highly compressible data
+        _write_database(temp_db_file, "A" * 100000)
 
         metadata = backup_service.create_backup(description="Compression test", source="manual")
 
-        # Compressed size should be much smaller than original
-        assert metadata.size_bytes < 10000
+        # Compressed size should be much smaller than the database
+        assert metadata.database_bytes == os.path.getsize(temp_db_file)
+        assert metadata.size_bytes < metadata.database_bytes / 10
 
         # Verify decompression works
-        backup_path = Path(temp_backup_dir) / metadata.filename
-        with gzip.open(backup_path, "rb") as f:
-            content = f.read()
-            assert len(content) == 10000
-            assert content == b"A" * 10000
+        restored = Path(temp_backup_dir) / "restored.db"
+        with gzip.open(Path(temp_backup_dir) / metadata.filename, "rb") as f:
+            restored.write_bytes(f.read())
+        assert _read_database(restored) == "A" * 100000
 
     def test_restore_overwrites_database(self, backup_service, temp_db_file):
         """Test that restore completely overwrites database."""
-        original_content = b"Original database content"
-        with open(temp_db_file, "wb") as f:
-            f.write(original_content)
+        _write_database(temp_db_file, "Original database content")
 
         # Create backup of original
         metadata = backup_service.create_backup(description="Original", source="manual")
 
         # Modify database significantly
-        with open(temp_db_file, "wb") as f:
-            f.write(b"Completely different content that is much longer")
+        _write_database(temp_db_file, "Completely different content that is much longer")
 
         # Restore should bring back original
         backup_service.restore_backup(metadata.id)
 
-        with open(temp_db_file, "rb") as f:
-            restored_content = f.read()
-            assert restored_content == original_content
+        assert _read_database(temp_db_file) == "Original database content"
 
     def test_multiple_demo_backups_only_one_active(self, backup_service):
         """Test that only one backup can be demo backup at a time."""
@@ -425,7 +443,7 @@ class TestBackupServiceGFSRetention:
 
     def test_gfs_deletes_old_backups_outside_all_tiers(self, temp_backup_dir, temp_db_file):
         """Test that old backups outside all GFS tiers are deleted."""
-        with patch("app.services.backup.settings") as mock_settings:
+        with patch("app.services.backup.settings", settings.model_copy()) as mock_settings:
             mock_settings.backup_dir = temp_backup_dir
 
             service = BackupService()
@@ -449,7 +467,7 @@ class TestBackupServiceGFSRetention:
 
     def test_gfs_preserves_recent_backups(self, temp_backup_dir, temp_db_file):
         """Test that recent backups (within 24h) are preserved."""
-        with patch("app.services.backup.settings") as mock_settings:
+        with patch("app.services.backup.settings", settings.model_copy()) as mock_settings:
             mock_settings.backup_dir = temp_backup_dir
 
             service = BackupService()
@@ -470,7 +488,7 @@ class TestBackupServiceGFSRetention:
         Freezes time to mid-month to prevent a 2-day-old backup from crossing
         a month boundary and being promoted to 'monthly' instead of 'daily'/'weekly'.
         """
-        with patch("app.services.backup.settings") as mock_settings:
+        with patch("app.services.backup.settings", settings.model_copy()) as mock_settings:
             mock_settings.backup_dir = temp_backup_dir
 
             service = BackupService()
@@ -508,7 +526,7 @@ class TestBackupServiceGFSRetention:
 
     def test_tier_promotion_to_monthly(self, temp_backup_dir, temp_db_file):
         """Test that old backups get promoted to monthly tier."""
-        with patch("app.services.backup.settings") as mock_settings:
+        with patch("app.services.backup.settings", settings.model_copy()) as mock_settings:
             mock_settings.backup_dir = temp_backup_dir
 
             service = BackupService()
@@ -538,7 +556,7 @@ class TestBackupServiceInvalidDatabase:
 
     def test_invalid_database_url(self, temp_backup_dir):
         """Test error when database URL is not SQLite."""
-        with patch("app.services.backup.settings") as mock_settings:
+        with patch("app.services.backup.settings", settings.model_copy()) as mock_settings:
             mock_settings.backup_dir = temp_backup_dir
 
             with patch("app.services.backup.DATABASE_URL", "postgresql://localhost/db"):
@@ -549,7 +567,7 @@ class TestBackupServiceInvalidDatabase:
 
     def test_missing_database_file(self, temp_backup_dir):
         """Test error when database file doesn't exist."""
-        with patch("app.services.backup.settings") as mock_settings:
+        with patch("app.services.backup.settings", settings.model_copy()) as mock_settings:
             mock_settings.backup_dir = temp_backup_dir
 
             service = BackupService()
@@ -569,3 +587,323 @@ class TestBackupServiceInvalidDatabase:
 
         with pytest.raises(FileNotFoundError, match="Backup file not found"):
             backup_service.restore_backup(metadata.id)
+
+    def test_truncated_archive_leaves_database_untouched(self, backup_service, temp_db_file, temp_backup_dir):
+        """A restore that fails part way never writes into the live database."""
+        metadata = backup_service.create_backup(description="Test", source="manual")
+        backup_path = Path(temp_backup_dir) / metadata.filename
+        backup_path.write_bytes(backup_path.read_bytes()[:-16])
+        _write_database(temp_db_file, "current")
+
+        with pytest.raises(EOFError):
+            backup_service.restore_backup(metadata.id)
+
+        assert _read_database(temp_db_file) == "current"
+        assert not Path(f"{temp_db_file}.restoring").exists()
+
+    def test_restore_waits_for_running_backup(self, backup_service, temp_db_file):
+        """Restore does not replace the database while a backup holds the lock."""
+        metadata = backup_service.create_backup(description="Test", source="manual")
+        _write_database(temp_db_file, "current")
+
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def hold_backup_lock():
+            with backup_service._backup_lock:
+                acquired.set()
+                release.wait()
+
+        holder = threading.Thread(target=hold_backup_lock)
+        holder.start()
+        acquired.wait()
+        restorer = threading.Thread(target=backup_service.restore_backup, args=(metadata.id,))
+        try:
+            restorer.start()
+            restorer.join(timeout=0.2)
+            assert restorer.is_alive()
+            assert _read_database(temp_db_file) == "current"
+        finally:
+            release.set()
+            holder.join()
+            restorer.join()
+
+        assert _read_database(temp_db_file) == "SQLite test database content for backup testing"
+
+
+class TestBackupServiceWAL:
+    """Backups of a database in WAL journal mode."""
+
+    @pytest.fixture
+    def wal_service(self, temp_backup_dir):
+        with tempfile.TemporaryDirectory() as db_dir:
+            db_path = Path(db_dir) / "wallet.db"
+            with patch("app.services.backup.settings", settings.model_copy()) as mock_settings:
+                mock_settings.backup_dir = temp_backup_dir
+                service = BackupService()
+                service._db_path = db_path
+                yield service
+
+    def test_backup_includes_uncheckpointed_wal_pages(self, wal_service, temp_backup_dir):
+        """Rows committed to the -wal file are part of the backup."""
+        conn = sqlite3.connect(wal_service.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA wal_autocheckpoint=0")
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100)])
+        conn.commit()
+        assert Path(f"{wal_service.db_path}-wal").stat().st_size > 0
+
+        metadata = wal_service.create_backup(description="WAL", source="manual")
+        conn.close()
+
+        restored = Path(temp_backup_dir) / "restored.db"
+        with gzip.open(Path(temp_backup_dir) / metadata.filename, "rb") as f:
+            restored.write_bytes(f.read())
+        check = sqlite3.connect(restored)
+        try:
+            assert check.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 100
+        finally:
+            check.close()
+
+    def test_restore_removes_wal_sidecars(self, wal_service):
+        """-wal/-shm files of the replaced database do not survive a restore."""
+        conn = sqlite3.connect(wal_service.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.close()
+        metadata = wal_service.create_backup(description="Empty table", source="manual")
+
+        for suffix in ("-wal", "-shm"):
+            Path(f"{wal_service.db_path}{suffix}").write_bytes(b"left over from the old database")
+        wal_service.restore_backup(metadata.id)
+
+        assert not Path(f"{wal_service.db_path}-wal").exists()
+        assert not Path(f"{wal_service.db_path}-shm").exists()
+        check = sqlite3.connect(wal_service.db_path)
+        try:
+            assert check.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+        finally:
+            check.close()
+
+
+class TestBackupServiceOnlineBackup:
+    """Snapshots through the SQLite online backup API."""
+
+    @pytest.fixture
+    def large_db(self, temp_db_file):
+        conn = sqlite3.connect(temp_db_file)
+        conn.executemany("INSERT INTO t VALUES (?)", [(f"row {i} " * 20,) for i in range(2000)])
+        conn.commit()
+        conn.close()
+        return temp_db_file
+
+    @pytest.mark.parametrize("algorithm", sorted(COMPRESSIONS))
+    def test_compression_round_trip(self, backup_service, temp_db_file, monkeypatch, algorithm):
+        if algorithm == "zstd" and zstd is None:
+            pytest.skip("zstd needs Python 3.14+")
+        monkeypatch.setattr("app.services.backup.settings.backup_compression", algorithm)
+        metadata = backup_service.create_backup(description=algorithm, source="manual")
+        _write_database(temp_db_file, "changed")
+
+        backup_service.restore_backup(metadata.id)
+
+        assert metadata.compression == algorithm
+        assert metadata.filename.endswith(".db" + COMPRESSIONS[algorithm].suffix)
+        assert _read_database(temp_db_file) == "SQLite test database content for backup testing"
+
+    def test_unsupported_compression(self, backup_service, monkeypatch):
+        monkeypatch.setattr("app.services.backup.settings.backup_compression", "rar")
+
+        with pytest.raises(ValueError, match="Unsupported backup compression"):
+            backup_service.create_backup(description="rar", source="manual")
+
+    def test_metadata_reports_size_and_throughput(self, backup_service, large_db):
+        metadata = backup_service.create_backup(description="Stats", source="manual")
+
+        assert metadata.database_bytes == os.path.getsize(large_db)
+        assert metadata.duration_seconds > 0
+        assert metadata.throughput_bytes_per_second > 0
+        assert backup_service.progress is None
+
+    def test_copies_in_page_steps(self, backup_service, large_db, monkeypatch):
+        steps: list[tuple[str, int, int]] = []
+
+        class RecordingProgress(BackupProgress):
+            def __setattr__(self, name, value):
+                super().__setattr__(name, value)
+                if name == "pages_copied":
+                    steps.append((self.phase, value, self.pages_total))
+
+        monkeypatch.setattr("app.services.backup.BackupProgress", RecordingProgress)
+        monkeypatch.setattr("app.services.backup.settings.backup_step_pages", 8)
+
+        backup_service.create_backup(description="Steps", source="manual")
+
+        total = steps[-1][2]
+        assert total > 8
+        assert len(steps) == -(-total // 8)
+        assert steps[-1] == ("snapshot", total, total)
+        assert [copied for _, copied, _ in steps] == sorted(copied for _, copied, _ in steps)
+
+    def test_concurrent_writes_give_a_consistent_snapshot(self, backup_service, temp_backup_dir, large_db, monkeypatch):
+        """Rows committed while the backup runs never leave a torn copy."""
+        done = threading.Event()
+
+        def writer():
+            conn = sqlite3.connect(large_db)
+            for i in range(50):
+                conn.execute("INSERT INTO t VALUES (?)", (f"concurrent {i}",))
+                conn.commit()
+            conn.close()
+            done.set()
+
+        monkeypatch.setattr("app.services.backup.settings.backup_step_pages", 4)
+        thread = threading.Thread(target=writer)
+        thread.start()
+        metadata = backup_service.create_backup(description="Concurrent", source="manual")
+        thread.join()
+
+        restored = Path(temp_backup_dir) / "restored.db"
+        with gzip.open(Path(temp_backup_dir) / metadata.filename, "rb") as f:
+            restored.write_bytes(f.read())
+        check = sqlite3.connect(restored)
+        try:
+            assert check.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+            assert 2001 <= check.execute("SELECT COUNT(*) FROM t").fetchone()[0] <= 2051
+        finally:
+            check.close()
+        assert done.is_set()
+        # Only the compressed backup and the manifest are left behind
+        assert sorted(p.name for p in Path(temp_backup_dir).iterdir()) == sorted(
+            ["manifest.json", metadata.filename, "restored.db"]
+        )
+
+
+class TestChunkedBackups:
+    """BACKUP_FORMAT=chunked: backups share content-addressed chunks."""
+
+    @pytest.fixture
+    def chunked_service(self, backup_service, temp_db_file, monkeypatch):
+        monkeypatch.setattr("app.services.backup.settings.backup_format", "chunked")
+        monkeypatch.setattr("app.services.backup.settings.backup_chunk_kib", 4)
+        conn = sqlite3.connect(temp_db_file)
+        conn.execute("CREATE TABLE rows (id INTEGER PRIMARY KEY, payload TEXT)")
+        conn.executemany("INSERT INTO rows (payload) VALUES (?)", [(os.urandom(500).hex(),) for _ in range(500)])
+        conn.commit()
+        conn.close()
+        return backup_service
+
+    @staticmethod
+    def _chunks(service) -> set[str]:
+        return {path.name for path in (service.backup_dir / CHUNKS_DIR).glob("*/*")}
+
+    @staticmethod
+    def _update_row(db_file, row_id: int) -> None:
+        conn = sqlite3.connect(db_file)
+        conn.execute("UPDATE rows SET payload = 'changed' WHERE id = ?", (row_id,))
+        conn.commit()
+        conn.close()
+
+    def test_round_trip(self, chunked_service, temp_db_file):
+        metadata = chunked_service.create_backup(description="Chunked", source="manual")
+        _write_database(temp_db_file, "replaced")
+
+        chunked_service.restore_backup(metadata.id)
+
+        assert metadata.format == "chunked"
+        assert metadata.filename == f"wallet_hourly_{metadata.id}.chunks.json"
+        assert metadata.chunk_count == metadata.new_chunk_count == len(self._chunks(chunked_service))
+        assert _read_database(temp_db_file) == "SQLite test database content for backup testing"
+        conn = sqlite3.connect(temp_db_file)
+        assert conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0] == 500
+        conn.close()
+
+    def test_unchanged_database_stores_no_chunks(self, chunked_service):
+        first = chunked_service.create_backup(description="First", source="manual")
+        second = chunked_service.create_backup(description="Second", source="manual")
+
+        assert second.chunk_count == first.chunk_count > 100
+        assert second.new_chunk_count == 0
+        # Only the list of chunk hashes is written
+        assert second.size_bytes < 100 * second.chunk_count
+        assert second.size_bytes < first.size_bytes / 5
+
+    def test_small_change_stores_few_chunks(self, chunked_service, temp_db_file):
+        chunked_service.create_backup(description="Before", source="manual")
+        self._update_row(temp_db_file, 250)
+
+        after = chunked_service.create_backup(description="After", source="manual")
+
+        # The changed page plus the header page (change counter)
+        assert 1 <= after.new_chunk_count <= 3
+        assert after.chunk_count > 100
+
+    def test_garbage_collection_keeps_shared_chunks(self, chunked_service, temp_db_file):
+        first = chunked_service.create_backup(description="First", source="manual")
+        first_chunks = self._chunks(chunked_service)
+        self._update_row(temp_db_file, 1)
+        second = chunked_service.create_backup(description="Second", source="manual")
+        assert len(self._chunks(chunked_service)) == len(first_chunks) + second.new_chunk_count
+
+        chunked_service.delete_backup(first.id)
+
+        # Chunks only the first backup listed are gone; shared ones stay
+        assert len(self._chunks(chunked_service)) == second.chunk_count
+        assert len(first_chunks - self._chunks(chunked_service)) == second.new_chunk_count
+        chunked_service.restore_backup(second.id)
+        conn = sqlite3.connect(temp_db_file)
+        assert conn.execute("SELECT payload FROM rows WHERE id = 1").fetchone()[0] == "changed"
+        conn.close()
+
+    def test_garbage_collection_waits_for_running_backup(self, chunked_service):
+        chunked_service.create_backup(description="Kept", source="manual")
+        orphan = chunked_service.backup_dir / CHUNKS_DIR / "00" / ("00" * 32 + ".gz")
+        orphan.parent.mkdir(parents=True, exist_ok=True)
+        orphan.write_bytes(b"from an interrupted backup")
+
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def hold_backup_lock():
+            with chunked_service._backup_lock:
+                acquired.set()
+                release.wait()
+
+        holder = threading.Thread(target=hold_backup_lock)
+        holder.start()
+        acquired.wait()
+        try:
+            assert chunked_service.collect_garbage() == 0
+            assert orphan.exists()
+        finally:
+            release.set()
+            holder.join()
+
+        assert chunked_service.collect_garbage() == 1
+        assert not orphan.exists()
+
+    def test_corrupt_chunk_leaves_database_untouched(self, chunked_service, temp_db_file):
+        metadata = chunked_service.create_backup(description="Chunked", source="manual")
+        chunk = sorted((chunked_service.backup_dir / CHUNKS_DIR).glob("*/*"))[0]
+        with gzip.open(chunk, "wb") as f:
+            f.write(b"not the original bytes")
+        _write_database(temp_db_file, "current")
+
+        with pytest.raises(ValueError, match="Backup chunk is corrupt"):
+            chunked_service.restore_backup(metadata.id)
+
+        assert _read_database(temp_db_file) == "current"
+        assert not Path(f"{temp_db_file}.restoring").exists()
+
+    def test_tier_promotion_keeps_chunk_index_suffix(self, chunked_service):
+        with freeze_time(datetime.now(timezone.utc) - timedelta(days=2)):
+            metadata = chunked_service.create_backup(description="Old", source="manual")
+
+        chunked_service.cleanup_old_backups()
+
+        backup = chunked_service.get_backup(metadata.id)
+        assert backup.tier == "daily"
+        assert backup.filename == f"wallet_daily_{metadata.id}.chunks.json"
+        assert len(self._chunks(chunked_service)) == metadata.chunk_count
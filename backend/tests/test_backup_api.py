@@ -2,12 +2,14 @@
 Tests for backup-related API endpoints in admin router.
 """
 
+import threading
+
 import pytest
 from unittest.mock import patch
 from datetime import datetime, timezone
 from httpx import AsyncClient
 
-from app.services.backup import BackupMetadata
+from app.services.backup import BackupMetadata, BackupProgress
 
 
 class TestBackupAPIList:
@@ -141,6 +143,58 @@ class TestBackupAPICreate:
             assert data["is_demo_backup"] is True
             assert data["source"] == "demo_seed"
 
+    @pytest.mark.asyncio
+    async def test_create_backup_runs_off_the_event_loop(self, client: AsyncClient):
+        """The snapshot and compression run on a worker thread."""
+        mock_backup = BackupMetadata(
+            id="20241215_150000_444444",
+            filename="wallet_hourly_20241215_150000_444444.db.gz",
+            description="Threaded",
+            created_at=datetime.now(timezone.utc),
+            size_bytes=512,
+        )
+        threads = []
+
+        def create_backup(**kwargs):
+            threads.append(threading.current_thread())
+            return mock_backup
+
+        with patch("app.routers.admin.backup_service") as mock_service:
+            mock_service.create_backup.side_effect = create_backup
+
+            response = await client.post("/api/v1/admin/backup")
+
+        assert response.status_code == 200
+        assert threads and threads[0] is not threading.current_thread()
+
+
+class TestBackupAPIProgress:
+    """Tests for GET /api/v1/admin/backup/progress endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_no_backup_running(self, client: AsyncClient):
+        with patch("app.routers.admin.backup_service") as mock_service:
+            mock_service.progress = None
+
+            response = await client.get("/api/v1/admin/backup/progress")
+
+        assert response.status_code == 200
+        assert response.json() is None
+
+    @pytest.mark.asyncio
+    async def test_running_backup(self, client: AsyncClient):
+        progress = BackupProgress(
+            id="20241215_150000_555555", started_at=datetime.now(timezone.utc), pages_total=400, pages_copied=100
+        )
+        with patch("app.routers.admin.backup_service") as mock_service:
+            mock_service.progress = progress
+
+            response = await client.get("/api/v1/admin/backup/progress")
+
+        data = response.json()
+        assert data["id"] == "20241215_150000_555555"
+        assert (data["phase"], data["pages_copied"], data["pages_total"]) == ("snapshot", 100, 400)
+
 
 class TestBackupAPIGet:
     """Tests for GET /api/v1/admin/backup/{backup_id} endpoint."""
@@ -221,7 +275,11 @@ class TestBackupAPIRestore:
             is_demo_backup=False,
             source="manual",
         )
-        with patch("app.routers.admin.backup_service") as mock_service:
+        with (
+            patch("app.routers.admin.backup_service") as mock_service,
+            patch("app.routers.admin.merchant_aliases") as mock_aliases,
+            patch("app.routers.admin.merchant_history") as mock_history,
+        ):
             mock_service.get_backup.return_value = mock_backup
             mock_service.restore_backup.return_value = True
 
@@ -232,6 +290,33 @@ class TestBackupAPIRestore:
             assert data["success"] is True
             assert "backup" in data
             mock_service.restore_backup.assert_called_once_with("20241215_143022_123456")
+            mock_aliases.clear_cache.assert_called_once()
+            mock_history.clear_cache.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_restore_backup_runs_off_the_event_loop(self, client: AsyncClient):
+        """Decompressing the backup over the database runs on a worker thread."""
+        mock_backup = BackupMetadata(
+            id="20241215_143022_123456",
+            filename="wallet_20241215_143022_123456.db.gz",
+            description="Threaded",
+            created_at=datetime(2024, 12, 15, 14, 30, 22, tzinfo=timezone.utc),
+            size_bytes=1024,
+        )
+        threads = []
+
+        def restore_backup(backup_id):
+            threads.append(threading.current_thread())
+            return True
+
+        with patch("app.routers.admin.backup_service") as mock_service:
+            mock_service.get_backup.return_value = mock_backup
+            mock_service.restore_backup.side_effect = restore_backup
+
+            response = await client.post("/api/v1/admin/restore/20241215_143022_123456?confirm=RESTORE")
+
+        assert response.status_code == 200
+        assert threads and threads[0] is not threading.current_thread()
 
     @pytest.mark.asyncio
     async def test_restore_backup_file_missing_raises_error(self, client: AsyncClient):
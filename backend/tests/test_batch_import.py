@@ -81,6 +81,8 @@ Date,Description,Amount,Running Bal.
         # Second file should have 1 cross-file duplicate
         file2_preview = next(f for f in data["files"] if f["filename"] == "file2.csv")
         assert file2_preview["cross_file_duplicate_count"] == 1
+        assert file2_preview["duplicate_report"]["duplicates_by_file"] == {"file1.csv": 1}
+        assert file2_preview["duplicate_report"]["exact_duplicates"] == 1
 
     @pytest.mark.asyncio
     async def test_batch_confirm_import(self, client: AsyncClient, seed_categories):
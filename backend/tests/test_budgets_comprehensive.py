@@ -2,9 +2,13 @@
 Comprehensive tests for budgets.py router to increase coverage to 90%+.
 """
 
+from datetime import date
+
 import pytest
 from httpx import AsyncClient
 
+from app.orm import Budget, Tag, Transaction, TransactionTag
+
 
 class TestBudgetsCRUD:
     """Tests for budget CRUD operations"""
@@ -263,3 +267,79 @@ class TestBudgetStatus:
             "/api/v1/budgets", json={"tag": "account:credit-card-spending", "amount": 2000.00, "period": "monthly"}
         )
         assert response.status_code in [201, 400]
+
+
+async def _seed_budgets(session, start: int, stop: int) -> None:
+    """Bucket budgets ``start``..``stop - 1``; budget i has 10.00 * (i + 1) of spending in November 2025."""
+    for i in range(start, stop):
+        tag = Tag(namespace="bucket", value=f"batch-{i}")
+        session.add(tag)
+        await session.flush()
+        txn = Transaction(date=date(2025, 11, 5), amount=-10.0 * (i + 1), description=f"t{i}", account_source="A")
+        session.add(txn)
+        await session.flush()
+        session.add(TransactionTag(transaction_id=txn.id, tag_id=tag.id))
+        session.add(Budget(tag=f"bucket:batch-{i}", amount=100.0, period="monthly"))
+    await session.commit()
+
+
+class TestBudgetStatusBatching:
+    """Budget status computes every budget's spending with one grouped query."""
+
+    @pytest.mark.asyncio
+    async def test_spending_per_namespace(self, client: AsyncClient, async_session):
+        bucket = Tag(namespace="bucket", value="groceries")
+        occasion = Tag(namespace="occasion", value="trip")
+        account = Tag(namespace="account", value="chase")
+        async_session.add_all([bucket, occasion, account])
+        await async_session.flush()
+
+        def txn(amount: float, **kwargs) -> Transaction:
+            return Transaction(
+                date=date(2025, 11, 10), amount=amount, description="t", account_source="chase", **kwargs
+            )
+
+        groceries = txn(-40.0, account_tag_id=account.id)
+        trip = txn(-60.0, account_tag_id=account.id)
+        refund = txn(25.0, account_tag_id=account.id)
+        transfer = txn(-500.0, account_tag_id=account.id, is_transfer=True)
+        async_session.add_all([groceries, trip, refund, transfer])
+        await async_session.flush()
+        async_session.add_all(
+            [
+                TransactionTag(transaction_id=groceries.id, tag_id=bucket.id),
+                TransactionTag(transaction_id=trip.id, tag_id=occasion.id),
+                TransactionTag(transaction_id=trip.id, tag_id=bucket.id),
+            ]
+        )
+        for tag in ("bucket:groceries", "occasion:trip", "account:chase", "bucket:missing"):
+            async_session.add(Budget(tag=tag, amount=200.0, period="monthly"))
+        await async_session.commit()
+
+        response = await client.get("/api/v1/budgets/status/current?year=2025&month=11")
+
+        assert response.status_code == 200
+        spent = {b["tag"]: b["spent_amount"] for b in response.json()["budgets"]}
+        assert spent == {
+            "bucket:groceries": 100.0,
+            "occasion:trip": 60.0,
+            "account:chase": 100.0,
+            "bucket:missing": 0.0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_statement_count_does_not_scale_with_budgets(
+        self, client: AsyncClient, async_session, statement_counter
+    ):
+        await _seed_budgets(async_session, 0, 2)
+        statement_counter.clear()
+        response = await client.get("/api/v1/budgets/status/current?year=2025&month=11")
+        few = len(statement_counter)
+        assert [b["spent_amount"] for b in response.json()["budgets"]] == [10.0, 20.0]
+
+        await _seed_budgets(async_session, 2, 30)
+        statement_counter.clear()
+        response = await client.get("/api/v1/budgets/status/current?year=2025&month=11")
+
+        assert len(response.json()["budgets"]) == 30
+        assert len(statement_counter) == few
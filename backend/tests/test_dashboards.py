@@ -506,3 +506,178 @@ class TestDuplicateDefaultDashboards:
         async_session.expire_all()
         result = await async_session.execute(select(Dashboard).where(Dashboard.is_default.is_(True)))
         assert len(list(result.scalars().all())) == 1
+
+
+class TestDashboardData:
+    """Tests for GET /api/v1/dashboards/{id}/data (all widgets from one scan)"""
+
+    @pytest.fixture
+    async def ledger(self, async_session):
+        """Transactions in the current month and the months before it, some bucket-tagged."""
+        from datetime import date, timedelta
+
+        from app.orm import Tag, Transaction, TransactionTag
+
+        groceries = Tag(namespace="bucket", value="groceries")
+        dining = Tag(namespace="bucket", value="dining")
+        async_session.add_all([groceries, dining])
+        await async_session.flush()
+
+        month_start = date.today().replace(day=1)
+        txns = []
+        # One transaction per day over ~five months, on distinct dates so first-seen order is stable
+        for i in range(150):
+            day = month_start - timedelta(days=120) + timedelta(days=i)
+            amount = 2500.0 if i % 30 == 0 else -(10.0 + (i % 7) * 4.25)
+            txns.append(
+                Transaction(
+                    date=day,
+                    amount=amount,
+                    description=f"TXN {i}",
+                    merchant=["Grocer", "Cafe", "Pharmacy", None][i % 4] if amount < 0 else "Employer",
+                    account_source="AMEX" if i % 3 else "CHASE",
+                    category=["Food", "Health", ""][i % 3],
+                )
+            )
+        txns.append(Transaction(date=month_start, amount=-500.0, description="Move", account_source="AMEX", is_transfer=True))
+        async_session.add_all(txns)
+        await async_session.flush()
+        async_session.add_all(
+            [
+                TransactionTag(transaction_id=txn.id, tag_id=(groceries if i % 2 else dining).id)
+                for i, txn in enumerate(txns[:150])
+                if i % 5
+            ]
+        )
+        await async_session.commit()
+        return txns
+
+    async def _dashboard(self, client: AsyncClient, async_session, range_type: str) -> int:
+        """Dashboard with default widgets, all made visible."""
+        from sqlalchemy import update
+
+        from app.orm import DashboardWidget
+
+        response = await client.post("/api/v1/dashboards", json={"name": f"Data {range_type}", "date_range_type": range_type})
+        dashboard_id = response.json()["id"]
+        await async_session.execute(
+            update(DashboardWidget).where(DashboardWidget.dashboard_id == dashboard_id).values(is_visible=True)
+        )
+        await async_session.commit()
+        return dashboard_id
+
+    @pytest.mark.asyncio
+    async def test_month_scale_matches_report_endpoints(self, client: AsyncClient, async_session, ledger):
+        """Each widget's data equals what its report endpoint returns"""
+        dashboard_id = await self._dashboard(client, async_session, "mtd")
+
+        response = await client.get(f"/api/v1/dashboards/{dashboard_id}/data")
+        assert response.status_code == 200
+        body = response.json()
+        start, end = body["date_range"]["start_date"], body["date_range"]["end_date"]
+        year, month = int(end[:4]), int(end[5:7])
+
+        datasets = {}
+        for widget in body["widgets"]:
+            datasets.update(widget["data"])
+        assert {w["widget_type"] for w in body["widgets"]} >= {"summary", "velocity", "sankey", "heatmap"}
+
+        endpoints = {
+            "summary": f"/api/v1/reports/monthly-summary?year={year}&month={month}",
+            "month_over_month": f"/api/v1/reports/month-over-month?current_year={year}&current_month={month}",
+            "spending_velocity": f"/api/v1/reports/spending-velocity?year={year}&month={month}",
+            "anomalies": f"/api/v1/reports/anomalies?year={year}&month={month}&threshold=2.0",
+            "trends": f"/api/v1/reports/trends?start_date={start}&end_date={end}&group_by=week",
+            "top_merchants": f"/api/v1/reports/top-merchants?limit=10&year={year}&month={month}",
+            "sankey": f"/api/v1/reports/sankey-flow?year={year}&month={month}",
+            "treemap": f"/api/v1/reports/treemap?year={year}&month={month}",
+            "heatmap": f"/api/v1/reports/spending-heatmap?year={year}&month={month}",
+        }
+        assert set(datasets) == set(endpoints)
+        for name, url in endpoints.items():
+            assert datasets[name] == (await client.get(url)).json(), name
+
+    @pytest.mark.asyncio
+    async def test_year_scale_skips_month_only_datasets(self, client: AsyncClient, async_session, ledger):
+        """Year-scale dashboards get the annual summary and no month-only datasets"""
+        dashboard_id = await self._dashboard(client, async_session, "ytd")
+
+        body = (await client.get(f"/api/v1/dashboards/{dashboard_id}/data")).json()
+        by_type = {w["widget_type"]: w["data"] for w in body["widgets"]}
+        year = int(body["date_range"]["end_date"][:4])
+
+        assert by_type["summary"]["month_over_month"] is None
+        assert by_type["velocity"]["spending_velocity"] is None
+        assert by_type["anomalies"]["anomalies"] is None
+        assert by_type["summary"]["summary"] == (await client.get(f"/api/v1/reports/annual-summary?year={year}")).json()
+        assert by_type["trends"]["trends"]["group_by"] == "month"
+        assert by_type["heatmap"]["heatmap"] == (
+            await client.get(f"/api/v1/reports/spending-heatmap?year={year}")
+        ).json()
+
+    @pytest.mark.asyncio
+    async def test_widget_filters_apply(self, client: AsyncClient, async_session, ledger):
+        """Filters in a widget's config are applied like the endpoint's filter parameters"""
+        import json
+
+        from sqlalchemy import update
+
+        from app.orm import DashboardWidget
+
+        dashboard_id = await self._dashboard(client, async_session, "last_90_days")
+        config = json.dumps({"buckets": ["dining"], "accounts": ["AMEX"], "merchants": ["grocer"]})
+        await async_session.execute(
+            update(DashboardWidget)
+            .where(DashboardWidget.dashboard_id == dashboard_id, DashboardWidget.widget_type.in_(["trends", "top_merchants"]))
+            .values(config=config)
+        )
+        await async_session.commit()
+
+        body = (await client.get(f"/api/v1/dashboards/{dashboard_id}/data")).json()
+        by_type = {w["widget_type"]: w["data"] for w in body["widgets"]}
+        start, end = body["date_range"]["start_date"], body["date_range"]["end_date"]
+        year = int(end[:4])
+
+        filters = "buckets=dining&accounts=AMEX&merchants=grocer"
+        expected_trends = await client.get(
+            f"/api/v1/reports/trends?start_date={start}&end_date={end}&group_by=month&{filters}"
+        )
+        assert by_type["trends"]["trends"] == expected_trends.json()
+        assert by_type["trends"]["trends"]["data"]
+        # Top merchants ignores the merchant filter
+        expected_top = await client.get(f"/api/v1/reports/top-merchants?limit=10&year={year}&buckets=dining&accounts=AMEX")
+        assert by_type["top_merchants"]["top_merchants"] == expected_top.json()
+        # Unfiltered widgets are unaffected
+        assert by_type["sankey"]["sankey"] == (await client.get(f"/api/v1/reports/sankey-flow?year={year}")).json()
+
+    @pytest.mark.asyncio
+    async def test_single_scan(self, client: AsyncClient, async_session, ledger, statement_counter):
+        """The whole dashboard reads transactions once, plus one bucket-tag query"""
+        dashboard_id = await self._dashboard(client, async_session, "mtd")
+
+        statement_counter.clear()
+        response = await client.get(f"/api/v1/dashboards/{dashboard_id}/data")
+
+        assert response.status_code == 200
+        transaction_reads = [s for s in statement_counter if "transactions" in s]
+        assert len(transaction_reads) == 2
+        assert len(statement_counter) == 5  # data generations (ETag), dashboard, widgets, transactions, bucket tags
+
+    @pytest.mark.asyncio
+    async def test_hidden_and_unknown_widgets(self, client: AsyncClient, async_session):
+        """Hidden widgets are omitted; unknown widget types get empty data"""
+        response = await client.post("/api/v1/dashboards", json={"name": "Partial"})
+        dashboard_id = response.json()["id"]
+        await client.post(f"/api/v1/dashboards/{dashboard_id}/widgets", json={"widget_type": "custom_chart", "position": 99})
+
+        body = (await client.get(f"/api/v1/dashboards/{dashboard_id}/data")).json()
+        widget_types = [w["widget_type"] for w in body["widgets"]]
+        assert "sankey" not in widget_types  # hidden by default
+        assert widget_types[-1] == "custom_chart"
+        assert body["widgets"][-1]["data"] == {}
+
+    @pytest.mark.asyncio
+    async def test_nonexistent_dashboard(self, client: AsyncClient):
+        """Data for a non-existent dashboard returns 404"""
+        response = await client.get("/api/v1/dashboards/99999/data")
+        assert response.status_code == 404
@@ -0,0 +1,168 @@
+"""Tests for data generations and conditional GETs (ETag / If-None-Match)."""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import select, text, update
+
+from app.orm import DataGeneration, Tag, Transaction
+from app.routers.conditional import etag_matches
+from app.services.data_generations import mark_changed
+
+SUMMARY = "/api/v1/reports/monthly-summary"
+SUMMARY_PARAMS = {"year": 2024, "month": 1}
+
+
+def _txn(day: date, amount: float, **kwargs) -> Transaction:
+    kwargs.setdefault("account_source", "AMEX")
+    return Transaction(date=day, amount=amount, description=kwargs.pop("description", "TXN"), **kwargs)
+
+
+async def _generations(session) -> dict:
+    rows = (await session.execute(select(DataGeneration.table_name, DataGeneration.generation))).all()
+    return dict(rows)
+
+
+async def _etag(client, path=SUMMARY, params=SUMMARY_PARAMS) -> str:
+    response = await client.get(path, params=params)
+    assert response.status_code == 200
+    return response.headers["etag"]
+
+
+@pytest.fixture
+async def ledger(async_session):
+    async_session.add_all([_txn(date(2024, 1, 5), -10.0), _txn(date(2024, 1, 20), 100.0)])
+    await async_session.commit()
+
+
+class TestGenerations:
+    @pytest.mark.asyncio
+    async def test_orm_changes_bump_on_commit(self, async_session):
+        txn = _txn(date(2024, 1, 5), -10.0)
+        async_session.add_all([txn, Tag(namespace="bucket", value="dining")])
+        await async_session.commit()
+        assert await _generations(async_session) == {"transactions": 1, "tags": 1}
+
+        txn.amount = -12.0
+        await async_session.flush()
+        txn.category = "Food"
+        await async_session.commit()
+        # One bump per commit, however many flushes it took
+        assert (await _generations(async_session))["transactions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_bulk_statements_bump(self, async_session, ledger):
+        await async_session.execute(update(Transaction).values(category="Bulk"))
+        await async_session.commit()
+        assert (await _generations(async_session))["transactions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_rollback_does_not_bump(self, async_session, ledger):
+        async_session.add(_txn(date(2024, 2, 1), -3.0))
+        await async_session.flush()
+        await async_session.rollback()
+
+        async_session.add(Tag(namespace="bucket", value="dining"))
+        await async_session.commit()
+        assert await _generations(async_session) == {"transactions": 1, "tags": 1}
+
+    @pytest.mark.asyncio
+    async def test_raw_sql_with_mark_changed(self, async_session, ledger):
+        await async_session.execute(text("UPDATE transactions SET category = 'Raw'"))
+        mark_changed(async_session.sync_session, "transactions", "import_sessions")
+        await async_session.commit()
+        assert await _generations(async_session) == {"transactions": 2}
+
+
+class TestConditionalGet:
+    @pytest.mark.asyncio
+    async def test_etag_is_stable_and_revalidated(self, client, ledger):
+        response = await client.get(SUMMARY, params=SUMMARY_PARAMS)
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('W/"')
+        assert response.headers["cache-control"] == "private, no-cache"
+        assert await _etag(client) == response.headers["etag"]
+
+    @pytest.mark.asyncio
+    async def test_matching_if_none_match_costs_one_lookup(self, client, ledger, statement_counter):
+        etag = await _etag(client)
+
+        statement_counter.clear()
+        response = await client.get(SUMMARY, params=SUMMARY_PARAMS, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert len(statement_counter) == 1
+        assert "data_generations" in statement_counter[0]
+
+    @pytest.mark.asyncio
+    async def test_if_none_match_forms(self, client, ledger):
+        etag = await _etag(client)
+        strong = etag.removeprefix("W/")
+        for header, status in [
+            (f'W/"stale", {etag}', 304),
+            (strong, 304),
+            ("*", 304),
+            ('W/"stale"', 200),
+        ]:
+            response = await client.get(SUMMARY, params=SUMMARY_PARAMS, headers={"If-None-Match": header})
+            assert response.status_code == status, header
+
+    @pytest.mark.asyncio
+    async def test_query_parameters_change_etag(self, client, ledger):
+        assert await _etag(client) != await _etag(client, params={"year": 2024, "month": 2})
+        assert await _etag(client, "/api/v1/reports/annual-summary", {"year": 2024}) != await _etag(
+            client, "/api/v1/reports/account-summary", {"year": 2024}
+        )
+
+    @pytest.mark.asyncio
+    async def test_data_changes_change_etag(self, client, async_session, ledger):
+        etag = await _etag(client)
+        async_session.add(_txn(date(2024, 1, 25), -5.0))
+        await async_session.commit()
+
+        response = await client.get(SUMMARY, params=SUMMARY_PARAMS, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["total_expenses"] == 15.0
+
+    @pytest.mark.asyncio
+    async def test_etags_follow_the_tables_each_endpoint_reads(self, client, ledger):
+        response = await client.post("/api/v1/tags/", json={"namespace": "bucket", "value": "groceries"})
+        assert response.status_code == 201
+        report_etag = await _etag(client)
+        budgets_etag = await _etag(client, "/api/v1/budgets/", params=None)
+
+        response = await client.post("/api/v1/budgets/", json={"tag": "bucket:groceries", "amount": 100.0})
+        assert response.status_code == 201
+        assert await _etag(client, "/api/v1/budgets/", params=None) != budgets_etag
+        # Reports do not read budgets
+        assert await _etag(client) == report_etag
+
+        response = await client.post("/api/v1/tags/", json={"namespace": "bucket", "value": "dining"})
+        assert response.status_code == 201
+        assert await _etag(client) != report_etag
+
+    @pytest.mark.asyncio
+    async def test_writes_are_not_conditional(self, client):
+        response = await client.post("/api/v1/tags/", json={"namespace": "bucket", "value": "dining"})
+        assert response.status_code == 201
+        assert "etag" not in response.headers
+        assert response.headers["cache-control"] == "no-store"
+
+    @pytest.mark.asyncio
+    async def test_list_endpoints(self, client, ledger):
+        for path in ("/api/v1/transactions/", "/api/v1/transactions/paginated", "/api/v1/tags/", "/api/v1/budgets/"):
+            etag = await _etag(client, path, params=None)
+            response = await client.get(path, headers={"If-None-Match": etag})
+            assert response.status_code == 304, path
+
+
+class TestEtagMatches:
+    def test_weak_comparison(self):
+        assert etag_matches('W/"abc"', 'W/"abc"')
+        assert etag_matches('"abc"', 'W/"abc"')
+        assert etag_matches('"x", W/"abc"', 'W/"abc"')
+        assert not etag_matches('W/"abcd"', 'W/"abc"')
+        assert not etag_matches(None, 'W/"abc"')
+        assert not etag_matches("", 'W/"abc"')
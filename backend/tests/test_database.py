@@ -0,0 +1,74 @@
+"""Tests for the engine connection profile (app.database)."""
+
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import AppSettings
+from app.database import configure_engine, engine_options, sqlite_pragmas
+
+
+async def _pragma(engine, name):
+    async with engine.connect() as conn:
+        return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+
+class TestSqlitePragmas:
+    @pytest.mark.asyncio
+    async def test_applied_on_connect(self, tmp_path):
+        engine = configure_engine(create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}"))
+        try:
+            assert await _pragma(engine, "journal_mode") == "wal"
+            assert await _pragma(engine, "synchronous") == 1  # NORMAL
+            assert await _pragma(engine, "busy_timeout") == 5000
+            assert await _pragma(engine, "temp_store") == 2  # MEMORY
+            assert await _pragma(engine, "cache_size") == -64 * 1024
+            assert await _pragma(engine, "mmap_size") == 256 * 1024 * 1024
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_values_come_from_settings(self, tmp_path):
+        with patch("app.database.settings") as mock_settings:
+            mock_settings.sqlite_tuning = True
+            mock_settings.sqlite_journal_mode = "delete"
+            mock_settings.sqlite_synchronous = "full"
+            mock_settings.sqlite_busy_timeout_ms = 250
+            mock_settings.sqlite_temp_store = "default"
+            mock_settings.sqlite_cache_size_kib = 0
+            mock_settings.sqlite_mmap_size_mb = 0
+            engine = configure_engine(create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'custom.db'}"))
+        try:
+            assert await _pragma(engine, "journal_mode") == "delete"
+            assert await _pragma(engine, "synchronous") == 2  # FULL
+            assert await _pragma(engine, "busy_timeout") == 250
+            assert await _pragma(engine, "mmap_size") == 0
+        finally:
+            await engine.dispose()
+
+    def test_tuning_disabled(self):
+        with patch("app.database.settings") as mock_settings:
+            mock_settings.sqlite_tuning = False
+            assert sqlite_pragmas() == []
+
+    def test_settings_accept_any_case(self):
+        assert AppSettings(sqlite_journal_mode="wal", sqlite_temp_store="file").sqlite_journal_mode == "WAL"
+
+    @pytest.mark.parametrize("field", ["sqlite_journal_mode", "sqlite_synchronous", "sqlite_temp_store"])
+    def test_settings_reject_unknown_values(self, field):
+        with pytest.raises(ValidationError):
+            AppSettings(**{field: "WALL"})
+
+
+class TestEngineOptions:
+    def test_sqlite_keeps_default_pool(self):
+        assert engine_options("sqlite+aiosqlite:///./wallet.db") == {}
+        assert engine_options("sqlite+aiosqlite:///:memory:") == {}
+
+    def test_postgres_gets_sized_pool_with_pre_ping(self):
+        options = engine_options("postgresql+asyncpg://user:pw@db/wallet")
+
+        assert options == {"pool_size": 10, "max_overflow": 20, "pool_recycle": 1800, "pool_pre_ping": True}
@@ -0,0 +1,104 @@
+"""
+Tests for single-pass format sniffing (app.parsers.sniff) and cached detection.
+"""
+
+from typing import Tuple
+
+import pytest
+
+from app.parsers import SAMPLE_CHARS, CSVFormatParser, ColumnMapping, FormatSample, ParserRegistry
+from app.parsers.formats.amex_cc import AmexCCParser
+
+AMEX_HEADER = "Date,Description,Card Member,Account #,Amount,Reference,Category\n"
+
+
+@pytest.fixture(autouse=True)
+def fresh_detection_cache():
+    ParserRegistry._clear_detected()
+    yield
+    ParserRegistry._clear_detected()
+
+
+class TestFormatSample:
+    def test_header_cells_and_delimiter(self):
+        sample = FormatSample.from_content('"Posted Date"\t"Reference Number"\tPayee\n11/26/2025\t1\tSHOP\n')
+
+        assert sample.delimiter == "\t"
+        assert sample.header_rows[0] == ("Posted Date", "Reference Number", "Payee")
+        assert sample.has_columns("Payee", "Posted Date")
+        assert not sample.has_columns("Payee", "Running Bal.")
+
+    def test_markers(self):
+        assert FormatSample.from_content("OFXHEADER:100\n<ofx>\n").ofx_markers == {"OFXHEADER:", "<OFX>"}
+        assert FormatSample.from_content("\n!Type:Bank\nD12/15/2024\n").qif_type_line == 0
+        assert FormatSample.from_content("note\n!type:CCard\n").qif_type_line == 1
+        assert FormatSample.from_content("Date,Amount\n").qif_type_line is None
+
+    def test_only_the_prefix_is_sampled(self):
+        content = "x" * SAMPLE_CHARS + "\n<OFX>\n"
+        sample = FormatSample.from_content(content)
+
+        assert len(sample.text) == SAMPLE_CHARS
+        assert not sample.ofx_markers
+        parser, _ = ParserRegistry.detect_format(content)
+        assert parser is None
+
+
+class TestDetectFormat:
+    def test_detection_cost_does_not_depend_on_file_size(self, monkeypatch):
+        """Parsers only ever see the bounded sample."""
+        seen: list[int] = []
+        detect = AmexCCParser.detect
+
+        def recording_detect(self, sample: FormatSample) -> Tuple[bool, float]:
+            seen.append(len(sample.text))
+            return detect(self, sample)
+
+        monkeypatch.setattr(AmexCCParser, "detect", recording_detect)
+        rows = "".join(f"01/15/2025,SHOP {i},JOHN DOE,XXXXX-53004,{i}.00,{i},Other\n" for i in range(20000))
+
+        parser, confidence = ParserRegistry.detect_format(AMEX_HEADER + rows)
+
+        assert parser.format_key == "amex_cc"
+        assert confidence == 0.95
+        assert seen == [SAMPLE_CHARS]
+
+    def test_results_are_cached_by_content(self, monkeypatch):
+        calls: list[str] = []
+        detect = AmexCCParser.detect
+
+        def counting_detect(self, sample: FormatSample) -> Tuple[bool, float]:
+            calls.append(sample.digest)
+            return detect(self, sample)
+
+        monkeypatch.setattr(AmexCCParser, "detect", counting_detect)
+        content = AMEX_HEADER + "01/15/2025,SHOP,JOHN DOE,XXXXX-53004,5.00,1,Other\n"
+
+        first, _ = ParserRegistry.detect_format(content)
+        second, _ = ParserRegistry.detect_format(content)
+        ParserRegistry.detect_format("Random,Headers\n1,2\n")
+
+        assert first is not second
+        assert second.format_key == "amex_cc"
+        assert len(calls) == 2
+
+    def test_can_parse_only_parsers_still_detect(self, monkeypatch):
+        class LegacyParser(CSVFormatParser):
+            format_key = "legacy_bank"
+            format_name = "Legacy Bank"
+            column_mapping = ColumnMapping(date_column="Date", amount_column="Amount", description_column="Memo")
+
+            def can_parse(self, csv_content: str) -> Tuple[bool, float]:
+                return ("LEGACY BANK" in csv_content), 0.99
+
+        monkeypatch.setattr(ParserRegistry, "_parsers", {**ParserRegistry._parsers})
+        ParserRegistry.register(LegacyParser)
+
+        parser, confidence = ParserRegistry.detect_format("LEGACY BANK\nDate,Amount,Memo\n")
+
+        assert parser.format_key == "legacy_bank"
+        assert confidence == 0.99
+
+    def test_can_parse_uses_detect(self):
+        assert AmexCCParser().can_parse(AMEX_HEADER) == (True, 0.95)
+        assert AmexCCParser().can_parse("Date,Description,Amount\n") == (False, 0.0)
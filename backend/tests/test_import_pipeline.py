@@ -0,0 +1,247 @@
+"""
+Tests for the batched import pipeline (app.services.import_pipeline).
+"""
+
+import io
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.orm import ImportSession, Tag, Transaction, TransactionTag
+from app.services.import_pipeline import BatchDuplicateIndex, TransactionImporter, existing_match_keys
+from app.utils.hashing import hash_transaction_dicts
+
+
+def _amex_csv(rows: int, start: date = date(2024, 1, 1)) -> str:
+    """Build an AMEX CSV export with ``rows`` distinct charges."""
+    header = (
+        "Date,Description,Card Member,Account #,Amount,Extended Details,Appears On Your Statement As,"
+        "Address,City/State,Zip Code,Country,Reference,Category\n"
+    )
+    lines = []
+    for i in range(rows):
+        txn_date = start + timedelta(days=i % 365)
+        lines.append(
+            f"{txn_date.strftime('%m/%d/%Y')},MERCHANT {i},JOHN DOE,XXXXX-53004,{10 + i % 90}.{i % 100:02d},"
+            f",,,,,,{320240000000 + i},Merchandise"
+        )
+    return header + "\n".join(lines) + "\n"
+
+
+class TestConfirmImportBatching:
+    """confirm_import should issue O(rows / chunk) statements."""
+
+    @pytest.mark.asyncio
+    async def test_statement_count_does_not_scale_with_rows(
+        self, client: AsyncClient, async_session, statement_counter
+    ):
+        csv_content = _amex_csv(1200)
+        files = {"file": ("amex.csv", io.BytesIO(csv_content.encode()), "text/csv")}
+
+        response = await client.post("/api/v1/import/confirm", files=files, data={"format_type": "amex_cc"})
+
+        assert response.status_code == 200
+        assert response.json()["imported"] == 1200
+        # 3 chunks of <=500 rows, each a few statements; never one per row
+        assert len(statement_counter) < 40, f"{len(statement_counter)} statements for 1200 rows"
+
+        tagged = await async_session.execute(
+            select(func.count())
+            .select_from(TransactionTag)
+            .join(Tag, Tag.id == TransactionTag.tag_id)
+            .where(Tag.namespace == "bucket")
+        )
+        assert tagged.scalar() == 1200
+
+        account_ids = await async_session.execute(select(func.count(func.distinct(Transaction.account_tag_id))))
+        assert account_ids.scalar() == 1
+
+    @pytest.mark.asyncio
+    async def test_reimport_is_all_duplicates(self, client: AsyncClient):
+        csv_content = _amex_csv(600)
+
+        first = await client.post(
+            "/api/v1/import/confirm",
+            files={"file": ("amex.csv", io.BytesIO(csv_content.encode()), "text/csv")},
+            data={"format_type": "amex_cc"},
+        )
+        second = await client.post(
+            "/api/v1/import/confirm",
+            files={"file": ("amex.csv", io.BytesIO(csv_content.encode()), "text/csv")},
+            data={"format_type": "amex_cc"},
+        )
+
+        assert first.json()["imported"] == 600
+        assert second.json()["imported"] == 0
+        assert second.json()["duplicates"] == 600
+
+
+class TestTransactionImporter:
+    """Direct tests for TransactionImporter."""
+
+    @staticmethod
+    def _row(day: int, amount: float, description: str, account: str = "AMEX", reference_id=None) -> dict:
+        return {
+            "date": date(2024, 3, day),
+            "amount": amount,
+            "description": description,
+            "merchant": description.title(),
+            "account_source": account,
+            "reference_id": reference_id,
+        }
+
+    async def _import_session(self, async_session) -> ImportSession:
+        import_session = ImportSession(filename="test.csv", format_type="custom", status="in_progress")
+        async_session.add(import_session)
+        await async_session.flush()
+        return import_session
+
+    @pytest.mark.asyncio
+    async def test_duplicates_within_file_are_skipped(self, async_session):
+        importer = TransactionImporter(async_session)
+        rows = [self._row(1, -5.0, "coffee"), self._row(1, -5.0, "coffee"), self._row(2, -7.0, "lunch")]
+
+        result = await importer.import_transactions(rows, await self._import_session(async_session))
+
+        assert result.imported == 2
+        assert result.duplicates == 1
+        assert result.dates == [date(2024, 3, 1), date(2024, 3, 2)]
+
+    @pytest.mark.asyncio
+    async def test_consumes_iterators_one_chunk_at_a_time(self, async_session):
+        importer = TransactionImporter(async_session, chunk_size=2)
+        pulled: list[int] = []
+
+        def rows():
+            for day in range(1, 6):
+                pulled.append(day)
+                yield self._row(day, -float(day), f"shop {day}")
+
+        import_session = await self._import_session(async_session)
+        chunks_seen: list[int] = []
+        import_chunk = importer._import_chunk
+
+        async def recording_import_chunk(chunk, session, result):
+            chunks_seen.append(len(pulled))
+            await import_chunk(chunk, session, result)
+
+        importer._import_chunk = recording_import_chunk  # type: ignore[method-assign]
+        result = await importer.import_transactions(rows(), import_session)
+
+        assert result.imported == 5
+        # Each chunk is imported before the next rows are pulled from the generator
+        assert chunks_seen == [2, 4, 5]
+
+    @pytest.mark.asyncio
+    async def test_bucket_tags_follow_their_rows(self, async_session):
+        importer = TransactionImporter(async_session)
+        rows = [
+            self._row(1, -40.0, "whole foods market"),
+            self._row(1, -9.0, "zzz unknown"),
+            self._row(2, 2500.0, "payroll"),
+        ]
+
+        await importer.import_transactions(rows, await self._import_session(async_session))
+
+        tagged = await async_session.execute(
+            select(Transaction.description, Tag.value)
+            .join(TransactionTag, TransactionTag.transaction_id == Transaction.id)
+            .join(Tag, Tag.id == TransactionTag.tag_id)
+        )
+        assert dict(tagged.all()) == {"whole foods market": "groceries", "zzz unknown": "none", "payroll": "income"}
+
+    @pytest.mark.asyncio
+    async def test_cross_account_warning(self, async_session):
+        importer = TransactionImporter(async_session)
+        import_session = await self._import_session(async_session)
+        await importer.import_transactions([self._row(1, -5.0, "coffee", account="AMEX")], import_session)
+
+        result = await importer.import_transactions([self._row(1, -5.0, "coffee", account="CHASE")], import_session)
+
+        assert result.imported == 1
+        assert result.cross_account_warnings[0]["existing_account"] == "AMEX"
+        assert result.cross_account_warnings[0]["importing_account"] == "CHASE"
+
+    @pytest.mark.asyncio
+    async def test_match_fields_dedupe_across_files(self, async_session):
+        importer = TransactionImporter(async_session, match_fields=("date", "amount", "reference_id"))
+        import_session = await self._import_session(async_session)
+
+        first = await importer.import_transactions([self._row(1, -5.0, "coffee", reference_id="A1")], import_session)
+        # Same date/amount/reference under a different description is still a duplicate
+        second = await importer.import_transactions([self._row(1, -5.0, "latte", reference_id="A1")], import_session)
+
+        assert first.imported == 1
+        assert second.imported == 0
+        assert second.duplicates == 1
+
+    @pytest.mark.asyncio
+    async def test_existing_match_keys_matches_null_fields(self, async_session):
+        async_session.add(
+            Transaction(date=date(2024, 3, 1), amount=-5.0, description="x", account_source="A", reference_id=None)
+        )
+        await async_session.flush()
+
+        found = await existing_match_keys(
+            async_session,
+            [(date(2024, 3, 1), -5.0, None), (date(2024, 3, 1), -6.0, None)],
+            ("date", "amount", "reference_id"),
+        )
+
+        assert found == {(date(2024, 3, 1), -5.0, None)}
+
+
+class TestBatchDuplicateIndex:
+    """Cross-file duplicate detection for batch previews."""
+
+    @staticmethod
+    def _row(day: int, amount: float, description: str, account: str = "AMEX", reference_id=None) -> dict:
+        return TestTransactionImporter._row(day, amount, description, account, reference_id)
+
+    def _add(self, index: BatchDuplicateIndex, filename: str, rows: list[dict]):
+        return index.add_file(filename, rows, hash_transaction_dicts(rows))
+
+    def test_reports_which_file_holds_the_duplicate(self):
+        index = BatchDuplicateIndex()
+        self._add(index, "jan.csv", [self._row(1, -5.0, "coffee", reference_id="R1")])
+        self._add(index, "feb.csv", [self._row(2, -7.0, "lunch", reference_id="R2")])
+
+        rows = [
+            self._row(1, -5.0, "coffee", reference_id="R1"),
+            # Same key, different description: still a duplicate, but not an exact one
+            self._row(2, -7.0, "LUNCH PLACE", reference_id="R2"),
+            self._row(3, -9.0, "dinner", reference_id="R3"),
+        ]
+        report = self._add(index, "overlap.csv", rows)
+
+        assert report.cross_file_duplicates == 2
+        assert report.exact_duplicates == 1
+        assert report.duplicates_by_file == {"jan.csv": 1, "feb.csv": 1}
+        assert [row["is_cross_file_duplicate"] for row in rows] == [True, True, False]
+
+    def test_within_file_and_db_duplicates_are_not_cross_file(self):
+        index = BatchDuplicateIndex()
+        rows = [self._row(1, -5.0, "coffee"), self._row(1, -5.0, "coffee")]
+        assert self._add(index, "a.csv", rows).cross_file_duplicates == 0
+
+        db_duplicate = {**self._row(1, -5.0, "coffee"), "is_db_duplicate": True}
+        report = self._add(index, "b.csv", [db_duplicate])
+
+        assert report.cross_file_duplicates == 0
+        assert db_duplicate["is_cross_file_duplicate"] is False
+
+    def test_cross_account_matches(self):
+        index = BatchDuplicateIndex()
+        self._add(index, "amex.csv", [self._row(1, -5.0, "coffee", account="AMEX", reference_id="A")])
+
+        report = self._add(index, "chase.csv", [self._row(1, -5.0, "coffee", account="CHASE", reference_id="B")])
+
+        assert report.cross_file_duplicates == 0
+        [match] = report.cross_account_matches
+        assert (match["existing_account"], match["existing_file"], match["importing_account"]) == (
+            "AMEX",
+            "amex.csv",
+            "CHASE",
+        )
@@ -2,6 +2,8 @@
 Tests for Merchant Alias functionality (v0.1)
 """
 
+import json
+
 import pytest
 from httpx import AsyncClient
 from datetime import date
@@ -41,6 +43,23 @@ class TestMerchantAliases:
 
         assert data["match_type"] == "contains"
 
+    @pytest.mark.asyncio
+    async def test_list_flags_refused_stored_regex(self, client: AsyncClient, async_session):
+        """A stored regex the guard refuses is listed with the reason it never matches"""
+        from app.orm import MerchantAlias
+
+        refused = MerchantAlias(pattern=r"^SQ \*(\w+ ?)+", canonical_name="Square", match_type="regex")
+        async_session.add_all([refused, MerchantAlias(pattern="AMAZON", canonical_name="Amazon")])
+        await async_session.commit()
+
+        aliases = (await client.get("/api/v1/merchants/aliases")).json()
+        errors = {alias["pattern"]: alias["pattern_error"] for alias in aliases}
+        assert "nested repetition" in errors[r"^SQ \*(\w+ ?)+"]
+        assert errors["AMAZON"] is None
+
+        single = (await client.get(f"/api/v1/merchants/aliases/{refused.id}")).json()
+        assert "nested repetition" in single["pattern_error"]
+
     @pytest.mark.asyncio
     async def test_create_alias_regex_match(self, client: AsyncClient):
         """Create an alias with regex match type"""
@@ -467,3 +486,103 @@ class TestAliasApplicationDuringImport:
         txn_id = txn_response.json()["id"]
         get_response = await client.get(f"/api/v1/transactions/{txn_id}")
         assert get_response.json()["merchant"] == "Imported Merchant"
+
+
+class TestAliasApplyBulk:
+    """Bulk write path and streamed preview for /merchants/aliases/apply"""
+
+    @staticmethod
+    async def _seed(async_session, count: int):
+        from app.orm import Transaction
+
+        async_session.add_all(
+            [
+                Transaction(
+                    date=date(2024, 1, 1),
+                    amount=-5.0,
+                    description=f"{'BULKA' if i % 2 else 'BULKB'} STORE {i}",
+                    merchant="Raw",
+                    account_source="TEST",
+                )
+                for i in range(count)
+            ]
+        )
+        await async_session.commit()
+
+    @pytest.mark.asyncio
+    async def test_dry_run_streams_all_updates(self, client: AsyncClient, async_session):
+        """Dry run lists every pending change instead of the first 100"""
+        await self._seed(async_session, 250)
+        await client.post(
+            "/api/v1/merchants/aliases",
+            json={"pattern": "BULK", "canonical_name": "Bulk Store", "match_type": "contains"},
+        )
+
+        response = await client.post("/api/v1/merchants/aliases/apply?dry_run=true")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["dry_run"] is True
+        assert data["updated_count"] == 250
+        assert len(data["updates"]) == 250
+        assert {u["new_merchant"] for u in data["updates"]} == {"Bulk Store"}
+
+    @pytest.mark.asyncio
+    async def test_preview_is_sent_as_rows_are_read(self, monkeypatch):
+        """Each batch of entries is sent before the next rows are read from the cursor"""
+        from types import SimpleNamespace
+
+        from app.orm import MerchantAliasMatchType
+        from app.routers import merchants
+        from app.services.merchant_aliases import AliasMatcher
+
+        monkeypatch.setattr(merchants, "PREVIEW_STREAM_BATCH", 2)
+        matcher = AliasMatcher(
+            [
+                SimpleNamespace(
+                    id=1, pattern="BULK", canonical_name="Bulk", match_type=MerchantAliasMatchType.contains, priority=0
+                )
+            ]
+        )
+        read = []
+
+        async def rows():
+            for i in range(5):
+                read.append(i)
+                yield i, f"BULK {i}", "Raw" if i != 3 else "Bulk"
+
+        chunks = []
+        async for chunk in merchants._stream_alias_preview(matcher, rows()):
+            chunks.append((chunk, len(read)))
+
+        assert [rows_read for _, rows_read in chunks] == [0, 2, 5, 5]
+        data = json.loads("".join(chunk for chunk, _ in chunks))
+        assert data["updated_count"] == 4
+        assert [u["transaction_id"] for u in data["updates"]] == [0, 1, 2, 4]
+
+    @pytest.mark.asyncio
+    async def test_apply_groups_updates_by_canonical_name(self, client: AsyncClient, async_session, statement_counter):
+        """Renames are written with one UPDATE per canonical name, not per row"""
+        from sqlalchemy import func, select
+        from app.orm import Transaction
+
+        await self._seed(async_session, 400)
+        for pattern, name in [("BULKA", "Store A"), ("BULKB", "Store B")]:
+            await client.post(
+                "/api/v1/merchants/aliases",
+                json={"pattern": pattern, "canonical_name": name, "match_type": "contains"},
+            )
+
+        statement_counter.clear()
+        response = await client.post("/api/v1/merchants/aliases/apply")
+        updates = [s for s in statement_counter if s.startswith("UPDATE transactions")]
+
+        data = response.json()
+        assert data["updated_count"] == 400
+        assert len(data["updates"]) == 100
+        assert len(updates) == 2
+
+        counts = await async_session.execute(
+            select(Transaction.merchant, func.count()).group_by(Transaction.merchant).order_by(Transaction.merchant)
+        )
+        assert counts.all() == [("Store A", 200), ("Store B", 200)]
@@ -0,0 +1,136 @@
+"""
+Tests for the cached merchant -> bucket history index (app.services.merchant_history).
+"""
+
+import io
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text, update
+
+from app.orm import Transaction
+from app.services.merchant_history import clear_cache, get_merchant_history
+
+
+def _txn(merchant: str, category, amount: float = -10.0) -> Transaction:
+    return Transaction(
+        date=date(2024, 1, 1),
+        amount=amount,
+        description=merchant.upper(),
+        merchant=merchant,
+        account_source="TEST",
+        category=category,
+    )
+
+
+class TestMerchantHistoryIndex:
+    """The index is built once and kept current on commit."""
+
+    @pytest.mark.asyncio
+    async def test_built_from_categorized_transactions(self, async_session):
+        async_session.add_all([_txn("Blue Bottle", "Coffee & Tea"), _txn("Mystery Shop", None)])
+        await async_session.commit()
+
+        history = await get_merchant_history(async_session)
+
+        assert history == {"blue bottle": "bucket:coffee-and-tea"}
+
+    @pytest.mark.asyncio
+    async def test_cached_between_calls(self, async_session, statement_counter):
+        async_session.add(_txn("Blue Bottle", "Coffee"))
+        await async_session.commit()
+        await get_merchant_history(async_session)
+        statement_counter.clear()
+
+        await get_merchant_history(async_session)
+
+        assert statement_counter == []
+
+    @pytest.mark.asyncio
+    async def test_new_categorization_applied_on_commit(self, async_session, statement_counter):
+        await get_merchant_history(async_session)
+        async_session.add(_txn("Safeway", "Groceries"))
+        await async_session.commit()
+        statement_counter.clear()
+
+        history = await get_merchant_history(async_session)
+
+        assert history["safeway"] == "bucket:groceries"
+        assert statement_counter == []
+
+    @pytest.mark.asyncio
+    async def test_uncommitted_changes_not_applied_after_rollback(self, async_session):
+        await get_merchant_history(async_session)
+        async_session.add(_txn("Safeway", "Groceries"))
+        await async_session.flush()
+        await async_session.rollback()
+
+        history = await get_merchant_history(async_session)
+
+        assert "safeway" not in history
+
+    @pytest.mark.asyncio
+    async def test_cleared_category_rebuilds(self, async_session):
+        txn = _txn("Safeway", "Groceries")
+        async_session.add(txn)
+        await async_session.commit()
+        assert "safeway" in await get_merchant_history(async_session)
+
+        txn.category = None
+        await async_session.commit()
+
+        assert "safeway" not in await get_merchant_history(async_session)
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_rebuilds(self, async_session):
+        async_session.add(_txn("Safeway", "Groceries"))
+        await async_session.commit()
+        await get_merchant_history(async_session)
+
+        await async_session.execute(update(Transaction).values(category="Dining"))
+        await async_session.commit()
+
+        assert (await get_merchant_history(async_session))["safeway"] == "bucket:dining"
+
+    @pytest.mark.asyncio
+    async def test_clear_cache_rebuilds_after_out_of_band_changes(self, async_engine, async_session):
+        async_session.add(_txn("Safeway", "Groceries"))
+        await async_session.commit()
+        await get_merchant_history(async_session)
+
+        # Bypasses the Session hooks, as restoring a backup file does
+        async with async_engine.begin() as conn:
+            await conn.execute(text("UPDATE transactions SET category = 'Dining'"))
+        assert (await get_merchant_history(async_session))["safeway"] == "bucket:groceries"
+
+        clear_cache()
+
+        assert (await get_merchant_history(async_session))["safeway"] == "bucket:dining"
+
+
+class TestImportUsesHistory:
+    """Import previews suggest buckets from the history without rescanning transactions."""
+
+    @pytest.mark.asyncio
+    async def test_preview_uses_history(self, client: AsyncClient, async_session, statement_counter):
+        async_session.add(_txn("Zzyzx Outfitters", "Shopping"))
+        await async_session.commit()
+
+        csv_content = (
+            "Date,Description,Card Member,Account #,Amount\n01/05/2024,ZZYZX OUTFITTERS,JOHN DOE,XXXXX-53004,25.00\n"
+        )
+        for _ in range(2):
+            statement_counter.clear()
+            response = await client.post(
+                "/api/v1/import/preview",
+                files={"file": ("amex.csv", io.BytesIO(csv_content.encode()), "text/csv")},
+                data={"format_type": "amex_cc"},
+            )
+            assert response.status_code == 200
+
+        txn = response.json()["transactions"][0]
+        assert txn["merchant"].lower() == "zzyzx outfitters"
+        assert txn["bucket"] == "shopping"
+        # The second preview reads the cached history instead of querying transactions
+        assert not any("FROM transactions" in s and "category IS NOT NULL" in s for s in statement_counter)
@@ -0,0 +1,247 @@
+"""Tests for the monthly rollup table (app.services.monthly_rollups)."""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, insert, select, text, update
+
+from app.orm import MonthlyRollup, Tag, TagRule, Transaction, TransactionTag
+from app.routers.report_helpers import aggregate, aggregate_window, report_filters
+from app.routers.tag_rules import apply_rules_in_bulk
+from app.services.monthly_rollups import check_rollups, mark_rebuild, rebuild_rollups, whole_months
+
+
+def _txn(day: date, amount: float, **kwargs) -> Transaction:
+    kwargs.setdefault("account_source", "AMEX")
+    return Transaction(date=day, amount=amount, description=kwargs.pop("description", "TXN"), **kwargs)
+
+
+async def _rollups(session) -> dict:
+    """(year_month, category, bucket_tag_id) -> (income, expenses, count) for non-transfer rows."""
+    rows = (await session.execute(select(MonthlyRollup).where(MonthlyRollup.is_transfer.is_(False)))).scalars()
+    return {(r.year_month, r.category, r.bucket_tag_id): (r.income, r.expenses, r.transaction_count) for r in rows}
+
+
+@pytest.fixture
+async def buckets(async_session):
+    groceries = Tag(namespace="bucket", value="groceries")
+    dining = Tag(namespace="bucket", value="dining")
+    async_session.add_all([groceries, dining])
+    await async_session.commit()
+    return {"groceries": groceries, "dining": dining}
+
+
+class TestWholeMonths:
+    def test_aligned_windows(self):
+        assert whole_months(date(2024, 1, 1), date(2024, 4, 1)) == (202401, 202403)
+        assert whole_months(date(2024, 1, 1), date(2024, 2, 29), end_inclusive=True) == (202401, 202402)
+        assert whole_months(date(2023, 12, 1), date(2024, 1, 1)) == (202312, 202312)
+        assert whole_months(None, None) == (None, None)
+        assert whole_months(date(2024, 3, 1), None) == (202403, None)
+
+    def test_partial_months(self):
+        assert whole_months(date(2024, 1, 2), date(2024, 2, 1)) is None
+        assert whole_months(date(2024, 1, 1), date(2024, 2, 28), end_inclusive=True) is None
+        assert whole_months(date(2024, 1, 1), date(2024, 1, 15)) is None
+        assert whole_months(date(2024, 2, 1), date(2024, 2, 1)) is None
+
+
+class TestMaintenance:
+    @pytest.mark.asyncio
+    async def test_orm_create_edit_delete(self, async_session):
+        jan = _txn(date(2024, 1, 5), -10.0, category="Food")
+        async_session.add_all([jan, _txn(date(2024, 1, 20), 100.0), _txn(date(2024, 2, 1), -4.0, category="Food")])
+        await async_session.commit()
+
+        assert await _rollups(async_session) == {
+            (202401, "Food", None): (0.0, 10.0, 1),
+            (202401, "Uncategorized", None): (100.0, 0.0, 1),
+            (202402, "Food", None): (0.0, 4.0, 1),
+        }
+
+        # Moving a transaction to another month updates both months
+        jan.date = date(2024, 2, 10)
+        jan.amount = -6.0
+        await async_session.commit()
+        assert await _rollups(async_session) == {
+            (202401, "Uncategorized", None): (100.0, 0.0, 1),
+            (202402, "Food", None): (0.0, 10.0, 2),
+        }
+
+        await async_session.delete(jan)
+        await async_session.commit()
+        assert (await _rollups(async_session))[(202402, "Food", None)] == (0.0, 4.0, 1)
+        assert await check_rollups(async_session) == []
+
+    @pytest.mark.asyncio
+    async def test_retag_and_split_through_api(self, client, async_session, buckets):
+        txn = _txn(date(2024, 3, 3), -50.0)
+        async_session.add(txn)
+        await async_session.commit()
+
+        response = await client.post(f"/api/v1/transactions/{txn.id}/tags", json={"tag": "bucket:groceries"})
+        assert response.status_code == 200
+        assert await _rollups(async_session) == {(202403, "Uncategorized", buckets["groceries"].id): (0.0, 50.0, 1)}
+
+        response = await client.put(
+            f"/api/v1/transactions/{txn.id}/splits",
+            json={"splits": [{"tag": "bucket:dining", "amount": 20.0}, {"tag": "bucket:groceries", "amount": 30.0}]},
+        )
+        assert response.status_code == 200
+        # A split transaction reports under its highest bucket value, like the "bucket" report dimension
+        assert await _rollups(async_session) == {(202403, "Uncategorized", buckets["groceries"].id): (0.0, 50.0, 1)}
+
+        response = await client.delete(f"/api/v1/transactions/{txn.id}/tags/bucket:groceries")
+        assert response.status_code in (200, 204)
+        assert await _rollups(async_session) == {(202403, "Uncategorized", buckets["dining"].id): (0.0, 50.0, 1)}
+        assert await check_rollups(async_session) == []
+
+    @pytest.mark.asyncio
+    async def test_bulk_statements(self, async_session, buckets):
+        await async_session.execute(
+            insert(Transaction),
+            [
+                {"date": date(2024, 5, d), "amount": -1.0 * d, "description": "X", "account_source": "AMEX"}
+                for d in range(1, 11)
+            ],
+        )
+        await async_session.commit()
+        assert (await _rollups(async_session))[(202405, "Uncategorized", None)] == (0.0, 55.0, 10)
+
+        ids = (await async_session.execute(select(Transaction.id).order_by(Transaction.id))).scalars().all()
+        await async_session.execute(
+            insert(TransactionTag), [{"transaction_id": i, "tag_id": buckets["dining"].id} for i in ids[:4]]
+        )
+        await async_session.execute(
+            update(Transaction).where(Transaction.amount < -8).values(category="Big"),
+        )
+        await async_session.commit()
+        rollups = await _rollups(async_session)
+        assert rollups[(202405, "Uncategorized", buckets["dining"].id)] == (0.0, 10.0, 4)
+        assert rollups[(202405, "Big", None)] == (0.0, 19.0, 2)
+
+        await async_session.execute(delete(Transaction).where(Transaction.amount == -10.0))
+        await async_session.execute(delete(TransactionTag).where(TransactionTag.transaction_id == ids[0]))
+        await async_session.commit()
+        assert await check_rollups(async_session) == []
+
+    @pytest.mark.asyncio
+    async def test_rule_application(self, async_session, buckets):
+        async_session.add_all([_txn(date(2024, 6, d), -5.0, merchant="Cafe") for d in (1, 15)])
+        rule = TagRule(name="Cafes", tag="bucket:dining", merchant_pattern="cafe", priority=1, enabled=True)
+        async_session.add(rule)
+        await async_session.commit()
+
+        await apply_rules_in_bulk(async_session, [rule], unbucketed_only=False)
+        await async_session.commit()
+
+        assert await _rollups(async_session) == {(202406, "Uncategorized", buckets["dining"].id): (0.0, 10.0, 2)}
+        assert await check_rollups(async_session) == []
+
+    @pytest.mark.asyncio
+    async def test_rollback_discards_pending_months(self, async_session):
+        async_session.add(_txn(date(2024, 7, 1), -3.0))
+        await async_session.flush()
+        await async_session.rollback()
+
+        async_session.add(_txn(date(2024, 8, 1), -2.0))
+        await async_session.commit()
+        assert set(await _rollups(async_session)) == {(202408, "Uncategorized", None)}
+
+    @pytest.mark.asyncio
+    async def test_raw_sql_with_mark_rebuild(self, async_session):
+        async_session.add(_txn(date(2024, 1, 31), -3.0))
+        await async_session.commit()
+
+        await async_session.execute(text("UPDATE transactions SET date = '2024-02-01'"))
+        mark_rebuild(async_session.sync_session)
+        await async_session.commit()
+        assert set(await _rollups(async_session)) == {(202402, "Uncategorized", None)}
+
+
+class TestConsistency:
+    @pytest.mark.asyncio
+    async def test_check_reports_and_rebuild_repairs(self, async_session):
+        async_session.add_all([_txn(date(2024, 1, 5), -10.0), _txn(date(2024, 2, 5), 20.0)])
+        await async_session.commit()
+        # Bypass the Session: the rollups do not see this
+        async with async_session.bind.begin() as conn:
+            await conn.execute(text("UPDATE transactions SET amount = -99 WHERE amount = -10"))
+
+        mismatches = await check_rollups(async_session)
+        assert [(m.key[0], m.stored[1], m.actual[1]) for m in mismatches] == [(202401, 10.0, 99.0)]
+
+        await rebuild_rollups(async_session)
+        await async_session.commit()
+        assert await check_rollups(async_session) == []
+
+
+class TestReportsReadRollups:
+    @pytest.fixture
+    async def ledger(self, async_session, buckets):
+        txns = [
+            _txn(date(2024, 1, 3), -12.5, category="Food", account_source="AMEX"),
+            _txn(date(2024, 1, 9), 1000.0, category="Salary", account_source="CHASE"),
+            _txn(date(2024, 2, 14), -40.0, category="Food", account_source="CHASE"),
+            _txn(date(2024, 2, 20), -7.25, account_source="AMEX"),
+            _txn(date(2024, 3, 1), -100.0, category="Rent", account_source="CHASE", is_transfer=True),
+            _txn(date(2024, 3, 31), -3.0, category="", account_source="AMEX"),
+        ]
+        async_session.add_all(txns)
+        await async_session.flush()
+        async_session.add_all(
+            [
+                TransactionTag(transaction_id=txns[0].id, tag_id=buckets["groceries"].id),
+                TransactionTag(transaction_id=txns[2].id, tag_id=buckets["dining"].id),
+            ]
+        )
+        await async_session.commit()
+        return txns
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "group_by",
+        [[], ["category"], ["bucket"], ["account"], ["year", "month"], ["bucket", "year", "month"]],
+    )
+    @pytest.mark.parametrize("expenses_only", [False, True])
+    async def test_matches_transaction_scan(self, async_session, ledger, group_by, expenses_only):
+        window = (date(2024, 1, 1), date(2024, 3, 31))
+        from_rollups = await aggregate_window(
+            async_session, group_by, *window, end_inclusive=True, expenses_only=expenses_only
+        )
+        from_scan = await aggregate(
+            async_session, group_by, report_filters(*window, end_inclusive=True, expenses_only=expenses_only)
+        )
+
+        def shape(rows):
+            return sorted(
+                (tuple(getattr(r, name) for name in group_by), float(r.expenses), r._mapping["count"]) for r in rows
+            )
+
+        assert shape(from_rollups) == shape(from_scan)
+        if not expenses_only:
+            assert sorted(float(r.income) for r in from_rollups) == sorted(float(r.income) for r in from_scan)
+
+    @pytest.mark.asyncio
+    async def test_whole_month_reports_skip_transactions(self, client, ledger, statement_counter):
+        statement_counter.clear()
+        response = await client.get("/api/v1/reports/annual-summary", params={"year": 2024})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_expenses"] == pytest.approx(62.75)
+        assert data["monthly_breakdown"]["1"]["income"] == 1000.0
+
+        rollup_reads = [s for s in statement_counter if "monthly_rollups" in s]
+        # Month and bucket breakdowns; only top merchants scans transactions
+        assert len(rollup_reads) == 2
+        assert not any("FROM transactions" in s for s in rollup_reads)
+
+    @pytest.mark.asyncio
+    async def test_partial_month_window_scans_transactions(self, client, ledger, statement_counter):
+        statement_counter.clear()
+        response = await client.get(
+            "/api/v1/reports/bucket-summary", params={"start_date": "2024-01-05", "end_date": "2024-02-28"}
+        )
+        assert response.status_code == 200
+        assert {b["bucket"]: b["expenses"] for b in response.json()["buckets"]} == {"dining": 40.0, "Untagged": 7.25}
+        assert not any("monthly_rollups" in s for s in statement_counter)
@@ -5,9 +5,16 @@ Tests for New Analytics Features:
 - Anomaly Detection
 """
 
+import statistics
+from datetime import date
+from types import SimpleNamespace
+
 import pytest
 from httpx import AsyncClient
 
+from app.orm import Transaction
+from app.routers.report_analytics import ExpenseStats
+
 
 class TestNewAnalytics:
     """Tests for new analytics endpoints to help find savings opportunities"""
@@ -228,3 +235,55 @@ class TestNewAnalytics:
             assert "z_score" in category
             assert "percent_increase" in category
             assert "reason" in category
+
+
+class TestAnomalyStatistics:
+    """Anomalies are computed from SQL aggregates plus the flagged rows only."""
+
+    def test_expense_stats_match_statistics(self):
+        amounts = [12.5, 40.0, 19.99, 250.0, 7.25]
+        rows = [SimpleNamespace(amount=-a) for a in amounts] + [SimpleNamespace(amount=1000.0)]
+        stats = ExpenseStats.from_rows(rows)
+
+        assert stats.transaction_count == 6
+        assert stats.mean == pytest.approx(statistics.mean(amounts))
+        assert stats.stdev == pytest.approx(statistics.stdev(amounts))
+        assert stats.large_threshold(2.0) == pytest.approx(statistics.mean(amounts) + 2 * statistics.stdev(amounts))
+
+    def test_equal_expenses_have_no_spread(self):
+        stats = ExpenseStats.from_rows([SimpleNamespace(amount=-19.99)] * 1000)
+
+        assert stats.stdev == 0.0
+        assert stats.large_threshold(2.0) is None
+        assert ExpenseStats.from_rows([SimpleNamespace(amount=-5.0)]).mean is None
+
+    @pytest.mark.asyncio
+    async def test_flags_large_and_new_merchant_expenses(self, client: AsyncClient, async_session):
+        baseline = [
+            Transaction(
+                date=date(2025, m, d), amount=-amount, description="Grocer", merchant="Grocer", account_source="A"
+            )
+            for m in range(1, 6)
+            for d, amount in ((3, 40.0), (17, 60.0))
+        ]
+        large = Transaction(
+            date=date(2025, 6, 10), amount=-900.0, description="Grocer", merchant="Grocer", account_source="A"
+        )
+        new_shop = Transaction(
+            date=date(2025, 6, 12), amount=-25.0, description="New Shop", merchant="New Shop", account_source="A"
+        )
+        regular = Transaction(
+            date=date(2025, 6, 14), amount=-55.0, description="Grocer", merchant="Grocer", account_source="A"
+        )
+        async_session.add_all([*baseline, large, new_shop, regular])
+        await async_session.commit()
+
+        response = await client.get("/api/v1/reports/anomalies?year=2025&month=6&threshold=2.0")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [t["id"] for t in data["anomalies"]["large_transactions"]] == [large.id]
+        assert [t["merchant"] for t in data["anomalies"]["new_merchants"]] == ["New Shop"]
+        assert data["anomalies"]["new_merchants"][0]["bucket"] is None
+        assert data["summary"]["mean_expense"] == 50.0
+        assert data["baseline_period"]["transaction_count"] == len(baseline)
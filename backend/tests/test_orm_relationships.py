@@ -2,9 +2,10 @@
 Tests for ORM relationship loading with SQLAlchemy 2.0.
 
 These tests verify that:
-1. lazy="selectin" relationships load correctly
-2. Related data is accessible after session operations
-3. No N+1 query issues when accessing relationships
+1. Relationships are lazy="raise" and never load implicitly
+2. Loader profiles load the relationships a query asks for
+3. Related data is accessible after session operations
+4. No N+1 query issues when accessing relationships
 """
 
 import pytest
@@ -13,7 +14,14 @@ from datetime import date
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import select, event
+from sqlalchemy.exc import InvalidRequestError
 
+from app.loader_profiles import (
+    DASHBOARD_WITH_WIDGETS,
+    TRANSACTION_WITH_TAGS,
+    LoaderProfile,
+    load_profile,
+)
 from app.orm import (
     Base,
     Transaction,
@@ -23,6 +31,11 @@ from app.orm import (
     DashboardWidget,
 )
 
+# Every Transaction relationship, for the relationship tests below
+TRANSACTION_RELATIONS = LoaderProfile(
+    "transaction_relations", Transaction.tags, Transaction.account_tag, Transaction.linked_transaction
+)
+
 
 # ============================================================================
 # Test Fixtures
@@ -76,10 +89,10 @@ def query_tracker(test_engine):
 class TestTransactionTagRelationship:
     """Tests for Transaction <-> Tag many-to-many relationship."""
 
-    async def test_transaction_loads_tags_with_selectin(
+    async def test_transaction_loads_tags_with_profile(
         self, test_session: AsyncSession, query_tracker: list
     ):
-        """Transaction.tags relationship uses selectin loading."""
+        """TRANSACTION_WITH_TAGS loads Transaction.tags with the query."""
         # Setup: Create tag and transaction
         tag = Tag(namespace="bucket", value="groceries")
         test_session.add(tag)
@@ -104,13 +117,15 @@ class TestTransactionTagRelationship:
 
         # Load transaction fresh
         result = await test_session.execute(
-            select(Transaction).where(Transaction.id == txn.id)
+            TRANSACTION_WITH_TAGS.apply(select(Transaction).where(Transaction.id == txn.id))
         )
         loaded_txn = result.scalar_one()
 
-        # Access tags - should NOT cause additional query with selectin
-        # (selectin loads in the same "round" as the main query)
+        # Access tags - should NOT cause additional query
+        # (selectinload runs in the same "round" as the main query)
+        query_tracker.clear()
         tags = loaded_txn.tags
+        assert query_tracker == []
         assert len(tags) == 1
         assert tags[0].value == "groceries"
 
@@ -138,17 +153,17 @@ class TestTransactionTagRelationship:
 
         # Load fresh and expunge
         result = await test_session.execute(
-            select(Transaction).where(Transaction.id == txn.id)
+            TRANSACTION_WITH_TAGS.apply(select(Transaction).where(Transaction.id == txn.id))
         )
         loaded_txn = result.scalar_one()
 
-        # Access tags before expunge (triggers selectin load)
+        # Tags were loaded by the profile
         _ = loaded_txn.tags
 
         # Expunge from session
         test_session.expunge(loaded_txn)
 
-        # Should still be accessible (loaded via selectin, not lazy)
+        # Should still be accessible (loaded by the query, not lazily)
         assert len(loaded_txn.tags) == 1
         assert loaded_txn.tags[0].value == "dining"
 
@@ -186,20 +201,20 @@ class TestTransactionTagRelationship:
         query_tracker.clear()
 
         # Load all transactions
-        result = await test_session.execute(select(Transaction))
+        result = await test_session.execute(TRANSACTION_WITH_TAGS.apply(select(Transaction)))
         loaded_transactions = result.scalars().all()
 
         # Access tags on all transactions
         for txn in loaded_transactions:
             _ = txn.tags
 
-        # With selectin, should be 2 queries:
+        # With selectinload, should be 2 queries:
         # 1. SELECT transactions
         # 2. SELECT tags WHERE transaction_id IN (...)
         # NOT 1 + N queries
         assert len(query_tracker) <= 3, (
             f"Possible N+1: {len(query_tracker)} queries for {len(loaded_transactions)} transactions. "
-            f"Expected ~2 queries with selectin loading."
+            f"Expected ~2 queries with selectinload."
         )
 
 
@@ -225,7 +240,7 @@ class TestTransactionAccountTagRelationship:
 
         # Load fresh
         result = await test_session.execute(
-            select(Transaction).where(Transaction.id == txn.id)
+            TRANSACTION_RELATIONS.apply(select(Transaction).where(Transaction.id == txn.id))
         )
         loaded_txn = result.scalar_one()
 
@@ -266,7 +281,7 @@ class TestDashboardWidgetRelationship:
 
         # Load fresh
         result = await test_session.execute(
-            select(Dashboard).where(Dashboard.id == dashboard.id)
+            DASHBOARD_WITH_WIDGETS.apply(select(Dashboard).where(Dashboard.id == dashboard.id))
         )
         loaded_dashboard = result.scalar_one()
 
@@ -293,8 +308,9 @@ class TestDashboardWidgetRelationship:
         await test_session.commit()
 
         # Load widget fresh
+        profile = LoaderProfile("widget_with_dashboard", DashboardWidget.dashboard)
         result = await test_session.execute(
-            select(DashboardWidget).where(DashboardWidget.id == widget.id)
+            profile.apply(select(DashboardWidget).where(DashboardWidget.id == widget.id))
         )
         loaded_widget = result.scalar_one()
 
@@ -330,7 +346,7 @@ class TestDashboardWidgetRelationship:
         query_tracker.clear()
 
         # Load all dashboards
-        result = await test_session.execute(select(Dashboard))
+        result = await test_session.execute(DASHBOARD_WITH_WIDGETS.apply(select(Dashboard)))
         loaded_dashboards = result.scalars().all()
 
         # Access widgets on all dashboards
@@ -374,7 +390,7 @@ class TestLinkedTransactionRelationship:
 
         # Load the transfer-in transaction
         result = await test_session.execute(
-            select(Transaction).where(Transaction.id == txn2.id)
+            TRANSACTION_RELATIONS.apply(select(Transaction).where(Transaction.id == txn2.id))
         )
         loaded_txn = result.scalar_one()
 
@@ -384,6 +400,64 @@ class TestLinkedTransactionRelationship:
         assert loaded_txn.linked_transaction.amount == -500.0
 
 
+class TestDefaultLoading:
+    """Relationships load only when a query asks for them."""
+
+    async def test_unrequested_relationship_raises(self, test_session: AsyncSession):
+        """Touching a relationship the query did not load raises instead of issuing SQL."""
+        txn = Transaction(date=date.today(), description="Plain", amount=-5.0, account_source="test")
+        test_session.add(txn)
+        await test_session.commit()
+        test_session.expunge_all()
+
+        loaded_txn = (await test_session.execute(select(Transaction))).scalar_one()
+
+        with pytest.raises(InvalidRequestError):
+            _ = loaded_txn.tags
+        with pytest.raises(InvalidRequestError):
+            _ = loaded_txn.account_tag
+
+    async def test_select_tag_does_not_load_transactions(
+        self, test_session: AsyncSession, query_tracker: list
+    ):
+        """select(Tag) is a single query however many transactions carry the tag."""
+        tag = Tag(namespace="bucket", value="groceries")
+        test_session.add(tag)
+        await test_session.flush()
+        for i in range(20):
+            txn = Transaction(date=date.today(), description=f"T{i}", amount=-1.0, account_source="test")
+            test_session.add(txn)
+            await test_session.flush()
+            test_session.add(TransactionTag(transaction_id=txn.id, tag_id=tag.id))
+        await test_session.commit()
+        test_session.expunge_all()
+        query_tracker.clear()
+
+        loaded_tag = (await test_session.execute(select(Tag))).scalar_one()
+
+        assert loaded_tag.value == "groceries"
+        assert len(query_tracker) == 1
+        assert "transaction" not in query_tracker[0].lower()
+
+    async def test_load_profile_on_fetched_instance(self, test_session: AsyncSession):
+        """load_profile loads relationships onto an instance fetched without options."""
+        dashboard = Dashboard(name="Later", date_range_type="mtd")
+        test_session.add(dashboard)
+        await test_session.flush()
+        test_session.add(DashboardWidget(dashboard_id=dashboard.id, widget_type="summary", position=0))
+        await test_session.commit()
+        test_session.expunge_all()
+
+        loaded_dashboard = (await test_session.execute(select(Dashboard))).scalar_one()
+        await load_profile(test_session, [loaded_dashboard], DASHBOARD_WITH_WIDGETS)
+
+        assert [w.widget_type for w in loaded_dashboard.widgets] == ["summary"]
+
+    def test_profile_attribute_names(self):
+        """attribute_names lists each top-level relationship in order."""
+        assert TRANSACTION_RELATIONS.attribute_names == ["tags", "account_tag", "linked_transaction"]
+
+
 # ============================================================================
 # Edge Cases
 # ============================================================================
@@ -404,7 +478,7 @@ class TestRelationshipEdgeCases:
         await test_session.commit()
 
         result = await test_session.execute(
-            select(Transaction).where(Transaction.id == txn.id)
+            TRANSACTION_WITH_TAGS.apply(select(Transaction).where(Transaction.id == txn.id))
         )
         loaded_txn = result.scalar_one()
 
@@ -423,7 +497,7 @@ class TestRelationshipEdgeCases:
         await test_session.commit()
 
         result = await test_session.execute(
-            select(Transaction).where(Transaction.id == txn.id)
+            TRANSACTION_RELATIONS.apply(select(Transaction).where(Transaction.id == txn.id))
         )
         loaded_txn = result.scalar_one()
 
@@ -439,7 +513,7 @@ class TestRelationshipEdgeCases:
         await test_session.commit()
 
         result = await test_session.execute(
-            select(Dashboard).where(Dashboard.id == dashboard.id)
+            DASHBOARD_WITH_WIDGETS.apply(select(Dashboard).where(Dashboard.id == dashboard.id))
         )
         loaded_dashboard = result.scalar_one()
 
@@ -473,7 +547,7 @@ class TestRelationshipEdgeCases:
 
         # Load and verify
         result = await test_session.execute(
-            select(Transaction).where(Transaction.id == txn.id)
+            TRANSACTION_WITH_TAGS.apply(select(Transaction).where(Transaction.id == txn.id))
         )
         loaded_txn = result.scalar_one()
 
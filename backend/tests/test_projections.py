@@ -0,0 +1,58 @@
+"""Tests for read-only column projections (app.projections)."""
+
+from datetime import date
+
+import pytest
+
+from app.orm import Transaction
+from app.projections import REPORT_ROWS, TRANSACTION_ROWS, ReportRow, TransactionRow
+
+
+class TestProjection:
+    @pytest.mark.asyncio
+    async def test_fetch_returns_named_tuples(self, async_session):
+        async_session.add_all(
+            [
+                Transaction(date=date(2024, 1, 2), amount=-5.0, description="COFFEE", account_source="AMEX"),
+                Transaction(
+                    date=date(2024, 1, 1),
+                    amount=-9.5,
+                    description="LUNCH",
+                    merchant="Deli",
+                    account_source="AMEX",
+                    category="Dining",
+                ),
+            ]
+        )
+        await async_session.commit()
+
+        rows = await TRANSACTION_ROWS.fetch(async_session, TRANSACTION_ROWS.select().order_by(Transaction.date))
+
+        assert [type(row) for row in rows] == [TransactionRow, TransactionRow]
+        assert rows[0].merchant == "Deli"
+        assert rows[0].date == date(2024, 1, 1)
+        assert rows[1]._asdict()["description"] == "COFFEE"
+
+    @pytest.mark.asyncio
+    async def test_selects_only_projected_columns(self, async_session, statement_counter):
+        async_session.add(Transaction(date=date(2024, 1, 1), amount=-5.0, description="X", account_source="A"))
+        await async_session.commit()
+        statement_counter.clear()
+
+        rows = await REPORT_ROWS.fetch(async_session, REPORT_ROWS.select(Transaction.amount < 0))
+
+        assert rows == [ReportRow(rows[0].id, date(2024, 1, 1), -5.0, None, "A", None)]
+        assert len(statement_counter) == 1
+        select_list = statement_counter[0].split("FROM")[0]
+        assert "description" not in select_list
+        assert "notes" not in select_list
+
+    @pytest.mark.asyncio
+    async def test_rows_are_not_tracked_by_session(self, async_session):
+        async_session.add(Transaction(date=date(2024, 1, 1), amount=-5.0, description="X", account_source="A"))
+        await async_session.commit()
+        async_session.expunge_all()
+
+        await REPORT_ROWS.fetch(async_session, REPORT_ROWS.select())
+
+        assert len(async_session.identity_map) == 0
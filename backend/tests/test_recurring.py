@@ -441,3 +441,92 @@ class TestRecurringPatterns:
 
         # Should have the most common category
         assert hulu["category"] == "Subscriptions"
+
+
+class TestIncrementalDetection:
+    """Detection only re-analyzes merchants whose transactions changed"""
+
+    @staticmethod
+    async def _add_monthly(client: AsyncClient, merchant: str, months: int, start: int = 0):
+        today = date.today()
+        for i in range(start, start + months):
+            await client.post(
+                "/api/v1/transactions",
+                json={
+                    "date": (today - timedelta(days=30 * i)).isoformat(),
+                    "amount": -12.00,
+                    "description": f"{merchant} monthly",
+                    "merchant": merchant,
+                    "account_source": "TEST",
+                    "reference_id": f"{merchant}_{i}",
+                },
+            )
+
+    @staticmethod
+    def _analyzed_merchants(statements: list) -> int:
+        """Number of transaction-row loads (one per chunk of changed merchants)"""
+        return sum(1 for s in statements if s.startswith("SELECT transactions.merchant, transactions.date"))
+
+    @pytest.mark.asyncio
+    async def test_unchanged_merchants_are_not_reloaded(self, client: AsyncClient, statement_counter):
+        await self._add_monthly(client, "Gym", 4)
+        await self._add_monthly(client, "Netflix", 4)
+        first = (await client.post("/api/v1/recurring/detect")).json()
+        assert first["detected_count"] == 2
+
+        statement_counter.clear()
+        second = (await client.post("/api/v1/recurring/detect")).json()
+        assert second["detected_count"] == 0
+        assert self._analyzed_merchants(statement_counter) == 0
+
+    @pytest.mark.asyncio
+    async def test_changed_merchant_is_reanalyzed(self, client: AsyncClient, async_session):
+        from sqlalchemy import select
+        from app.orm import RecurringMerchantWatermark
+
+        await self._add_monthly(client, "Gym", 2)
+        first = (await client.post("/api/v1/recurring/detect")).json()
+        assert first["detected_count"] == 0  # Too few occurrences, not analyzed
+
+        await self._add_monthly(client, "Gym", 2, start=2)
+        second = (await client.post("/api/v1/recurring/detect")).json()
+
+        assert [p["merchant"] for p in second["patterns"]] == ["gym"]
+        watermark = (await async_session.execute(select(RecurringMerchantWatermark))).scalar_one()
+        assert watermark.merchant == "gym"
+        assert watermark.transaction_count == 4
+        assert watermark.detected_frequency == "monthly"
+
+    @pytest.mark.asyncio
+    async def test_deleted_pattern_is_detected_again(self, client: AsyncClient):
+        await self._add_monthly(client, "Gym", 4)
+        await client.post("/api/v1/recurring/detect")
+        pattern = (await client.get("/api/v1/recurring/")).json()[0]
+
+        await client.delete(f"/api/v1/recurring/{pattern['id']}")
+        again = (await client.post("/api/v1/recurring/detect")).json()
+
+        assert again["detected_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_new_thresholds_reanalyze(self, client: AsyncClient):
+        # Irregular intervals (2 and 58 days) average out to monthly with ~0.7 confidence
+        today = date.today()
+        for i, days_ago in enumerate([60, 58, 0]):
+            await client.post(
+                "/api/v1/transactions",
+                json={
+                    "date": (today - timedelta(days=days_ago)).isoformat(),
+                    "amount": -12.00,
+                    "description": "Gym monthly",
+                    "merchant": "Gym",
+                    "account_source": "TEST",
+                    "reference_id": f"gym_irregular_{i}",
+                },
+            )
+
+        strict = (await client.post("/api/v1/recurring/detect?min_confidence=0.9")).json()
+        relaxed = (await client.post("/api/v1/recurring/detect?min_confidence=0.5")).json()
+
+        assert strict["detected_count"] == 0
+        assert relaxed["detected_count"] == 1
@@ -0,0 +1,94 @@
+"""Tests for shared regex matching and the SQLite REGEXP function (app.utils.regexp)."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import literal, select
+
+from app.utils.regexp import MAX_SUBJECT_LENGTH, compile_pattern, pattern_error, regexp
+
+
+class TestPatternError:
+    @pytest.mark.parametrize("pattern", ["STORE[0-9]+", r"(?i)taco\s*bell", "(ab){2,5}", "(?:a|b)*c", "^AMZN"])
+    def test_accepts_ordinary_patterns(self, pattern):
+        assert pattern_error(pattern) is None
+
+    @pytest.mark.parametrize("pattern", ["(a+)+$", r"(\w+\s?)*$", "(a*)*", "(x|y+)*z", "(a+){2}"])
+    def test_rejects_nested_repetition(self, pattern):
+        assert "nested repetition" in pattern_error(pattern)
+
+    @pytest.mark.parametrize("pattern", [r"\d+(,\d+)*", "[0-9]{3}(-[0-9]+)+", "(?:[^,]+,)+", "((a+,)+b)*", r"(-\w+)+$"])
+    def test_accepts_repeats_separated_by_a_literal(self, pattern):
+        assert pattern_error(pattern) is None
+
+    @pytest.mark.parametrize("pattern", [r"^SQ \*(\w+ ?)+", r"(x\w+)+$", r"(\d+[.]?)+$", "(a+a)+$"])
+    def test_rejects_separators_that_are_optional_or_ambiguous(self, pattern):
+        assert "nested repetition" in pattern_error(pattern)
+
+    def test_rejects_invalid_and_long_patterns(self):
+        assert pattern_error("[invalid(").startswith("Invalid regex pattern")
+        assert pattern_error("a" * 201).startswith("Regex pattern too long")
+
+
+class TestRegexpFunction:
+    def test_case_insensitive_search(self):
+        assert regexp("store[0-9]+", "MY STORE42") is True
+        assert regexp("^store", "MY STORE42") is False
+
+    def test_null_and_refused_patterns(self):
+        assert regexp("a", None) is None
+        assert regexp(None, "a") is None
+        assert regexp("(a+)+$", "aaaa") is False
+        assert regexp("[invalid(", "[invalid(") is False
+
+    def test_only_searches_subject_prefix(self):
+        value = "x" * MAX_SUBJECT_LENGTH + "needle"
+        assert regexp("needle", value) is False
+
+    def test_pattern_compiled_once(self):
+        compile_pattern.cache_clear()
+        for value in ("a1", "b2", "c3"):
+            regexp("[a-c][0-9]", value)
+        info = compile_pattern.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
+
+    @pytest.mark.asyncio
+    async def test_registered_on_sqlite_connections(self, async_session):
+        result = await async_session.execute(
+            select(
+                literal("MY STORE42").regexp_match("store[0-9]+"),
+                literal("aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa!").regexp_match("(a+)+$"),
+            )
+        )
+        assert tuple(result.one()) == (True, False)
+
+
+class TestRegexSearch:
+    @pytest.mark.asyncio
+    async def test_regex_search_is_case_insensitive(self, client: AsyncClient, seed_categories):
+        for merchant in ("STORE123", "Store 9", "OTHER"):
+            tx = {
+                "date": "2024-12-01",
+                "amount": -5.0,
+                "description": "Test purchase",
+                "merchant": merchant,
+                "account_source": "TEST-ACCT",
+            }
+            await client.post("/api/v1/transactions", json=tx)
+
+        response = await client.get("/api/v1/transactions/", params={"search": "^store ?[0-9]+$", "search_regex": True})
+        assert response.status_code == 200
+        assert sorted(t["merchant"] for t in response.json()) == ["STORE123", "Store 9"]
+
+    @pytest.mark.asyncio
+    async def test_nested_repetition_returns_400(self, client: AsyncClient):
+        response = await client.get("/api/v1/transactions/", params={"search": "(a+)+$", "search_regex": True})
+        assert response.status_code == 400
+        assert response.json()["detail"]["error_code"] == "INVALID_REGEX"
+
+    @pytest.mark.asyncio
+    async def test_alias_with_nested_repetition_rejected(self, client: AsyncClient):
+        response = await client.post(
+            "/api/v1/merchants/aliases",
+            json={"pattern": r"(\w+\s?)*$", "canonical_name": "Slow", "match_type": "regex"},
+        )
+        assert response.status_code == 400
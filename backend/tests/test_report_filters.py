@@ -688,3 +688,81 @@ class TestVisualizationEndpointsAPI:
             params={"year": 2024, "month": 6, "accounts": "AMEX-53004"},
         )
         assert response.status_code == 200
+
+
+class TestSqlAggregation:
+    """The SQL-side aggregation must match the in-Python semantics it replaced."""
+
+    @pytest.mark.asyncio
+    async def test_bucket_summary_counts_multi_tagged_transaction_once(self, client: AsyncClient, async_session):
+        """A transaction with a bucket and an occasion tag is counted once, under its bucket."""
+        from app.orm import Tag, TransactionTag
+
+        bucket = Tag(namespace="bucket", value="groceries")
+        occasion = Tag(namespace="occasion", value="vacation")
+        txn = Transaction(
+            date=date(2024, 3, 5), amount=-40.0, description="Market", merchant="Market", account_source="CHK"
+        )
+        untagged = Transaction(
+            date=date(2024, 3, 6), amount=100.0, description="Refund", merchant="Shop", account_source="CHK"
+        )
+        async_session.add_all([bucket, occasion, txn, untagged])
+        await async_session.flush()
+        async_session.add_all(
+            [
+                TransactionTag(transaction_id=txn.id, tag_id=bucket.id),
+                TransactionTag(transaction_id=txn.id, tag_id=occasion.id),
+            ]
+        )
+        await async_session.commit()
+
+        response = await client.get("/api/v1/reports/bucket-summary")
+        assert response.status_code == 200
+        buckets = {b["bucket"]: b for b in response.json()["buckets"]}
+        assert buckets["groceries"]["expenses"] == 40.0
+        assert buckets["groceries"]["count"] == 1
+        assert buckets["Untagged"]["income"] == 100.0
+
+    @pytest.mark.asyncio
+    async def test_trends_merchant_filter_is_case_insensitive(self, client: AsyncClient, async_session):
+        """Merchant filter matches regardless of case, like the Python filter did."""
+        async_session.add_all(
+            [
+                Transaction(
+                    date=date(2024, 5, 1), amount=-10.0, description="A", merchant="Amazon", account_source="CHK"
+                ),
+                Transaction(
+                    date=date(2024, 5, 2), amount=-5.0, description="B", merchant="Target", account_source="CHK"
+                ),
+            ]
+        )
+        await async_session.commit()
+
+        response = await client.get(
+            "/api/v1/reports/trends",
+            params={"start_date": "2024-05-01", "end_date": "2024-05-31", "group_by": "month", "merchants": "AMAZON"},
+        )
+        assert response.status_code == 200
+        assert response.json()["data"] == [{"period": "2024-05", "income": 0.0, "expenses": 10.0, "net": -10.0}]
+
+    @pytest.mark.asyncio
+    async def test_weekly_trends_roll_days_into_iso_weeks(self, client: AsyncClient, async_session):
+        """Days straddling a year boundary land in the same ISO week."""
+        async_session.add_all(
+            [
+                Transaction(
+                    date=date(2024, 12, 30), amount=-10.0, description="A", merchant="A", account_source="CHK"
+                ),
+                Transaction(
+                    date=date(2025, 1, 2), amount=-15.0, description="B", merchant="B", account_source="CHK"
+                ),
+            ]
+        )
+        await async_session.commit()
+
+        response = await client.get(
+            "/api/v1/reports/trends",
+            params={"start_date": "2024-12-01", "end_date": "2025-01-31", "group_by": "week"},
+        )
+        assert response.status_code == 200
+        assert response.json()["data"] == [{"period": "2025-W01", "income": 0.0, "expenses": 25.0, "net": -25.0}]
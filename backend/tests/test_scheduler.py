@@ -302,7 +302,11 @@ class TestSchedulerServiceDemoResetExecution:
         """Demo reset job restores from demo backup."""
         service = SchedulerService()
 
-        with patch("app.services.scheduler.backup_service") as mock_backup:
+        with (
+            patch("app.services.scheduler.backup_service") as mock_backup,
+            patch("app.services.scheduler.merchant_aliases") as mock_aliases,
+            patch("app.services.scheduler.merchant_history") as mock_history,
+        ):
             mock_demo_backup = MagicMock(id="demo_backup_id")
             mock_backup.get_demo_backup.return_value = mock_demo_backup
             mock_backup.restore_backup.return_value = True
@@ -311,6 +315,8 @@ class TestSchedulerServiceDemoResetExecution:
 
             mock_backup.get_demo_backup.assert_called_once()
             mock_backup.restore_backup.assert_called_once_with("demo_backup_id")
+            mock_aliases.clear_cache.assert_called_once()
+            mock_history.clear_cache.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_run_demo_reset_no_demo_backup(self):
@@ -434,6 +440,8 @@ class TestSchedulerServiceDateShift:
 
         mock_session.execute = mock_execute
         mock_session.commit = AsyncMock()
+        # Change markers for rollups and data generations live in session.info
+        mock_session.sync_session = MagicMock(info={})
 
         mock_cm = MagicMock()
         mock_cm.__aenter__ = AsyncMock(return_value=mock_session)
@@ -442,6 +450,7 @@ class TestSchedulerServiceDateShift:
         with patch("app.database.async_session", return_value=mock_cm):
             await service._shift_demo_dates()
 
+        assert mock_session.sync_session.info["data_generations_changed"] == {"transactions"}
         # Should have called execute 3 times: MAX query, update transactions, update import_sessions
         assert len(execute_calls) == 3
 
@@ -6,11 +6,13 @@ verifying the full integration between APScheduler and our backup service.
 """
 
 import asyncio
+import sqlite3
 import tempfile
 import pytest
 from pathlib import Path
 from unittest.mock import patch
 
+from app.config import settings
 from app.services.scheduler import SchedulerService
 from app.services.backup import BackupService
 
@@ -185,7 +187,10 @@ class TestSchedulerWithRealBackupService:
         backup_dir.mkdir()
 
         db_file = tmp_path / "test.db"
-        db_file.write_bytes(b"SQLite format 3\x00" + b"\x00" * 100)
+        conn = sqlite3.connect(db_file)
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.close()
 
         return {
             "backup_dir": str(backup_dir),
@@ -195,7 +200,7 @@ class TestSchedulerWithRealBackupService:
     @pytest.mark.asyncio
     async def test_scheduled_backup_creates_real_file(self, backup_env):
         """Test that a scheduled backup actually creates a backup file."""
-        with patch("app.services.backup.settings") as mock_settings:
+        with patch("app.services.backup.settings", settings.model_copy()) as mock_settings:
             mock_settings.backup_dir = backup_env["backup_dir"]
             mock_settings.backup_retention = 10
             mock_settings.backup_retention_days = 0
@@ -0,0 +1,263 @@
+"""
+Tests for lazy parsing (CSVFormatParser.iter_parse) and streamed uploads.
+"""
+
+import io
+from typing import Iterator
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.orm import ImportSession
+from app.parsers import CustomCsvConfig, CustomCsvParser, ParserRegistry, RowHandling
+
+BOFA_BANK_CSV = """Description,,Summary Amt.
+Beginning balance as of 01/01/2025,,"1,000.00"
+
+Date,Description,Amount,Running Bal.
+01/01/2025,Beginning balance as of 01/01/2025,,"1,000.00"
+01/02/2025,STARBUCKS STORE 123,-5.75,994.25
+01/03/2025,PAYROLL DES:SALARY ID:XXXXX123,"2,500.00","3,494.25"
+"""
+
+VENMO_CSV = """Account Statement - (@someone) ,,,,,,,,,
+Account Activity,,,,,,,,,
+,ID,Datetime,Type,Status,Note,From,To,Amount (total),Amount (tip)
+,,,,,,,,,
+,4001,2025-01-04T22:01:03,Payment,Complete,Dinner,Alex,Sam,- $18.00,
+,4002,2025-01-05T10:00:00,Payment,Complete,,Sam,Alex,+ $20.00,
+,4003,2025-01-06T10:00:00,Payment,Pending,Rent,Alex,Sam,- $900.00,
+"""
+
+QIF = """!Type:Bank
+D12/15/2024
+T-150.00
+PAMAZON.COM
+^
+D12/10/2024
+T1,500.00
+PPAYROLL
+N1001
+^
+"""
+
+# ACCTID after the transaction list: blocks are held until the end
+QFX_ACCOUNT_LAST = """OFXHEADER:100
+
+<OFX>
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20241215
+<TRNAMT>-150.00
+<FITID>A1
+<NAME>AMAZON.COM
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20241210
+<TRNAMT>1500.00
+<FITID>A2
+<NAME>PAYROLL
+</STMTTRN>
+</BANKTRANLIST>
+<BANKACCTFROM>
+<ACCTTYPE>CHECKING
+<ACCTID>987654321
+</BANKACCTFROM>
+</OFX>
+"""
+
+
+def _qfx(rows: int) -> str:
+    blocks = "".join(
+        f"<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20241215\n<TRNAMT>-{i}.00\n<FITID>F{i}\n<NAME>SHOP {i}\n</STMTTRN>\n"
+        for i in range(1, rows + 1)
+    )
+    return (
+        "<OFX>\n<BANKACCTFROM>\n<ACCTID>123456789\n<ACCTTYPE>CHECKING\n</BANKACCTFROM>\n"
+        f"<BANKTRANLIST>\n{blocks}</BANKTRANLIST>\n</OFX>\n"
+    )
+
+
+def _amex_csv(rows: int) -> str:
+    header = "Date,Description,Card Member,Account #,Amount,Reference,Category\n"
+    return header + "".join(
+        f"01/{1 + i % 28:02d}/2025,MERCHANT {i},JOHN DOE,XXXXX-53004,{10 + i}.00,{9000 + i},Merchandise\n"
+        for i in range(rows)
+    )
+
+
+class CountingLines:
+    """Line iterator recording how many lines have been consumed."""
+
+    def __init__(self, content: str):
+        self._lines = io.StringIO(content, newline="")
+        self.consumed = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self._lines:
+            self.consumed += 1
+            yield line
+
+
+def _stream(content: str) -> io.TextIOWrapper:
+    """Text stream decoded incrementally from bytes, like an upload."""
+    return io.TextIOWrapper(io.BytesIO(content.encode("utf-8")), encoding="utf-8", newline="")
+
+
+class TestIterParseMatchesParse:
+    """iter_parse over a stream yields what parse returns for the whole content."""
+
+    @pytest.mark.parametrize(
+        "format_key,content",
+        [
+            ("bofa_bank", BOFA_BANK_CSV),
+            ("venmo", VENMO_CSV),
+            ("amex_cc", _amex_csv(20)),
+            ("qif", QIF),
+            ("qfx", _qfx(20)),
+            ("qfx", QFX_ACCOUNT_LAST),
+        ],
+    )
+    def test_same_transactions(self, format_key: str, content: str):
+        parser = ParserRegistry.get_parser(format_key)
+        assert parser is not None
+
+        expected = parser.parse(content)
+        streamed = list(parser.iter_parse(_stream(content)))
+
+        assert expected
+        assert streamed == expected
+
+    def test_bofa_bank_skips_to_header(self):
+        parser = ParserRegistry.get_parser("bofa_bank")
+        transactions = list(parser.iter_parse(_stream(BOFA_BANK_CSV), "BOFA-Checking"))
+
+        assert [t.amount for t in transactions] == [-5.75, 2500.00]
+        assert all(t.account_source == "BOFA-Checking" for t in transactions)
+
+    def test_venmo_builds_description_and_skips_pending(self):
+        parser = ParserRegistry.get_parser("venmo")
+        transactions = list(parser.iter_parse(_stream(VENMO_CSV)))
+
+        assert [t.reference_id for t in transactions] == ["4001", "4002"]
+        assert transactions[1].description == "Payment: Sam -> Alex"
+
+    def test_qfx_tags_split_across_lines(self):
+        """Elements broken over arbitrary line boundaries still parse."""
+        parser = ParserRegistry.get_parser("qfx")
+        content = _qfx(3)
+        pieces = [content[i : i + 7] for i in range(0, len(content), 7)]
+
+        transactions = list(parser.iter_parse(pieces))
+
+        assert transactions == parser.parse(content)
+        assert transactions[0].account_source == "QFX-****6789"
+
+    def test_qfx_account_after_transactions(self):
+        parser = ParserRegistry.get_parser("qfx")
+        transactions = list(parser.iter_parse(_stream(QFX_ACCOUNT_LAST)))
+
+        assert [t.account_source for t in transactions] == ["QFX-****4321"] * 2
+
+
+class TestIterParseIsLazy:
+    """Transactions are yielded before the input has been read to the end."""
+
+    @pytest.mark.parametrize(
+        "format_key,content",
+        [("amex_cc", _amex_csv(1000)), ("qif", QIF * 500), ("qfx", _qfx(1000))],
+    )
+    def test_first_transaction_before_end_of_input(self, format_key: str, content: str):
+        parser = ParserRegistry.get_parser(format_key)
+        lines = CountingLines(content)
+
+        transactions = parser.iter_parse(lines, "Test Account")
+        next(transactions)
+
+        assert 0 < lines.consumed < 20
+
+    def test_custom_footer_rows_read_ahead_only(self):
+        config = CustomCsvConfig(
+            name="Footer Bank",
+            account_source="FOOTER",
+            date_column="Date",
+            amount_column="Amount",
+            description_column="Description",
+            row_handling=RowHandling(skip_footer_rows=2),
+        )
+        content = "Date,Amount,Description\n" + "01/15/2025,-1.00,COFFEE\n" * 1000 + "Total,-1000.00,\nEnd\n"
+        lines = CountingLines(content)
+
+        transactions = CustomCsvParser(config).iter_parse(lines)
+        next(transactions)
+
+        assert lines.consumed < 10
+        assert len(list(transactions)) == 999
+
+    def test_custom_footer_rows_match_parse(self):
+        config = CustomCsvConfig(
+            name="Footer Bank",
+            account_source="FOOTER",
+            date_column=0,
+            amount_column=1,
+            description_column=2,
+            row_handling=RowHandling(skip_footer_rows=1),
+        )
+        parser = CustomCsvParser(config)
+        # A trailing newline leaves an empty last line, which counts as the footer row
+        for content in ["01/15/2025,-1.00,A\n01/16/2025,-2.00,B\n", "01/15/2025,-1.00,A\n01/16/2025,-2.00,B"]:
+            assert list(parser.iter_parse(_stream(content))) == parser.parse(content)
+        assert len(parser.parse("01/15/2025,-1.00,A\n01/16/2025,-2.00,B\n")) == 2
+        assert len(parser.parse("01/15/2025,-1.00,A\n01/16/2025,-2.00,B")) == 1
+
+
+class TestStreamedUploads:
+    """Import endpoints parse uploads incrementally instead of reading them whole."""
+
+    @pytest.mark.asyncio
+    async def test_preview_counts_all_but_returns_limit(self, client: AsyncClient):
+        content = _amex_csv(250)
+        response = await client.post(
+            "/api/v1/import/preview",
+            files={"file": ("amex.csv", io.BytesIO(content.encode()), "text/csv")},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["detected_format"] == "amex_cc"
+        assert data["transaction_count"] == 250
+        assert len(data["transactions"]) == 100
+        assert data["total_amount"] == pytest.approx(-sum(10 + i for i in range(250)))
+
+    @pytest.mark.asyncio
+    async def test_confirm_multibyte_characters_across_read_boundaries(self, client: AsyncClient):
+        # Enough non-ASCII text that UTF-8 sequences straddle decoder chunk boundaries
+        header = "Date,Description,Card Member,Account #,Amount,Reference,Category\n"
+        description = "CAFÉ ÑANDÚ " + "é" * 50
+        rows = "".join(
+            f"01/{1 + i % 28:02d}/2025,{description} {i},JOHN DOE,XXXXX-53004,{i + 1}.00,{7000 + i},Restaurant\n"
+            for i in range(2000)
+        )
+        response = await client.post(
+            "/api/v1/import/confirm",
+            files={"file": ("amex.csv", io.BytesIO((header + rows).encode()), "text/csv")},
+            data={"format_type": "amex_cc"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["imported"] == 2000
+
+    @pytest.mark.asyncio
+    async def test_confirm_without_transactions_creates_no_session(self, client: AsyncClient, async_session):
+        response = await client.post(
+            "/api/v1/import/confirm",
+            files={"file": ("empty.qif", io.BytesIO(b"!Type:Bank\n"), "text/plain")},
+            data={"format_type": "qif"},
+        )
+
+        assert response.status_code == 400
+        count = await async_session.execute(select(func.count()).select_from(ImportSession))
+        assert count.scalar() == 0
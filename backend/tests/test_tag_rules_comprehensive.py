@@ -529,3 +529,72 @@ class TestTagRuleTagApplication:
         bucket_tags = [t for t in tags if t["namespace"] == "bucket"]
         assert len(bucket_tags) == 1
         assert bucket_tags[0]["full"] == "bucket:shopping"
+
+
+class TestBulkRuleApplication:
+    """Tests for the set-based rule engine behind /tag-rules/apply"""
+
+    async def _create_txn(self, client: AsyncClient, merchant: str, reference_id: str) -> int:
+        response = await client.post(
+            "/api/v1/transactions",
+            json={
+                "date": date.today().isoformat(),
+                "amount": -25.00,
+                "description": f"{merchant} purchase",
+                "merchant": merchant,
+                "account_source": "TEST",
+                "reference_id": reference_id,
+            },
+        )
+        return response.json()["id"]
+
+    @pytest.mark.asyncio
+    async def test_only_unbucketed_transactions_are_checked(self, client: AsyncClient, seed_categories):
+        """Transactions with a real bucket are skipped; bucket:none is replaced"""
+        tagged_id = await self._create_txn(client, "Bulk Store", "bulk_tagged")
+        none_id = await self._create_txn(client, "Bulk Store", "bulk_none")
+        untagged_id = await self._create_txn(client, "Bulk Store", "bulk_untagged")
+        await client.post(f"/api/v1/transactions/{tagged_id}/tags", json={"tag": "bucket:dining"})
+        await client.post(f"/api/v1/transactions/{none_id}/tags", json={"tag": "bucket:none"})
+
+        rule = (
+            await client.post(
+                "/api/v1/tag-rules",
+                json={"name": "Bulk", "tag": "bucket:groceries", "merchant_pattern": "bulk store"},
+            )
+        ).json()
+
+        data = (await client.post("/api/v1/tag-rules/apply")).json()
+
+        assert data["applied_count"] == 2
+        assert data["total_transactions_checked"] == 2
+        for txn_id, expected in [
+            (tagged_id, "bucket:dining"),
+            (none_id, "bucket:groceries"),
+            (untagged_id, "bucket:groceries"),
+        ]:
+            tags = (await client.get(f"/api/v1/transactions/{txn_id}/tags")).json()["tags"]
+            assert [t["full"] for t in tags if t["namespace"] == "bucket"] == [expected]
+
+        rule_data = (await client.get(f"/api/v1/tag-rules/{rule['id']}")).json()
+        assert rule_data["match_count"] == 2
+        assert rule_data["last_matched_date"] is not None
+
+    @pytest.mark.asyncio
+    async def test_non_bucket_tag_not_applied_twice(self, client: AsyncClient, seed_categories):
+        """Re-running an occasion rule does not duplicate the tag or its stats"""
+        await self._create_txn(client, "Beach Resort", "bulk_occasion")
+        rule = (
+            await client.post(
+                "/api/v1/tag-rules",
+                json={"name": "Beach", "tag": "occasion:vacation", "merchant_pattern": "beach"},
+            )
+        ).json()
+
+        first = (await client.post("/api/v1/tag-rules/apply")).json()
+        second = (await client.post("/api/v1/tag-rules/apply")).json()
+
+        assert first["applied_count"] == 1
+        assert second["applied_count"] == 0
+        rule_data = (await client.get(f"/api/v1/tag-rules/{rule['id']}")).json()
+        assert rule_data["match_count"] == 1
@@ -4,6 +4,9 @@ Comprehensive tests for tags.py and tag_rules.py to increase coverage.
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.orm import Tag, Transaction, TransactionTag
 
 
 class TestTagsComprehensive:
@@ -376,3 +379,101 @@ class TestTagsAdditional:
                     # Check for error code indicating tag is in use
                     assert delete_response.json()["detail"]["error_code"] == "TAG_IN_USE"
                     break
+
+
+class TestTagStatistics:
+    """Tag statistics come from one grouped query per namespace."""
+
+    @pytest.mark.asyncio
+    async def test_bucket_stats_match_per_tag_totals(self, client: AsyncClient, async_session, seed_transactions):
+        response = await client.get("/api/v1/tags/buckets/stats")
+        assert response.status_code == 200
+        buckets = response.json()["buckets"]
+
+        tags = (await async_session.execute(select(Tag).where(Tag.namespace == "bucket"))).scalars().all()
+        assert {b["value"] for b in buckets} == {t.value for t in tags}
+        for bucket in buckets:
+            count, total, first, last = (
+                await async_session.execute(
+                    select(func.count(), func.sum(Transaction.amount), func.min(Transaction.date), func.max(Transaction.date))
+                    .select_from(Transaction)
+                    .join(TransactionTag, Transaction.id == TransactionTag.transaction_id)
+                    .where(TransactionTag.tag_id == bucket["id"])
+                )
+            ).one()
+            assert bucket["transaction_count"] == count
+            assert bucket["total_amount"] == pytest.approx(total or 0)
+            assert bucket["first_used"] == (first.isoformat() if first else None)
+            assert bucket["last_used"] == (last.isoformat() if last else None)
+
+        income = next(b for b in buckets if b["value"] == "income")
+        assert income["transaction_count"] > 0
+        unused = next(b for b in buckets if b["value"] == "education")
+        assert unused == {**unused, "transaction_count": 0, "total_amount": 0.0, "first_used": None, "last_used": None}
+
+    @pytest.mark.asyncio
+    async def test_account_stats_count_by_account_fk(self, client: AsyncClient, async_session, seed_transactions):
+        response = await client.get("/api/v1/tags/accounts/stats")
+        accounts = {a["value"]: a for a in response.json()["accounts"]}
+
+        amex = accounts["amex-5678"]
+        expected = (
+            await async_session.execute(
+                select(func.count(), func.sum(Transaction.amount)).where(Transaction.account_tag_id == amex["id"])
+            )
+        ).one()
+        assert (amex["transaction_count"], amex["total_amount"]) == (expected[0], pytest.approx(expected[1]))
+        assert accounts["chase-9999"]["transaction_count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_statements_do_not_grow_with_tags(self, client: AsyncClient, seed_transactions, statement_counter):
+        response = await client.get("/api/v1/tags/buckets/stats")
+        assert len(response.json()["buckets"]) == 14
+        # Data generation tokens (ETag) plus the grouped query
+        assert len(statement_counter) == 2
+
+        statement_counter.clear()
+        await client.get("/api/v1/tags/buckets/stats")
+        # Served from the cache; only the tokens are read
+        assert len(statement_counter) == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_can_be_disabled(self, client: AsyncClient, seed_transactions, statement_counter, monkeypatch):
+        monkeypatch.setattr("app.services.tag_stats.settings.tag_stats_cache_seconds", 0)
+
+        for _ in range(2):
+            statement_counter.clear()
+            await client.get("/api/v1/tags/occasions/stats")
+            assert len(statement_counter) == 2
+
+    @pytest.mark.asyncio
+    async def test_tag_writes_invalidate_cached_stats(self, client: AsyncClient, seed_transactions):
+        before = await client.get("/api/v1/tags/occasions/stats")
+        vacation = next(o for o in before.json()["occasions"] if o["value"] == "vacation")
+        txn = (await client.get("/api/v1/transactions?limit=1")).json()[0]
+
+        await client.post(f"/api/v1/transactions/{txn['id']}/tags", json={"tag": "occasion:vacation"})
+        await client.post("/api/v1/tags", json={"namespace": "occasion", "value": "birthday"})
+        after = {o["value"]: o for o in (await client.get("/api/v1/tags/occasions/stats")).json()["occasions"]}
+
+        assert after["vacation"]["transaction_count"] == vacation["transaction_count"] + 1
+        assert after["vacation"]["last_used"] is not None
+        assert after["birthday"]["transaction_count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_list_with_usage_matches_usage_count(
+        self, client: AsyncClient, seed_transactions, statement_counter
+    ):
+        statement_counter.clear()
+        response = await client.get("/api/v1/tags?namespace=bucket&with_usage=true")
+        tags = response.json()
+        assert len(statement_counter) == 2
+
+        for tag in tags:
+            usage = (await client.get(f"/api/v1/tags/{tag['id']}/usage-count")).json()
+            assert tag["usage_count"] == usage["usage_count"]
+        assert any(tag["usage_count"] > 0 for tag in tags)
+
+        plain = (await client.get("/api/v1/tags?namespace=bucket")).json()
+        assert [t["id"] for t in plain] == [t["id"] for t in tags]
+        assert all(t["usage_count"] is None for t in plain)
@@ -0,0 +1,119 @@
+"""
+Tests for the import worker pools (app.services.worker_pool).
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import AppSettings, settings
+from app.orm import ImportFormatType
+from app.routers.import_helpers import _parse_content
+from app.services import worker_pool
+
+AMEX_CSV = """Date,Description,Card Member,Account #,Amount,Reference,Category
+01/15/2025,AMAZON.COM,JOHN DOE,XXXXX-53004,-199.99,320250150001,Merchandise
+01/10/2025,STARBUCKS,JOHN DOE,XXXXX-53004,-12.50,320250100001,Restaurant
+"""
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    """Select IMPORT_EXECUTOR for one test, with fresh pools on either side."""
+
+    def select(kind: str) -> None:
+        worker_pool.shutdown()
+        monkeypatch.setattr(settings, "import_executor", kind)
+
+    yield select
+    worker_pool.shutdown()
+
+
+def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+class TestExecutors:
+    @pytest.mark.asyncio
+    async def test_thread_runs_off_the_event_loop(self, executor):
+        executor("thread")
+
+        assert (await worker_pool.run_blocking(_thread_name)).startswith("import-worker")
+        assert (await worker_pool.run_cpu(_thread_name)).startswith("import-worker")
+
+    @pytest.mark.asyncio
+    async def test_inline_runs_on_the_event_loop(self, executor):
+        executor("inline")
+
+        assert await worker_pool.run_cpu(_thread_name) == threading.current_thread().name
+
+    @pytest.mark.asyncio
+    async def test_process_parses_whole_files(self, executor, monkeypatch):
+        executor("process")
+        monkeypatch.setattr(settings, "import_workers", 2)
+
+        results = await asyncio.gather(
+            worker_pool.run_cpu(_parse_content, AMEX_CSV.encode(), None, None),
+            worker_pool.run_cpu(_parse_content, AMEX_CSV.encode(), "AMEX", ImportFormatType.amex_cc),
+        )
+
+        for transactions, format_type in results:
+            assert format_type == ImportFormatType.amex_cc
+            assert [t["amount"] for t in transactions] == [199.99, 12.50]
+        # Streaming work stays on threads in process mode
+        assert (await worker_pool.run_blocking(_thread_name)).startswith("import-worker")
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, executor):
+        executor("thread")
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await worker_pool.run_cpu(time.sleep, 0.2)
+        task.cancel()
+
+        assert ticks > 5
+
+    def test_unknown_executor_is_rejected(self):
+        with pytest.raises(ValidationError):
+            AppSettings(import_executor="proces")
+
+
+class TestIterateBlocking:
+    @pytest.mark.asyncio
+    async def test_pulls_batches_in_order(self, executor):
+        executor("thread")
+        pulled: list[int] = []
+
+        def numbers():
+            for i in range(7):
+                pulled.append(i)
+                yield i
+
+        items = worker_pool.iterate_blocking(numbers(), 3)
+
+        assert await anext(items) == 0
+        # Only the first batch has been pulled
+        assert pulled == [0, 1, 2]
+        assert [i async for i in items] == [1, 2, 3, 4, 5, 6]
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate(self, executor):
+        executor("inline")
+
+        def failing():
+            yield 1
+            raise ValueError("bad row")
+
+        with pytest.raises(ValueError, match="bad row"):
+            async for _ in worker_pool.iterate_blocking(failing(), 10):
+                pass
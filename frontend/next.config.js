@@ -74,8 +74,9 @@ const nextConfig = {
         ],
       },
       {
-        // Cache-Control for HTML pages (not static assets)
-        source: '/((?!_next/static|_next/image|favicon.ico).*)',
+        // Cache-Control for HTML pages (not static assets, not proxied API
+        // responses, which set their own for ETag revalidation)
+        source: '/((?!_next/static|_next/image|favicon.ico|api/).*)',
         headers: [
           {
             key: 'Cache-Control',
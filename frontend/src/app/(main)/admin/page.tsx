@@ -63,23 +63,10 @@ export default function AdminPage() {
   async function fetchTags(namespace: string | null) {
     setTagsLoading(true)
     try {
-      const url = namespace ? `/api/v1/tags?namespace=${namespace}` : '/api/v1/tags'
+      const url = namespace ? `/api/v1/tags?namespace=${namespace}&with_usage=true` : '/api/v1/tags?with_usage=true'
       const res = await fetch(url)
-      const data = await res.json()
-
-      const tagsWithUsage = await Promise.all(
-        data.map(async (tag: Tag) => {
-          try {
-            const usageRes = await fetch(`/api/v1/tags/${tag.id}/usage-count`)
-            const usageData = await usageRes.json()
-            return { ...tag, usage_count: usageData.usage_count }
-          } catch {
-            return { ...tag, usage_count: 0 }
-          }
-        })
-      )
-
-      setTags(tagsWithUsage)
+      const data: Tag[] = await res.json()
+      setTags(data)
     } catch (err) {
       console.error('Error fetching tags:', err)
     } finally {
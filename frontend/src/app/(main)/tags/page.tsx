@@ -99,22 +99,9 @@ export default function TagsPage() {
   async function fetchTagsForNamespace(namespace: string) {
     setTagsLoading(true)
     try {
-      const res = await fetch(`/api/v1/tags?namespace=${namespace}`)
+      const res = await fetch(`/api/v1/tags?namespace=${namespace}&with_usage=true`)
       const data: Tag[] = await res.json()
-
-      const tagsWithUsage = await Promise.all(
-        data.map(async (tag) => {
-          try {
-            const usageRes = await fetch(`/api/v1/tags/${tag.id}/usage-count`)
-            const usageData = await usageRes.json()
-            return { ...tag, usage_count: usageData.usage_count }
-          } catch {
-            return { ...tag, usage_count: 0 }
-          }
-        })
-      )
-
-      setTags(tagsWithUsage)
+      setTags(data)
     } catch (err) {
       console.error('Error fetching tags:', err)
     } finally {
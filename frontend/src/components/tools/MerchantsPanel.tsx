@@ -15,6 +15,7 @@ interface MerchantAlias {
   match_type: 'exact' | 'contains' | 'regex'
   priority: number
   match_count: number
+  pattern_error?: string | null
 }
 
 interface AliasPreviewUpdate {
@@ -363,6 +364,15 @@ export default function MerchantsPanel() {
                           {alias.match_type}
                         </span>
                         <span>{t('used')} {alias.match_count}x</span>
+                        {alias.pattern_error && (
+                          <span
+                            className="text-red-500"
+                            title={alias.pattern_error}
+                            data-testid={`alias-pattern-error-${alias.id}`}
+                          >
+                            {t('patternRefused')}
+                          </span>
+                        )}
                       </div>
                     </div>
                     <div className="flex gap-1 ml-2">
@@ -22,6 +22,20 @@ export interface PreviewTransaction {
   bucket?: string
 }
 
+export interface BatchDuplicateReport {
+  cross_file_duplicates: number
+  exact_duplicates: number
+  duplicates_by_file: Record<string, number>
+  cross_account_matches: {
+    date: string
+    amount: number
+    description: string
+    existing_account: string
+    existing_file: string
+    importing_account: string | null
+  }[]
+}
+
 export interface FilePreview {
   filename: string
   account_source: string | null
@@ -29,6 +43,7 @@ export interface FilePreview {
   transaction_count: number
   duplicate_count: number
   cross_file_duplicate_count: number
+  duplicate_report?: BatchDuplicateReport
   total_amount: number
   date_range_start: string | null
   date_range_end: string | null